@@ -2,12 +2,19 @@
 포트폴리오 분석 스크립트
 DB에 저장된 ETF 보유 내역을 분석하여 실제 보유 종목과 섹터 비중 계산
 """
+import calendar
 import sqlite3
 import time
+import uuid
 import yfinance as yf
+import numpy as np
 import pandas as pd
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
+from datetime import datetime
+
+from data.import_broker_trades import FX_TICKER, resolve_daily_closes
+from data.price_lookup import nearest_price
 
 
 # ===== 0. 티커 매핑 및 환율 조회 =====
@@ -332,6 +339,248 @@ def fetch_etf_sectors(ticker: str, retry: int = 3) -> Optional[Dict[str, float]]
     return None
 
 
+def get_etf_constituents(ticker: str, db_path: str) -> Optional[pd.DataFrame]:
+    """
+    운용사 보유종목 파일에서 임포트한 ETF 전체 구성 종목 조회 (data/import_constituents.py)
+
+    Args:
+        ticker: ETF 티커 (매핑 후, 예: 'SPY')
+        db_path: DB 경로
+
+    Returns:
+        DataFrame with columns: ['Symbol', 'Name', 'Holding Percent'] (비중 내림차순)
+        또는 임포트된 파일이 없으면 None
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        df = pd.read_sql_query("""
+            SELECT s.symbol AS Symbol, COALESCE(s.name, s.symbol) AS Name, c.weight AS "Holding Percent"
+            FROM etf_constituents c
+            JOIN constituent_symbols s ON s.id = c.symbol_id
+            WHERE c.etf_ticker = ?
+            ORDER BY c.weight DESC
+        """, conn, params=(ticker,))
+    except (sqlite3.OperationalError, pd.errors.DatabaseError):
+        # 구성 종목 테이블이 없는 기존 DB
+        return None
+    finally:
+        conn.close()
+
+    return df if not df.empty else None
+
+
+# ===== 2.5 구성 종목 캐시 및 재귀 전개 (fund-of-funds) =====
+
+# 하위 펀드로 전개할 quoteType
+FUND_QUOTE_TYPES = ('ETF', 'MUTUALFUND')
+
+# 재귀 전개 최대 깊이 (1 = 직접 구성 종목만)
+MAX_LOOKTHROUGH_DEPTH = 3
+
+
+def new_composition_cache() -> Dict:
+    """
+    분석 1회 실행 동안 공유하는 구성 종목 캐시 생성
+    (같은 펀드를 여러 계좌/상위 펀드가 참조해도 조회는 1번)
+
+    Returns:
+        {
+            'compositions': {ticker: (DataFrame 또는 None, 로컬 여부)},
+            'sectors': {ticker: Dict 또는 None},
+            'info': {ticker: Dict 또는 None},
+            'expansions': {(ticker, max_depth): expand_etf_holdings 결과},
+            'local_funds': 로컬 구성 종목이 있는 ETF 티커 set (최초 조회 시 채움)
+        }
+    """
+    return {'compositions': {}, 'sectors': {}, 'info': {}, 'expansions': {}, 'local_funds': None}
+
+
+def get_ticker_info(ticker: str, cache: Optional[Dict] = None) -> Optional[Dict]:
+    """
+    yfinance info 조회 (캐시 사용)
+
+    Args:
+        ticker: 티커
+        cache: new_composition_cache() 결과 (None이면 캐시 없이 조회)
+
+    Returns:
+        info 딕셔너리 또는 실패 시 None
+    """
+    if cache is not None and ticker in cache['info']:
+        return cache['info'][ticker]
+
+    try:
+        info = yf.Ticker(ticker).info
+    except Exception as e:
+        print(f"⚠️  {ticker} 정보 조회 실패: {e}")
+        info = None
+
+    if cache is not None:
+        cache['info'][ticker] = info
+    return info
+
+
+def _get_local_fund_tickers(db_path: str, cache: Dict) -> set:
+    """로컬 구성 종목이 임포트된 ETF 티커 목록 (캐시)"""
+    if cache['local_funds'] is None:
+        conn = sqlite3.connect(db_path)
+        try:
+            rows = conn.execute("SELECT etf_ticker FROM etf_constituent_files").fetchall()
+            cache['local_funds'] = {row[0] for row in rows}
+        except sqlite3.OperationalError:
+            cache['local_funds'] = set()
+        finally:
+            conn.close()
+    return cache['local_funds']
+
+
+def _load_composition(ticker: str, db_path: str, cache: Dict) -> Tuple[Optional[pd.DataFrame], bool]:
+    """구성 종목 조회 (캐시) → (DataFrame 또는 None, 로컬 여부)"""
+    if ticker not in cache['compositions']:
+        constituents_df = None
+        if ticker in _get_local_fund_tickers(db_path, cache):
+            constituents_df = get_etf_constituents(ticker, db_path)
+
+        if constituents_df is not None:
+            print(f"   📂 {ticker} 로컬 구성 종목 사용: {len(constituents_df)}개")
+            cache['compositions'][ticker] = (constituents_df, True)
+        else:
+            cache['compositions'][ticker] = (fetch_etf_holdings(ticker), False)
+
+    return cache['compositions'][ticker]
+
+
+def load_etf_holdings(ticker: str, db_path: str, cache: Optional[Dict] = None) -> Optional[pd.DataFrame]:
+    """
+    ETF 구성 종목 조회: 로컬 전체 구성 종목 우선, 없으면 yfinance top holdings
+
+    Args:
+        ticker: ETF 티커 (매핑 후)
+        db_path: DB 경로
+        cache: new_composition_cache() 결과 (None이면 매번 조회)
+
+    Returns:
+        DataFrame (Symbol 컬럼 또는 인덱스, Name, Holding Percent) 또는 None
+    """
+    if cache is None:
+        cache = new_composition_cache()
+    return _load_composition(ticker, db_path, cache)[0]
+
+
+def load_etf_sectors(ticker: str, cache: Optional[Dict] = None) -> Optional[Dict[str, float]]:
+    """
+    ETF 섹터 비중 조회 (캐시 사용, fetch_etf_sectors 래퍼)
+
+    Args:
+        ticker: ETF 티커 (매핑 후)
+        cache: new_composition_cache() 결과 (None이면 매번 조회)
+
+    Returns:
+        {'Technology': 0.28, ...} 또는 None
+    """
+    if cache is None:
+        return fetch_etf_sectors(ticker)
+    if ticker not in cache['sectors']:
+        cache['sectors'][ticker] = fetch_etf_sectors(ticker)
+    return cache['sectors'][ticker]
+
+
+def _is_fund(symbol: str, db_path: str, cache: Dict, allow_remote: bool) -> bool:
+    """
+    구성 종목이 하위 펀드(ETF/뮤추얼펀드)인지 확인
+
+    Args:
+        symbol: 구성 종목 티커
+        db_path: DB 경로
+        cache: 구성 종목 캐시
+        allow_remote: False면 로컬 구성 종목 여부만 확인 (수천 개 구성 종목의 yfinance 조회 방지)
+    """
+    if symbol in _get_local_fund_tickers(db_path, cache):
+        return True
+    if not allow_remote:
+        return False
+
+    info = get_ticker_info(symbol, cache)
+    return bool(info) and info.get('quoteType') in FUND_QUOTE_TYPES
+
+
+def expand_etf_holdings(
+    ticker: str,
+    db_path: str,
+    cache: Optional[Dict] = None,
+    max_depth: int = MAX_LOOKTHROUGH_DEPTH
+) -> Optional[pd.DataFrame]:
+    """
+    ETF 구성 종목을 하위 펀드까지 재귀적으로 전개 (fund-of-funds look-through)
+
+    - 하위 펀드 비중 × 하위 펀드 내 종목 비중으로 실제 종목까지 펼침
+    - 순환 참조(A → B → A)와 max_depth 초과 시 해당 펀드를 종목으로 유지
+    - 하위 펀드가 없으면 조회한 구성 종목을 그대로 반환
+
+    Args:
+        ticker: ETF 티커 (매핑 후)
+        db_path: DB 경로
+        cache: new_composition_cache() 결과 (None이면 이번 호출에서만 사용)
+        max_depth: 최대 전개 깊이 (1 = 직접 구성 종목만)
+
+    Returns:
+        DataFrame with columns: ['Symbol', 'Name', 'Holding Percent'] 또는 None
+    """
+    if cache is None:
+        cache = new_composition_cache()
+
+    # 같은 펀드는 실행당 1번만 전개 (계좌별 / 전체 / 여러 월이 공유)
+    key = (ticker, max_depth)
+    if key not in cache['expansions']:
+        cache['expansions'][key] = _expand_composition(ticker, db_path, cache, max_depth)
+    return cache['expansions'][key]
+
+
+def _expand_composition(ticker: str, db_path: str, cache: Dict, max_depth: int) -> Optional[pd.DataFrame]:
+    """expand_etf_holdings 본체 (캐시 없음)"""
+    root_df, root_is_local = _load_composition(ticker, db_path, cache)
+    if root_df is None or root_df.empty:
+        return root_df
+
+    leaves = {}  # symbol -> [name, weight]
+    expanded = []
+
+    def walk(fund: str, composition_df: pd.DataFrame, is_local: bool, parent_weight: float,
+             path: Tuple[str, ...], depth: int):
+        symbols = composition_df['Symbol'].tolist() if 'Symbol' in composition_df.columns else composition_df.index.tolist()
+        names = composition_df['Name'].tolist() if 'Name' in composition_df.columns else symbols
+        weights = composition_df['Holding Percent'].tolist()
+
+        for symbol, name, weight in zip(symbols, names, weights):
+            child = TICKER_MAPPING.get(symbol, symbol)
+            effective_weight = parent_weight * weight
+
+            if child in path:
+                print(f"   ⚠️  순환 참조 감지: {' → '.join(path)} → {child} (종목으로 처리)")
+            elif depth < max_depth and _is_fund(child, db_path, cache, allow_remote=not is_local):
+                child_df, child_is_local = _load_composition(child, db_path, cache)
+                if child_df is not None and not child_df.empty:
+                    expanded.append(child)
+                    walk(child, child_df, child_is_local, effective_weight, path + (child,), depth + 1)
+                    continue
+
+            if symbol in leaves:
+                leaves[symbol][1] += effective_weight
+            else:
+                leaves[symbol] = [name, effective_weight]
+
+    walk(ticker, root_df, root_is_local, 1.0, (ticker,), 1)
+
+    if not expanded:
+        return root_df
+
+    print(f"   🔍 하위 펀드 전개: {', '.join(dict.fromkeys(expanded))}")
+    return pd.DataFrame(
+        [(symbol, name, weight) for symbol, (name, weight) in leaves.items()],
+        columns=['Symbol', 'Name', 'Holding Percent']
+    )
+
+
 # ===== 3. 분석 및 계산 레이어 =====
 
 def calculate_my_holdings(
@@ -362,10 +611,12 @@ def calculate_my_holdings(
     result = []
     total_weight = 0.0
 
-    for index, row in holdings_df.iterrows():
-        stock_symbol = row.get('Symbol', index)  # Symbol 컬럼 또는 인덱스
-        stock_name = row.get('Name', stock_symbol)
-        weight_in_etf = row['Holding Percent']
+    # iterrows 대신 컬럼 단위로 꺼내기 (전체 구성 종목 수천 개 대비)
+    symbols = holdings_df['Symbol'].tolist() if 'Symbol' in holdings_df.columns else holdings_df.index.tolist()
+    names = holdings_df['Name'].tolist() if 'Name' in holdings_df.columns else symbols
+    weights = holdings_df['Holding Percent'].tolist()
+
+    for stock_symbol, stock_name, weight_in_etf in zip(symbols, names, weights):
 
         # 내 포트폴리오에서 이 종목이 차지하는 실제 금액
         my_stock_value = int(my_investment * weight_in_etf)
@@ -450,99 +701,387 @@ def calculate_my_sectors(
     return result
 
 
+# ===== 3.1 일괄(벡터화) 계산 =====
+
+HOLDING_COLUMNS = ['account_id', 'source_ticker', 'stock_symbol', 'stock_name',
+                   'holding_percent', 'my_amount', 'asset_type']
+SECTOR_COLUMNS = ['account_id', 'source_ticker', 'sector_name',
+                  'sector_percent', 'my_amount', 'asset_type']
+
+
+def build_composition_frame(holdings_by_etf: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    ETF별 top_holdings DataFrame을 하나의 long-format 구성 종목 프레임으로 변환
+
+    Args:
+        holdings_by_etf: {'SPY': fetch_etf_holdings('SPY'), ...}
+
+    Returns:
+        DataFrame with columns: ['source_ticker', 'stock_symbol', 'stock_name', 'holding_percent']
+    """
+    frames = []
+    for etf_ticker, holdings_df in holdings_by_etf.items():
+        if holdings_df is None or holdings_df.empty:
+            continue
+
+        df = holdings_df if 'Symbol' in holdings_df.columns else holdings_df.rename_axis('Symbol').reset_index()
+        symbols = df['Symbol'].astype(str)
+        names = df['Name'] if 'Name' in df.columns else symbols
+
+        frames.append(pd.DataFrame({
+            'source_ticker': etf_ticker,
+            'stock_symbol': symbols.values,
+            'stock_name': names.fillna(symbols).values,
+            'holding_percent': df['Holding Percent'].astype(float).values,
+        }))
+
+    if not frames:
+        return pd.DataFrame(columns=['source_ticker', 'stock_symbol', 'stock_name', 'holding_percent'])
+
+    return pd.concat(frames, ignore_index=True)
+
+
+def build_sector_frame(sectors_by_etf: Dict[str, Dict[str, float]]) -> pd.DataFrame:
+    """
+    ETF별 sector_weightings를 long-format 섹터 프레임으로 변환
+
+    Args:
+        sectors_by_etf: {'SPY': {'technology': 0.31, ...}, ...}
+
+    Returns:
+        DataFrame with columns: ['source_ticker', 'sector_name', 'sector_percent']
+    """
+    rows = [
+        (etf_ticker, sector_name, float(weight))
+        for etf_ticker, sectors in sectors_by_etf.items() if sectors
+        for sector_name, weight in sectors.items()
+    ]
+    return pd.DataFrame(rows, columns=['source_ticker', 'sector_name', 'sector_percent'])
+
+
+def _sequential_weight_totals(df: pd.DataFrame, weight_col: str) -> pd.Series:
+    """
+    ETF별 비중 합계 (calculate_my_holdings와 같은 순차 합산으로 부동소수 결과 일치)
+
+    np.cumsum은 앞에서부터 차례로 더하므로 ETF 구간별 마지막 누적값 = 순차 합계 (행 단위 반복 없음)
+    """
+    codes, etf_tickers = pd.factorize(df['source_ticker'], sort=False)
+    if len(codes) == 0:
+        return pd.Series(dtype=float, name='total_weight')
+
+    order = np.argsort(codes, kind='stable')
+    weights = df[weight_col].to_numpy(dtype=float)[order]
+    bounds = np.flatnonzero(np.diff(codes[order])) + 1
+    totals = [np.cumsum(chunk)[-1] for chunk in np.split(weights, bounds)]
+    return pd.Series(totals, index=etf_tickers, name='total_weight', dtype=float)
+
+
+def _apply_weights(
+    composition_df: pd.DataFrame,
+    allocation_df: pd.DataFrame,
+    weight_col: str,
+    other_symbol_cols: Dict[str, object],
+    columns: List[str]
+) -> pd.DataFrame:
+    """구성 비중 × 계좌별 투자금 (merge-and-multiply) + 누락 비중 OTHER 행 생성"""
+    if composition_df.empty or allocation_df.empty:
+        return pd.DataFrame(columns=columns)
+
+    allocation = allocation_df[['account_id', 'source_ticker', 'amount', 'asset_type']]
+
+    rows = allocation.merge(composition_df, on='source_ticker', how='inner')
+    rows['my_amount'] = np.trunc(rows['amount'].to_numpy(dtype=float) * rows[weight_col].to_numpy()).astype(np.int64)
+
+    # 비중 합계 < 1.0이면 나머지를 OTHER로
+    totals = _sequential_weight_totals(composition_df, weight_col)
+    remaining = (1.0 - totals[totals < 1.0]).rename(weight_col)
+    others = allocation.merge(remaining, left_on='source_ticker', right_index=True, how='inner')
+    others['my_amount'] = np.trunc(others['amount'].to_numpy(dtype=float) * others[weight_col].to_numpy()).astype(np.int64)
+    for col, value in other_symbol_cols.items():
+        others[col] = value(others['source_ticker']) if callable(value) else value
+
+    result = pd.concat([rows[columns], others[columns]], ignore_index=True)
+    return result.sort_values(['account_id', 'source_ticker'], kind='stable', na_position='first').reset_index(drop=True)
+
+
+def calculate_holdings_batch(composition_df: pd.DataFrame, allocation_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    전체 ETF 구성 종목 × 계좌별 투자금을 한 번에 계산 (calculate_my_holdings의 일괄 버전)
+
+    Args:
+        composition_df: build_composition_frame 결과
+        allocation_df: columns ['account_id', 'source_ticker', 'amount', 'asset_type']
+                       (account_id가 None이면 전체 분석 행)
+
+    Returns:
+        DataFrame with columns: HOLDING_COLUMNS (OTHER 행 포함)
+    """
+    return _apply_weights(
+        composition_df, allocation_df, 'holding_percent',
+        {
+            'stock_symbol': 'OTHER',
+            'stock_name': lambda sources: sources + ' 기타 종목',
+        },
+        HOLDING_COLUMNS
+    )
+
+
+def calculate_sectors_batch(sector_df: pd.DataFrame, allocation_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    전체 ETF 섹터 비중 × 계좌별 투자금을 한 번에 계산 (calculate_my_sectors의 일괄 버전)
+
+    Args:
+        sector_df: build_sector_frame 결과
+        allocation_df: columns ['account_id', 'source_ticker', 'amount', 'asset_type']
+
+    Returns:
+        DataFrame with columns: SECTOR_COLUMNS (누락 비중은 'other' 섹터)
+    """
+    return _apply_weights(
+        sector_df, allocation_df, 'sector_percent',
+        {'sector_name': 'other'},
+        SECTOR_COLUMNS
+    )
+
+
 # ===== 3.5 자산 유형별 분석 함수 =====
+# 조회(resolve_asset, 네트워크)와 계산(build_asset_analysis, 순수 함수)을 분리
+# → 동기 분석(analyze_*_asset)과 비동기 파이프라인(analyze_portfolio_async)이 같은 결과를 생성
 
-def analyze_stock_asset(
+def resolve_asset(
     ticker: str,
-    name: str,
-    amount: int,
-    month_id: int,
-    account_id: Optional[int],
-    db_path: str
-):
+    asset_type: str,
+    db_path: str,
+    cache: Optional[Dict] = None
+) -> Dict:
     """
-    주식형 자산 분석 (ETF 또는 개별 주식)
+    자산 분석에 필요한 외부 데이터 조회 (yfinance / 로컬 구성 종목)
 
     Args:
-        ticker: 티커 심볼
-        name: 보유 종목명
-        amount: 투자 금액
-        month_id: 월 ID
-        account_id: 계좌 ID (None이면 전체)
+        ticker: 티커 심볼 (매핑 전)
+        asset_type: 'STOCK', 'BOND', 'CASH'
         db_path: DB 경로
+        cache: new_composition_cache() 결과
+
+    Returns:
+        {
+            'ticker': 'SPY',            # 매핑 후 티커
+            'asset_type': 'STOCK',
+            'quote_type': 'ETF',        # STOCK만
+            'info': {...},              # STOCK만
+            'holdings_df': DataFrame 또는 None,
+            'sectors': Dict 또는 None
+        }
     """
+    if asset_type == 'CASH':
+        return {'ticker': 'CASH', 'asset_type': 'CASH'}
+
     mapped_ticker = map_ticker(ticker)
+    if cache is None:
+        cache = new_composition_cache()
 
-    # ETF인지 개별 주식인지 확인
-    try:
-        stock = yf.Ticker(mapped_ticker)
-        info = stock.info
-        quote_type = info.get('quoteType', 'UNKNOWN')
-    except Exception as e:
-        print(f"⚠️  {mapped_ticker} 정보 조회 실패: {e}")
-        quote_type = 'UNKNOWN'
+    resolved = {'ticker': mapped_ticker, 'asset_type': asset_type, 'holdings_df': None, 'sectors': None}
 
-    # 개별 주식인 경우
-    if quote_type == 'EQUITY':
-        print(f"   📌 개별 주식으로 처리")
-        # Holdings: 자기 자신을 100% 보유
-        holdings_data = [{
-            'source_ticker': mapped_ticker,
-            'stock_symbol': mapped_ticker,
+    if asset_type == 'STOCK':
+        # ETF인지 개별 주식인지 확인 (로컬 구성 종목이 있으면 ETF로 확정, quoteType 조회 생략)
+        if mapped_ticker in _get_local_fund_tickers(db_path, cache):
+            info = {}
+            quote_type = 'ETF'
+        else:
+            info = get_ticker_info(mapped_ticker, cache) or {}
+            quote_type = info.get('quoteType', 'UNKNOWN')
+
+        resolved['info'] = info
+        resolved['quote_type'] = quote_type
+
+        # 개별 주식은 구성 종목/섹터 조회 불필요
+        if quote_type == 'EQUITY':
+            return resolved
+
+    # ETF / 채권: Holdings(하위 펀드는 재귀 전개) + Sectors 조회
+    resolved['holdings_df'] = expand_etf_holdings(mapped_ticker, db_path, cache)
+    resolved['sectors'] = load_etf_sectors(mapped_ticker, cache)
+    return resolved
+
+
+def build_asset_analysis(
+    resolved: Dict,
+    name: str,
+    amount: int,
+    holding_rows: Optional[List[Dict]] = None,
+    sector_rows: Optional[List[Dict]] = None
+) -> Dict:
+    """
+    조회 결과 + 투자 금액 → 저장할 holdings / sectors / metadata 계산 (DB·네트워크 접근 없음)
+
+    Args:
+        resolved: resolve_asset 결과
+        name: 보유 종목명
+        amount: 투자 금액
+        holding_rows: 미리 계산한 ETF 구성 종목 행 (build_asset_analyses, None이면 여기서 계산)
+        sector_rows: 미리 계산한 ETF 섹터 행 (build_asset_analyses, None이면 여기서 계산)
+
+    Returns:
+        {
+            'asset_type': 'STOCK',
+            'holdings': [...],   # calculate_my_holdings 형식
+            'sectors': [...],    # calculate_my_sectors 형식
+            'metadata': (ticker, status, error_message, holdings_count, sectors_count) 또는 None
+        }
+    """
+    asset_type = resolved['asset_type']
+    ticker = resolved['ticker']
+    result = {'asset_type': asset_type, 'holdings': [], 'sectors': [], 'metadata': None}
+
+    # 현금형: 현금 상품 자체 + Cash & Equivalents
+    if asset_type == 'CASH':
+        result['holdings'] = [{
+            'source_ticker': 'CASH',
+            'stock_symbol': 'CASH',
             'stock_name': name,
             'holding_percent': 1.0,
             'my_amount': amount
         }]
-        save_analyzed_holdings(month_id, account_id, holdings_data, db_path, asset_type='STOCK')
-
-        # Sectors: info에서 sector 조회
-        sector_name = info.get('sector', 'Unknown')
+        result['sectors'] = [{
+            'source_ticker': 'CASH',
+            'sector_name': 'Cash & Equivalents',
+            'sector_percent': 1.0,
+            'my_amount': amount
+        }]
+        result['metadata'] = ('CASH', 'SUCCESS', None, 1, 1)
+        return result
+
+    holdings_df = resolved.get('holdings_df')
+    sectors = resolved.get('sectors')
+    if holding_rows is None and holdings_df is not None and not holdings_df.empty:
+        holding_rows = calculate_my_holdings(ticker, amount, holdings_df)
+    if sector_rows is None and sectors is not None and len(sectors) > 0:
+        sector_rows = calculate_my_sectors(ticker, amount, sectors)
+
+    # 개별 주식: 자기 자신을 100% 보유, 섹터는 info에서
+    if asset_type == 'STOCK' and resolved.get('quote_type') == 'EQUITY':
+        result['holdings'] = [{
+            'source_ticker': ticker,
+            'stock_symbol': ticker,
+            'stock_name': name,
+            'holding_percent': 1.0,
+            'my_amount': amount
+        }]
+        sector_name = resolved['info'].get('sector', 'Unknown')
         if sector_name and sector_name != 'Unknown':
-            sectors_data = [{
-                'source_ticker': mapped_ticker,
+            result['sectors'] = [{
+                'source_ticker': ticker,
                 'sector_name': sector_name,
                 'sector_percent': 1.0,
                 'my_amount': amount
             }]
-            save_analyzed_sectors(month_id, account_id, sectors_data, db_path, asset_type='STOCK')
+        result['metadata'] = (ticker, 'SUCCESS', None, 1, 1 if sector_name else 0)
+        return result
+
+    # 주식형 ETF: 조회된 데이터만 저장
+    if asset_type == 'STOCK':
+        if holding_rows is not None:
+            result['holdings'] = holding_rows
+            result['metadata'] = (ticker, 'SUCCESS', None, len(result['holdings']), 0)
+        if sector_rows is not None:
+            result['sectors'] = sector_rows
+        return result
+
+    # 채권형 ETF: 조회 실패 시 채권 자체 / Fixed Income으로 대체
+    if holding_rows is not None:
+        result['holdings'] = holding_rows
+    else:
+        result['holdings'] = [{
+            'source_ticker': ticker,
+            'stock_symbol': ticker,
+            'stock_name': name,
+            'holding_percent': 1.0,
+            'my_amount': amount
+        }]
 
-        # metadata 저장
-        save_analysis_metadata(
-            month_id, mapped_ticker, 'SUCCESS', None,
-            len(holdings_data), 1 if sector_name else 0, db_path
-        )
-        return
+    if sector_rows is not None:
+        result['sectors'] = sector_rows
+    else:
+        result['sectors'] = [{
+            'source_ticker': ticker,
+            'sector_name': 'Fixed Income',
+            'sector_percent': 1.0,
+            'my_amount': amount
+        }]
+
+    result['metadata'] = (ticker, 'SUCCESS', None, len(result['holdings']), len(result['sectors']))
+    return result
 
-    # ETF인 경우 (기존 로직)
-    # Holdings 조회
-    holdings_df = fetch_etf_holdings(mapped_ticker)
-    if holdings_df is not None and not holdings_df.empty:
-        holdings_data = calculate_my_holdings(mapped_ticker, amount, holdings_df)
-        save_analyzed_holdings(month_id, account_id, holdings_data, db_path, asset_type='STOCK')
 
-        # metadata 저장
-        save_analysis_metadata(
-            month_id, mapped_ticker, 'SUCCESS', None,
-            len(holdings_data), 0, db_path
+def _split_batch_rows(batch_df: pd.DataFrame, keys: List[str], count: int) -> List[List[Dict]]:
+    """일괄 계산 결과를 작업 순번(account_id 컬럼)별 행 목록으로 분리"""
+    rows = [[] for _ in range(count)]
+    for index, group in batch_df.groupby('account_id', sort=False):
+        rows[int(index)] = group[keys].to_dict('records')
+    return rows
+
+
+def build_asset_analyses(resolved: Dict, items: List[Tuple[str, int]]) -> List[Dict]:
+    """
+    같은 자산을 보유한 여러 작업(계좌별 + 전체)의 분석 결과를 한 번에 계산
+
+    ETF 구성 종목 / 섹터 비중 × 작업별 금액을 calculate_holdings_batch /
+    calculate_sectors_batch 한 번으로 계산한다 (작업마다 calculate_my_holdings 반복 없음).
+    결과는 작업마다 build_asset_analysis를 호출한 것과 같다.
+
+    Args:
+        resolved: resolve_asset 결과
+        items: [(보유 종목명, 투자 금액), ...]
+
+    Returns:
+        items 순서대로 build_asset_analysis 결과 목록
+    """
+    holdings_df = resolved.get('holdings_df')
+    sectors = resolved.get('sectors')
+    if resolved['asset_type'] == 'CASH' or resolved.get('quote_type') == 'EQUITY':
+        return [build_asset_analysis(resolved, name, amount) for name, amount in items]
+
+    ticker = resolved['ticker']
+    # account_id 자리에 작업 순번을 넣어 결과를 작업별로 분리
+    allocation = pd.DataFrame({
+        'account_id': range(len(items)),
+        'source_ticker': ticker,
+        'amount': [amount for _, amount in items],
+        'asset_type': resolved['asset_type'],
+    })
+
+    holding_rows = [None] * len(items)
+    if holdings_df is not None and not holdings_df.empty:
+        batch = calculate_holdings_batch(build_composition_frame({ticker: holdings_df}), allocation)
+        holding_rows = _split_batch_rows(
+            batch, ['source_ticker', 'stock_symbol', 'stock_name', 'holding_percent', 'my_amount'], len(items)
         )
 
-    # Sectors 조회
-    sectors = fetch_etf_sectors(mapped_ticker)
+    sector_rows = [None] * len(items)
     if sectors is not None and len(sectors) > 0:
-        sectors_data = calculate_my_sectors(mapped_ticker, amount, sectors)
-        save_analyzed_sectors(month_id, account_id, sectors_data, db_path, asset_type='STOCK')
+        batch = calculate_sectors_batch(build_sector_frame({ticker: sectors}), allocation)
+        sector_rows = _split_batch_rows(
+            batch, ['source_ticker', 'sector_name', 'sector_percent', 'my_amount'], len(items)
+        )
 
+    return [
+        build_asset_analysis(resolved, name, amount, holding_rows[i], sector_rows[i])
+        for i, (name, amount) in enumerate(items)
+    ]
 
-def analyze_bond_asset(
+
+def analyze_stock_asset(
     ticker: str,
     name: str,
     amount: int,
     month_id: int,
     account_id: Optional[int],
-    db_path: str
+    db_path: str,
+    cache: Optional[Dict] = None,
+    checkpoint: Optional[Dict] = None
 ):
     """
-    채권형 ETF 분석 (조회 시도, 실패 시 대체)
+    주식형 자산 분석 (ETF 또는 개별 주식)
 
     Args:
         ticker: 티커 심볼
@@ -551,43 +1090,41 @@ def analyze_bond_asset(
         month_id: 월 ID
         account_id: 계좌 ID (None이면 전체)
         db_path: DB 경로
+        cache: new_composition_cache() 결과 (분석 실행 단위로 구성 종목/정보 재사용)
+        checkpoint: 완료 기록 정보 (write_asset_analysis 참고)
     """
-    mapped_ticker = map_ticker(ticker)
+    resolved = resolve_asset(ticker, 'STOCK', db_path, cache)
+    if resolved.get('quote_type') == 'EQUITY':
+        print(f"   📌 개별 주식으로 처리")
 
-    # 1. Holdings 조회 시도
-    holdings_df = fetch_etf_holdings(mapped_ticker)
-    if holdings_df is not None and not holdings_df.empty:
-        holdings_data = calculate_my_holdings(mapped_ticker, amount, holdings_df)
-    else:
-        # 실패: 채권 자체를 holding으로
-        holdings_data = [{
-            'source_ticker': mapped_ticker,
-            'stock_symbol': mapped_ticker,
-            'stock_name': name,
-            'holding_percent': 1.0,
-            'my_amount': amount
-        }]
-    save_analyzed_holdings(month_id, account_id, holdings_data, db_path, asset_type='BOND')
+    save_asset_analysis(month_id, account_id, build_asset_analysis(resolved, name, amount), db_path, checkpoint)
 
-    # 2. Sectors 조회 시도
-    sectors = fetch_etf_sectors(mapped_ticker)
-    if sectors is not None and len(sectors) > 0:
-        sectors_data = calculate_my_sectors(mapped_ticker, amount, sectors)
-    else:
-        # 실패: Fixed Income 섹터로
-        sectors_data = [{
-            'source_ticker': mapped_ticker,
-            'sector_name': 'Fixed Income',
-            'sector_percent': 1.0,
-            'my_amount': amount
-        }]
-    save_analyzed_sectors(month_id, account_id, sectors_data, db_path, asset_type='BOND')
 
-    # metadata 저장
-    save_analysis_metadata(
-        month_id, mapped_ticker, 'SUCCESS', None,
-        len(holdings_data), len(sectors_data), db_path
-    )
+def analyze_bond_asset(
+    ticker: str,
+    name: str,
+    amount: int,
+    month_id: int,
+    account_id: Optional[int],
+    db_path: str,
+    cache: Optional[Dict] = None,
+    checkpoint: Optional[Dict] = None
+):
+    """
+    채권형 ETF 분석 (조회 시도, 실패 시 대체)
+
+    Args:
+        ticker: 티커 심볼
+        name: 보유 종목명
+        amount: 투자 금액
+        month_id: 월 ID
+        account_id: 계좌 ID (None이면 전체)
+        db_path: DB 경로
+        cache: new_composition_cache() 결과 (분석 실행 단위로 구성 종목/정보 재사용)
+        checkpoint: 완료 기록 정보 (write_asset_analysis 참고)
+    """
+    resolved = resolve_asset(ticker, 'BOND', db_path, cache)
+    save_asset_analysis(month_id, account_id, build_asset_analysis(resolved, name, amount), db_path, checkpoint)
 
 
 def analyze_cash_asset(
@@ -596,7 +1133,8 @@ def analyze_cash_asset(
     amount: int,
     month_id: int,
     account_id: Optional[int],
-    db_path: str
+    db_path: str,
+    checkpoint: Optional[Dict] = None
 ):
     """
     현금형 자산 분석 (yfinance 조회 없음)
@@ -608,31 +1146,10 @@ def analyze_cash_asset(
         month_id: 월 ID
         account_id: 계좌 ID (None이면 전체)
         db_path: DB 경로
+        checkpoint: 완료 기록 정보 (write_asset_analysis 참고)
     """
-    # Holdings: 현금 상품 자체
-    holdings_data = [{
-        'source_ticker': 'CASH',
-        'stock_symbol': 'CASH',
-        'stock_name': name,
-        'holding_percent': 1.0,
-        'my_amount': amount
-    }]
-    save_analyzed_holdings(month_id, account_id, holdings_data, db_path, asset_type='CASH')
-
-    # Sectors: Cash & Equivalents
-    sectors_data = [{
-        'source_ticker': 'CASH',
-        'sector_name': 'Cash & Equivalents',
-        'sector_percent': 1.0,
-        'my_amount': amount
-    }]
-    save_analyzed_sectors(month_id, account_id, sectors_data, db_path, asset_type='CASH')
-
-    # metadata 저장
-    save_analysis_metadata(
-        month_id, 'CASH', 'SUCCESS', None,
-        1, 1, db_path
-    )
+    resolved = resolve_asset(ticker, 'CASH', db_path)
+    save_asset_analysis(month_id, account_id, build_asset_analysis(resolved, name, amount), db_path, checkpoint)
 
 
 # ===== 4. DB 저장 레이어 =====
@@ -660,28 +1177,30 @@ def save_analyzed_holdings(
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
 
-    count = 0
-    for holding in holdings_data:
-        cursor.execute(
-            """
-            INSERT INTO analyzed_holdings
-            (month_id, account_id, source_ticker, stock_symbol, stock_name,
-             holding_percent, my_amount, asset_type)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                month_id,
-                account_id,
-                holding['source_ticker'],
-                holding['stock_symbol'],
-                holding['stock_name'],
-                holding['holding_percent'],
-                holding['my_amount'],
-                asset_type
-            )
+    rows = [
+        (
+            month_id,
+            account_id,
+            holding['source_ticker'],
+            holding['stock_symbol'],
+            holding['stock_name'],
+            holding['holding_percent'],
+            holding['my_amount'],
+            asset_type
         )
-        count += 1
-
+        for holding in holdings_data
+    ]
+    cursor.executemany(
+        """
+        INSERT INTO analyzed_holdings
+        (month_id, account_id, source_ticker, stock_symbol, stock_name,
+         holding_percent, my_amount, asset_type)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        rows
+    )
+    count = len(rows)
+
     conn.commit()
     conn.close()
 
@@ -711,26 +1230,28 @@ def save_analyzed_sectors(
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
 
-    count = 0
-    for sector in sectors_data:
-        cursor.execute(
-            """
-            INSERT INTO analyzed_sectors
-            (month_id, account_id, source_ticker, sector_name,
-             sector_percent, my_amount, asset_type)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                month_id,
-                account_id,
-                sector['source_ticker'],
-                sector['sector_name'],
-                sector['sector_percent'],
-                sector['my_amount'],
-                asset_type
-            )
+    rows = [
+        (
+            month_id,
+            account_id,
+            sector['source_ticker'],
+            sector['sector_name'],
+            sector['sector_percent'],
+            sector['my_amount'],
+            asset_type
         )
-        count += 1
+        for sector in sectors_data
+    ]
+    cursor.executemany(
+        """
+        INSERT INTO analyzed_sectors
+        (month_id, account_id, source_ticker, sector_name,
+         sector_percent, my_amount, asset_type)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        rows
+    )
+    count = len(rows)
 
     conn.commit()
     conn.close()
@@ -775,6 +1296,478 @@ def save_analysis_metadata(
     conn.close()
 
 
+def write_asset_analysis(
+    cursor: sqlite3.Cursor,
+    month_id: int,
+    account_id: Optional[int],
+    analysis: Dict,
+    checkpoint: Optional[Dict] = None
+) -> Tuple[int, int]:
+    """
+    build_asset_analysis 결과를 주어진 커서로 저장 (커밋은 호출자 담당)
+
+    Args:
+        cursor: DB 커서
+        month_id: 월 ID
+        account_id: 계좌 ID (None이면 전체 분석)
+        analysis: build_asset_analysis 결과
+        checkpoint: {'run_id', 'holding_ticker', 'holding_name'}
+                    주어지면 analysis_metadata에 (계좌, 보유 종목) 단위 완료 기록
+                    (분석 행과 같은 트랜잭션 → 완료 기록이 있으면 분석 행도 모두 저장됨)
+
+    Returns:
+        (holdings 저장 건수, sectors 저장 건수)
+    """
+    asset_type = analysis['asset_type']
+
+    cursor.executemany(
+        """
+        INSERT INTO analyzed_holdings
+        (month_id, account_id, source_ticker, stock_symbol, stock_name,
+         holding_percent, my_amount, asset_type)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        [
+            (month_id, account_id, h['source_ticker'], h['stock_symbol'], h['stock_name'],
+             h['holding_percent'], h['my_amount'], asset_type)
+            for h in analysis['holdings']
+        ]
+    )
+    cursor.executemany(
+        """
+        INSERT INTO analyzed_sectors
+        (month_id, account_id, source_ticker, sector_name,
+         sector_percent, my_amount, asset_type)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        [
+            (month_id, account_id, sec['source_ticker'], sec['sector_name'],
+             sec['sector_percent'], sec['my_amount'], asset_type)
+            for sec in analysis['sectors']
+        ]
+    )
+    metadata = analysis['metadata']
+    if checkpoint is not None:
+        if metadata is None:
+            # 구성 종목 조회 결과가 없으면 완료가 아님 → FAILED로 기록해 resume 시 재시도
+            metadata = (map_ticker(checkpoint['holding_ticker']), 'FAILED', '구성 종목 조회 결과 없음',
+                        0, len(analysis['sectors']))
+        cursor.execute(
+            """
+            INSERT INTO analysis_metadata
+            (month_id, ticker, status, error_message, holdings_count, sectors_count,
+             run_id, account_id, holding_ticker, holding_name)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (month_id, *metadata, checkpoint['run_id'], account_id,
+             checkpoint['holding_ticker'], checkpoint['holding_name'])
+        )
+    elif metadata is not None:
+        cursor.execute(
+            """
+            INSERT INTO analysis_metadata
+            (month_id, ticker, status, error_message, holdings_count, sectors_count)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (month_id, *metadata)
+        )
+
+    return len(analysis['holdings']), len(analysis['sectors'])
+
+
+def save_asset_analysis(
+    month_id: int,
+    account_id: Optional[int],
+    analysis: Dict,
+    db_path: str,
+    checkpoint: Optional[Dict] = None
+) -> Tuple[int, int]:
+    """
+    build_asset_analysis 결과를 한 트랜잭션으로 저장
+
+    Args:
+        month_id: 월 ID
+        account_id: 계좌 ID (None이면 전체 분석)
+        analysis: build_asset_analysis 결과
+        db_path: DB 경로
+        checkpoint: 완료 기록 정보 (write_asset_analysis 참고)
+
+    Returns:
+        (holdings 저장 건수, sectors 저장 건수)
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        counts = write_asset_analysis(conn.cursor(), month_id, account_id, analysis, checkpoint)
+        conn.commit()
+        return counts
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+# ===== 4.1 체크포인트 (이어서 분석) =====
+
+def new_run_id() -> str:
+    """분석 실행 ID 생성 (예: '20260126-090000-a1b2c3')"""
+    return f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+
+
+def job_checkpoint(job: Dict, run_id: str) -> Dict:
+    """plan_month_analysis 작업 → write_asset_analysis 체크포인트 정보"""
+    return {'run_id': run_id, 'holding_ticker': job['ticker'], 'holding_name': job['name']}
+
+
+def get_completed_units(month_id: int, db_path: str) -> set:
+    """
+    체크포인트가 기록된(완료된) 분석 단위 조회 (FAILED 제외)
+
+    Returns:
+        {(account_id, holding_ticker, holding_name), ...}  (account_id None = 전체)
+    """
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("""
+        SELECT account_id, holding_ticker, holding_name
+        FROM analysis_metadata
+        WHERE month_id = ? AND run_id IS NOT NULL AND status != 'FAILED'
+    """, (month_id,)).fetchall()
+    conn.close()
+    return set(rows)
+
+
+def filter_completed_jobs(jobs: List[Dict], completed: set) -> List[Dict]:
+    """이미 완료된 (계좌, 보유 종목) 작업 제외"""
+    return [
+        job for job in jobs
+        if (job['account_id'], job['ticker'], job['name']) not in completed
+    ]
+
+
+# ===== 4.5. 계좌별 결과로부터 전체 분석 파생 =====
+
+def _get_invested_by_source(month_id: int, db_path: str, exclude_tickers: List[str] = None) -> Dict[Tuple[str, str], int]:
+    """
+    분석된 계좌 기준 ETF(source_ticker)별 투자 총액 조회
+
+    계좌별 분석 결과가 실제로 저장된 (계좌, ETF) 조합만 합산하므로,
+    일부 계좌 분석이 실패해도 전체 금액이 부풀려지지 않는다.
+
+    Args:
+        month_id: 월 ID
+        db_path: DB 경로
+        exclude_tickers: 제외할 티커 리스트
+
+    Returns:
+        {(source_ticker, asset_type): total_amount}
+    """
+    exclude_tickers = exclude_tickers or []
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    cursor.execute("""
+        SELECT h.account_id, h.ticker_mapping, h.asset_type, SUM(h.amount)
+        FROM holdings h
+        INNER JOIN accounts a ON h.account_id = a.id
+        WHERE a.month_id = ? AND h.asset_type != 'CASH'
+        GROUP BY h.account_id, h.ticker_mapping, h.asset_type
+    """, (month_id,))
+    holdings_rows = cursor.fetchall()
+
+    cursor.execute("""
+        SELECT DISTINCT account_id, source_ticker
+        FROM analyzed_holdings
+        WHERE month_id = ? AND account_id IS NOT NULL
+    """, (month_id,))
+    analyzed_pairs = set(cursor.fetchall())
+
+    conn.close()
+
+    invested = {}
+    for account_id, ticker, asset_type, amount in holdings_rows:
+        if ticker in exclude_tickers:
+            continue
+        source_ticker = TICKER_MAPPING.get(ticker, ticker)
+        if (account_id, source_ticker) not in analyzed_pairs:
+            continue
+        key = (source_ticker, asset_type)
+        invested[key] = invested.get(key, 0) + amount
+
+    return invested
+
+
+def derive_total_analysis(month_id: int, db_path: str, exclude_tickers: List[str] = None) -> Tuple[int, int]:
+    """
+    계좌별 분석 결과를 GROUP BY로 합산하여 전체(account_id IS NULL) 분석 결과 생성
+
+    yfinance 재조회 없이 INSERT ... SELECT 한 번으로 전체 행을 만든다.
+    STOCK/BOND 행의 금액은 ETF별 투자 총액 × 비중으로 재계산하여
+    계좌별 절사 오차가 누적되지 않도록 맞춘다 (전체 분석을 직접 수행한 결과와 동일).
+    CASH 행은 비중이 100%이므로 단순 합산한다.
+
+    Args:
+        month_id: 월 ID
+        db_path: DB 경로
+        exclude_tickers: 제외할 티커 리스트
+
+    Returns:
+        (생성된 holdings 행 수, 생성된 sectors 행 수)
+    """
+    invested_by_source = _get_invested_by_source(month_id, db_path, exclude_tickers)
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("DELETE FROM analyzed_holdings WHERE month_id = ? AND account_id IS NULL", (month_id,))
+        cursor.execute("DELETE FROM analyzed_sectors WHERE month_id = ? AND account_id IS NULL", (month_id,))
+
+        cursor.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS source_invested (
+                source_ticker TEXT NOT NULL,
+                asset_type TEXT NOT NULL,
+                total_amount INTEGER NOT NULL,
+                PRIMARY KEY (source_ticker, asset_type)
+            )
+        """)
+        cursor.execute("DELETE FROM source_invested")
+        cursor.executemany(
+            "INSERT INTO source_invested (source_ticker, asset_type, total_amount) VALUES (?, ?, ?)",
+            [(source, asset_type, amount) for (source, asset_type), amount in invested_by_source.items()]
+        )
+
+        cursor.execute("""
+            INSERT INTO analyzed_holdings
+            (month_id, account_id, source_ticker, stock_symbol, stock_name,
+             holding_percent, my_amount, asset_type)
+            SELECT
+                ah.month_id,
+                NULL,
+                ah.source_ticker,
+                ah.stock_symbol,
+                MAX(ah.stock_name),
+                MAX(ah.holding_percent),
+                CASE
+                    WHEN ah.asset_type = 'CASH' OR si.total_amount IS NULL THEN SUM(ah.my_amount)
+                    ELSE CAST(si.total_amount * MAX(ah.holding_percent) AS INTEGER)
+                END,
+                ah.asset_type
+            FROM analyzed_holdings ah
+            LEFT JOIN source_invested si
+                ON si.source_ticker = ah.source_ticker AND si.asset_type = ah.asset_type
+            WHERE ah.month_id = ? AND ah.account_id IS NOT NULL
+            GROUP BY
+                ah.source_ticker,
+                ah.stock_symbol,
+                CASE WHEN ah.asset_type = 'CASH' THEN ah.stock_name END,  -- 적금 상품은 이름별 유지
+                ah.asset_type
+        """, (month_id,))
+        holdings_count = cursor.rowcount
+
+        cursor.execute("""
+            INSERT INTO analyzed_sectors
+            (month_id, account_id, source_ticker, sector_name,
+             sector_percent, my_amount, asset_type)
+            SELECT
+                s.month_id,
+                NULL,
+                s.source_ticker,
+                s.sector_name,
+                MAX(s.sector_percent),
+                CASE
+                    WHEN s.asset_type = 'CASH' OR si.total_amount IS NULL THEN SUM(s.my_amount)
+                    ELSE CAST(si.total_amount * MAX(s.sector_percent) AS INTEGER)
+                END,
+                s.asset_type
+            FROM analyzed_sectors s
+            LEFT JOIN source_invested si
+                ON si.source_ticker = s.source_ticker AND si.asset_type = s.asset_type
+            WHERE s.month_id = ? AND s.account_id IS NOT NULL
+            GROUP BY s.source_ticker, s.sector_name, s.asset_type
+        """, (month_id,))
+        sectors_count = cursor.rowcount
+
+        cursor.execute("DROP TABLE source_invested")
+        conn.commit()
+
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+
+    finally:
+        conn.close()
+
+    return holdings_count, sectors_count
+
+
+# ===== 4.6. 종목 노출 역색인 =====
+
+# 노출 색인에서 제외할 심볼 (상위 N개 외 합산 / 현금)
+EXPOSURE_EXCLUDED_SYMBOLS = ('OTHER', 'CASH')
+
+
+def _exposure_price_date(cursor: sqlite3.Cursor, year_month: str) -> str:
+    """이번 달 가격 기준일 (마지막 매수일, 매수 기록이 없으면 월말)"""
+    cursor.execute("SELECT MAX(purchase_date) FROM purchase_history WHERE year_month = ?", (year_month,))
+    row = cursor.fetchone()
+    if row and row[0]:
+        return row[0]
+
+    year, month = map(int, year_month.split('-'))
+    return f"{year_month}-{calendar.monthrange(year, month)[1]:02d}"
+
+
+def _month_exchange_rate(
+    cursor: sqlite3.Cursor,
+    year_month: str,
+    price_date: str,
+    fetch: bool
+) -> Optional[float]:
+    """이번 달 USD/KRW 환율 (매수 기록 환율 → 일별 환율 종가, 현재 환율은 사용하지 않음)"""
+    cursor.execute("""
+        SELECT exchange_rate FROM purchase_history
+        WHERE year_month = ? AND exchange_rate IS NOT NULL
+        ORDER BY purchase_date DESC LIMIT 1
+    """, (year_month,))
+    row = cursor.fetchone()
+    if row:
+        return float(row[0])
+
+    found = nearest_price(cursor, FX_TICKER, price_date, source='daily_prices')
+    if found is None and fetch:
+        found = resolve_daily_closes(cursor, {FX_TICKER: {price_date}}).get((FX_TICKER, price_date))
+    return found[1] if found else None
+
+
+def _month_price_krw(
+    cursor: sqlite3.Cursor,
+    symbol: str,
+    price_date: str,
+    month_rate: Optional[float]
+) -> Optional[float]:
+    """기준일 원화 가격 (매수 단가 → 일별 종가 × 이번 달 환율, 로컬 저장소만 조회)"""
+    found = nearest_price(cursor, symbol, price_date, source='purchase_history')
+    if found:
+        return found[1]
+
+    found = nearest_price(cursor, symbol, price_date, source='daily_prices')
+    if found is None:
+        return None
+    if symbol.endswith(('.KS', '.KQ')):
+        return found[1]
+    return found[1] * month_rate if month_rate else None
+
+
+def build_exposure_index(
+    month_id: int,
+    db_path: str,
+    cache: Optional[Dict] = None
+) -> int:
+    """
+    분석 결과로 종목 → (월, 계좌, 출처 ETF, 금액, 환산 수량) 역색인 생성 (stock_exposures)
+
+    - 계좌별 분석 행 기준 (계좌별 분석이 없으면 전체 분석 행)
+    - 직접 보유(출처 = 종목)는 purchase_history 매수 수량 사용
+    - ETF 경유 보유는 금액 ÷ 이번 달 원화 가격으로 환산 수량 계산 (직접 보유와 같은 기준)
+      - 가격: 마지막 매수일의 매수 단가 → daily_prices 종가 × 이번 달 환율
+      - 로컬에 종가가 없으면 분석 중 info를 조회한 종목만 일별 종가 1번 조회 후 daily_prices에 저장
+        (info 신규 조회 없음 → 로컬 구성 종목 수천 개를 재조회하지 않음)
+
+    Args:
+        month_id: 월 ID
+        db_path: DB 경로
+        cache: new_composition_cache() 결과 (분석 중 info를 조회한 종목만 종가 조회 대상)
+
+    Returns:
+        생성된 색인 행 수
+    """
+    if cache is None:
+        cache = new_composition_cache()
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("SELECT year_month FROM months WHERE id = ?", (month_id,))
+        row = cursor.fetchone()
+        if row is None:
+            return 0
+        year_month = row[0]
+
+        cursor.execute(
+            "SELECT 1 FROM analyzed_holdings WHERE month_id = ? AND account_id IS NOT NULL LIMIT 1",
+            (month_id,)
+        )
+        account_filter = "account_id IS NOT NULL" if cursor.fetchone() else "account_id IS NULL"
+
+        placeholders = ','.join('?' * len(EXPOSURE_EXCLUDED_SYMBOLS))
+        cursor.execute(f"""
+            SELECT stock_symbol, account_id, source_ticker,
+                   MAX(stock_name), asset_type, SUM(my_amount)
+            FROM analyzed_holdings
+            WHERE month_id = ? AND {account_filter}
+              AND asset_type != 'CASH' AND stock_symbol NOT IN ({placeholders})
+            GROUP BY stock_symbol, account_id, source_ticker, asset_type
+        """, (month_id, *EXPOSURE_EXCLUDED_SYMBOLS))
+        exposures = cursor.fetchall()
+
+        # 직접 보유 수량: (계좌, 티커) → 이번 달 매수 수량
+        cursor.execute("""
+            SELECT account_id, ticker, SUM(quantity)
+            FROM purchase_history
+            WHERE year_month = ?
+            GROUP BY account_id, ticker
+        """, (year_month,))
+        direct_quantities: Dict[Tuple[Optional[int], str], float] = {}
+        for account_id, ticker, quantity in cursor.fetchall():
+            direct_quantities[(account_id, ticker)] = quantity
+            direct_quantities[(None, ticker)] = direct_quantities.get((None, ticker), 0.0) + quantity
+
+        # 종목 가격: 로컬 저장소 우선, 없으면 info 조회 이력이 있는 종목만 종가 조회
+        price_date = _exposure_price_date(cursor, year_month)
+        symbols = {row[0] for row in exposures}
+        month_rate = _month_exchange_rate(cursor, year_month, price_date, fetch=bool(symbols))
+        prices = {symbol: _month_price_krw(cursor, symbol, price_date, month_rate) for symbol in symbols}
+
+        missing = {symbol: {price_date} for symbol, price in prices.items()
+                   if price is None and symbol in cache['info']}
+        if missing:
+            resolve_daily_closes(cursor, missing)
+            for symbol in missing:
+                prices[symbol] = _month_price_krw(cursor, symbol, price_date, month_rate)
+
+        rows = []
+        for symbol, account_id, source_ticker, stock_name, asset_type, amount in exposures:
+            is_direct = symbol == source_ticker
+            implied_shares = direct_quantities.get((account_id, symbol)) if is_direct else None
+            price_krw = prices.get(symbol)
+
+            if implied_shares is None and price_krw:
+                implied_shares = amount / price_krw
+
+            rows.append((symbol, month_id, account_id, source_ticker, stock_name, asset_type,
+                         int(amount), price_krw, implied_shares, int(is_direct)))
+
+        cursor.execute("DELETE FROM stock_exposures WHERE month_id = ?", (month_id,))
+        cursor.executemany("""
+            INSERT INTO stock_exposures
+            (stock_symbol, month_id, account_id, source_ticker, stock_name, asset_type,
+             my_amount, price_krw, implied_shares, is_direct)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+        conn.commit()
+
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+
+    finally:
+        conn.close()
+
+    return len(rows)
+
+
 # ===== 5. 집계 및 출력 레이어 =====
 
 def aggregate_holdings(month_id: int, account_id: Optional[int], db_path: str) -> pd.DataFrame:
@@ -1125,40 +2118,37 @@ def print_integrated_analysis(month_id: int, db_path: str):
 
 # ===== 6. 메인 오케스트레이션 =====
 
-def analyze_month_portfolio(
+def prepare_month_analysis(
     year_month: str,
-    db_path: str = "portfolio.db",
-    overwrite: bool = False,
-    exclude_tickers: List[str] = None,
-    analyze_by_account: bool = True,
-    analyze_total: bool = True
-):
+    db_path: str,
+    overwrite: bool,
+    exchange_rate: Optional[float] = None,
+    resume: bool = False
+) -> Optional[Tuple[int, float]]:
     """
-    특정 월의 포트폴리오를 분석하여 DB에 저장
+    분석 준비: 환율 조회/저장, month_id 조회, 기존 분석 데이터 처리
 
     Args:
         year_month: 'YYYY-MM' 형식
         db_path: DB 경로
-        overwrite: True면 기존 분석 데이터 삭제 후 재분석
-        exclude_tickers: 분석에서 제외할 티커 목록 (기본값: [] - 모든 자산 분석)
-        analyze_by_account: 계좌별 분석 수행 여부
-        analyze_total: 전체 합산 분석 수행 여부
-    """
-    if exclude_tickers is None:
-        exclude_tickers = []  # 모든 자산 유형 분석
-
-    print(f"\n📂 {year_month}월 포트폴리오 분석 시작")
-    print("=" * 80)
+        overwrite: True면 기존 분석 데이터 삭제
+        exchange_rate: 이미 조회한 환율 (None이면 조회, 여러 월 일괄 분석 시 공유)
+        resume: True면 완료 기록이 있는 기존 데이터는 유지하고 FAILED 단위(기록 + 분석 행)만 삭제
+                (overwrite보다 우선)
 
+    Returns:
+        (month_id, exchange_rate) 또는 분석을 진행할 수 없으면 None
+    """
     # 1. 환율 조회 및 저장
-    exchange_rate = get_exchange_rate()
+    if exchange_rate is None:
+        exchange_rate = get_exchange_rate()
     print(f"💱 환율: 1 USD = {exchange_rate:,.2f} KRW")
 
     # 1.5. month_id 조회
     month_id = get_month_id(year_month, db_path)
     if month_id is None:
         print(f"❌ {year_month} 데이터를 찾을 수 없습니다.")
-        return
+        return None
 
     # 환율 저장
     save_exchange_rate(year_month, exchange_rate, db_path)
@@ -1170,79 +2160,132 @@ def analyze_month_portfolio(
     cursor.execute("SELECT COUNT(*) FROM analyzed_holdings WHERE month_id = ?", (month_id,))
     existing_count = cursor.fetchone()[0]
 
-    if existing_count > 0:
+    if resume:
+        cursor.execute(
+            "SELECT COUNT(*) FROM analysis_metadata WHERE month_id = ? AND run_id IS NOT NULL",
+            (month_id,)
+        )
+        checkpoint_count = cursor.fetchone()[0]
+
+        if existing_count > 0 and checkpoint_count == 0:
+            # 완료 기록 없이 저장된 데이터는 어디까지 끝났는지 알 수 없음
+            print(f"❌ 이어서 분석할 완료 기록이 없습니다. --overwrite 옵션을 사용하세요.")
+            conn.close()
+            return None
+
+        # FAILED 단위는 함께 저장된 분석 행까지 지우고 다시 분석
+        # (분석 행은 보유 종목명을 모르므로 같은 계좌·티커의 완료 기록도 함께 초기화)
+        failed_units = cursor.execute(
+            "SELECT DISTINCT account_id, ticker FROM analysis_metadata "
+            "WHERE month_id = ? AND status = 'FAILED' AND run_id IS NOT NULL",
+            (month_id,)
+        ).fetchall()
+        for account_id, ticker in failed_units:
+            cursor.execute(
+                "DELETE FROM analyzed_holdings WHERE month_id = ? AND account_id IS ? AND source_ticker = ?",
+                (month_id, account_id, ticker)
+            )
+            cursor.execute(
+                "DELETE FROM analyzed_sectors WHERE month_id = ? AND account_id IS ? AND source_ticker = ?",
+                (month_id, account_id, ticker)
+            )
+            cursor.execute(
+                "DELETE FROM analysis_metadata WHERE month_id = ? AND account_id IS ? AND ticker = ? "
+                "AND run_id IS NOT NULL",
+                (month_id, account_id, ticker)
+            )
+        cursor.execute("DELETE FROM analysis_metadata WHERE month_id = ? AND status = 'FAILED'", (month_id,))
+        conn.commit()
+        cursor.execute(
+            "SELECT COUNT(*) FROM analysis_metadata WHERE month_id = ? AND run_id IS NOT NULL",
+            (month_id,)
+        )
+        print(f"🔁 이어서 분석: 기존 완료 기록 {cursor.fetchone()[0]}건 유지")
+    elif existing_count > 0:
         if overwrite:
             print(f"⚠️  기존 분석 데이터 {existing_count}건 삭제 중...")
             cursor.execute("DELETE FROM analyzed_holdings WHERE month_id = ?", (month_id,))
             cursor.execute("DELETE FROM analyzed_sectors WHERE month_id = ?", (month_id,))
             cursor.execute("DELETE FROM analysis_metadata WHERE month_id = ?", (month_id,))
+            cursor.execute("DELETE FROM stock_exposures WHERE month_id = ?", (month_id,))
             conn.commit()
         else:
             print(f"❌ 이미 분석된 데이터가 있습니다. --overwrite 옵션을 사용하세요.")
             conn.close()
-            return
+            return None
 
     conn.close()
+    return month_id, exchange_rate
 
-    # 3. 계좌별 분석
-    total_holdings_count = 0
-    total_sectors_count = 0
 
-    if analyze_by_account:
-        print("\n🏦 계좌별 분석 수행 중...")
-        account_etfs = get_account_etf_holdings(year_month, db_path, exclude_tickers)
-
-        for etf_data in account_etfs:
-            account_id = etf_data['account_id']
-            account_name = etf_data['account_name']
-            ticker = etf_data['ticker']
-            name = etf_data['name']
-            amount = etf_data['amount']
-            asset_type = etf_data['asset_type']
-
-            print(f"\n  📊 [{account_name}] [{asset_type}] {name} ({ticker}): {amount:,}원")
-
-            try:
-                # 자산 유형별 분석
-                if asset_type == 'STOCK':
-                    analyze_stock_asset(ticker, name, amount, month_id, account_id, db_path)
-                elif asset_type == 'BOND':
-                    analyze_bond_asset(ticker, name, amount, month_id, account_id, db_path)
-                elif asset_type == 'CASH':
-                    analyze_cash_asset(ticker, name, amount, month_id, account_id, db_path)
-
-                print(f"     ✅ 분석 완료")
-            except Exception as e:
-                print(f"     ❌ 오류: {e}")
-
-    # 4. 전체 합산 분석
-    if analyze_total:
-        print("\n🌐 전체 포트폴리오 분석 수행 중...")
-        total_etfs = get_etf_holdings(year_month, db_path, exclude_tickers)
-
-        total_investment = sum(etf['total_amount'] for etf in total_etfs)
-        print(f"  💰 총 투자 금액: {total_investment:,}원")
-
-        for etf_data in total_etfs:
-            ticker = etf_data['ticker']
-            name = etf_data['name']
-            amount = etf_data['total_amount']
-            asset_type = etf_data['asset_type']
+def plan_month_analysis(
+    year_month: str,
+    db_path: str,
+    exclude_tickers: List[str],
+    analyze_by_account: bool,
+    analyze_total: bool,
+    derive_total: bool
+) -> List[Dict]:
+    """
+    분석 작업 목록 생성 (계좌별 → 전체 순)
 
-            print(f"\n  📊 [전체] [{asset_type}] {name} ({ticker}): {amount:,}원")
+    Returns:
+        [
+            {'account_id': 1, 'label': 'ISA', 'ticker': 'SPY', 'name': '...',
+             'amount': 300000, 'asset_type': 'STOCK'},
+            {'account_id': None, 'label': '전체', ...},
+            ...
+        ]
+        derive_total이 적용되면 전체(account_id=None) 작업은 포함하지 않음
+    """
+    jobs = []
 
-            try:
-                # 자산 유형별 분석 (account_id=None)
-                if asset_type == 'STOCK':
-                    analyze_stock_asset(ticker, name, amount, month_id, None, db_path)
-                elif asset_type == 'BOND':
-                    analyze_bond_asset(ticker, name, amount, month_id, None, db_path)
-                elif asset_type == 'CASH':
-                    analyze_cash_asset(ticker, name, amount, month_id, None, db_path)
+    if analyze_by_account:
+        for etf_data in get_account_etf_holdings(year_month, db_path, exclude_tickers):
+            jobs.append({
+                'account_id': etf_data['account_id'],
+                'label': etf_data['account_name'],
+                'ticker': etf_data['ticker'],
+                'name': etf_data['name'],
+                'amount': etf_data['amount'],
+                'asset_type': etf_data['asset_type']
+            })
+
+    if analyze_total and not (derive_total and analyze_by_account):
+        for etf_data in get_etf_holdings(year_month, db_path, exclude_tickers):
+            jobs.append({
+                'account_id': None,
+                'label': '전체',
+                'ticker': etf_data['ticker'],
+                'name': etf_data['name'],
+                'amount': etf_data['total_amount'],
+                'asset_type': etf_data['asset_type']
+            })
+
+    return jobs
+
+
+def finish_month_analysis(
+    month_id: int,
+    exchange_rate: float,
+    db_path: str,
+    analyze_total: bool,
+    derive_total: bool,
+    analyze_by_account: bool,
+    exclude_tickers: List[str],
+    cache: Optional[Dict] = None
+):
+    """
+    분석 마무리: (선택) 계좌별 결과로 전체 분석 파생, 종목 노출 색인 생성 후 결과 출력
+    """
+    if analyze_total and derive_total and analyze_by_account:
+        print("\n🌐 전체 포트폴리오 분석 (계좌별 결과 합산)...")
+        holdings_count, sectors_count = derive_total_analysis(month_id, db_path, exclude_tickers)
+        print(f"  ✅ holdings {holdings_count}건, sectors {sectors_count}건 생성")
 
-                print(f"     ✅ 분석 완료")
-            except Exception as e:
-                print(f"     ❌ 오류: {e}")
+    print("\n🔎 종목 노출 색인 생성 중...")
+    exposure_count = build_exposure_index(month_id, db_path, cache)
+    print(f"  ✅ {exposure_count}건 생성")
 
     # 5. 결과 출력
     print("\n" + "=" * 80)
@@ -1266,9 +2309,109 @@ def analyze_month_portfolio(
     print("\n✅ 분석 완료!")
 
 
+def analyze_month_portfolio(
+    year_month: str,
+    db_path: str = "portfolio.db",
+    overwrite: bool = False,
+    exclude_tickers: List[str] = None,
+    analyze_by_account: bool = True,
+    analyze_total: bool = True,
+    derive_total: bool = False,
+    exchange_rate: Optional[float] = None,
+    composition_cache: Optional[Dict] = None,
+    resume: bool = False,
+    jobs: Optional[List[Dict]] = None
+):
+    """
+    특정 월의 포트폴리오를 분석하여 DB에 저장
+
+    (계좌, 보유 종목) 단위마다 분석 행과 완료 기록(run_id)을 한 트랜잭션으로 저장하므로
+    중간에 중단되어도 resume=True로 남은 단위만 이어서 분석할 수 있다.
+
+    Args:
+        year_month: 'YYYY-MM' 형식
+        db_path: DB 경로
+        overwrite: True면 기존 분석 데이터 삭제 후 재분석
+        exclude_tickers: 분석에서 제외할 티커 목록 (기본값: [] - 모든 자산 분석)
+        analyze_by_account: 계좌별 분석 수행 여부
+        analyze_total: 전체 합산 분석 수행 여부
+        derive_total: True면 전체 분석을 yfinance 재조회 없이 계좌별 결과 합산으로 생성
+                      (analyze_by_account가 True일 때만 적용)
+        exchange_rate: 이미 조회한 환율 (None이면 조회)
+        composition_cache: 여러 월이 공유하는 new_composition_cache() 결과 (None이면 이번 월 전용)
+        resume: True면 기존 분석 데이터를 유지하고 완료되지 않은 단위만 분석
+        jobs: 이미 만든 plan_month_analysis 결과 (같은 인자로 생성, None이면 이번 월에서 생성)
+    """
+    if exclude_tickers is None:
+        exclude_tickers = []  # 모든 자산 유형 분석
+
+    print(f"\n📂 {year_month}월 포트폴리오 분석 시작")
+    print("=" * 80)
+
+    prepared = prepare_month_analysis(year_month, db_path, overwrite, exchange_rate, resume)
+    if prepared is None:
+        return
+    month_id, exchange_rate = prepared
+
+    if analyze_total and derive_total and not analyze_by_account:
+        print("\n⚠️  계좌별 분석 없이 전체 분석을 파생할 수 없어 직접 분석합니다.")
+
+    # 3. 계좌별 / 4. 전체 합산 분석
+    # 같은 ETF/하위 펀드는 계좌·전체 분석에서 1번만 조회
+    if composition_cache is None:
+        composition_cache = new_composition_cache()
+    if jobs is None:
+        jobs = plan_month_analysis(year_month, db_path, exclude_tickers,
+                                   analyze_by_account, analyze_total, derive_total)
+    if resume:
+        remaining = filter_completed_jobs(jobs, get_completed_units(month_id, db_path))
+        print(f"⏭️  완료된 작업 {len(jobs) - len(remaining)}건 건너뜀, 남은 작업 {len(remaining)}건")
+        jobs = remaining
+    run_id = new_run_id()
+
+    # 같은 자산(티커, 유형) 작업은 처음 나올 때 한 번에 조회·계산 (build_asset_analyses)
+    groups = {}
+    for index, job in enumerate(jobs):
+        groups.setdefault((job['ticker'], job['asset_type']), []).append(index)
+    precomputed = {}
+
+    if any(job['account_id'] is not None for job in jobs):
+        print("\n🏦 계좌별 분석 수행 중...")
+
+    for index, job in enumerate(jobs):
+        if job['account_id'] is None and (index == 0 or jobs[index - 1]['account_id'] is not None):
+            print("\n🌐 전체 포트폴리오 분석 수행 중...")
+            total_investment = sum(j['amount'] for j in jobs if j['account_id'] is None)
+            print(f"  💰 총 투자 금액: {total_investment:,}원")
+
+        print(f"\n  📊 [{job['label']}] [{job['asset_type']}] {job['name']} ({job['ticker']}): {job['amount']:,}원")
+
+        try:
+            analysis = precomputed.pop(index, None)
+            if analysis is None:
+                # 아직 저장하지 않은 같은 자산 작업까지 일괄 계산
+                group = [i for i in groups[(job['ticker'], job['asset_type'])] if i >= index]
+                resolved = resolve_asset(job['ticker'], job['asset_type'], db_path, composition_cache)
+                if resolved.get('quote_type') == 'EQUITY':
+                    print(f"   📌 개별 주식으로 처리")
+                analyses = build_asset_analyses(resolved, [(jobs[i]['name'], jobs[i]['amount']) for i in group])
+                analysis = analyses[0]
+                precomputed.update(zip(group[1:], analyses[1:]))
+
+            save_asset_analysis(month_id, job['account_id'], analysis, db_path, job_checkpoint(job, run_id))
+            print(f"     ✅ 분석 완료")
+        except Exception as e:
+            print(f"     ❌ 오류: {e}")
+
+    finish_month_analysis(month_id, exchange_rate, db_path, analyze_total,
+                          derive_total, analyze_by_account, exclude_tickers, composition_cache)
+
+
 if __name__ == "__main__":
     import argparse
 
+    from data.init_db import init_database
+
     parser = argparse.ArgumentParser(description="월별 포트폴리오 ETF 구성 분석")
     parser.add_argument("--month", required=True, help="분석할 년-월 (예: 2025-12)")
     parser.add_argument("--db", default="portfolio.db", help="SQLite DB 파일 경로")
@@ -1276,12 +2419,20 @@ if __name__ == "__main__":
     parser.add_argument("--exclude", default="", help="제외할 티커 (쉼표 구분, 기본값: 모든 자산 분석)")
     parser.add_argument("--skip-account", action="store_true", help="계좌별 분석 건너뛰기")
     parser.add_argument("--skip-total", action="store_true", help="전체 분석 건너뛰기")
+    parser.add_argument("--derive-total", action="store_true",
+                        help="전체 분석을 계좌별 결과 합산으로 생성 (yfinance 재조회 없음)")
+    parser.add_argument("--resume", action="store_true",
+                        help="중단된 분석 이어서 실행 (완료된 계좌·종목 건너뛰기)")
 
     args = parser.parse_args()
 
     # 제외 티커 파싱
     exclude_tickers = [t.strip() for t in args.exclude.split(',') if t.strip()]
 
+    # 기존 DB에도 새 테이블/컬럼 마이그레이션 (완료 기록, 종목 노출 색인 등)
+    print("🔧 데이터베이스 스키마 확인 중...")
+    init_database(args.db)
+
     # 분석 실행
     analyze_month_portfolio(
         year_month=args.month,
@@ -1289,5 +2440,7 @@ if __name__ == "__main__":
         overwrite=args.overwrite,
         exclude_tickers=exclude_tickers,
         analyze_by_account=not args.skip_account,
-        analyze_total=not args.skip_total
+        analyze_total=not args.skip_total,
+        derive_total=args.derive_total,
+        resume=args.resume
     )
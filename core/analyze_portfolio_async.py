@@ -0,0 +1,324 @@
+"""
+비동기 포트폴리오 분석 파이프라인 (analyze_month_portfolio의 asyncio 버전)
+
+- 조회: 티커별 코루틴이 블로킹 yfinance 호출을 executor에서 실행 (티커당 1번, 타임아웃)
+- 계산: 조회가 끝난 티커부터 build_asset_analysis로 행 생성
+- 저장: asyncio.Queue를 비우는 단일 writer가 연결 1개로 작업 단위 커밋
+→ 네트워크 대기와 계산/저장이 겹쳐 실행되고, 취소 시에도 큐에 들어간 결과는 저장됨
+"""
+import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from core.analyze_portfolio import (
+    build_asset_analysis,
+    filter_completed_jobs,
+    finish_month_analysis,
+    get_completed_units,
+    job_checkpoint,
+    map_ticker,
+    new_composition_cache,
+    new_run_id,
+    plan_month_analysis,
+    prepare_month_analysis,
+    resolve_asset,
+    write_asset_analysis,
+)
+
+
+# 티커 1개 조회(구성 종목 + 섹터 + info) 타임아웃 (초)
+DEFAULT_FETCH_TIMEOUT = 60.0
+
+# 동시 조회 스레드 수 (yfinance 요청 제한 고려)
+DEFAULT_MAX_WORKERS = 4
+
+# writer 큐 최대 길이 (조회가 저장보다 빠를 때 메모리 제한)
+DEFAULT_QUEUE_SIZE = 100
+
+_WRITER_DONE = None
+
+
+def _failed_analysis(asset_type: str, ticker: str, error_message: str) -> Dict:
+    """조회 실패/타임아웃/계산 오류 시 analysis_metadata에만 기록할 결과"""
+    return {
+        'asset_type': asset_type,
+        'holdings': [],
+        'sectors': [],
+        'metadata': (ticker, 'FAILED', error_message, 0, 0)
+    }
+
+
+def _write_item(
+    conn: sqlite3.Connection,
+    month_id: int,
+    account_id: Optional[int],
+    analysis: Dict,
+    checkpoint: Dict
+) -> Tuple[int, int]:
+    """writer 스레드에서 1건 저장 (+ 완료 기록) + 커밋"""
+    try:
+        counts = write_asset_analysis(conn.cursor(), month_id, account_id, analysis, checkpoint)
+        conn.commit()
+        return counts
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+
+
+async def _db_writer(queue: asyncio.Queue, db_path: str, month_id: int, run_id: str) -> Dict:
+    """
+    큐를 비우며 분석 결과를 저장하는 단일 writer
+
+    Args:
+        queue: (job, analysis) 또는 _WRITER_DONE
+        db_path: DB 경로
+        month_id: 월 ID
+        run_id: 완료 기록에 남길 실행 ID
+
+    Returns:
+        {'jobs': 저장된 작업 수, 'holdings': 행 수, 'sectors': 행 수, 'errors': 저장 실패 수}
+    """
+    loop = asyncio.get_running_loop()
+    stats = {'jobs': 0, 'holdings': 0, 'sectors': 0, 'errors': 0}
+
+    # sqlite 연결은 전용 스레드 1개에서만 사용
+    with ThreadPoolExecutor(max_workers=1) as writer_executor:
+        conn = await loop.run_in_executor(
+            writer_executor, lambda: sqlite3.connect(db_path, check_same_thread=False)
+        )
+        try:
+            while True:
+                item = await queue.get()
+                try:
+                    if item is _WRITER_DONE:
+                        break
+
+                    job, analysis = item
+                    try:
+                        holdings_count, sectors_count = await loop.run_in_executor(
+                            writer_executor, _write_item, conn, month_id, job['account_id'], analysis,
+                            job_checkpoint(job, run_id)
+                        )
+                        stats['jobs'] += 1
+                        stats['holdings'] += holdings_count
+                        stats['sectors'] += sectors_count
+                    except sqlite3.Error as e:
+                        stats['errors'] += 1
+                        print(f"     ❌ [{job['label']}] {job['ticker']} 저장 실패: {e}")
+                finally:
+                    queue.task_done()
+        finally:
+            await loop.run_in_executor(writer_executor, conn.close)
+
+    return stats
+
+
+async def _produce(
+    key: Tuple[str, str],
+    jobs: List[Dict],
+    queue: asyncio.Queue,
+    executor: ThreadPoolExecutor,
+    db_path: str,
+    cache: Dict,
+    fetch_timeout: float
+):
+    """
+    티커 1개 조회 → 이 티커를 보유한 모든 작업(계좌별/전체) 계산 → 큐에 전달
+
+    조회가 실패/타임아웃이면 이 티커의 모든 작업을 FAILED로 기록한다 (재개 시 다시 분석).
+
+    타임아웃은 기다리기만 멈출 뿐 executor 스레드의 resolve_asset은 끝날 때까지 계속 실행되어
+    cache에 결과를 쓸 수 있다. cache 항목은 티커별 조회 결과를 딕셔너리에 한 번 대입하는 방식이라
+    (GIL 아래에서 원자적, 같은 키에는 같은 값) 늦게 끝난 스레드가 써도 다른 작업의 결과는 바뀌지 않고
+    중복 조회만 생길 수 있다.
+    """
+    loop = asyncio.get_running_loop()
+    asset_type, ticker = key
+
+    try:
+        resolved = await asyncio.wait_for(
+            loop.run_in_executor(executor, resolve_asset, ticker, asset_type, db_path, cache),
+            timeout=fetch_timeout
+        )
+    except asyncio.TimeoutError:
+        print(f"  ⏱️  [{asset_type}] {ticker}: 조회 타임아웃 ({fetch_timeout:.0f}초)")
+        for job in jobs:
+            await queue.put((job, _failed_analysis(asset_type, map_ticker(ticker), 'fetch timeout')))
+        return
+    except Exception as e:
+        print(f"  ❌ [{asset_type}] {ticker}: 조회 실패: {e}")
+        for job in jobs:
+            await queue.put((job, _failed_analysis(asset_type, map_ticker(ticker), str(e))))
+        return
+
+    for job in jobs:
+        try:
+            analysis = await loop.run_in_executor(
+                executor, build_asset_analysis, resolved, job['name'], job['amount']
+            )
+        except Exception as e:
+            # 계산 오류는 이 작업만 실패 처리 (다른 티커 조회는 계속)
+            print(f"  ❌ [{job['label']}] [{asset_type}] {job['name']} ({ticker}): 계산 실패: {e}")
+            await queue.put((job, _failed_analysis(asset_type, map_ticker(ticker), str(e))))
+            continue
+        print(f"  📊 [{job['label']}] [{asset_type}] {job['name']} ({ticker}): {job['amount']:,}원 ✅")
+        await queue.put((job, analysis))
+
+
+async def run_analysis_jobs(
+    jobs: List[Dict],
+    month_id: int,
+    db_path: str,
+    fetch_timeout: float = DEFAULT_FETCH_TIMEOUT,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    run_id: Optional[str] = None,
+    cache: Optional[Dict] = None
+) -> Dict:
+    """
+    분석 작업 목록을 조회 → 계산 → 저장 파이프라인으로 실행
+
+    Args:
+        jobs: plan_month_analysis 결과
+        month_id: 월 ID
+        db_path: DB 경로
+        fetch_timeout: 티커별 조회 타임아웃 (초)
+        max_workers: 동시 조회 스레드 수
+        queue_size: writer 큐 최대 길이
+        run_id: 완료 기록에 남길 실행 ID (None이면 생성)
+        cache: new_composition_cache() 결과 (None이면 이번 실행 전용)
+
+    Returns:
+        _db_writer 통계 + {'tickers': 조회한 티커 수}
+    """
+    # 같은 티커는 계좌/전체 작업이 여러 개여도 1번만 조회
+    groups: Dict[Tuple[str, str], List[Dict]] = {}
+    for job in jobs:
+        groups.setdefault((job['asset_type'], job['ticker']), []).append(job)
+
+    if run_id is None:
+        run_id = new_run_id()
+
+    if cache is None:
+        cache = new_composition_cache()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    writer = asyncio.create_task(_db_writer(queue, db_path, month_id, run_id))
+    producers = [
+        asyncio.create_task(_produce(key, group, queue, executor, db_path, cache, fetch_timeout))
+        for key, group in groups.items()
+    ]
+
+    try:
+        await asyncio.gather(*producers)
+    finally:
+        # 취소/오류 시 남은 조회는 중단하고, 큐에 들어간 결과까지는 저장
+        for producer in producers:
+            producer.cancel()
+        await asyncio.gather(*producers, return_exceptions=True)
+        await queue.put(_WRITER_DONE)
+        stats = await writer
+        # 대기 중인 조회는 취소, 이미 실행 중인 조회 스레드는 기다리지 않음 (_produce 참고)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    stats['tickers'] = len(groups)
+    return stats
+
+
+async def analyze_month_portfolio_async(
+    year_month: str,
+    db_path: str = "portfolio.db",
+    overwrite: bool = False,
+    exclude_tickers: List[str] = None,
+    analyze_by_account: bool = True,
+    analyze_total: bool = True,
+    derive_total: bool = False,
+    fetch_timeout: float = DEFAULT_FETCH_TIMEOUT,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    resume: bool = False
+) -> Optional[Dict]:
+    """
+    특정 월의 포트폴리오를 비동기로 분석하여 DB에 저장 (결과는 analyze_month_portfolio와 동일)
+
+    Args:
+        year_month: 'YYYY-MM' 형식
+        db_path: DB 경로
+        overwrite: True면 기존 분석 데이터 삭제 후 재분석
+        exclude_tickers: 분석에서 제외할 티커 목록
+        analyze_by_account: 계좌별 분석 수행 여부
+        analyze_total: 전체 합산 분석 수행 여부
+        derive_total: True면 전체 분석을 계좌별 결과 합산으로 생성
+        fetch_timeout: 티커별 조회 타임아웃 (초)
+        max_workers: 동시 조회 스레드 수
+        resume: True면 기존 분석 데이터를 유지하고 완료되지 않은 단위만 분석
+
+    Returns:
+        파이프라인 통계 또는 분석을 진행할 수 없으면 None
+    """
+    if exclude_tickers is None:
+        exclude_tickers = []
+
+    print(f"\n📂 {year_month}월 포트폴리오 분석 시작 (비동기)")
+    print("=" * 80)
+
+    prepared = await asyncio.to_thread(prepare_month_analysis, year_month, db_path, overwrite, None, resume)
+    if prepared is None:
+        return None
+    month_id, exchange_rate = prepared
+
+    jobs = plan_month_analysis(year_month, db_path, exclude_tickers,
+                               analyze_by_account, analyze_total, derive_total)
+    if resume:
+        completed = await asyncio.to_thread(get_completed_units, month_id, db_path)
+        remaining = filter_completed_jobs(jobs, completed)
+        print(f"⏭️  완료된 작업 {len(jobs) - len(remaining)}건 건너뜀, 남은 작업 {len(remaining)}건")
+        jobs = remaining
+    print(f"\n🚀 작업 {len(jobs)}건 조회·계산·저장 병행 실행 중...")
+
+    cache = new_composition_cache()
+    stats = await run_analysis_jobs(jobs, month_id, db_path, fetch_timeout, max_workers, cache=cache)
+    print(f"\n  ✅ 티커 {stats['tickers']}개 조회, 작업 {stats['jobs']}건 저장 "
+          f"(holdings {stats['holdings']}건, sectors {stats['sectors']}건, 실패 {stats['errors']}건)")
+
+    await asyncio.to_thread(finish_month_analysis, month_id, exchange_rate, db_path, analyze_total,
+                            derive_total, analyze_by_account, exclude_tickers, cache)
+    return stats
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from data.init_db import init_database
+
+    parser = argparse.ArgumentParser(description="월별 포트폴리오 ETF 구성 분석 (비동기)")
+    parser.add_argument("--month", required=True, help="분석할 년-월 (예: 2025-12)")
+    parser.add_argument("--db", default="portfolio.db", help="SQLite DB 파일 경로")
+    parser.add_argument("--overwrite", action="store_true", help="기존 분석 데이터 덮어쓰기")
+    parser.add_argument("--exclude", default="", help="제외할 티커 (쉼표 구분, 기본값: 모든 자산 분석)")
+    parser.add_argument("--derive-total", action="store_true",
+                        help="전체 분석을 계좌별 결과 합산으로 생성 (yfinance 재조회 없음)")
+    parser.add_argument("--fetch-timeout", type=float, default=DEFAULT_FETCH_TIMEOUT,
+                        help=f"티커별 조회 타임아웃 초 (기본값: {DEFAULT_FETCH_TIMEOUT:.0f})")
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS,
+                        help=f"동시 조회 스레드 수 (기본값: {DEFAULT_MAX_WORKERS})")
+    parser.add_argument("--resume", action="store_true",
+                        help="중단된 분석 이어서 실행 (완료된 계좌·종목 건너뛰기)")
+
+    args = parser.parse_args()
+
+    # 기존 DB에도 새 테이블/컬럼 마이그레이션 (완료 기록, 종목 노출 색인 등)
+    print("🔧 데이터베이스 스키마 확인 중...")
+    init_database(args.db)
+
+    asyncio.run(analyze_month_portfolio_async(
+        year_month=args.month,
+        db_path=args.db,
+        overwrite=args.overwrite,
+        exclude_tickers=[t.strip() for t in args.exclude.split(',') if t.strip()],
+        derive_total=args.derive_total,
+        fetch_timeout=args.fetch_timeout,
+        max_workers=args.workers,
+        resume=args.resume
+    ))
@@ -6,7 +6,7 @@ import sqlite3
 import yfinance as yf
 import pandas as pd
 from typing import Optional
-from core.interest_calculator import calc_cash_current_value
+from core.interest_calculator import calc_savings_product_value
 
 
 def get_current_price(ticker: str) -> Optional[float]:
@@ -174,15 +174,10 @@ def evaluate_holdings(db_path: str = "portfolio.db") -> pd.DataFrame:
             ]
             display_name = name_match['name'].iloc[0] if not name_match.empty and pd.notna(name_match['name'].iloc[0]) else f"CASH({rate*100:.1f}%)" if rate else "CASH"
 
-            # 각 납입건별 이자 계산 후 합산
-            total_value = 0.0
-            for _, rec in group.iterrows():
-                total_value += calc_cash_current_value(
-                    principal=int(rec['input_amount']),
-                    annual_rate=rate,
-                    purchase_date=rec['purchase_date'],
-                    interest_type=itype,
-                )
+            # 매월 같은 금액 납입이면 등차/등비 합 공식, 불규칙하면 납입건별 합산
+            total_value = calc_savings_product_value(
+                group['input_amount'], rate, group['purchase_date'], itype
+            )
 
             profit = total_value - invested
             return_rate = (profit / invested * 100) if invested > 0 else 0
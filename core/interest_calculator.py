@@ -3,9 +3,13 @@
 
 적립식 적금의 이자를 단리/복리로 계산하는 함수를 제공합니다.
 각 월별 납입액에 대해 경과 개월수를 기준으로 이자를 계산합니다.
+여러 납입건은 calc_cash_values로 한 번에 (NumPy 배열 연산, calc_cash_current_value와 같은 값) 계산합니다.
 """
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
 
 
 def calc_months_elapsed(purchase_date: str, eval_date: Optional[str] = None) -> int:
@@ -84,3 +88,264 @@ def calc_cash_current_value(
     months = calc_months_elapsed(purchase_date, eval_date)
     interest = calc_deposit_interest(principal, annual_rate, months, interest_type)
     return float(principal + interest)
+
+
+# ===== 배열 API (여러 납입건 일괄 평가) =====
+
+def _month_index(dates) -> np.ndarray:
+    """
+    'YYYY-MM-DD' 배열 → 1970-01 기준 월 번호 배열 (strptime 없이 NumPy 날짜 변환)
+
+    Args:
+        dates: 날짜 문자열 배열 / Series / 단일 문자열, None이면 오늘
+    """
+    if dates is None:
+        today = datetime.now()
+        return np.asarray((today.year - 1970) * 12 + today.month - 1, dtype=np.int64)
+    return np.asarray(dates, dtype='datetime64[D]').astype('datetime64[M]').astype(np.int64)
+
+
+def _compound_factors(rate: np.ndarray, months: np.ndarray) -> np.ndarray:
+    """
+    (1 + 연이율/12) ** 경과월 배열
+
+    NumPy 거듭제곱은 파이썬 float ** int와 마지막 자리가 다를 수 있으므로
+    고유한 (연이율, 경과월) 쌍만 파이썬으로 계산해서 펼친다 (쌍 개수 ≪ 납입건 수).
+    """
+    rate, months = np.broadcast_arrays(rate, months)
+    pairs, inverse = np.unique(
+        np.stack([rate.ravel(), months.ravel().astype(np.float64)]), axis=1, return_inverse=True
+    )
+    factors = np.array([(1 + r / 12) ** int(m) for r, m in pairs.T], dtype=np.float64)
+    return factors[np.ravel(inverse)].reshape(rate.shape)
+
+
+def calc_cash_values(
+    principal,
+    annual_rate,
+    purchase_date,
+    interest_type='simple',
+    eval_date=None,
+) -> np.ndarray:
+    """
+    적금 납입건 배열의 평가액(원금 + 이자) 일괄 계산
+
+    calc_cash_current_value를 행마다 호출한 결과와 같은 값을 반환한다.
+    각 인자는 같은 길이의 배열 / Series 또는 단일 값(전체에 적용)이다.
+
+    Args:
+        principal: 납입 원금
+        annual_rate: 연이율 (None / NaN / 0 이하면 이자 없음)
+        purchase_date: 매수일 (YYYY-MM-DD)
+        interest_type: 'compound'면 복리, 그 외(None 포함)는 단리
+        eval_date: 평가 기준일 (None이면 오늘)
+
+    Returns:
+        평가액 배열 (float64)
+    """
+    principal = np.asarray(principal, dtype=np.float64)
+    rate = np.asarray(pd.to_numeric(pd.Series(np.ravel(annual_rate)), errors='coerce'), dtype=np.float64)
+    rate = rate.reshape(np.shape(annual_rate))
+    months = np.maximum(_month_index(eval_date) - _month_index(purchase_date), 0)
+    compound = np.asarray(interest_type, dtype=object) == 'compound'
+
+    has_interest = (rate > 0) & (months > 0)  # NaN 비교는 False
+    safe_rate = np.where(has_interest, rate, 0.0)
+
+    simple_interest = principal * safe_rate * (months / 12)
+    compound_interest = principal * (_compound_factors(safe_rate, months) - 1)
+    interest = np.where(compound, compound_interest, simple_interest)
+
+    return principal + np.where(has_interest, interest, 0.0)
+
+
+def calc_cash_records_value(records: pd.DataFrame, eval_date: Optional[str] = None) -> float:
+    """
+    purchase_history CASH 레코드 전체 평가액 합계
+
+    Args:
+        records: input_amount, interest_rate, purchase_date, interest_type 컬럼을 가진 DataFrame
+        eval_date: 평가 기준일 (None이면 오늘)
+
+    Returns:
+        평가액 합계 (레코드가 없으면 0.0)
+    """
+    if records.empty:
+        return 0.0
+    return float(calc_cash_values(
+        records['input_amount'],
+        records['interest_rate'],
+        records['purchase_date'],
+        records['interest_type'],
+        eval_date,
+    ).sum())
+
+
+# ===== 적금 상품 단위 평가 (등차 / 등비 합 공식) =====
+
+def calc_regular_savings_value(
+    monthly_principal: float,
+    annual_rate: Optional[float],
+    first_purchase_date: str,
+    count: int,
+    interest_type: str = 'simple',
+    eval_date: Optional[str] = None,
+) -> float:
+    """
+    매월 같은 금액을 연속 납입한 적금 1개 상품의 평가액 (납입 횟수와 무관하게 O(1))
+
+    납입건 i의 경과월은 E - (첫 납입월 + i)이고 (0 미만이면 0), 이자가 붙는 납입건의 경과월은
+    lo..hi 연속 정수이므로
+    - 단리: P × r × (Σm / 12), Σm = (lo + hi) × 개수 / 2 (등차 합)
+    - 복리: P × (Σ(1 + r/12)^m - 개수), Σ = (1 + r/12)^lo × ((1 + r/12)^개수 - 1) / (r/12) (등비 합)
+
+    Args:
+        monthly_principal: 회차별 납입 원금
+        annual_rate: 연이율 (None / 0 이하면 이자 없음)
+        first_purchase_date: 첫 납입일 (YYYY-MM-DD)
+        count: 납입 횟수 (첫 납입월부터 매월 1회)
+        interest_type: 'compound'면 복리, 그 외는 단리
+        eval_date: 평가 기준일 (None이면 오늘)
+
+    Returns:
+        평가액 (원금 합계 + 이자)
+    """
+    total_principal = float(monthly_principal) * count
+    if count <= 0 or not annual_rate or not annual_rate > 0:
+        return total_principal
+
+    elapsed_first = int(_month_index(eval_date) - _month_index(first_purchase_date))
+    hi = elapsed_first
+    lo = max(1, elapsed_first - (count - 1))
+    if hi < lo:
+        return total_principal
+
+    n = hi - lo + 1
+    if interest_type == 'compound':
+        growth = 1 + annual_rate / 12
+        factor_sum = growth ** lo * (growth ** n - 1) / (annual_rate / 12)
+        interest = monthly_principal * (factor_sum - n)
+    else:
+        month_sum = (lo + hi) * n // 2
+        interest = monthly_principal * annual_rate * (month_sum / 12)
+
+    return total_principal + interest
+
+
+def regular_schedule(principal, purchase_date) -> Optional[Tuple[float, str, int]]:
+    """
+    납입건이 '매월 같은 금액, 연속된 달에 1번씩'인지 확인
+
+    Args:
+        principal: 납입 원금 배열
+        purchase_date: 매수일 배열 (YYYY-MM-DD)
+
+    Returns:
+        (회차 원금, 첫 납입일, 납입 횟수) 또는 불규칙하면 None
+    """
+    principal = np.asarray(principal, dtype=np.float64)
+    dates = np.asarray(purchase_date, dtype='datetime64[D]')
+    if principal.size == 0 or np.any(principal != principal[0]):
+        return None
+
+    months = np.sort(dates.astype('datetime64[M]').astype(np.int64))
+    if np.any(np.diff(months) != 1):
+        return None
+
+    return float(principal[0]), str(dates.min()), int(principal.size)
+
+
+def calc_savings_product_value(
+    principal,
+    annual_rate: Optional[float],
+    purchase_date,
+    interest_type: str = 'simple',
+    eval_date: Optional[str] = None,
+) -> float:
+    """
+    같은 (종목, 연이율, 이자 유형) 적금 상품의 평가액
+
+    규칙적인 납입(매월 같은 금액)이면 calc_regular_savings_value로 O(1) 계산,
+    금액이 바뀌었거나 빠진 달 / 같은 달 중복 납입이 있으면 납입건별 합산(calc_cash_values)으로 계산한다.
+
+    Args:
+        principal: 납입 원금 배열
+        annual_rate: 연이율 (상품 공통)
+        purchase_date: 매수일 배열 (YYYY-MM-DD)
+        interest_type: 'simple' 또는 'compound' (상품 공통)
+        eval_date: 평가 기준일 (None이면 오늘)
+
+    Returns:
+        평가액 합계
+    """
+    rate = annual_rate if annual_rate is not None and pd.notna(annual_rate) else None
+    schedule = regular_schedule(principal, purchase_date)
+    if schedule is not None:
+        monthly_principal, first_date, count = schedule
+        return calc_regular_savings_value(monthly_principal, rate, first_date, count, interest_type, eval_date)
+
+    return float(calc_cash_values(principal, rate, purchase_date, interest_type, eval_date).sum())
+
+
+# ===== 평가일 시계열 =====
+
+# 평가일 × 납입건 행렬 한 번에 계산할 최대 원소 수 (메모리 상한, 넘으면 납입건을 나눠서 계산)
+SERIES_MAX_CELLS = 1_000_000
+
+
+def calc_cash_value_series(
+    principal,
+    annual_rate,
+    purchase_date,
+    interest_type='simple',
+    eval_dates=(),
+    include_future: bool = False,
+) -> np.ndarray:
+    """
+    여러 평가일의 적금 평가액 합계를 한 번에 계산 (평가일 × 납입건 배열 연산)
+
+    평가일마다 calc_cash_values(..., eval_date)를 합산한 것과 같은 값이며,
+    기본적으로 평가일 이후 납입건은 아직 납입 전이므로 제외한다.
+    annual_rate=None으로 호출하면 평가일별 납입 원금 누계가 된다.
+
+    Args:
+        principal: 납입 원금 배열
+        annual_rate: 연이율 배열 또는 단일 값
+        purchase_date: 매수일 배열 (YYYY-MM-DD)
+        interest_type: 이자 유형 배열 또는 단일 값
+        eval_dates: 평가일 배열 (YYYY-MM-DD, 예: 월말 목록)
+        include_future: True면 평가일 이후 납입건도 원금으로 포함 (calc_cash_current_value와 동일)
+
+    Returns:
+        평가일별 평가액 배열 (eval_dates와 같은 길이)
+    """
+    principal = np.atleast_1d(np.asarray(principal, dtype=np.float64))
+    count = principal.size
+    rate = np.broadcast_to(np.asarray(annual_rate, dtype=object), (count,))
+    dates = np.broadcast_to(np.asarray(purchase_date, dtype='datetime64[D]'), (count,))
+    types = np.broadcast_to(np.asarray(interest_type, dtype=object), (count,))
+    eval_days = np.atleast_1d(np.asarray(eval_dates, dtype='datetime64[D]'))
+
+    totals = np.zeros(eval_days.size, dtype=np.float64)
+    if count == 0 or eval_days.size == 0:
+        return totals
+
+    step = max(1, SERIES_MAX_CELLS // eval_days.size)
+    for start in range(0, count, step):
+        part = slice(start, start + step)
+        values = calc_cash_values(
+            principal[None, part], rate[None, part], dates[None, part], types[None, part], eval_days[:, None]
+        )
+        if not include_future:
+            values = np.where(dates[None, part] <= eval_days[:, None], values, 0.0)
+        totals += values.sum(axis=1)
+
+    return totals
+
+
+def month_end_dates(year_months) -> np.ndarray:
+    """
+    'YYYY-MM' 배열 → 월말 날짜 배열 (datetime64[D])
+    """
+    months = np.asarray(year_months, dtype='datetime64[M]')
+    return (months + 1).astype('datetime64[D]') - np.timedelta64(1, 'D')
@@ -0,0 +1,500 @@
+"""
+증권사 거래내역 CSV를 purchase_history에 임포트하는 스크립트
+월별 YAML의 가상 매수(보유 종목당 월 1건) 대신 실제 체결 내역을 저장
+
+- 거래내역이 있는 (계좌, 월, 티커)는 YAML 가상 매수를 삭제 → 거래내역 우선, 투자 금액 합계 중복 없음
+
+- CSV를 청크 단위로 스트리밍 파싱 → 파일 크기와 무관하게 메모리 일정
+- 단가 / 환율이 없는 행은 청크별로 모아서 daily_prices(로컬 저장소) 먼저 조회,
+  없는 구간만 티커당 1번 yfinance 조회 후 저장
+- 청크마다 executemany로 일괄 삽입, 파일 전체는 한 트랜잭션 (실패 시 롤백)
+"""
+import csv
+import sqlite3
+import yfinance as yf
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+
+# 거래내역 행을 구분하는 note 접두사 (월 재임포트 시 보존)
+BROKER_NOTE_PREFIX = 'broker:'
+
+# 증권사별 컬럼명 → 표준 컬럼 (소문자 비교)
+DATE_ALIASES = ['date', 'trade date', 'settlement date', '거래일', '거래일자', '체결일', '체결일자', '매매일자']
+TICKER_ALIASES = ['ticker', 'symbol', 'code', '종목코드', '티커', '단축코드']
+QUANTITY_ALIASES = ['quantity', 'qty', 'shares', '수량', '체결수량', '거래수량']
+PRICE_ALIASES = ['price', 'trade price', 'unit price', '단가', '체결단가', '거래단가']
+AMOUNT_ALIASES = ['amount', 'trade amount', 'gross amount', '금액', '체결금액', '거래금액']
+CURRENCY_ALIASES = ['currency', '통화', '결제통화']
+EXCHANGE_RATE_ALIASES = ['exchange rate', 'fx rate', '환율', '적용환율']
+SIDE_ALIASES = ['side', 'type', 'action', '매매구분', '거래구분', '구분']
+ACCOUNT_ALIASES = ['account', 'account name', '계좌', '계좌명']
+
+BUY_VALUES = {'buy', 'b', 'bought', '매수', '매입'}
+REQUIRED_COLUMNS = ('date', 'ticker', 'quantity')
+
+# 환율 티커 (1 USD = X KRW)
+FX_TICKER = 'KRW=X'
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def _match_columns(headers: List) -> Optional[Dict[str, int]]:
+    """
+    헤더 행에서 표준 컬럼 위치 찾기
+
+    Returns:
+        {'date': 0, 'ticker': 1, 'quantity': 3, ...} 또는 헤더 행이 아니면 None
+    """
+    normalized = [str(h).strip().lower() for h in headers]
+    found = {}
+    for key, aliases in [
+        ('date', DATE_ALIASES), ('ticker', TICKER_ALIASES), ('quantity', QUANTITY_ALIASES),
+        ('price', PRICE_ALIASES), ('amount', AMOUNT_ALIASES), ('currency', CURRENCY_ALIASES),
+        ('exchange_rate', EXCHANGE_RATE_ALIASES), ('side', SIDE_ALIASES), ('account', ACCOUNT_ALIASES),
+    ]:
+        for alias in aliases:
+            if alias in normalized:
+                found[key] = normalized.index(alias)
+                break
+
+    if any(key not in found for key in REQUIRED_COLUMNS):
+        return None
+    return found
+
+
+def _parse_number(value) -> Optional[float]:
+    """'1,234.5' / '$600' / '35,000원' → float (빈 값은 None)"""
+    if value is None:
+        return None
+    text = str(value).strip()
+    for symbol in (',', '$', '₩', '원', ' '):
+        text = text.replace(symbol, '')
+    if text in ('', '-'):
+        return None
+    return float(text)
+
+
+def _parse_date(value) -> str:
+    """'2025.01.24' / '2025/01/24' / '20250124' / '2025-01-24 09:30' → '2025-01-24'"""
+    text = str(value).strip()
+    if len(text) == 8 and text.isdigit():
+        text = f"{text[:4]}-{text[4:6]}-{text[6:]}"
+    text = text[:10].replace('.', '-').replace('/', '-')
+    return datetime.strptime(text, '%Y-%m-%d').strftime('%Y-%m-%d')
+
+
+def _default_currency(ticker: str) -> str:
+    return 'KRW' if ticker.endswith(('.KS', '.KQ')) else 'USD'
+
+
+def iter_trade_chunks(
+    file_path: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    encoding: str = 'utf-8-sig'
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    거래내역 CSV를 청크 단위로 읽기 (파일 전체를 메모리에 올리지 않음)
+
+    헤더 위의 설명 행과 필수 값이 빈 행(합계 / 주석)은 건너뛴다.
+
+    Args:
+        file_path: CSV 파일 경로
+        chunk_size: 청크당 행 수
+        encoding: 파일 인코딩 (국내 증권사 파일은 'cp949'인 경우가 많음)
+
+    Yields:
+        [{'line', 'trade_date', 'ticker', 'quantity', 'price', 'amount',
+          'currency', 'exchange_rate', 'account', 'is_buy'}, ...]
+
+    Raises:
+        ValueError: 일자/종목/수량 컬럼을 찾을 수 없거나 값을 해석할 수 없는 경우 (줄 번호 포함)
+    """
+    with open(file_path, 'r', encoding=encoding, newline='') as f:
+        reader = csv.reader(f)
+
+        columns = None
+        for row in reader:
+            columns = _match_columns(row)
+            if columns:
+                break
+        if columns is None:
+            raise ValueError(f"일자/종목/수량 컬럼을 찾을 수 없습니다: {file_path}")
+
+        def cell(row, key):
+            index = columns.get(key)
+            if index is None or index >= len(row):
+                return None
+            value = row[index].strip()
+            return value or None
+
+        chunk = []
+        for row in reader:
+            if any(cell(row, key) is None for key in REQUIRED_COLUMNS):
+                continue
+            try:
+                ticker = cell(row, 'ticker').upper()
+                side = cell(row, 'side')
+                currency = cell(row, 'currency')
+                chunk.append({
+                    'line': reader.line_num,
+                    'trade_date': _parse_date(cell(row, 'date')),
+                    'ticker': ticker,
+                    'quantity': _parse_number(cell(row, 'quantity')),
+                    'price': _parse_number(cell(row, 'price')),
+                    'amount': _parse_number(cell(row, 'amount')),
+                    'currency': currency.upper() if currency else _default_currency(ticker),
+                    'exchange_rate': _parse_number(cell(row, 'exchange_rate')),
+                    'account': cell(row, 'account'),
+                    'is_buy': side is None or side.strip().lower() in BUY_VALUES,
+                })
+            except ValueError as e:
+                raise ValueError(f"{file_path}:{reader.line_num} 행을 해석할 수 없습니다: {e}")
+
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+
+        if chunk:
+            yield chunk
+
+
+def fetch_daily_closes(ticker: str, start_date: str, end_date: str) -> Dict[str, float]:
+    """
+    yfinance로 기간 일별 종가 조회 (1번 호출)
+
+    Args:
+        ticker: 종목 코드 (환율은 'KRW=X')
+        start_date: 시작일 (YYYY-MM-DD, 포함)
+        end_date: 종료일 (YYYY-MM-DD, 포함)
+
+    Returns:
+        {'2025-01-24': 600.0, ...} (실패 시 빈 딕셔너리)
+    """
+    try:
+        end = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
+        hist = yf.Ticker(ticker).history(start=start_date, end=end.strftime('%Y-%m-%d'))
+        return {index.strftime('%Y-%m-%d'): float(close) for index, close in hist['Close'].items()}
+    except Exception as e:
+        print(f"      ⚠️  {ticker} yfinance 조회 실패: {e}")
+        return {}
+
+
+def resolve_daily_closes(
+    cursor: sqlite3.Cursor,
+    wanted: Dict[str, Set[str]],
+    lookback_days: int = 7
+) -> Dict[Tuple[str, str], Tuple[str, float]]:
+    """
+    여러 티커 × 날짜의 종가를 일괄 조회 (daily_prices 우선, 부족한 티커만 yfinance 1번)
+
+    해당 날짜 종가가 없으면 lookback_days 이내 직전 영업일 종가를 사용한다.
+    yfinance로 조회한 구간은 daily_price_fetches에 기록 → 구간 안의 주말·공휴일은 다시 조회하지 않는다.
+
+    Args:
+        cursor: DB 커서 (yfinance 조회 결과를 daily_prices에 저장, 커밋은 호출자 담당)
+        wanted: {ticker: {날짜, ...}}
+        lookback_days: 직전 영업일 탐색 일수
+
+    Returns:
+        {(ticker, 요청 날짜): (실제 날짜, 종가)} (찾지 못한 항목은 제외)
+    """
+    resolved = {}
+    last_closed = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+    for ticker, dates in wanted.items():
+        dates = sorted(dates)
+        start = (datetime.strptime(dates[0], '%Y-%m-%d') - timedelta(days=lookback_days)).strftime('%Y-%m-%d')
+        end = dates[-1]
+
+        cursor.execute(
+            "SELECT price_date, close FROM daily_prices WHERE ticker = ? AND price_date BETWEEN ? AND ?",
+            (ticker, start, end)
+        )
+        closes = dict(cursor.fetchall())
+        cursor.execute(
+            "SELECT start_date, end_date FROM daily_price_fetches WHERE ticker = ? AND start_date <= ? AND end_date >= ?",
+            (ticker, end, dates[0])
+        )
+        fetched_ranges = cursor.fetchall()
+
+        # 종가가 없어도 이미 조회한 구간 안이면 휴장일(주말·공휴일) → 직전 영업일 종가 사용
+        missing = [
+            date for date in dates
+            if date not in closes and not any(s <= date <= e for s, e in fetched_ranges)
+        ]
+        if missing:
+            fetch_start = (datetime.strptime(missing[0], '%Y-%m-%d') - timedelta(days=lookback_days)).strftime('%Y-%m-%d')
+            print(f"  💹 {ticker} 일별 종가 조회 ({fetch_start} ~ {missing[-1]})")
+            fetched = fetch_daily_closes(ticker, fetch_start, missing[-1])
+            currency = None if ticker == FX_TICKER else _default_currency(ticker)
+            cursor.executemany(
+                "INSERT OR REPLACE INTO daily_prices (ticker, price_date, close, currency) VALUES (?, ?, ?, ?)",
+                [(ticker, date, close, currency) for date, close in fetched.items()]
+            )
+            # 조회 성공 구간 기록 (오늘 이후는 종가가 아직 없을 수 있으므로 어제까지만)
+            fetched_end = min(missing[-1], last_closed)
+            if fetched and fetch_start <= fetched_end:
+                cursor.execute(
+                    "INSERT OR IGNORE INTO daily_price_fetches (ticker, start_date, end_date) VALUES (?, ?, ?)",
+                    (ticker, fetch_start, fetched_end)
+                )
+            closes.update(fetched)
+
+        known = sorted(closes)
+        for date in dates:
+            position = bisect_right(known, date)
+            if position == 0:
+                continue
+            found = known[position - 1]
+            if (datetime.strptime(date, '%Y-%m-%d') - datetime.strptime(found, '%Y-%m-%d')).days <= lookback_days:
+                resolved[(ticker, date)] = (found, closes[found])
+
+    return resolved
+
+
+def _find_holding(
+    cursor: sqlite3.Cursor,
+    account_id: Optional[int],
+    ticker: str
+) -> Tuple[Optional[int], str]:
+    """
+    거래내역 행의 holdings 연결 + 자산 유형
+
+    Returns:
+        (체결월 계좌의 같은 티커 holdings ID 또는 None,
+         그 holdings의 asset_type → 없으면 가장 최근 같은 티커 holdings → 없으면 'STOCK')
+    """
+    if account_id is not None:
+        cursor.execute(
+            "SELECT id, asset_type FROM holdings WHERE account_id = ? AND ticker_mapping = ? ORDER BY id LIMIT 1",
+            (account_id, ticker)
+        )
+        found = cursor.fetchone()
+        if found:
+            return found[0], found[1]
+
+    cursor.execute("SELECT asset_type FROM holdings WHERE ticker_mapping = ? ORDER BY id DESC LIMIT 1", (ticker,))
+    found = cursor.fetchone()
+    return None, found[0] if found else 'STOCK'
+
+
+def drop_covered_purchases(cursor: sqlite3.Cursor, year_month: str) -> int:
+    """
+    증권사 거래내역이 있는 (계좌, 월, 티커)의 YAML 가상 매수 삭제 (거래내역 우선)
+
+    거래내역 임포트 후, 월 YAML 재임포트 후 모두 호출해 어느 순서로 임포트해도 결과가 같다.
+    계좌에 연결되지 않은 거래내역은 대상 계좌를 알 수 없으므로 YAML 매수를 유지한다.
+
+    Args:
+        cursor: DB 커서 (커밋은 호출자 담당)
+        year_month: 'YYYY-MM'
+
+    Returns:
+        삭제한 YAML 매수 행 수
+    """
+    cursor.execute("""
+        DELETE FROM purchase_history
+        WHERE year_month = ? AND account_id IS NOT NULL
+          AND (note IS NULL OR note NOT LIKE ?)
+          AND EXISTS (
+              SELECT 1 FROM purchase_history b
+              WHERE b.note LIKE ?
+                AND b.account_id = purchase_history.account_id
+                AND b.year_month = purchase_history.year_month
+                AND b.ticker = purchase_history.ticker
+          )
+    """, (year_month, BROKER_NOTE_PREFIX + '%', BROKER_NOTE_PREFIX + '%'))
+    return cursor.rowcount
+
+
+def _prepare_rows(
+    cursor: sqlite3.Cursor,
+    trades: List[Dict[str, Any]],
+    note: str,
+    default_account: Optional[str],
+    account_ids: Dict[Tuple[str, str], Optional[int]],
+    holdings: Dict[Tuple[Optional[int], str], Tuple[Optional[int], str]]
+) -> List[tuple]:
+    """
+    매수 체결 청크 → purchase_history 삽입 행 (단가 / 환율은 청크 단위 일괄 조회)
+
+    계좌 / holdings 연결과 자산 유형은 account_ids / holdings에 캐시해 파일 전체에서 재사용한다.
+
+    Raises:
+        ValueError: 단가 / 환율을 찾을 수 없거나 지원하지 않는 통화인 경우
+    """
+    wanted: Dict[str, Set[str]] = {}
+    for trade in trades:
+        if trade['currency'] not in ('KRW', 'USD'):
+            raise ValueError(f"{trade['line']}행: 지원하지 않는 통화 {trade['currency']} (KRW/USD만 지원)")
+        if trade['price'] is None and trade['amount'] is None:
+            wanted.setdefault(trade['ticker'], set()).add(trade['trade_date'])
+        if trade['currency'] == 'USD' and trade['exchange_rate'] is None:
+            wanted.setdefault(FX_TICKER, set()).add(trade['trade_date'])
+
+    closes = resolve_daily_closes(cursor, wanted) if wanted else {}
+
+    missing = sorted({
+        f"{ticker} {date}" for ticker, dates in wanted.items() for date in dates
+        if (ticker, date) not in closes
+    })
+    if missing:
+        raise ValueError(f"종가를 찾을 수 없습니다: {', '.join(missing)}")
+
+    rows = []
+    for trade in trades:
+        ticker, trade_date, quantity = trade['ticker'], trade['trade_date'], trade['quantity']
+        year_month = trade_date[:7]
+
+        # 단가: 파일 단가 → 금액 ÷ 수량 → 로컬 저장소 종가
+        price = trade['price']
+        if price is None and trade['amount'] is not None:
+            price = trade['amount'] / quantity
+        if price is None:
+            price = closes[(ticker, trade_date)][1]
+        amount = trade['amount'] if trade['amount'] is not None else price * quantity
+
+        if trade['currency'] == 'KRW':
+            exchange_rate = None
+            rate = 1.0
+        else:
+            exchange_rate = trade['exchange_rate'] or closes[(FX_TICKER, trade_date)][1]
+            rate = exchange_rate
+
+        account_name = trade['account'] or default_account
+        key = (account_name, year_month)
+        if account_name and key not in account_ids:
+            cursor.execute("""
+                SELECT a.id FROM accounts a
+                INNER JOIN months m ON a.month_id = m.id
+                WHERE a.name = ? AND m.year_month = ?
+            """, key)
+            found = cursor.fetchone()
+            account_ids[key] = found[0] if found else None
+        account_id = account_ids.get(key)
+
+        if (account_id, ticker) not in holdings:
+            holdings[(account_id, ticker)] = _find_holding(cursor, account_id, ticker)
+        holding_id, asset_type = holdings[(account_id, ticker)]
+
+        rows.append((
+            ticker, asset_type, year_month, trade_date,
+            quantity, int(round(amount * rate)), price * rate,
+            trade['currency'], exchange_rate, account_id, note, holding_id
+        ))
+
+    return rows
+
+
+def import_broker_trades(
+    csv_path: str,
+    db_path: str = "portfolio.db",
+    account_name: Optional[str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    encoding: str = 'utf-8-sig',
+    overwrite: bool = False
+) -> Optional[Dict[str, int]]:
+    """
+    증권사 거래내역 CSV의 매수 체결을 purchase_history에 임포트 (파일 전체 한 트랜잭션)
+
+    - 매도 등 매수가 아닌 행은 건너뜀
+    - 계좌는 체결월의 같은 이름 계좌, holdings는 그 계좌의 같은 티커에 연결 (없으면 NULL)
+    - 자산 유형은 연결된 holdings 기준 (drop_covered_purchases로 같은 (계좌, 월, 티커)의 YAML 매수 삭제)
+    - note = 'broker:<파일명>' → 같은 파일 재임포트 시 overwrite로 교체
+
+    Args:
+        csv_path: 거래내역 CSV 경로
+        db_path: SQLite DB 파일 경로
+        account_name: 파일에 계좌 컬럼이 없을 때 사용할 계좌명
+        chunk_size: 청크당 행 수 (메모리 사용량 상한)
+        encoding: 파일 인코딩
+        overwrite: True면 같은 파일에서 임포트한 기존 행 삭제 후 재삽입
+
+    Returns:
+        {'rows', 'skipped', 'unlinked', 'chunks', 'replaced'} 또는 이미 임포트된 파일이라 건너뛴 경우 None
+        (replaced = 거래내역으로 대체되어 삭제된 YAML 매수 행 수)
+
+    Raises:
+        ValueError: 파일 형식 오류 / 단가·환율을 찾을 수 없는 경우 (DB 변경 없음)
+    """
+    note = f"{BROKER_NOTE_PREFIX}{Path(csv_path).name}"
+    print(f"📂 거래내역 임포트: {csv_path} (청크 {chunk_size:,}행)")
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    result = {'rows': 0, 'skipped': 0, 'unlinked': 0, 'chunks': 0, 'replaced': 0}
+    account_ids: Dict[Tuple[str, str], Optional[int]] = {}
+    holdings: Dict[Tuple[Optional[int], str], Tuple[Optional[int], str]] = {}
+    months: Set[str] = set()
+
+    try:
+        cursor.execute("SELECT COUNT(*) FROM purchase_history WHERE note = ?", (note,))
+        if cursor.fetchone()[0]:
+            if not overwrite:
+                print(f"❌ {Path(csv_path).name} 거래내역이 이미 존재합니다. --overwrite 옵션을 사용하세요.")
+                return None
+            cursor.execute("DELETE FROM purchase_history WHERE note = ?", (note,))
+            print(f"   🗑️  기존 거래내역 {cursor.rowcount}건 삭제")
+
+        for chunk in iter_trade_chunks(csv_path, chunk_size, encoding):
+            buys = [t for t in chunk if t['is_buy'] and t['quantity'] and t['quantity'] > 0]
+            result['skipped'] += len(chunk) - len(buys)
+            result['chunks'] += 1
+            if not buys:
+                continue
+
+            rows = _prepare_rows(cursor, buys, note, account_name, account_ids, holdings)
+            cursor.executemany(
+                """
+                INSERT INTO purchase_history
+                (ticker, asset_type, year_month, purchase_date,
+                 quantity, input_amount, price_at_purchase,
+                 currency, exchange_rate, account_id, note, holding_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows
+            )
+            months.update(row[2] for row in rows)
+            result['rows'] += len(rows)
+            result['unlinked'] += sum(1 for row in rows if row[9] is None)
+            print(f"   ✅ 청크 {result['chunks']}: {len(rows):,}건 저장 (누적 {result['rows']:,}건)")
+
+        # 거래내역이 있는 (계좌, 월, 티커)의 YAML 가상 매수 삭제
+        for year_month in sorted(months):
+            result['replaced'] += drop_covered_purchases(cursor, year_month)
+
+        conn.commit()
+
+    except Exception:
+        conn.rollback()
+        raise
+
+    finally:
+        conn.close()
+
+    print(f"\n✅ 거래내역 임포트 완료: 매수 {result['rows']:,}건, 건너뜀 {result['skipped']:,}건, "
+          f"계좌 미연결 {result['unlinked']:,}건, YAML 매수 대체 {result['replaced']:,}건")
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="증권사 거래내역 CSV를 purchase_history에 임포트 (매수 체결)")
+    parser.add_argument("csv_file", help="거래내역 CSV 파일 경로")
+    parser.add_argument("--db", default="portfolio.db", help="SQLite DB 파일 경로 (기본값: portfolio.db)")
+    parser.add_argument("--account", default=None, help="계좌 컬럼이 없을 때 연결할 계좌명 (예: ISA)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"청크당 행 수 (기본값: {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument("--encoding", default="utf-8-sig", help="파일 인코딩 (기본값: utf-8-sig, 국내 증권사는 cp949)")
+    parser.add_argument("--overwrite", action="store_true", help="같은 파일에서 임포트한 기존 거래내역 교체")
+
+    args = parser.parse_args()
+
+    if not Path(args.csv_file).exists():
+        print(f"❌ 파일을 찾을 수 없습니다: {args.csv_file}")
+        exit(1)
+
+    import_broker_trades(args.csv_file, args.db, args.account, args.chunk_size, args.encoding, args.overwrite)
@@ -0,0 +1,228 @@
+"""
+운용사 보유종목 파일(CSV/XLSX)을 SQLite DB에 임포트하는 스크립트
+yfinance top_holdings(상위 10개)를 대체하는 ETF 전체 구성 종목 저장
+"""
+import csv
+import sqlite3
+import pandas as pd
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+# 운용사별 컬럼명 → 표준 컬럼 (소문자 비교)
+SYMBOL_ALIASES = ['ticker', 'symbol', 'holding ticker', 'code', '종목코드', '티커', '단축코드']
+NAME_ALIASES = ['name', 'security name', 'holding name', 'description', '종목명', '구성종목명']
+WEIGHT_ALIASES = [
+    'weight (%)', 'weight(%)', 'weight', '% of net assets', '% weight', 'portfolio weight',
+    'holding percent', 'market value weight', '비중', '비중(%)', '비중 (%)',
+]
+
+SUPPORTED_EXTENSIONS = ['.csv', '.xlsx', '.xls']
+
+
+def _normalize(header) -> str:
+    return str(header).strip().lower()
+
+
+def _match_columns(headers: List) -> Optional[Dict[str, int]]:
+    """
+    헤더 행에서 심볼/종목명/비중 컬럼 위치 찾기
+
+    Returns:
+        {'symbol': 0, 'name': 1, 'weight': 5} (종목명은 선택) 또는 헤더 행이 아니면 None
+    """
+    normalized = [_normalize(h) for h in headers]
+    found = {}
+    for key, aliases in [('symbol', SYMBOL_ALIASES), ('name', NAME_ALIASES), ('weight', WEIGHT_ALIASES)]:
+        for alias in aliases:
+            if alias in normalized:
+                found[key] = normalized.index(alias)
+                break
+
+    if 'symbol' not in found or 'weight' not in found:
+        return None
+    return found
+
+
+def _read_raw_rows(file_path: str) -> List[List]:
+    """파일을 헤더 구분 없이 행 목록으로 읽기 (운용사 파일은 상단에 설명 행이 있음)"""
+    suffix = Path(file_path).suffix.lower()
+
+    if suffix == '.csv':
+        with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
+            return [row for row in csv.reader(f)]
+
+    # XLSX/XLS: openpyxl/xlrd 필요 (선택 의존성)
+    raw = pd.read_excel(file_path, header=None, dtype=str)
+    return raw.where(raw.notna(), None).values.tolist()
+
+
+def parse_holdings_file(file_path: str) -> pd.DataFrame:
+    """
+    운용사 보유종목 파일을 표준 형식으로 파싱
+
+    Args:
+        file_path: CSV/XLSX 파일 경로
+
+    Returns:
+        DataFrame with columns: ['Symbol', 'Name', 'Holding Percent'] (비중 내림차순, 0~1 비율)
+
+    Raises:
+        ValueError: 심볼/비중 컬럼을 찾을 수 없는 경우
+    """
+    rows = _read_raw_rows(file_path)
+
+    header_index, columns = None, None
+    for i, row in enumerate(rows):
+        columns = _match_columns(row)
+        if columns:
+            header_index = i
+            break
+
+    if header_index is None:
+        raise ValueError(f"심볼/비중 컬럼을 찾을 수 없습니다: {file_path}")
+
+    records = []
+    width = max(columns.values()) + 1
+    for row in rows[header_index + 1:]:
+        if len(row) < width:
+            continue  # 하단 주석/빈 행
+        symbol = row[columns['symbol']]
+        symbol = str(symbol).strip() if symbol is not None else ''
+        name = row[columns['name']] if 'name' in columns else None
+        records.append((symbol, name, row[columns['weight']]))
+
+    df = pd.DataFrame(records, columns=['Symbol', 'Name', 'Holding Percent'])
+    df['Holding Percent'] = pd.to_numeric(
+        df['Holding Percent'].astype(str).str.replace(',', '').str.replace('%', '').str.strip(),
+        errors='coerce'
+    )
+    df = df[(df['Symbol'] != '') & (df['Symbol'] != '-') & (df['Holding Percent'] > 0)]
+
+    # 퍼센트 단위(합계 ≈ 100) → 비율
+    if df['Holding Percent'].sum() > 1.5:
+        df['Holding Percent'] = df['Holding Percent'] / 100
+
+    df['Name'] = df['Name'].fillna(df['Symbol']).astype(str).str.strip()
+
+    # 같은 심볼이 여러 행(통화/라인 분할)인 경우 합산
+    df = (
+        df.groupby('Symbol', sort=False)
+        .agg({'Name': 'first', 'Holding Percent': 'sum'})
+        .reset_index()
+        .sort_values('Holding Percent', ascending=False, kind='stable')
+        .reset_index(drop=True)
+    )
+    return df
+
+
+def save_constituents(etf_ticker: str, constituents_df: pd.DataFrame, source_file: str, db_path: str) -> int:
+    """
+    ETF 전체 구성 종목을 저장 (기존 데이터 교체)
+
+    Args:
+        etf_ticker: ETF 티커 (yfinance 형식, 예: 'SPY', '069500.KS')
+        constituents_df: parse_holdings_file 결과
+        source_file: 원본 파일 경로
+        db_path: DB 경로
+
+    Returns:
+        저장된 구성 종목 수
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    try:
+        symbols = constituents_df['Symbol'].tolist()
+        names = constituents_df['Name'].tolist()
+        weights = constituents_df['Holding Percent'].tolist()
+
+        # 1. 심볼 사전 갱신
+        cursor.executemany(
+            "INSERT OR IGNORE INTO constituent_symbols (symbol, name) VALUES (?, ?)",
+            zip(symbols, names)
+        )
+        symbol_ids = dict(cursor.execute("SELECT symbol, id FROM constituent_symbols").fetchall())
+
+        # 2. 구성 종목 교체
+        cursor.execute("DELETE FROM etf_constituents WHERE etf_ticker = ?", (etf_ticker,))
+        cursor.executemany(
+            "INSERT INTO etf_constituents (etf_ticker, symbol_id, weight) VALUES (?, ?, ?)",
+            [(etf_ticker, symbol_ids[symbol], weight) for symbol, weight in zip(symbols, weights)]
+        )
+
+        # 3. 파일 정보
+        cursor.execute(
+            """
+            INSERT OR REPLACE INTO etf_constituent_files
+            (etf_ticker, source_file, constituents_count, total_weight)
+            VALUES (?, ?, ?, ?)
+            """,
+            (etf_ticker, str(source_file), len(symbols), float(sum(weights)))
+        )
+
+        conn.commit()
+        return len(symbols)
+
+    except sqlite3.Error as e:
+        print(f"❌ {etf_ticker} 구성 종목 저장 실패: {e}")
+        conn.rollback()
+        raise
+
+    finally:
+        conn.close()
+
+
+def import_constituents(folder: str, db_path: str = "portfolio.db") -> Dict[str, int]:
+    """
+    폴더 내 운용사 보유종목 파일을 모두 임포트
+    파일명(확장자 제외)을 ETF 티커로 사용 (예: constituents/SPY.csv, constituents/069500.KS.xlsx)
+
+    Args:
+        folder: 보유종목 파일 폴더
+        db_path: DB 경로
+
+    Returns:
+        {'SPY': 503, 'QQQ': 101, ...} (실패한 파일은 제외)
+    """
+    files = sorted(
+        p for p in Path(folder).iterdir()
+        if p.is_file() and p.suffix.lower() in SUPPORTED_EXTENSIONS
+    )
+
+    if not files:
+        print(f"⚠️  보유종목 파일이 없습니다: {folder}")
+        return {}
+
+    print(f"📂 보유종목 파일 {len(files)}개 임포트 중...")
+
+    result = {}
+    for file_path in files:
+        etf_ticker = file_path.stem.upper()
+        try:
+            constituents_df = parse_holdings_file(str(file_path))
+            count = save_constituents(etf_ticker, constituents_df, str(file_path), db_path)
+            result[etf_ticker] = count
+            print(f"   ✅ {etf_ticker}: {count}개 종목 (비중 합계 {constituents_df['Holding Percent'].sum():.1%})")
+        except ImportError as e:
+            print(f"   ⚠️  {file_path.name}: XLSX 읽기 모듈 없음 (pip install openpyxl) - {e}")
+        except (ValueError, OSError) as e:
+            print(f"   ❌ {file_path.name}: {e}")
+
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="운용사 보유종목 파일(CSV/XLSX)을 SQLite DB에 임포트")
+    parser.add_argument("folder", nargs="?", default="constituents", help="보유종목 파일 폴더 (기본값: constituents)")
+    parser.add_argument("--db", default="portfolio.db", help="SQLite DB 파일 경로 (기본값: portfolio.db)")
+
+    args = parser.parse_args()
+
+    if not Path(args.folder).is_dir():
+        print(f"❌ 폴더를 찾을 수 없습니다: {args.folder}")
+        exit(1)
+
+    import_constituents(args.folder, args.db)
@@ -0,0 +1,393 @@
+"""
+월별 YAML → months / accounts / holdings / purchase_history 단일 트랜잭션 임포트
+(import_monthly_data + import_monthly_purchases 통합 버전)
+
+- YAML은 1번만 파싱, 주가는 종목당 1번만 조회 (트랜잭션 시작 전)
+- 계좌 ID는 방금 삽입한 행에서 바로 사용 (계좌명 재조회 없음)
+- 쓰기는 executemany로 일괄, 하나라도 실패하면 전체 롤백 → 반쯤 임포트된 월 없음
+- 입력 지문(정규화한 YAML 내용 + 매수 기준일)이 지난 임포트와 같으면 건너뜀 (force로 강제)
+"""
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from data.yaml_loader import load_yaml
+from data.import_broker_trades import BROKER_NOTE_PREFIX, drop_covered_purchases
+from data.import_monthly_purchases import quantity_from_price, resolve_purchase_price
+
+
+# month_id로 연결된 분석 결과 테이블 (월 교체 시 함께 삭제)
+MONTH_TABLES = ['analyzed_holdings', 'analyzed_sectors', 'analysis_metadata', 'stock_exposures']
+
+
+def delete_month_data(cursor: sqlite3.Cursor, year_month: str):
+    """
+    월 데이터 전체 삭제 (months 행 + 계좌/holdings/매수 이력/분석 결과)
+
+    증권사 거래내역(note 'broker:')은 남기고 계좌명만 기록해 둔다 → 계좌 재삽입 후 relink_broker_trades
+
+    Args:
+        cursor: DB 커서 (커밋은 호출자 담당)
+        year_month: 'YYYY-MM'
+    """
+    cursor.execute("CREATE TEMP TABLE IF NOT EXISTS broker_relink (purchase_id INTEGER PRIMARY KEY, account_name TEXT)")
+    cursor.execute("DELETE FROM broker_relink")
+    cursor.execute("""
+        INSERT INTO broker_relink (purchase_id, account_name)
+        SELECT p.id, a.name
+        FROM purchase_history p
+        LEFT JOIN accounts a ON p.account_id = a.id
+        WHERE p.year_month = ? AND p.note LIKE ?
+    """, (year_month, BROKER_NOTE_PREFIX + '%'))
+
+    cursor.execute("SELECT id FROM months WHERE year_month = ?", (year_month,))
+    month_ids = [row[0] for row in cursor.fetchall()]
+
+    for month_id in month_ids:
+        for table in MONTH_TABLES:
+            cursor.execute(f"DELETE FROM {table} WHERE month_id = ?", (month_id,))
+        cursor.execute("""
+            DELETE FROM holdings
+            WHERE account_id IN (SELECT id FROM accounts WHERE month_id = ?)
+        """, (month_id,))
+        cursor.execute("DELETE FROM accounts WHERE month_id = ?", (month_id,))
+
+    cursor.execute("""
+        DELETE FROM purchase_history
+        WHERE year_month = ? AND (note IS NULL OR note NOT LIKE ?)
+    """, (year_month, BROKER_NOTE_PREFIX + '%'))
+    cursor.execute("DELETE FROM import_fingerprints WHERE year_month = ?", (year_month,))
+    cursor.execute("DELETE FROM months WHERE year_month = ?", (year_month,))
+
+
+def relink_broker_trades(cursor: sqlite3.Cursor, year_month: str):
+    """
+    delete_month_data에서 남긴 증권사 거래내역을 새로 삽입한 같은 이름 계좌(와 그 계좌의 같은 티커 holdings)에 다시 연결
+
+    Args:
+        cursor: DB 커서 (커밋은 호출자 담당)
+        year_month: 'YYYY-MM'
+    """
+    cursor.execute("CREATE TEMP TABLE IF NOT EXISTS broker_relink (purchase_id INTEGER PRIMARY KEY, account_name TEXT)")
+    cursor.execute("""
+        UPDATE purchase_history
+        SET account_id = (
+            SELECT a.id
+            FROM broker_relink r
+            JOIN accounts a ON a.name = r.account_name
+            JOIN months m ON a.month_id = m.id
+            WHERE r.purchase_id = purchase_history.id AND m.year_month = ?
+        )
+        WHERE id IN (SELECT purchase_id FROM broker_relink)
+    """, (year_month,))
+    # holdings도 새 계좌의 같은 티커로 다시 연결
+    cursor.execute("""
+        UPDATE purchase_history
+        SET holding_id = (
+            SELECT h.id FROM holdings h
+            WHERE h.account_id = purchase_history.account_id AND h.ticker_mapping = purchase_history.ticker
+            ORDER BY h.id LIMIT 1
+        )
+        WHERE id IN (SELECT purchase_id FROM broker_relink)
+    """)
+    cursor.execute("DELETE FROM broker_relink")
+
+
+def compute_import_fingerprint(data: Dict[str, Any], purchase_day: int) -> str:
+    """
+    임포트 입력 지문: 파싱한 YAML을 정규화(키 정렬 JSON)한 내용 + 매수 기준일의 SHA-256
+
+    주석 / 들여쓰기 / 키 순서만 바뀐 경우는 같은 지문이 된다.
+
+    Args:
+        data: 파싱된 월별 YAML
+        purchase_day: 실제 적용되는 매수 기준일 (YAML 지정값 반영 후)
+
+    Returns:
+        16진수 해시 문자열
+    """
+    normalized = json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=str)
+    return hashlib.sha256(f"{normalized}|purchase_day={purchase_day}".encode('utf-8')).hexdigest()
+
+
+def get_import_fingerprint(cursor: sqlite3.Cursor, year_month: str) -> Optional[str]:
+    """
+    저장된 임포트 지문 조회 (월 데이터가 없으면 None)
+
+    Args:
+        cursor: DB 커서
+        year_month: 'YYYY-MM'
+    """
+    cursor.execute("""
+        SELECT f.fingerprint
+        FROM import_fingerprints f
+        JOIN months m ON m.year_month = f.year_month
+        WHERE f.year_month = ?
+    """, (year_month,))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def _load_month_input(yaml_path: str, purchase_day: int):
+    """YAML 로드 → (year_month, data, 실제 매수 기준일, 지문)"""
+    data = load_yaml(yaml_path)
+    yaml_purchase_day = data.get('purchase_day')
+    if yaml_purchase_day is not None:
+        purchase_day = int(yaml_purchase_day)
+    return Path(yaml_path).stem, data, purchase_day, compute_import_fingerprint(data, purchase_day)
+
+
+def is_import_unchanged(yaml_path: str, db_path: str = "portfolio.db", purchase_day: int = 26) -> bool:
+    """
+    YAML 입력이 마지막 임포트와 같은지 확인 (DB 변경 없음)
+
+    Args:
+        yaml_path: YAML 파일 경로 (파일명 = YYYY-MM)
+        db_path: SQLite DB 파일 경로
+        purchase_day: 매수 기준일 (YAML의 purchase_day가 있으면 그 값 사용)
+
+    Returns:
+        저장된 지문과 같으면 True (월 데이터가 없으면 False)
+    """
+    year_month, _, _, fingerprint = _load_month_input(yaml_path, purchase_day)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        return get_import_fingerprint(conn.cursor(), year_month) == fingerprint
+    finally:
+        conn.close()
+
+
+def clear_import_fingerprint(db_path: str, year_month: str) -> bool:
+    """
+    저장된 임포트 지문 삭제 (임포트 후 분석 등 다음 단계가 실패했을 때)
+
+    지문이 없으면 같은 입력이라도 다음 실행에서 다시 처리된다.
+
+    Args:
+        db_path: SQLite DB 파일 경로
+        year_month: 'YYYY-MM'
+
+    Returns:
+        삭제한 지문이 있으면 True
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.execute("DELETE FROM import_fingerprints WHERE year_month = ?", (year_month,))
+        conn.commit()
+        return cursor.rowcount > 0
+    finally:
+        conn.close()
+
+
+def resolve_month_prices(
+    accounts: List[Dict],
+    year_month: str,
+    purchase_day: int,
+    db_path: str
+) -> Dict[str, Dict[str, Any]]:
+    """
+    CASH를 제외한 모든 종목의 매수 기준일 주가 조회 (종목당 1번)
+
+    Returns:
+        {ticker: resolve_purchase_price 결과}
+
+    Raises:
+        ValueError: 주가를 찾을 수 없는 종목이 있는 경우 (종목 목록 포함)
+    """
+    tickers = []
+    for account in accounts:
+        for holding in account.get('holdings', []):
+            ticker = holding['ticker_mapping']
+            if holding.get('asset_type', 'STOCK') != 'CASH' and ticker not in tickers:
+                tickers.append(ticker)
+
+    prices = {}
+    failed = []
+    for ticker in tickers:
+        print(f"\n  💹 {ticker} 주가 조회")
+        try:
+            prices[ticker] = resolve_purchase_price(ticker, year_month, purchase_day, db_path)
+        except ValueError as e:
+            print(f"      ❌ {e}")
+            failed.append(ticker)
+
+    if failed:
+        raise ValueError(f"{year_month} 주가를 찾을 수 없는 종목: {', '.join(failed)}")
+
+    return prices
+
+
+def import_month(
+    yaml_path: str,
+    db_path: str = "portfolio.db",
+    purchase_day: int = 26,
+    overwrite: bool = False,
+    force: bool = False
+) -> Optional[Dict[str, Any]]:
+    """
+    월별 YAML을 한 트랜잭션으로 임포트 (계좌 / 보유 종목 / 매수 이력)
+
+    Args:
+        yaml_path: YAML 파일 경로 (파일명 = YYYY-MM)
+        db_path: SQLite DB 파일 경로
+        purchase_day: 매수 기준일 (YAML의 purchase_day가 있으면 그 값 사용)
+        overwrite: True면 기존 월 데이터(분석 결과 포함) 삭제 후 재삽입
+        force: True면 입력 지문이 같아도 다시 임포트
+
+    Returns:
+        {'month_id', 'accounts', 'holdings', 'purchases', 'skipped'} 또는 기존 데이터가 있어 건너뛴 경우 None
+        (입력이 바뀌지 않아 건너뛰면 skipped=True, 개수는 0)
+
+    Raises:
+        ValueError: 주가를 찾을 수 없는 종목이 있는 경우 (DB 변경 없음)
+    """
+    print(f"📂 YAML 파일 읽는 중: {yaml_path}")
+    year_month, data, effective_day, fingerprint = _load_month_input(yaml_path, purchase_day)
+
+    if data.get('purchase_day') is not None:
+        print(f"   📅 YAML 지정 매수일: {effective_day}일 (기본값 {purchase_day}일 대신 사용)")
+        purchase_day = effective_day
+
+    accounts = data.get('accounts', [])
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    try:
+        # 1. 기존 데이터 확인 (쓰기 전)
+        cursor.execute("SELECT id FROM months WHERE year_month = ?", (year_month,))
+        existing = cursor.fetchone()
+        if existing and not overwrite:
+            print(f"❌ {year_month} 데이터가 이미 존재합니다. --overwrite 옵션을 사용하세요.")
+            return None
+
+        if existing and not force and get_import_fingerprint(cursor, year_month) == fingerprint:
+            print(f"⏭️  {year_month} 입력 변경 없음 → 임포트 건너뜀 (--force로 다시 임포트)")
+            return {'month_id': existing[0], 'accounts': 0, 'holdings': 0, 'purchases': 0, 'skipped': True}
+
+        # 2. 주가 조회 (네트워크, 트랜잭션 밖에서 먼저 끝냄)
+        prices = resolve_month_prices(accounts, year_month, purchase_day, db_path)
+        cash_date = f"{year_month}-{purchase_day:02d}"
+
+        # 3. 단일 트랜잭션 쓰기
+        if overwrite:
+            delete_month_data(cursor, year_month)
+
+        cursor.execute("INSERT INTO months (year_month) VALUES (?)", (year_month,))
+        month_id = cursor.lastrowid
+
+        holding_rows = []
+        purchase_rows = []
+        for account in accounts:
+            cursor.execute(
+                """
+                INSERT INTO accounts (month_id, name, type, broker, fee)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (month_id, account['name'], account['type'], account['broker'], account.get('fee', 0.0))
+            )
+            account_id = cursor.lastrowid
+
+            holdings_list = account.get('holdings', [])
+            total_amount = sum(h['amount'] for h in holdings_list)
+
+            for holding in holdings_list:
+                ticker = holding['ticker_mapping']
+                amount = holding['amount']
+                asset_type = holding.get('asset_type', 'STOCK')
+                interest_rate = holding.get('interest_rate')
+                target_ratio = amount / total_amount if total_amount > 0 else 0.0
+
+                holding_rows.append((account_id, holding['name'], ticker, amount,
+                                     target_ratio, asset_type, interest_rate))
+
+                if asset_type == 'CASH':
+                    # 현금은 금액을 그대로 수량으로 (1원당 1원)
+                    purchase = {'purchase_date': cash_date, 'quantity': amount, 'price_krw': 1.0,
+                                'currency': 'KRW', 'exchange_rate': None}
+                else:
+                    purchase = quantity_from_price(amount, prices[ticker])
+
+                purchase_rows.append((
+                    ticker, asset_type, year_month, purchase['purchase_date'],
+                    purchase['quantity'], amount, purchase['price_krw'],
+                    purchase['currency'], purchase['exchange_rate'], account_id, None,
+                    interest_rate, holding.get('interest_type', 'simple')
+                ))
+
+        cursor.executemany(
+            """
+            INSERT INTO holdings
+            (account_id, name, ticker_mapping, amount, target_ratio, asset_type, interest_rate)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            holding_rows
+        )
+        # 매수 이력마다 방금 삽입한 holdings 행 연결 (holdings / 매수 이력은 같은 순서로 1:1)
+        cursor.execute(
+            "SELECT h.id FROM holdings h JOIN accounts a ON h.account_id = a.id WHERE a.month_id = ? ORDER BY h.id",
+            (month_id,)
+        )
+        holding_ids = [row[0] for row in cursor.fetchall()]
+        cursor.executemany(
+            """
+            INSERT INTO purchase_history
+            (ticker, asset_type, year_month, purchase_date,
+             quantity, input_amount, price_at_purchase,
+             currency, exchange_rate, account_id, note,
+             interest_rate, interest_type, holding_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [row + (holding_id,) for row, holding_id in zip(purchase_rows, holding_ids)]
+        )
+        relink_broker_trades(cursor, year_month)
+        drop_covered_purchases(cursor, year_month)
+        cursor.execute(
+            """
+            INSERT OR REPLACE INTO import_fingerprints (year_month, fingerprint, purchase_day, source_file)
+            VALUES (?, ?, ?, ?)
+            """,
+            (year_month, fingerprint, purchase_day, str(yaml_path))
+        )
+
+        conn.commit()
+
+    except Exception:
+        conn.rollback()
+        raise
+
+    finally:
+        conn.close()
+
+    result = {
+        'month_id': month_id,
+        'accounts': len(accounts),
+        'holdings': len(holding_rows),
+        'purchases': len(purchase_rows),
+        'skipped': False
+    }
+    print(f"\n✅ {year_month} 임포트 완료 (계좌 {result['accounts']}개, "
+          f"보유 종목 {result['holdings']}개, 매수 기록 {result['purchases']}건)")
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="월별 YAML 단일 트랜잭션 임포트 (계좌 + 보유 종목 + 매수 이력)")
+    parser.add_argument("yaml_file", help="YAML 파일 경로 (예: monthly/2025-11.yaml)")
+    parser.add_argument("--db", default="portfolio.db", help="SQLite DB 파일 경로 (기본값: portfolio.db)")
+    parser.add_argument("--purchase-day", type=int, default=26, help="매수 기준일 (기본값: 26일)")
+    parser.add_argument("--overwrite", action="store_true", help="기존 데이터 덮어쓰기")
+    parser.add_argument("--force", action="store_true", help="입력이 바뀌지 않았어도 다시 임포트")
+
+    args = parser.parse_args()
+
+    if not Path(args.yaml_file).exists():
+        print(f"❌ 파일을 찾을 수 없습니다: {args.yaml_file}")
+        exit(1)
+
+    import_month(args.yaml_file, args.db, args.purchase_day, args.overwrite, args.force)
@@ -2,23 +2,10 @@
 월별 YAML 데이터를 SQLite DB에 임포트하는 스크립트
 """
 import sqlite3
-import yaml
 from pathlib import Path
 from typing import Dict, List, Any
 
-
-def load_yaml(file_path: str) -> Dict[str, Any]:
-    """
-    YAML 파일을 읽어서 딕셔너리로 반환합니다.
-
-    Args:
-        file_path: YAML 파일 경로
-
-    Returns:
-        파싱된 데이터 딕셔너리
-    """
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return yaml.safe_load(f)
+from data.yaml_loader import load_yaml
 
 
 def extract_year_month_from_filename(file_path: str) -> str:
@@ -63,6 +50,8 @@ def import_monthly_data(yaml_path: str, db_path: str = "portfolio.db", overwrite
             if overwrite:
                 print(f"⚠️  {year_month} 데이터가 이미 존재합니다. 삭제 후 재삽입합니다.")
                 cursor.execute("DELETE FROM months WHERE year_month = ?", (year_month,))
+                # 단일 트랜잭션 임포트(import_month)의 입력 지문 무효화
+                cursor.execute("DELETE FROM import_fingerprints WHERE year_month = ?", (year_month,))
             else:
                 print(f"❌ {year_month} 데이터가 이미 존재합니다. --overwrite 옵션을 사용하세요.")
                 return
@@ -3,17 +3,14 @@
 사용자가 입력한 금액을 기준으로 수량을 자동 계산하여 저장
 """
 import sqlite3
-import yaml
 import yfinance as yf
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, Tuple
 
-
-def load_yaml(file_path: str) -> Dict[str, Any]:
-    """YAML 파일 로드"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return yaml.safe_load(f)
+from data.import_broker_trades import drop_covered_purchases
+from data.yaml_loader import load_yaml
+from data.price_lookup import nearest_price
 
 
 def get_historical_price(ticker: str, target_date: str, max_lookback_days: int = 7) -> Optional[Tuple[str, float, str]]:
@@ -70,26 +67,16 @@ def get_price_from_db(ticker: str, target_date: str, db_path: str) -> Optional[f
     """
     try:
         conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-
-        # 목표 날짜와 가장 가까운 매수 기록 찾기 (±7일 이내)
-        cursor.execute("""
-            SELECT price_at_purchase, purchase_date
-            FROM purchase_history
-            WHERE ticker = ?
-              AND purchase_date BETWEEN date(?, '-7 days') AND date(?, '+7 days')
-              AND price_at_purchase IS NOT NULL
-            ORDER BY ABS(julianday(purchase_date) - julianday(?))
-            LIMIT 1
-        """, (ticker, target_date, target_date, target_date))
-
-        result = cursor.fetchone()
-        conn.close()
+        try:
+            # 목표 날짜와 가장 가까운 매수 기록 찾기 (±7일 이내, 인덱스 범위 탐색)
+            result = nearest_price(conn.cursor(), ticker, target_date, max_days=7)
+        finally:
+            conn.close()
 
         if result:
-            price, found_date = result
+            found_date, price = result
             print(f"      💾 DB에서 찾음: {found_date} 주가 사용 ({price:,.0f}원)")
-            return float(price)
+            return price
 
         return None
 
@@ -123,19 +110,17 @@ def get_exchange_rate(date: str) -> float:
         return 1450.0  # 기본값
 
 
-def calculate_quantity(
+def resolve_purchase_price(
     ticker: str,
-    input_amount: int,
     year_month: str,
     purchase_day: int,
     db_path: str
 ) -> Dict[str, Any]:
     """
-    투자 금액을 기준으로 매수 수량 계산
+    매수 기준일의 원화 주가 조회 (yfinance 우선, 실패 시 DB 매수 기록)
 
     Args:
         ticker: 종목 코드
-        input_amount: 투자 금액 (원화)
         year_month: 기준 년월 (YYYY-MM)
         purchase_day: 매수 기준일 (26일 등)
         db_path: DB 경로
@@ -143,12 +128,13 @@ def calculate_quantity(
     Returns:
         {
             'purchase_date': '2024-11-26',
-            'quantity': 1.5,
             'price_krw': 200000,
-            'leftover': 0,
             'currency': 'USD',
             'exchange_rate': 1450.0
         }
+
+    Raises:
+        ValueError: 주가를 찾을 수 없는 경우
     """
     # 1. 매수 기준일 생성
     purchase_date = f"{year_month}-{purchase_day:02d}"
@@ -167,40 +153,84 @@ def calculate_quantity(
                            f"수동으로 price_at_purchase를 입력하거나 yfinance 데이터를 확인하세요.")
 
         # DB에서 가져온 가격 사용 (이미 KRW)
-        actual_date = purchase_date
-        price_krw = db_price
-        currency = 'KRW'
-        exchange_rate = None
+        return {
+            'purchase_date': purchase_date,
+            'price_krw': db_price,
+            'currency': 'KRW',
+            'exchange_rate': None
+        }
 
+    actual_date, close_price, currency = price_data
+    print(f"      ✅ {actual_date} 종가: {close_price:,.2f} {currency}")
+
+    # 3. 원화 환산
+    if currency == 'KRW':
+        price_krw = close_price
+        exchange_rate = None
     else:
-        actual_date, close_price, currency = price_data
-        print(f"      ✅ {actual_date} 종가: {close_price:,.2f} {currency}")
-
-        # 3. 원화 환산
-        if currency == 'KRW':
-            price_krw = close_price
-            exchange_rate = None
-        else:
-            exchange_rate = get_exchange_rate(actual_date)
-            price_krw = close_price * exchange_rate
-            print(f"      💱 환율: {exchange_rate:,.2f} KRW/USD → {price_krw:,.0f}원")
-
-    # 4. 수량 계산
+        exchange_rate = get_exchange_rate(actual_date)
+        price_krw = close_price * exchange_rate
+        print(f"      💱 환율: {exchange_rate:,.2f} KRW/USD → {price_krw:,.0f}원")
+
+    return {
+        'purchase_date': actual_date,
+        'price_krw': price_krw,
+        'currency': currency,
+        'exchange_rate': exchange_rate
+    }
+
+
+def quantity_from_price(input_amount: int, price: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    resolve_purchase_price 결과 + 투자 금액 → calculate_quantity 형식 결과
+    """
+    price_krw = price['price_krw']
     quantity = input_amount / price_krw
     leftover = input_amount - (int(quantity) * price_krw)
 
     print(f"      🎯 매수 수량: {quantity:.4f}주 (잔돈: {int(leftover):,}원)")
 
     return {
-        'purchase_date': actual_date,
+        'purchase_date': price['purchase_date'],
         'quantity': quantity,
         'price_krw': price_krw,
         'leftover': int(leftover),
-        'currency': currency,
-        'exchange_rate': exchange_rate
+        'currency': price['currency'],
+        'exchange_rate': price['exchange_rate']
     }
 
 
+def calculate_quantity(
+    ticker: str,
+    input_amount: int,
+    year_month: str,
+    purchase_day: int,
+    db_path: str
+) -> Dict[str, Any]:
+    """
+    투자 금액을 기준으로 매수 수량 계산
+
+    Args:
+        ticker: 종목 코드
+        input_amount: 투자 금액 (원화)
+        year_month: 기준 년월 (YYYY-MM)
+        purchase_day: 매수 기준일 (26일 등)
+        db_path: DB 경로
+
+    Returns:
+        {
+            'purchase_date': '2024-11-26',
+            'quantity': 1.5,
+            'price_krw': 200000,
+            'leftover': 0,
+            'currency': 'USD',
+            'exchange_rate': 1450.0
+        }
+    """
+    price = resolve_purchase_price(ticker, year_month, purchase_day, db_path)
+    return quantity_from_price(input_amount, price)
+
+
 def save_purchase(
     ticker: str,
     asset_type: str,
@@ -212,8 +242,9 @@ def save_purchase(
     db_path: str,
     interest_rate: Optional[float] = None,
     interest_type: Optional[str] = None,
+    holding_name: Optional[str] = None,
 ):
-    """purchase_history 테이블에 저장"""
+    """purchase_history 테이블에 저장 (holding_name이 있으면 같은 계좌의 holdings 행 연결)"""
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
 
@@ -230,14 +261,26 @@ def save_purchase(
             if result:
                 account_id = result[0]
 
+        # holding_id 찾기 (같은 계좌의 이름 + 티커 일치 holdings)
+        holding_id = None
+        if account_id is not None and holding_name:
+            cursor.execute("""
+                SELECT id FROM holdings
+                WHERE account_id = ? AND name = ? AND ticker_mapping = ? AND asset_type = ?
+                ORDER BY id LIMIT 1
+            """, (account_id, holding_name, ticker, asset_type))
+            result = cursor.fetchone()
+            if result:
+                holding_id = result[0]
+
         # purchase_history 삽입
         cursor.execute("""
             INSERT INTO purchase_history
             (ticker, asset_type, year_month, purchase_date,
              quantity, input_amount, price_at_purchase,
              currency, exchange_rate, account_id, note,
-             interest_rate, interest_type)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+             interest_rate, interest_type, holding_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """, (
             ticker,
             asset_type,
@@ -252,6 +295,7 @@ def save_purchase(
             note,
             interest_rate,
             interest_type,
+            holding_id,
         ))
 
         conn.commit()
@@ -271,7 +315,11 @@ def delete_purchase_history(year_month: str, db_path: str):
     cursor = conn.cursor()
     try:
         print(f"   🗑️  {year_month}의 기존 구매 기록 삭제 중...")
-        cursor.execute("DELETE FROM purchase_history WHERE year_month = ?", (year_month,))
+        # 증권사 거래내역(import_broker_trades)은 유지
+        cursor.execute(
+            "DELETE FROM purchase_history WHERE year_month = ? AND (note IS NULL OR note NOT LIKE 'broker:%')",
+            (year_month,)
+        )
         conn.commit()
         print(f"   ✅ {cursor.rowcount}개의 기존 구매 기록 삭제 완료.")
     except sqlite3.Error as e:
@@ -391,6 +439,7 @@ def import_monthly_purchases(yaml_path: str, db_path: str = "portfolio.db", purc
                 db_path=db_path,
                 interest_rate=purchase.get('interest_rate'),
                 interest_type=purchase.get('interest_type'),
+                holding_name=name,
             )
 
             success_count += 1
@@ -399,10 +448,20 @@ def import_monthly_purchases(yaml_path: str, db_path: str = "portfolio.db", purc
             print(f"      ❌ 실패: {e}")
             fail_count += 1
 
+    # 증권사 거래내역이 있는 (계좌, 티커)는 거래내역 우선
+    conn = sqlite3.connect(db_path)
+    try:
+        replaced = drop_covered_purchases(conn.cursor(), year_month)
+        conn.commit()
+    finally:
+        conn.close()
+
     print("\n" + "=" * 80)
     print(f"✅ 임포트 완료!")
     print(f"   - 성공: {success_count}건")
     print(f"   - 실패: {fail_count}건")
+    if replaced:
+        print(f"   - 증권사 거래내역으로 대체: {replaced}건")
 
 
 if __name__ == "__main__":
@@ -123,8 +123,10 @@ def init_database(db_path: str = "portfolio.db"):
                 interest_rate REAL,
                 interest_type TEXT DEFAULT 'simple',
                 note TEXT,
+                holding_id INTEGER,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (account_id) REFERENCES accounts(id) ON DELETE CASCADE
+                FOREIGN KEY (account_id) REFERENCES accounts(id) ON DELETE CASCADE,
+                FOREIGN KEY (holding_id) REFERENCES holdings(id) ON DELETE SET NULL
             )
         """)
 
@@ -144,6 +146,90 @@ def init_database(db_path: str = "portfolio.db"):
             GROUP BY ticker, asset_type
         """)
 
+        # 9. constituent_symbols 테이블 생성 (구성 종목 심볼 사전)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS constituent_symbols (
+                id INTEGER PRIMARY KEY,
+                symbol TEXT NOT NULL UNIQUE,
+                name TEXT
+            )
+        """)
+
+        # 10. etf_constituents 테이블 생성 (운용사 보유종목 파일 기반 전체 구성 종목)
+        #     ETF × 심볼ID × 비중만 저장 (심볼/종목명은 사전 테이블로 분리)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS etf_constituents (
+                etf_ticker TEXT NOT NULL,
+                symbol_id INTEGER NOT NULL,
+                weight REAL NOT NULL,
+                PRIMARY KEY (etf_ticker, symbol_id),
+                FOREIGN KEY (symbol_id) REFERENCES constituent_symbols(id)
+            ) WITHOUT ROWID
+        """)
+
+        # 11. etf_constituent_files 테이블 생성 (ETF별 임포트 파일 정보)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS etf_constituent_files (
+                etf_ticker TEXT PRIMARY KEY,
+                source_file TEXT NOT NULL,
+                constituents_count INTEGER NOT NULL,
+                total_weight REAL NOT NULL,
+                loaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+        # 12. stock_exposures 테이블 생성 (종목 → 월 × 계좌 × 출처 ETF 노출 역색인)
+        #     분석 시 생성, 종목 하나의 전체 기간 노출을 인덱스 범위 스캔 1번으로 조회
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS stock_exposures (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                stock_symbol TEXT NOT NULL,
+                month_id INTEGER NOT NULL,
+                account_id INTEGER,
+                source_ticker TEXT NOT NULL,
+                stock_name TEXT,
+                asset_type TEXT DEFAULT 'STOCK',
+                my_amount INTEGER NOT NULL,
+                price_krw REAL,
+                implied_shares REAL,
+                is_direct INTEGER NOT NULL DEFAULT 0,
+                FOREIGN KEY (month_id) REFERENCES months(id) ON DELETE CASCADE,
+                FOREIGN KEY (account_id) REFERENCES accounts(id) ON DELETE CASCADE
+            )
+        """)
+
+        # 13. import_fingerprints 테이블 생성 (월별 YAML 입력 지문 → 변경 없으면 임포트 생략)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS import_fingerprints (
+                year_month TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                purchase_day INTEGER NOT NULL,
+                source_file TEXT,
+                imported_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+        # 14. daily_prices 테이블 생성 (일별 종가 로컬 저장소, 티커 × 날짜, 환율은 'KRW=X')
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS daily_prices (
+                ticker TEXT NOT NULL,
+                price_date TEXT NOT NULL,
+                close REAL NOT NULL,
+                currency TEXT,
+                PRIMARY KEY (ticker, price_date)
+            ) WITHOUT ROWID
+        """)
+
+        # 15. daily_price_fetches 테이블 생성 (yfinance로 조회한 종가 구간 → 구간 안의 휴장일은 다시 조회하지 않음)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS daily_price_fetches (
+                ticker TEXT NOT NULL,
+                start_date TEXT NOT NULL,
+                end_date TEXT NOT NULL,
+                PRIMARY KEY (ticker, start_date, end_date)
+            ) WITHOUT ROWID
+        """)
+
         # 인덱스 생성 (조회 성능 향상)
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_accounts_month
@@ -185,6 +271,22 @@ def init_database(db_path: str = "portfolio.db"):
             ON analyzed_holdings(asset_type)
         """)
 
+        # 월 × 계좌(NULL=전체) 조회용 복합 인덱스 (ETF당 구성 종목 수천 개 대비)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_analyzed_holdings_month_account
+            ON analyzed_holdings(month_id, account_id, asset_type)
+        """)
+
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_analyzed_holdings_month_stock
+            ON analyzed_holdings(month_id, stock_symbol)
+        """)
+
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_analyzed_sectors_month_account
+            ON analyzed_sectors(month_id, account_id, asset_type)
+        """)
+
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_analyzed_sectors_month
             ON analyzed_sectors(month_id)
@@ -205,6 +307,22 @@ def init_database(db_path: str = "portfolio.db"):
             ON analysis_metadata(month_id)
         """)
 
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_stock_exposures_symbol
+            ON stock_exposures(stock_symbol, month_id, account_id, source_ticker, my_amount, implied_shares)
+        """)
+
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_stock_exposures_month
+            ON stock_exposures(month_id)
+        """)
+
+        # 최근접 날짜 주가 조회 (직전/직후 범위 탐색 2번, data/price_lookup.py)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_purchase_history_ticker_date
+            ON purchase_history(ticker, purchase_date, price_at_purchase)
+        """)
+
         # 마이그레이션: 기존 purchase_history에 interest_rate, interest_type 컬럼 추가
         try:
             cursor.execute("ALTER TABLE purchase_history ADD COLUMN interest_rate REAL")
@@ -215,6 +333,32 @@ def init_database(db_path: str = "portfolio.db"):
         except sqlite3.OperationalError:
             pass  # 이미 존재
 
+        # 마이그레이션: purchase_history에 holding_id 추가 (임포트 시 매수한 holdings 행 기록)
+        try:
+            cursor.execute(
+                "ALTER TABLE purchase_history ADD COLUMN holding_id INTEGER REFERENCES holdings(id) ON DELETE SET NULL"
+            )
+        except sqlite3.OperationalError:
+            pass  # 이미 존재
+
+        # 상품별 매수 이력 조회 (CASH 상품 평가액, streamlit_app/data_loader.py)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_purchase_history_holding
+            ON purchase_history(holding_id)
+        """)
+
+        # 마이그레이션: analysis_metadata에 체크포인트 컬럼 추가 (실행 ID, 계좌, 보유 종목 단위 완료 기록)
+        for column_def in ["run_id TEXT", "account_id INTEGER", "holding_ticker TEXT", "holding_name TEXT"]:
+            try:
+                cursor.execute(f"ALTER TABLE analysis_metadata ADD COLUMN {column_def}")
+            except sqlite3.OperationalError:
+                pass  # 이미 존재
+
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_analysis_metadata_checkpoint
+            ON analysis_metadata(month_id, run_id)
+        """)
+
         # 백필: 기존 CASH purchase_history에 holdings의 interest_rate 매칭
         # ticker_mapping 또는 name으로 매칭 시도
         cursor.execute("""
@@ -231,6 +375,25 @@ def init_database(db_path: str = "portfolio.db"):
             WHERE asset_type = 'CASH' AND interest_rate IS NULL
         """)
 
+        # 백필: holding_id 없는 기존 매수 이력에 같은 계좌의 holdings 연결
+        # ticker_mapping 일치 우선, 없으면 name으로 매칭 (증권사 거래내역은 제외)
+        cursor.execute("""
+            UPDATE purchase_history
+            SET holding_id = COALESCE(
+                (SELECT MIN(h.id) FROM holdings h
+                 WHERE h.account_id = purchase_history.account_id
+                   AND h.ticker_mapping = purchase_history.ticker
+                   AND h.asset_type = purchase_history.asset_type),
+                (SELECT MIN(h.id) FROM holdings h
+                 WHERE h.account_id = purchase_history.account_id
+                   AND h.name = purchase_history.ticker
+                   AND h.asset_type = purchase_history.asset_type)
+            )
+            WHERE holding_id IS NULL
+              AND account_id IS NOT NULL
+              AND (note IS NULL OR note NOT LIKE 'broker:%')
+        """)
+
         # 변경사항 저장
         conn.commit()
         print(f"✅ 데이터베이스 초기화 완료: {db_path}")
@@ -242,6 +405,11 @@ def init_database(db_path: str = "portfolio.db"):
         print("   - analysis_metadata 테이블 생성")
         print("   - purchase_history 테이블 생성")
         print("   - current_holdings_summary 뷰 생성")
+        print("   - constituent_symbols / etf_constituents / etf_constituent_files 테이블 생성")
+        print("   - stock_exposures 테이블 생성 (종목 노출 역색인)")
+        print("   - import_fingerprints 테이블 생성 (임포트 입력 지문)")
+        print("   - daily_prices 테이블 생성 (일별 종가 로컬 저장소)")
+        print("   - daily_price_fetches 테이블 생성 (종가 조회 구간)")
         print("   - 인덱스 생성 완료")
 
     except sqlite3.Error as e:
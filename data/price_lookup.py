@@ -0,0 +1,142 @@
+"""
+(티커, 날짜) 인덱스 기반 최근접 날짜 주가 조회
+- 직전 / 직후 날짜를 인덱스 범위 탐색 2번으로 찾음 (전체 스캔 + 정렬 없음)
+- 여러 티커 × 날짜 일괄 조회는 연결 1개로 요청당 탐색 2번 → 이력이 늘어도 O(log n)
+"""
+import sqlite3
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+
+# 가격 출처: 이름 → (테이블, 날짜 컬럼, 가격 컬럼), 모두 (티커, 날짜) 선두 인덱스 / PK 보유
+PRICE_SOURCES = {
+    'purchase_history': ('purchase_history', 'purchase_date', 'price_at_purchase'),  # 원화 매수 단가
+    'daily_prices': ('daily_prices', 'price_date', 'close'),  # 통화별 종가
+}
+
+DEFAULT_MAX_DAYS = 7
+
+
+def _days_between(a: str, b: str) -> int:
+    return abs((datetime.strptime(a, '%Y-%m-%d') - datetime.strptime(b, '%Y-%m-%d')).days)
+
+
+def nearest_prior_price(
+    cursor: sqlite3.Cursor,
+    ticker: str,
+    target_date: str,
+    max_days: int = DEFAULT_MAX_DAYS,
+    source: str = 'purchase_history'
+) -> Optional[Tuple[str, float]]:
+    """
+    target_date 이하 가장 가까운 날짜의 가격 (max_days 이내)
+
+    Returns:
+        (날짜, 가격) 또는 None
+    """
+    table, date_column, price_column = PRICE_SOURCES[source]
+    cursor.execute(f"""
+        SELECT {date_column}, {price_column}
+        FROM {table}
+        WHERE ticker = ?
+          AND {date_column} <= ?
+          AND {date_column} >= date(?, '-{int(max_days)} days')
+          AND {price_column} IS NOT NULL
+        ORDER BY {date_column} DESC
+        LIMIT 1
+    """, (ticker, target_date, target_date))
+    row = cursor.fetchone()
+    return (row[0], float(row[1])) if row else None
+
+
+def nearest_next_price(
+    cursor: sqlite3.Cursor,
+    ticker: str,
+    target_date: str,
+    max_days: int = DEFAULT_MAX_DAYS,
+    source: str = 'purchase_history'
+) -> Optional[Tuple[str, float]]:
+    """
+    target_date 초과 가장 가까운 날짜의 가격 (max_days 이내)
+
+    Returns:
+        (날짜, 가격) 또는 None
+    """
+    table, date_column, price_column = PRICE_SOURCES[source]
+    cursor.execute(f"""
+        SELECT {date_column}, {price_column}
+        FROM {table}
+        WHERE ticker = ?
+          AND {date_column} > ?
+          AND {date_column} <= date(?, '+{int(max_days)} days')
+          AND {price_column} IS NOT NULL
+        ORDER BY {date_column} ASC
+        LIMIT 1
+    """, (ticker, target_date, target_date))
+    row = cursor.fetchone()
+    return (row[0], float(row[1])) if row else None
+
+
+def nearest_price(
+    cursor: sqlite3.Cursor,
+    ticker: str,
+    target_date: str,
+    max_days: int = DEFAULT_MAX_DAYS,
+    source: str = 'purchase_history'
+) -> Optional[Tuple[str, float]]:
+    """
+    target_date와 가장 가까운 날짜의 가격 (±max_days, 같은 거리면 직전 날짜 우선)
+
+    Args:
+        cursor: DB 커서
+        ticker: 종목 코드
+        target_date: 목표 날짜 (YYYY-MM-DD)
+        max_days: 허용 거리 (일)
+        source: PRICE_SOURCES 키
+
+    Returns:
+        (날짜, 가격) 또는 None
+    """
+    prior = nearest_prior_price(cursor, ticker, target_date, max_days, source)
+    if prior and prior[0] == target_date:
+        return prior
+
+    following = nearest_next_price(cursor, ticker, target_date, max_days, source)
+    if prior is None or following is None:
+        return prior or following
+    if _days_between(following[0], target_date) < _days_between(prior[0], target_date):
+        return following
+    return prior
+
+
+def nearest_prices(
+    db_path: str,
+    requests: Iterable[Tuple[str, str]],
+    max_days: int = DEFAULT_MAX_DAYS,
+    source: str = 'purchase_history'
+) -> Dict[Tuple[str, str], Tuple[str, float]]:
+    """
+    여러 (티커, 날짜)의 최근접 가격 일괄 조회 (연결 1개, 요청당 인덱스 탐색 최대 2번)
+
+    Args:
+        db_path: DB 경로
+        requests: [(ticker, 'YYYY-MM-DD'), ...] (중복은 1번만 조회)
+        max_days: 허용 거리 (일)
+        source: PRICE_SOURCES 키
+
+    Returns:
+        {(ticker, 요청 날짜): (찾은 날짜, 가격)} (찾지 못한 요청은 제외)
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    result = {}
+
+    try:
+        for ticker, target_date in dict.fromkeys(requests):
+            found = nearest_price(cursor, ticker, target_date, max_days, source)
+            if found:
+                result[(ticker, target_date)] = found
+    finally:
+        conn.close()
+
+    return result
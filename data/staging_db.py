@@ -0,0 +1,250 @@
+"""
+월별 스테이징 DB 생성 및 본 DB 병합
+여러 월을 별도 프로세스에서 임포트/분석한 뒤 본 DB에 한 번씩 병합 (본 DB 쓰기는 병합 1곳에서만)
+"""
+import sqlite3
+from typing import Dict, List, Optional
+
+from data.init_db import init_database
+from data.import_broker_trades import BROKER_NOTE_PREFIX, drop_covered_purchases
+from data.import_month import MONTH_TABLES, delete_month_data, relink_broker_trades
+
+
+# 스테이징 DB로 복사할 공유 테이블
+# - ETF 구성 종목: 분석 시 로컬 구성 종목 사용
+# - purchase_history / daily_prices: 임포트 시 최근접 매수가·종가 조회 (본 DB와 같은 가격 사용)
+# - daily_price_fetches: 이미 조회한 종가 구간 (휴장일 재조회 방지)
+SHARED_TABLES = ['constituent_symbols', 'etf_constituents', 'etf_constituent_files',
+                 'purchase_history', 'daily_prices', 'daily_price_fetches']
+
+
+def _common_columns(cursor: sqlite3.Cursor, table: str) -> List[str]:
+    """스테이징 / 본 DB 양쪽에 있는 컬럼 목록 (id 제외, 마이그레이션 전 본 DB 대비)"""
+    cursor.execute(f"PRAGMA main.table_info({table})")
+    main_columns = {row[1] for row in cursor.fetchall()}
+    cursor.execute(f"PRAGMA staging.table_info({table})")
+    return [row[1] for row in cursor.fetchall() if row[1] != 'id' and row[1] in main_columns]
+
+
+def create_staging_db(
+    db_path: str,
+    staging_db: str,
+    year_month: Optional[str] = None,
+    include_holdings: bool = False
+):
+    """
+    스테이징 DB 생성: 빈 스키마 + 본 DB의 공유 테이블(ETF 구성 종목, 매수 이력, 종가) 복사
+
+    year_month가 주어지면 그 달의 months / accounts 행도 ID 그대로 복사한다.
+    → 스테이징 임포트가 본 DB와 같이 증권사 거래내역(note 'broker:')을 새 계좌에 다시 연결
+    (병합 시 증권사 거래내역은 본 DB 쪽을 유지하므로 다시 복사하지 않음)
+
+    include_holdings이면 그 달의 holdings와 임포트 지문도 ID 그대로 복사한다.
+    → 입력이 바뀌지 않은 월은 임포트 없이 스테이징에서 분석만 하고 같은 방식으로 병합
+
+    같은 실행에서 다른 워커가 임포트하는 월의 매수 이력은 보이지 않으므로,
+    처음 임포트하는 여러 월의 매수가는 순차 실행과 다를 수 있다 (본 DB에 이미 있는 이력은 동일).
+
+    Args:
+        db_path: 본 DB 경로
+        staging_db: 생성할 스테이징 DB 경로 (이미 있으면 덮어씀)
+        year_month: 스테이징에서 임포트할 월 'YYYY-MM' (None이면 공유 테이블만)
+        include_holdings: True면 year_month의 holdings / 임포트 지문까지 복사 (임포트 생략용)
+    """
+    init_database(staging_db)
+
+    conn = sqlite3.connect(staging_db)
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("ATTACH DATABASE ? AS main_db", (db_path,))
+        for table in SHARED_TABLES:
+            cursor.execute(f"DELETE FROM {table}")
+            cursor.execute(f"PRAGMA main_db.table_info({table})")
+            main_columns = {row[1] for row in cursor.fetchall()}
+            cursor.execute(f"PRAGMA main.table_info({table})")
+            columns = ', '.join(row[1] for row in cursor.fetchall() if row[1] in main_columns)
+            cursor.execute(f"INSERT INTO {table} ({columns}) SELECT {columns} FROM main_db.{table}")
+        if year_month is not None:
+            cursor.execute("DELETE FROM accounts")
+            cursor.execute("DELETE FROM months")
+            cursor.execute(
+                "INSERT INTO months (id, year_month, exchange_rate) "
+                "SELECT id, year_month, exchange_rate FROM main_db.months WHERE year_month = ?",
+                (year_month,)
+            )
+            cursor.execute("""
+                INSERT INTO accounts (id, month_id, name, type, broker, fee)
+                SELECT a.id, a.month_id, a.name, a.type, a.broker, a.fee
+                FROM main_db.accounts a
+                JOIN main_db.months m ON a.month_id = m.id
+                WHERE m.year_month = ?
+            """, (year_month,))
+        if year_month is not None and include_holdings:
+            cursor.execute("DELETE FROM holdings")
+            cursor.execute("PRAGMA main_db.table_info(holdings)")
+            columns = ', '.join(row[1] for row in cursor.fetchall())
+            cursor.execute(f"""
+                INSERT INTO holdings ({columns})
+                SELECT {', '.join('h.' + c for c in columns.split(', '))}
+                FROM main_db.holdings h
+                JOIN main_db.accounts a ON h.account_id = a.id
+                JOIN main_db.months m ON a.month_id = m.id
+                WHERE m.year_month = ?
+            """, (year_month,))
+            cursor.execute("""
+                INSERT OR REPLACE INTO import_fingerprints
+                (year_month, fingerprint, purchase_day, source_file, imported_at)
+                SELECT year_month, fingerprint, purchase_day, source_file, imported_at
+                FROM main_db.import_fingerprints WHERE year_month = ?
+            """, (year_month,))
+        conn.commit()
+        cursor.execute("DETACH DATABASE main_db")
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def merge_staging_month(staging_db: str, db_path: str, year_month: str) -> Dict[str, int]:
+    """
+    스테이징 DB의 한 달 데이터를 본 DB에 병합 (기존 월 데이터 교체, 한 트랜잭션)
+
+    month_id / account_id는 본 DB에서 새로 발급하고 모든 참조를 바꿔 복사한다.
+
+    Args:
+        staging_db: 스테이징 DB 경로
+        db_path: 본 DB 경로
+        year_month: 병합할 월 'YYYY-MM'
+
+    Returns:
+        {테이블명: 병합된 행 수}
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    counts = {}
+
+    try:
+        cursor.execute("ATTACH DATABASE ? AS staging", (staging_db,))
+
+        cursor.execute("SELECT id, exchange_rate FROM staging.months WHERE year_month = ?", (year_month,))
+        row = cursor.fetchone()
+        if row is None:
+            raise ValueError(f"스테이징 DB에 {year_month} 데이터가 없습니다: {staging_db}")
+        staging_month_id, exchange_rate = row
+
+        delete_month_data(cursor, year_month)
+
+        cursor.execute(
+            "INSERT INTO months (year_month, exchange_rate) VALUES (?, ?)",
+            (year_month, exchange_rate)
+        )
+        month_id = cursor.lastrowid
+
+        # 계좌 ID 매핑 (스테이징 ID → 본 DB ID)
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS account_map (old_id INTEGER PRIMARY KEY, new_id INTEGER)")
+        cursor.execute("DELETE FROM account_map")
+        cursor.execute(
+            "SELECT id, name, type, broker, fee FROM staging.accounts WHERE month_id = ? ORDER BY id",
+            (staging_month_id,)
+        )
+        for old_id, name, account_type, broker, fee in cursor.fetchall():
+            cursor.execute(
+                "INSERT INTO accounts (month_id, name, type, broker, fee) VALUES (?, ?, ?, ?, ?)",
+                (month_id, name, account_type, broker, fee)
+            )
+            cursor.execute("INSERT INTO account_map VALUES (?, ?)", (old_id, cursor.lastrowid))
+        counts['accounts'] = cursor.execute("SELECT COUNT(*) FROM account_map").fetchone()[0]
+
+        # holdings: account_id만 교체
+        columns = _common_columns(cursor, 'holdings')
+        select = ', '.join('am.new_id' if c == 'account_id' else f's.{c}' for c in columns)
+        cursor.execute(f"""
+            INSERT INTO holdings ({', '.join(columns)})
+            SELECT {select}
+            FROM staging.holdings s
+            JOIN account_map am ON s.account_id = am.old_id
+            ORDER BY s.id
+        """)
+        counts['holdings'] = cursor.rowcount
+
+        # holdings ID 매핑 (같은 순서로 복사했으므로 ID 순서대로 대응)
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS holding_map (old_id INTEGER PRIMARY KEY, new_id INTEGER)")
+        cursor.execute("DELETE FROM holding_map")
+        cursor.execute(
+            "SELECT s.id FROM staging.holdings s JOIN account_map am ON s.account_id = am.old_id ORDER BY s.id"
+        )
+        old_ids = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            "SELECT h.id FROM holdings h JOIN accounts a ON h.account_id = a.id WHERE a.month_id = ? ORDER BY h.id",
+            (month_id,)
+        )
+        new_ids = [row[0] for row in cursor.fetchall()]
+        cursor.executemany("INSERT INTO holding_map VALUES (?, ?)", zip(old_ids, new_ids))
+
+        # purchase_history: account_id + holding_id 교체
+        # (증권사 거래내역은 본 DB 행을 유지 → relink_broker_trades로 새 계좌에 연결)
+        columns = _common_columns(cursor, 'purchase_history')
+        select = ', '.join(
+            'am.new_id' if c == 'account_id' else 'hm.new_id' if c == 'holding_id' else f's.{c}'
+            for c in columns
+        )
+        cursor.execute(f"""
+            INSERT INTO purchase_history ({', '.join(columns)})
+            SELECT {select}
+            FROM staging.purchase_history s
+            LEFT JOIN account_map am ON s.account_id = am.old_id
+            LEFT JOIN holding_map hm ON s.holding_id = hm.old_id
+            WHERE s.year_month = ? AND (s.note IS NULL OR s.note NOT LIKE ?)
+            ORDER BY s.id
+        """, (year_month, BROKER_NOTE_PREFIX + '%'))
+        counts['purchase_history'] = cursor.rowcount
+        relink_broker_trades(cursor, year_month)
+        drop_covered_purchases(cursor, year_month)
+
+        # 임포트 입력 지문 (다음 실행에서 변경 없는 월 건너뛰기)
+        cursor.execute("""
+            INSERT OR REPLACE INTO import_fingerprints (year_month, fingerprint, purchase_day, source_file, imported_at)
+            SELECT year_month, fingerprint, purchase_day, source_file, imported_at
+            FROM staging.import_fingerprints WHERE year_month = ?
+        """, (year_month,))
+
+        # 스테이징에서 새로 조회한 일별 종가 (노출 색인 기준일 종가 등) → 다음 실행은 로컬 조회
+        cursor.execute("""
+            INSERT OR IGNORE INTO daily_prices (ticker, price_date, close, currency)
+            SELECT ticker, price_date, close, currency FROM staging.daily_prices
+        """)
+        cursor.execute("""
+            INSERT OR IGNORE INTO daily_price_fetches (ticker, start_date, end_date)
+            SELECT ticker, start_date, end_date FROM staging.daily_price_fetches
+        """)
+
+        # 분석 결과: month_id + account_id 교체 (account_id NULL = 전체 분석 유지)
+        for table in MONTH_TABLES:
+            columns = _common_columns(cursor, table)
+            select = ', '.join(
+                '?' if c == 'month_id' else 'am.new_id' if c == 'account_id' else f's.{c}'
+                for c in columns
+            )
+            cursor.execute(f"""
+                INSERT INTO {table} ({', '.join(columns)})
+                SELECT {select}
+                FROM staging.{table} s
+                LEFT JOIN account_map am ON s.account_id = am.old_id
+                WHERE s.month_id = ?
+                ORDER BY s.id
+            """, (month_id, staging_month_id))
+            counts[table] = cursor.rowcount
+
+        conn.commit()
+        cursor.execute("DETACH DATABASE staging")
+
+    except (sqlite3.Error, ValueError):
+        conn.rollback()
+        raise
+
+    finally:
+        conn.close()
+
+    return counts
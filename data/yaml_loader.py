@@ -0,0 +1,117 @@
+"""
+월별 YAML 로딩 레이어
+- libyaml C 로더(CSafeLoader)가 있으면 사용
+- 파싱 결과를 (경로, mtime, 크기, 내용 해시)로 프로세스 내 캐시
+- 내용 해시 기준 디스크 캐시 → 임포트 단계 / 대시보드 / 재실행 모두 같은 파일은 1번만 파싱
+"""
+import copy
+import hashlib
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import yaml
+
+
+# libyaml이 설치되어 있으면 C 로더 사용 (결과는 SafeLoader와 동일)
+SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# 디스크 캐시 디렉토리 (환경변수로 변경 가능)
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent / ".yaml_cache"
+
+# 디스크 캐시 형식 버전 (파싱 결과 구조가 바뀌면 올림)
+CACHE_VERSION = 1
+
+# {절대 경로: (mtime_ns, size, sha256, 파싱 결과)}
+_memory_cache: Dict[str, tuple] = {}
+
+
+def get_cache_dir() -> Path:
+    """디스크 캐시 디렉토리 (STOCK_ROUTINE_YAML_CACHE 환경변수 우선)"""
+    return Path(os.environ.get('STOCK_ROUTINE_YAML_CACHE', DEFAULT_CACHE_DIR))
+
+
+def _read_disk_cache(digest: str) -> Optional[Any]:
+    path = get_cache_dir() / f"{digest}.pickle"
+    try:
+        with open(path, 'rb') as f:
+            version, data = pickle.load(f)
+        return data if version == CACHE_VERSION else None
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError):
+        return None
+
+
+def _write_disk_cache(digest: str, data: Any):
+    cache_dir = get_cache_dir()
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        # 임시 파일에 쓴 뒤 교체 (동시 실행 중 반쯤 쓰인 파일을 읽지 않도록)
+        tmp_path = cache_dir / f"{digest}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((CACHE_VERSION, data), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_dir / f"{digest}.pickle")
+    except OSError as e:
+        print(f"⚠️  YAML 캐시 저장 실패: {e}")
+
+
+def parse_yaml(content: bytes) -> Any:
+    """YAML 바이트 → 파이썬 객체 (캐시 없음)"""
+    return yaml.load(content, Loader=SafeLoader)
+
+
+def load_yaml(file_path: str, use_cache: bool = True) -> Dict[str, Any]:
+    """
+    YAML 파일을 읽어서 딕셔너리로 반환합니다 (캐시 사용).
+
+    1. 경로의 mtime / 크기가 같으면 프로세스 내 캐시 반환 (파일 읽기 없음)
+    2. 내용 해시가 같으면 (touch 등) 캐시 반환
+    3. 디스크 캐시에 같은 해시가 있으면 반환
+    4. 그 외에만 파싱 후 캐시 저장
+
+    Args:
+        file_path: YAML 파일 경로
+        use_cache: False면 항상 파싱 (캐시 갱신 없음)
+
+    Returns:
+        파싱된 데이터 딕셔너리 (캐시와 공유하지 않는 복사본)
+    """
+    path = Path(file_path)
+
+    if not use_cache:
+        return parse_yaml(path.read_bytes())
+
+    key = str(path.resolve())
+    stat = path.stat()
+
+    cached = _memory_cache.get(key)
+    if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return copy.deepcopy(cached[3])
+
+    content = path.read_bytes()
+    digest = hashlib.sha256(content).hexdigest()
+
+    if cached is not None and cached[2] == digest:
+        data = cached[3]
+    else:
+        data = _read_disk_cache(digest)
+        if data is None:
+            data = parse_yaml(content)
+            _write_disk_cache(digest, data)
+
+    _memory_cache[key] = (stat.st_mtime_ns, stat.st_size, digest, data)
+    return copy.deepcopy(data)
+
+
+def clear_yaml_cache(disk: bool = False):
+    """
+    YAML 캐시 삭제
+
+    Args:
+        disk: True면 디스크 캐시 파일도 삭제
+    """
+    _memory_cache.clear()
+
+    if disk:
+        for path in get_cache_dir().glob("*.pickle"):
+            path.unlink(missing_ok=True)
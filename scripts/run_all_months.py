@@ -4,9 +4,17 @@
 
 사용법:
   python run_all_months.py
+  python run_all_months.py --batch   # 조회 데이터(환율, ETF 구성 종목, quoteType, 현재가)를 모든 월이 공유
+  python run_all_months.py --parallel --workers 8   # 월별 임포트·분석을 프로세스 풀에서 병렬 실행
+  python run_all_months.py --force   # YAML이 바뀌지 않은 월도 다시 임포트
 """
+import os
 import sys
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
+from typing import Dict, List, Optional
 import argparse
 
 # run_monthly.py에서 메인 루틴 함수를 가져옵니다.
@@ -14,7 +22,342 @@ import argparse
 project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 
-from scripts.run_monthly import run_monthly_routine
+from scripts.run_monthly import build_dashboard_stage, run_monthly_routine
+from data.init_db import init_database
+from data.import_month import import_month, is_import_unchanged
+from data.staging_db import create_staging_db, merge_staging_month
+from data.yaml_loader import load_yaml
+from core.analyze_portfolio import (
+    analyze_month_portfolio,
+    get_exchange_rate,
+    new_composition_cache,
+    plan_month_analysis,
+    resolve_asset,
+)
+from visualization.visualize_portfolio import create_asset_trend_chart, visualize_portfolio
+
+
+def run_all_months_batch(
+    yaml_files: List[Path],
+    db_path: str = "portfolio.db",
+    output_dir: str = "charts",
+    purchase_day: int = 26,
+    derive_total: bool = False,
+    skip_import: bool = False,
+    skip_visualize: bool = False,
+    force: bool = False
+) -> Dict:
+    """
+    모든 월을 단계별로 일괄 처리 (월마다 run_monthly_routine을 반복하지 않음)
+
+    1. 전체 월 임포트 (입력 지문이 같은 월은 건너뜀)
+    2. 전체 월 분석 계획 → 환율 1번 조회, ETF 구성 종목/섹터/quoteType은 모든 월이 캐시 공유
+    3. 월별 차트는 현재가 캐시 공유, 자산 추이 차트(공통 파일)는 마지막에 1번
+    4. 대시보드 데이터 사전 계산 (전체 월 1번)
+
+    Args:
+        yaml_files: 월별 YAML 파일 목록 (파일명 = YYYY-MM)
+        db_path: SQLite DB 파일 경로
+        output_dir: 차트 저장 디렉토리
+        purchase_day: 매수 기준일
+        derive_total: True면 전체 분석을 계좌별 결과 합산으로 생성
+        skip_import: True면 임포트 스킵 (DB에 이미 있는 월 재분석)
+        skip_visualize: True면 시각화 스킵
+        force: True면 YAML이 바뀌지 않은 월도 다시 임포트
+
+    Returns:
+        {'months': [처리한 월], 'failed': [실패한 월], 'unchanged': [임포트를 건너뛴 월],
+         'tickers': 조회 대상 티커 수}
+    """
+    months = [(Path(f).stem, str(f)) for f in sorted(yaml_files)]
+    failed = []
+    unchanged = []
+
+    if not Path(db_path).exists():
+        print("🔧 데이터베이스 파일이 없습니다. 초기화 중...")
+    else:
+        print("🔧 데이터베이스 스키마 확인 중...")
+    init_database(db_path)
+
+    # 1. 전체 월 임포트
+    if not skip_import:
+        print(f"\n📥 [1/4] {len(months)}개월 데이터 임포트")
+        print("-" * 80)
+        for year_month, yaml_path in months:
+            try:
+                result = import_month(yaml_path, db_path, purchase_day, overwrite=True, force=force)
+                if result['skipped']:
+                    unchanged.append(year_month)
+            except Exception as e:
+                print(f"❌ {year_month} 임포트 실패: {e}")
+                failed.append(year_month)
+
+    months = [(ym, path) for ym, path in months if ym not in failed]
+
+    # 2. 분석 계획 → 공유 데이터로 전체 월 분석
+    plans = {
+        ym: plan_month_analysis(ym, db_path, [], True, True, derive_total)
+        for ym, _ in months
+    }
+    tickers = {
+        (job['asset_type'], job['ticker'])
+        for jobs in plans.values() for job in jobs
+        if job['asset_type'] != 'CASH'
+    }
+    print(f"\n📋 [2/4] {len(months)}개월 분석 계획: 작업 {sum(len(j) for j in plans.values())}건, "
+          f"조회 대상 티커 {len(tickers)}개")
+    print("-" * 80)
+
+    exchange_rate = get_exchange_rate()
+    composition_cache = new_composition_cache()
+
+    for year_month, _ in months:
+        try:
+            analyze_month_portfolio(
+                year_month=year_month,
+                db_path=db_path,
+                overwrite=True,
+                derive_total=derive_total,
+                exchange_rate=exchange_rate,
+                composition_cache=composition_cache,
+                jobs=plans[year_month]
+            )
+        except Exception as e:
+            print(f"❌ {year_month} 분석 실패: {e}")
+            failed.append(year_month)
+
+    # 3. 시각화
+    if not skip_visualize:
+        print(f"\n📈 [3/4] 시각화")
+        print("-" * 80)
+        price_cache = {}
+        for year_month, _ in months:
+            if year_month in failed:
+                continue
+            try:
+                visualize_portfolio(year_month, db_path, output_dir,
+                                    price_cache=price_cache, render_trend=False)
+            except Exception as e:
+                print(f"❌ {year_month} 시각화 실패: {e}")
+                failed.append(year_month)
+
+        Path(output_dir).mkdir(exist_ok=True)
+        create_asset_trend_chart(db_path, Path(output_dir) / "cumulative_asset_trend.png", months=12)
+
+    # 4. 대시보드 데이터
+    print(f"\n🗂️  [4/4] 대시보드 데이터 생성")
+    print("-" * 80)
+    build_dashboard_stage(db_path)
+
+    return {
+        'months': [ym for ym, _ in months if ym not in failed],
+        'failed': failed,
+        'unchanged': unchanged,
+        'tickers': len(tickers)
+    }
+
+
+def _warm_composition_cache(yaml_paths: List[str], db_path: str) -> Dict:
+    """
+    모든 월 YAML의 자산 구성 종목 / 섹터 / quoteType을 메인 프로세스에서 1번씩 조회
+
+    워커마다 같은 ETF를 다시 조회하지 않도록 결과 캐시를 워커에 넘긴다.
+
+    Args:
+        yaml_paths: 월별 YAML 파일 경로 목록
+        db_path: 본 DB 경로 (로컬 구성 종목 조회)
+
+    Returns:
+        new_composition_cache() 결과 (조회 완료)
+    """
+    cache = new_composition_cache()
+    assets = set()
+    for yaml_path in yaml_paths:
+        try:
+            data = load_yaml(yaml_path)
+        except Exception:
+            continue  # 읽기 실패는 워커에서 실패로 기록
+        for account in data.get('accounts') or []:
+            for holding in account.get('holdings') or []:
+                asset_type = holding.get('asset_type', 'STOCK')
+                if asset_type != 'CASH' and holding.get('ticker_mapping'):
+                    assets.add((holding['ticker_mapping'], asset_type))
+
+    for ticker, asset_type in sorted(assets):
+        try:
+            resolve_asset(ticker, asset_type, db_path, cache)
+        except Exception as e:
+            print(f"  ⚠️  {ticker} 사전 조회 실패 (워커에서 다시 조회): {e}")
+    return cache
+
+
+def _process_month_in_staging(
+    year_month: str,
+    yaml_path: str,
+    staging_db: str,
+    purchase_day: int,
+    derive_total: bool,
+    exchange_rate: float,
+    composition_cache: Optional[Dict] = None,
+    skip_import: bool = False
+) -> str:
+    """
+    워커 프로세스: 스테이징 DB에 한 달 임포트 + 분석 (본 DB는 건드리지 않음)
+
+    Args:
+        composition_cache: 메인 프로세스에서 미리 조회한 구성 종목 캐시 (워커마다 복사본)
+        skip_import: True면 임포트 생략 (입력 변경 없는 월, 스테이징에 holdings 복사 완료)
+
+    Returns:
+        year_month
+    """
+    if not skip_import:
+        import_month(yaml_path, staging_db, purchase_day, overwrite=True)
+    analyze_month_portfolio(
+        year_month=year_month,
+        db_path=staging_db,
+        overwrite=True,
+        derive_total=derive_total,
+        exchange_rate=exchange_rate,
+        composition_cache=composition_cache
+    )
+    return year_month
+
+
+def run_all_months_parallel(
+    yaml_files: List[Path],
+    db_path: str = "portfolio.db",
+    output_dir: str = "charts",
+    purchase_day: int = 26,
+    derive_total: bool = False,
+    skip_visualize: bool = False,
+    workers: Optional[int] = None,
+    force: bool = False
+) -> Dict:
+    """
+    월별 임포트 + 분석을 프로세스 풀에서 병렬 실행 후 본 DB에 병합
+
+    1. 월마다 스테이징 DB(본 DB의 ETF 구성 종목·매수 이력·종가 복사본)를 만들어 워커에서 임포트·분석
+       (ETF 구성 종목·섹터·quoteType은 메인 프로세스에서 1번 조회한 캐시를 워커에 전달)
+    2. 본 DB 쓰기는 메인 프로세스의 병합 1곳에서만, 월 순서대로 한 트랜잭션씩
+    3. 시각화는 병합 후 순차 실행 (현재가 캐시 공유)
+    4. 대시보드 데이터 사전 계산 (전체 월 1번)
+
+    입력 지문이 본 DB와 같은 월은 스테이징에 본 DB의 holdings를 복사해 임포트 없이 분석만 하고
+    같은 방식으로 병합한다 (일괄·순차 모드와 같이 분석·시각화는 모든 월 실행).
+
+    Args:
+        yaml_files: 월별 YAML 파일 목록 (파일명 = YYYY-MM)
+        db_path: SQLite DB 파일 경로
+        output_dir: 차트 저장 디렉토리
+        purchase_day: 매수 기준일
+        derive_total: True면 전체 분석을 계좌별 결과 합산으로 생성
+        skip_visualize: True면 시각화 스킵
+        workers: 워커 프로세스 수 (None이면 CPU 코어 수)
+        force: True면 YAML이 바뀌지 않은 월도 다시 처리
+
+    Returns:
+        {'months': [처리한 월], 'failed': [실패한 월], 'unchanged': [임포트를 건너뛴 월]}
+    """
+    months = [(Path(f).stem, str(f)) for f in sorted(yaml_files)]
+    workers = workers or os.cpu_count() or 1
+    failed = []
+    unchanged = []
+
+    if not Path(db_path).exists():
+        print("🔧 데이터베이스 파일이 없습니다. 초기화 중...")
+    else:
+        print("🔧 데이터베이스 스키마 확인 중...")
+    init_database(db_path)
+
+    if not force:
+        for year_month, yaml_path in months:
+            try:
+                if is_import_unchanged(yaml_path, db_path, purchase_day):
+                    unchanged.append(year_month)
+            except Exception:
+                pass  # 읽기 실패는 워커에서 실패로 기록
+        if unchanged:
+            print(f"⏭️  입력 변경 없음 → 임포트 건너뜀: {', '.join(unchanged)}")
+
+    if not months:
+        return {'months': [], 'failed': [], 'unchanged': unchanged}
+
+    exchange_rate = get_exchange_rate()
+    print(f"\n🔎 {len(months)}개월 ETF 구성 종목 사전 조회")
+    composition_cache = _warm_composition_cache([path for _, path in months], db_path)
+    staging_dir = Path(tempfile.mkdtemp(prefix="staging_", dir=Path(db_path).resolve().parent))
+
+    try:
+        # 1. 월별 스테이징 DB에서 병렬 임포트 + 분석 (입력 변경 없는 월은 분석만)
+        print(f"\n⚙️  [1/4] {len(months)}개월 병렬 임포트·분석 (워커 {workers}개)")
+        print("-" * 80)
+        staging_dbs = {}
+        for year_month, _ in months:
+            staging_dbs[year_month] = str(staging_dir / f"{year_month}.db")
+            create_staging_db(db_path, staging_dbs[year_month], year_month,
+                              include_holdings=year_month in unchanged)
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(_process_month_in_staging, year_month, yaml_path,
+                                staging_dbs[year_month], purchase_day, derive_total, exchange_rate,
+                                composition_cache, year_month in unchanged): year_month
+                for year_month, yaml_path in months
+            }
+            for future in as_completed(futures):
+                year_month = futures[future]
+                try:
+                    future.result()
+                    print(f"  ✅ {year_month} 스테이징 완료")
+                except Exception as e:
+                    print(f"  ❌ {year_month} 임포트/분석 실패: {e}")
+                    failed.append(year_month)
+
+        # 2. 본 DB 병합 (월 순서대로, 단일 writer)
+        print(f"\n🔀 [2/4] 본 DB 병합")
+        print("-" * 80)
+        for year_month, _ in months:
+            if year_month in failed:
+                continue
+            try:
+                counts = merge_staging_month(staging_dbs[year_month], db_path, year_month)
+                print(f"  ✅ {year_month}: 계좌 {counts['accounts']}개, "
+                      f"holdings {counts['analyzed_holdings']}건, sectors {counts['analyzed_sectors']}건")
+            except Exception as e:
+                print(f"  ❌ {year_month} 병합 실패: {e}")
+                failed.append(year_month)
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+    months = [(ym, path) for ym, path in months if ym not in failed]
+
+    # 3. 시각화
+    if not skip_visualize:
+        print(f"\n📈 [3/4] 시각화")
+        print("-" * 80)
+        price_cache = {}
+        for year_month, _ in months:
+            try:
+                visualize_portfolio(year_month, db_path, output_dir,
+                                    price_cache=price_cache, render_trend=False)
+            except Exception as e:
+                print(f"❌ {year_month} 시각화 실패: {e}")
+                failed.append(year_month)
+
+        Path(output_dir).mkdir(exist_ok=True)
+        create_asset_trend_chart(db_path, Path(output_dir) / "cumulative_asset_trend.png", months=12)
+
+    # 4. 대시보드 데이터
+    print(f"\n🗂️  [4/4] 대시보드 데이터 생성")
+    print("-" * 80)
+    build_dashboard_stage(db_path)
+
+    return {
+        'months': [ym for ym, _ in months if ym not in failed],
+        'failed': failed,
+        'unchanged': unchanged
+    }
 
 
 def main():
@@ -25,6 +368,16 @@ def main():
     parser.add_argument("--db", default="portfolio.db", help="SQLite DB 파일 경로")
     parser.add_argument("--output", default="charts", help="차트 저장 디렉토리")
     parser.add_argument("--purchase-day", type=int, default=26, help="매수 기준일")
+    parser.add_argument("--batch", action="store_true",
+                        help="일괄 모드: 조회 데이터(환율, ETF 구성 종목, quoteType, 현재가)를 모든 월이 공유")
+    parser.add_argument("--parallel", action="store_true",
+                        help="병렬 모드: 월별 임포트·분석을 프로세스 풀에서 실행 후 본 DB에 병합")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="병렬 모드 워커 프로세스 수 (기본값: CPU 코어 수)")
+    parser.add_argument("--derive-total", action="store_true",
+                        help="전체 분석을 계좌별 결과 합산으로 생성 (yfinance 재조회 없음)")
+    parser.add_argument("--force", action="store_true",
+                        help="YAML이 바뀌지 않은 월도 다시 임포트 (기본: 입력 지문이 같으면 임포트 건너뜀)")
     args = parser.parse_args()
 
     monthly_dir = Path("monthly")
@@ -42,6 +395,37 @@ def main():
     print(f"🚀 총 {len(yaml_files)}개의 월에 대해 분석을 시작합니다.")
     print("=" * 80)
 
+    if args.parallel:
+        result = run_all_months_parallel(
+            yaml_files,
+            db_path=args.db,
+            output_dir=args.output,
+            purchase_day=args.purchase_day,
+            derive_total=args.derive_total,
+            workers=args.workers,
+            force=args.force
+        )
+        print("=" * 80)
+        if result['failed']:
+            print(f"⚠️  실패한 월: {', '.join(result['failed'])}")
+        print(f"🎉 {len(result['months'])}개월 병렬 분석 완료 (변경 없음 {len(result['unchanged'])}개월)")
+        return
+
+    if args.batch:
+        result = run_all_months_batch(
+            yaml_files,
+            db_path=args.db,
+            output_dir=args.output,
+            purchase_day=args.purchase_day,
+            derive_total=args.derive_total,
+            force=args.force
+        )
+        print("=" * 80)
+        if result['failed']:
+            print(f"⚠️  실패한 월: {', '.join(result['failed'])}")
+        print(f"🎉 {len(result['months'])}개월 일괄 분석 완료 (조회 티커 {result['tickers']}개)")
+        return
+
     for yaml_file in yaml_files:
         # 파일명에서 년-월(예: 2025-11)을 추출합니다.
         year_month = yaml_file.stem
@@ -56,13 +440,20 @@ def main():
                 # run_all 사용 시 항상 모든 단계를 실행하도록 가정
                 skip_import=False,
                 skip_analyze=False,
-                skip_visualize=False
+                skip_visualize=False,
+                derive_total=args.derive_total,
+                force_import=args.force,
+                skip_dashboard=True  # 모든 월 처리 후 1번
             )
         except Exception as e:
             print(f"❌ {year_month} 처리 중 오류 발생: {e}")
             # 한 월에서 오류가 발생하더라도 다음 월을 계속 처리합니다.
             continue
 
+    print("\n🗂️  대시보드 데이터 생성")
+    print("-" * 80)
+    build_dashboard_stage(args.db)
+
     print("=" * 80)
     print("🎉 모든 월에 대한 분석이 완료되었습니다.")
 
@@ -12,18 +12,47 @@
   0 9 1 * * cd /path/to/stock-routine && python run_monthly.py --month $(date +\%Y-\%m) --yaml monthly/$(date +\%Y-\%m).yaml
 """
 import argparse
+import asyncio
 import sys
+from typing import List, Optional, Tuple
 from pathlib import Path
 from datetime import datetime
 
 # 로컬 모듈 임포트
 from data.init_db import init_database
-from data.import_monthly_data import import_monthly_data
-from data.import_monthly_purchases import import_monthly_purchases
+from data.import_month import import_month
 from core.analyze_portfolio import analyze_month_portfolio
+from core.analyze_portfolio_async import analyze_month_portfolio_async
 from visualization.visualize_portfolio import visualize_portfolio
 
 
+def build_dashboard_stage(
+    db_path: str,
+    year_months: Optional[List[str]] = None,
+    base_version: Optional[Tuple[int, ...]] = None
+) -> int:
+    """
+    파이프라인 마지막 단계: 대시보드 페이지 데이터 사전 계산
+
+    실패해도 대시보드가 직접 계산하므로 파이프라인은 중단하지 않는다.
+
+    Args:
+        db_path: SQLite DB 파일 경로
+        year_months: 바뀐 월 목록 (None이면 전체 계산)
+        base_version: 바뀌기 직전 DB 데이터 버전 (같으면 다른 월 데이터는 기존 파일에서 재사용)
+
+    Returns:
+        저장한 데이터셋 수 (실패 시 0)
+    """
+    from streamlit_app.payloads import build_dashboard_payloads
+
+    try:
+        return build_dashboard_payloads(db_path, year_months, base_version)
+    except Exception as e:
+        print(f"⚠️ 대시보드 데이터 생성 실패 (대시보드에서 직접 계산): {e}")
+        return 0
+
+
 def run_monthly_routine(
     year_month: str,
     yaml_path: str,
@@ -32,7 +61,12 @@ def run_monthly_routine(
     purchase_day: int = 26,
     skip_import: bool = False,
     skip_analyze: bool = False,
-    skip_visualize: bool = False
+    skip_visualize: bool = False,
+    derive_total: bool = False,
+    async_analyze: bool = False,
+    resume: bool = False,
+    force_import: bool = False,
+    skip_dashboard: bool = False
 ):
     """
     월별 포트폴리오 분석 루틴 실행
@@ -46,6 +80,11 @@ def run_monthly_routine(
         skip_import: True면 import 스킵
         skip_analyze: True면 analyze 스킵
         skip_visualize: True면 visualize 스킵
+        derive_total: True면 전체 분석을 계좌별 결과 합산으로 생성 (yfinance 재조회 없음)
+        async_analyze: True면 비동기 파이프라인으로 분석 (조회·계산·저장 병행)
+        resume: True면 중단된 분석을 이어서 실행 (import는 month_id를 새로 만들므로 스킵)
+        force_import: True면 YAML 입력 지문이 같아도 다시 임포트
+        skip_dashboard: True면 대시보드 사전 계산 스킵 (여러 월을 연달아 실행할 때 마지막에 1번)
     """
     print("=" * 80)
     print(f"📅 {year_month}월 포트폴리오 자동 분석 시작")
@@ -56,22 +95,23 @@ def run_monthly_routine(
     db_file = Path(db_path)
     if not db_file.exists():
         print("🔧 데이터베이스 파일이 없습니다. 초기화 중...")
-        init_database(db_path)
+    else:
+        # 기존 DB에도 새 테이블/컬럼 마이그레이션 (체크포인트, 종목 노출 색인 등)
+        print("🔧 데이터베이스 스키마 확인 중...")
+    init_database(db_path)
+
+    if resume and not skip_import:
+        print("🔁 이어서 분석: 기존 분석 데이터 유지를 위해 임포트를 건너뜁니다.")
+        skip_import = True
 
     # Step 1: YAML Import
     if not skip_import:
         print("\n📥 [1/4] 데이터 임포트 시작")
         print("-" * 80)
         try:
-            # Step 1-1: 계좌 및 holdings 정보 저장
-            print("  [1-1] 계좌 정보 임포트 중...")
-            import_monthly_data(yaml_path, db_path, overwrite=True)
-            print("  ✅ 계좌 정보 임포트 완료")
-
-            # Step 1-2: 주가 조회 및 purchase_history 저장
-            print(f"\n  [1-2] 주가 조회 및 매수 수량 계산 중 (기준일: {purchase_day}일)...")
-            import_monthly_purchases(yaml_path, db_path, purchase_day, overwrite=True)
-            print("  ✅ 주가 조회 및 매수 데이터 저장 완료")
+            # 계좌 / holdings / 주가 조회 + purchase_history를 한 트랜잭션으로 저장
+            print(f"  계좌 정보 + 매수 수량 임포트 중 (기준일: {purchase_day}일)...")
+            import_month(yaml_path, db_path, purchase_day, overwrite=True, force=force_import)
 
             print("\n✅ 전체 데이터 임포트 완료")
         except Exception as e:
@@ -85,13 +125,26 @@ def run_monthly_routine(
         print("\n📊 [2/4] 포트폴리오 분석 시작")
         print("-" * 80)
         try:
-            analyze_month_portfolio(
-                year_month=year_month,
-                db_path=db_path,
-                overwrite=True,
-                analyze_by_account=True,
-                analyze_total=True
-            )
+            if async_analyze:
+                asyncio.run(analyze_month_portfolio_async(
+                    year_month=year_month,
+                    db_path=db_path,
+                    overwrite=True,
+                    analyze_by_account=True,
+                    analyze_total=True,
+                    derive_total=derive_total,
+                    resume=resume
+                ))
+            else:
+                analyze_month_portfolio(
+                    year_month=year_month,
+                    db_path=db_path,
+                    overwrite=True,
+                    analyze_by_account=True,
+                    analyze_total=True,
+                    derive_total=derive_total,
+                    resume=resume
+                )
             print("✅ 포트폴리오 분석 완료")
         except Exception as e:
             print(f"❌ 포트폴리오 분석 실패: {e}")
@@ -112,6 +165,14 @@ def run_monthly_routine(
     else:
         print("\n⏭️  [3/4] 시각화 스킵")
 
+    # Step 4: Dashboard Payloads
+    if not skip_dashboard:
+        print("\n🗂️  [4/4] 대시보드 데이터 생성")
+        print("-" * 80)
+        build_dashboard_stage(db_path)
+    else:
+        print("\n⏭️  [4/4] 대시보드 데이터 생성 스킵")
+
     # 완료 메시지
     print("\n" + "=" * 80)
     print(f"✅ {year_month}월 포트폴리오 자동 분석 완료!")
@@ -138,6 +199,9 @@ def main():
   # analyze만 실행
   python run_monthly.py --month 2025-11 --yaml monthly/2025-11.yaml --skip-import --skip-visualize
 
+  # 중단된 분석 이어서 실행 (완료된 계좌·종목 건너뛰기)
+  python run_monthly.py --month 2025-11 --yaml monthly/2025-11.yaml --resume
+
 크론 설정 예시:
   # 매월 1일 오전 9시에 실행 (26일 주가 기준)
   0 9 1 * * cd /path/to/stock-routine && python run_monthly.py --month $(date +\\%Y-\\%m) --yaml monthly/$(date +\\%Y-\\%m).yaml >> logs/cron.log 2>&1
@@ -152,11 +216,20 @@ def main():
     parser.add_argument("--skip-import", action="store_true", help="데이터 임포트 스킵")
     parser.add_argument("--skip-analyze", action="store_true", help="포트폴리오 분석 스킵")
     parser.add_argument("--skip-visualize", action="store_true", help="시각화 스킵")
+    parser.add_argument("--derive-total", action="store_true",
+                        help="전체 분석을 계좌별 결과 합산으로 생성 (yfinance 재조회 없음)")
+    parser.add_argument("--async-analyze", action="store_true",
+                        help="비동기 파이프라인으로 분석 (조회·계산·저장 병행, 티커별 타임아웃)")
+    parser.add_argument("--force-import", action="store_true",
+                        help="YAML이 바뀌지 않았어도 다시 임포트 (기본: 입력 지문이 같으면 임포트 건너뜀)")
+    parser.add_argument("--skip-dashboard", action="store_true", help="대시보드 데이터 사전 계산 스킵")
+    parser.add_argument("--resume", action="store_true",
+                        help="중단된 분석 이어서 실행 (임포트 스킵, 완료된 계좌·종목 건너뛰기)")
 
     args = parser.parse_args()
 
     # YAML 파일 존재 확인
-    if not args.skip_import:
+    if not args.skip_import and not args.resume:
         yaml_file = Path(args.yaml)
         if not yaml_file.exists():
             print(f"❌ YAML 파일을 찾을 수 없습니다: {args.yaml}")
@@ -171,7 +244,12 @@ def main():
         purchase_day=args.purchase_day,
         skip_import=args.skip_import,
         skip_analyze=args.skip_analyze,
-        skip_visualize=args.skip_visualize
+        skip_visualize=args.skip_visualize,
+        derive_total=args.derive_total,
+        async_analyze=args.async_analyze,
+        resume=args.resume,
+        force_import=args.force_import,
+        skip_dashboard=args.skip_dashboard
     )
 
 
@@ -0,0 +1,276 @@
+#!/usr/bin/env python
+"""
+monthly/*.yaml 변경 감시 → 바뀐 월만 임포트 + 분석 + 시각화 + 대시보드 데이터
+(이후 월의 누적 차트는 바뀐 월의 매수 이력을 포함하므로 함께 다시 그림)
+
+mtime 폴링 방식이라 운영체제 / 파일시스템과 무관하게 동작합니다.
+환율 / ETF 구성 종목·섹터·quoteType / 현재가 캐시는 프로세스 안에서 유지하므로
+두 번째 수정부터는 바뀐 종목만 조회합니다.
+
+사용법:
+  python scripts/watch_monthly.py
+  python scripts/watch_monthly.py --interval 2 --cache-ttl 3600
+"""
+import argparse
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from data.init_db import init_database
+from data.import_month import clear_import_fingerprint, import_month, is_import_unchanged
+from core.analyze_portfolio import analyze_month_portfolio, get_exchange_rate, new_composition_cache
+from visualization.visualize_portfolio import visualize_portfolio
+from scripts.run_monthly import build_dashboard_stage
+from streamlit_app.snapshot import get_data_version
+
+
+# 임포트 후 단계(분석 / 시각화 / 대시보드 데이터)가 실패한 월의 자동 재시도 횟수
+MAX_RETRIES = 3
+
+
+def scan_monthly_files(monthly_dir: str) -> Dict[str, int]:
+    """
+    월별 YAML 파일의 mtime 조회
+
+    Args:
+        monthly_dir: 월별 YAML 디렉토리
+
+    Returns:
+        {파일 경로: mtime_ns} (파일명이 YYYY-MM 형식인 .yaml만)
+    """
+    files = {}
+    for path in Path(monthly_dir).glob("*.yaml"):
+        stem = path.stem
+        if len(stem) != 7 or stem[4] != '-' or not (stem[:4] + stem[5:]).isdigit():
+            continue
+        try:
+            files[str(path)] = path.stat().st_mtime_ns
+        except OSError:
+            continue  # 스캔 도중 삭제/이름 변경
+    return files
+
+
+def new_watch_caches() -> Dict:
+    """
+    감시 프로세스 동안 유지하는 조회 캐시
+
+    Returns:
+        {'exchange_rate': None, 'composition': 구성 종목 캐시, 'prices': 현재가 캐시, 'created': 생성 시각}
+    """
+    return {
+        'exchange_rate': None,
+        'composition': new_composition_cache(),
+        'prices': {},
+        'created': time.monotonic(),
+    }
+
+
+def get_later_months(year_month: str, db_path: str) -> List[str]:
+    """
+    DB에 있는 year_month 이후 월 목록 (누적 차트를 다시 그릴 대상)
+
+    Returns:
+        ['2025-02', '2025-03', ...] (오름차순)
+    """
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(
+        "SELECT year_month FROM months WHERE year_month > ? ORDER BY year_month", (year_month,)
+    ).fetchall()
+    conn.close()
+    return [row[0] for row in rows]
+
+
+def process_month(
+    yaml_path: str,
+    db_path: str,
+    output_dir: str,
+    purchase_day: int,
+    caches: Dict,
+    derive_total: bool = False,
+    force: bool = False
+) -> bool:
+    """
+    한 달 임포트 → 분석 → 시각화 → 대시보드 데이터 (입력 지문이 같으면 아무것도 하지 않음)
+
+    자산 배분 차트는 해당 월까지의 누적 매수 이력으로 그리므로 이후 월 차트도 다시 그린다
+    (분석 결과는 월별이라 이후 월은 재분석하지 않음, 자산 추이 차트는 1번).
+    대시보드 데이터도 바뀐 월 / "전체 기간"만 다시 계산하고 다른 월은 기존 파일에서 재사용한다.
+
+    Args:
+        yaml_path: 월별 YAML 경로
+        db_path: SQLite DB 파일 경로
+        output_dir: 차트 저장 디렉토리
+        purchase_day: 매수 기준일
+        caches: new_watch_caches 결과 (월 간 공유)
+        derive_total: True면 전체 분석을 계좌별 결과 합산으로 생성
+        force: True면 입력이 바뀌지 않았어도 다시 처리
+
+    Returns:
+        처리했으면 True, 변경 없음으로 건너뛰었으면 False
+    """
+    year_month = Path(yaml_path).stem
+    base_version = get_data_version(db_path)  # 대시보드 데이터 재사용 기준 (임포트 직전)
+
+    result = import_month(yaml_path, db_path, purchase_day, overwrite=True, force=force)
+    if result['skipped']:
+        return False
+
+    if caches['exchange_rate'] is None:
+        caches['exchange_rate'] = get_exchange_rate()
+
+    analyze_month_portfolio(
+        year_month=year_month,
+        db_path=db_path,
+        overwrite=True,
+        derive_total=derive_total,
+        exchange_rate=caches['exchange_rate'],
+        composition_cache=caches['composition']
+    )
+    visualize_portfolio(year_month, db_path, output_dir, price_cache=caches['prices'])
+    for later_month in get_later_months(year_month, db_path):
+        visualize_portfolio(later_month, db_path, output_dir, price_cache=caches['prices'], render_trend=False)
+    build_dashboard_stage(db_path, [year_month], base_version)
+    return True
+
+
+def watch_monthly(
+    monthly_dir: str = "monthly",
+    db_path: str = "portfolio.db",
+    output_dir: str = "charts",
+    purchase_day: int = 26,
+    interval: float = 1.0,
+    cache_ttl: float = 6 * 3600,
+    derive_total: bool = False,
+    max_cycles: Optional[int] = None
+) -> List[str]:
+    """
+    월별 YAML 변경 감시 루프
+
+    1. 시작 시: DB의 입력 지문과 다른 월(새 월 / 감시 중지 중 수정된 월)을 처리
+    2. 이후 interval마다 mtime 비교 → 바뀐 파일은 다음 폴링에서도 mtime이 같을 때(저장 완료) 처리
+    3. cache_ttl이 지나면 조회 캐시를 비움 (오래된 환율·현재가 방지)
+
+    Args:
+        monthly_dir: 월별 YAML 디렉토리
+        db_path: SQLite DB 파일 경로
+        output_dir: 차트 저장 디렉토리
+        purchase_day: 매수 기준일
+        interval: 폴링 간격 (초)
+        cache_ttl: 조회 캐시 유지 시간 (초)
+        derive_total: True면 전체 분석을 계좌별 결과 합산으로 생성
+        max_cycles: 폴링 횟수 제한 (None이면 Ctrl+C까지)
+
+    Returns:
+        처리한 월 목록 (처리 순서)
+    """
+    init_database(db_path)
+    caches = new_watch_caches()
+    processed = []
+    retries: Dict[str, int] = {}  # 임포트 후 단계가 실패한 파일 → 재시도 횟수
+
+    def run(yaml_path: str):
+        year_month = Path(yaml_path).stem
+        started = time.monotonic()
+        print(f"\n🔄 {year_month} 변경 감지 → 처리 시작")
+        print("-" * 80)
+        try:
+            if process_month(yaml_path, db_path, output_dir, purchase_day, caches, derive_total):
+                processed.append(year_month)
+                print(f"✅ {year_month} 반영 완료 ({time.monotonic() - started:.1f}초)")
+            retries.pop(yaml_path, None)
+        except Exception as e:
+            # 잘못 저장된 YAML 등은 다음 수정에서 다시 시도
+            print(f"❌ {year_month} 처리 실패: {e}")
+            # 임포트 후 분석 / 시각화가 실패했으면 지문을 지워 같은 입력도 다시 처리되게 함
+            if clear_import_fingerprint(db_path, year_month):
+                attempts = retries.get(yaml_path, 0) + 1
+                if attempts <= MAX_RETRIES:
+                    retries[yaml_path] = attempts
+                    print(f"   ↻ 다음 폴링에서 재시도 ({attempts}/{MAX_RETRIES})")
+                else:
+                    retries.pop(yaml_path, None)
+                    print("   ⏸️ 재시도 중단 (다음 저장 또는 감시 재시작 시 다시 처리)")
+
+    # 1. 시작 시 DB와 다른 월 처리
+    known = scan_monthly_files(monthly_dir)
+    for yaml_path in sorted(known):
+        try:
+            unchanged = is_import_unchanged(yaml_path, db_path, purchase_day)
+        except Exception:
+            unchanged = False  # 파싱 실패 → run에서 오류 출력
+        if not unchanged:
+            run(yaml_path)
+
+    print(f"\n👀 {monthly_dir}/ 감시 중 (간격 {interval}초, Ctrl+C로 종료)")
+
+    # 2. 폴링
+    pending: Dict[str, int] = {}
+    cycles = 0
+    try:
+        while max_cycles is None or cycles < max_cycles:
+            time.sleep(interval)
+            cycles += 1
+
+            if time.monotonic() - caches['created'] > cache_ttl:
+                print("🧹 조회 캐시 만료 → 초기화")
+                caches = new_watch_caches()
+
+            current = scan_monthly_files(monthly_dir)
+            for yaml_path in sorted(current):
+                mtime = current[yaml_path]
+                if yaml_path in retries and yaml_path not in pending and known.get(yaml_path) == mtime:
+                    # 지난 처리가 임포트 후 실패 → 파일이 그대로여도 다시 처리
+                    run(yaml_path)
+                elif pending.get(yaml_path) == mtime:
+                    # 한 폴링 동안 mtime이 그대로 → 저장 완료로 보고 처리
+                    del pending[yaml_path]
+                    known[yaml_path] = mtime
+                    run(yaml_path)
+                elif known.get(yaml_path) != mtime:
+                    pending[yaml_path] = mtime
+
+            for yaml_path in set(known) - set(current):
+                del known[yaml_path]
+                pending.pop(yaml_path, None)
+
+    except KeyboardInterrupt:
+        print("\n👋 감시 종료")
+
+    return processed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="월별 YAML 변경 감시 → 바뀐 월만 임포트 + 분석 + 시각화")
+    parser.add_argument("--monthly-dir", default="monthly", help="월별 YAML 디렉토리 (기본값: monthly)")
+    parser.add_argument("--db", default="portfolio.db", help="SQLite DB 파일 경로 (기본값: portfolio.db)")
+    parser.add_argument("--output", default="charts", help="차트 저장 디렉토리 (기본값: charts)")
+    parser.add_argument("--purchase-day", type=int, default=26, help="매수 기준일 (기본값: 26일)")
+    parser.add_argument("--interval", type=float, default=1.0, help="폴링 간격 초 (기본값: 1)")
+    parser.add_argument("--cache-ttl", type=float, default=6 * 3600,
+                        help="환율·구성 종목·현재가 캐시 유지 시간 초 (기본값: 21600)")
+    parser.add_argument("--derive-total", action="store_true",
+                        help="전체 분석을 계좌별 결과 합산으로 생성 (yfinance 재조회 없음)")
+    args = parser.parse_args()
+
+    if not Path(args.monthly_dir).is_dir():
+        print(f"❌ '{args.monthly_dir}' 디렉토리를 찾을 수 없습니다.")
+        sys.exit(1)
+
+    watch_monthly(
+        monthly_dir=args.monthly_dir,
+        db_path=args.db,
+        output_dir=args.output,
+        purchase_day=args.purchase_day,
+        interval=args.interval,
+        cache_ttl=args.cache_ttl,
+        derive_total=args.derive_total
+    )
+
+
+if __name__ == "__main__":
+    main()
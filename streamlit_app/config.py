@@ -40,12 +40,18 @@ DATA_LIMITS = {
     'sectors_top_n': 10
 }
 
-# 캐싱 설정 (초 단위)
+# 캐싱 설정 (초 단위, None = 무기한)
+# data_loader 캐시 키에 DB 데이터 버전이 포함되므로 파이프라인 실행 직후 바로 무효화됨
 CACHE_TTL = {
-    'monthly_data': 3600,      # 1시간
-    'etf_data': 86400,         # 24시간
-    'static_data': 604800      # 7일
+    'monthly_data': None,      # DB만 읽는 조회: 데이터가 바뀔 때까지 유지
+    'live_data': 3600,         # 현재가 반영 조회: 1시간마다 현재가 갱신
+    'etf_data': None,
+    'static_data': None
 }
 
+# 함수별 캐시 항목 상한 (월 × 계좌 × 인자 조합 + 직전 데이터 버전 몇 개)
+# 데이터 버전이 바뀌면 이전 버전 항목은 다시 쓰이지 않으므로 오래된 것부터 제거
+CACHE_MAX_ENTRIES = 256
+
 # 데이터베이스 경로
 DB_PATH = "portfolio.db"
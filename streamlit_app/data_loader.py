@@ -1,68 +1,162 @@
 """
 데이터 로딩 및 캐싱 모듈
+- 캐시 키에 DB 데이터 버전(파일 mtime / 크기)을 포함 → 파이프라인 실행 직후 무효화, 그 전까지는 유지
+- 월 / 계좌 / 매수 이력 / 분석 결과 조회는 세션 공유 스냅샷(streamlit_app/snapshot.py)에서 pandas로 처리 (stock_exposures 역색인 / 월별 비교 표는 SQL)
+- 파이프라인이 미리 계산한 결과(streamlit_app/payloads.py)가 같은 데이터 버전이면 계산 없이 반환
 """
+import functools
+import inspect
 import sqlite3
-from typing import List, Dict, Optional, Tuple
+from typing import Callable, List, Dict, Optional, Tuple
 from pathlib import Path
 import pandas as pd
 import streamlit as st
-import yaml
-from streamlit_app.config import CACHE_TTL, DB_PATH
+from streamlit_app.config import CACHE_MAX_ENTRIES, CACHE_TTL, DB_PATH
+from streamlit_app.payloads import MISSING, get_payload, payload_key
+from streamlit_app.snapshot import PortfolioSnapshot, get_data_version, get_snapshot
 from streamlit_app.utils.formatters import get_previous_month
-from core.interest_calculator import calc_cash_current_value
+from core.interest_calculator import calc_cash_records_value, calc_cash_values
+from data.yaml_loader import load_yaml
 
 # YAML 파일 경로
 MONTHLY_DIR = Path(__file__).parent.parent / "monthly"
 
 
-def _calc_cash_value_from_db(db_path: str, month_id: Optional[int] = None) -> Tuple[int, float]:
+# ===== 캐시 (DB 데이터 버전) =====
+
+def cache_by_data_version(ttl: Optional[int] = None, max_entries: int = CACHE_MAX_ENTRIES) -> Callable:
     """
-    CASH 자산의 투자원금 합계와 이자 반영 평가액을 계산
+    st.cache_data + DB 데이터 버전 캐시 키
+
+    감싼 함수의 db_path 인자로 get_data_version을 계산해 캐시 키에 추가한다.
+    캐시 미스 시 사전 계산 결과(build_dashboard_payloads)가 있으면 그대로 사용한다.
+    ttl=None이면 데이터가 바뀔 때까지 유지 (현재가를 반영하는 함수만 ttl 지정).
+    데이터 버전마다 새 항목이 쌓이므로 max_entries로 함수별 항목 수를 제한한다.
 
     Args:
-        db_path: DB 경로
+        ttl: 캐시 유지 시간 (초, None이면 무기한)
+        max_entries: 함수별 최대 캐시 항목 수 (넘으면 오래된 항목부터 제거)
+
+    Returns:
+        데코레이터 (감싼 함수에 .clear() 제공)
+    """
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        def versioned(data_version, *args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            # 파이프라인이 미리 계산해 둔 결과 (같은 데이터 버전일 때만)
+            payload = get_payload(bound.arguments['db_path'], data_version,
+                                  payload_key(func.__name__, bound.arguments))
+            if payload is not MISSING:
+                return payload
+            return func(*args, **kwargs)
+
+        # st.cache_data는 __module__ / __qualname__으로 함수별 캐시를 구분
+        versioned.__module__ = func.__module__
+        versioned.__name__ = func.__name__
+        versioned.__qualname__ = func.__qualname__
+        cached = st.cache_data(ttl=ttl, max_entries=max_entries)(versioned)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return cached(get_data_version(bound.arguments['db_path']), *args, **kwargs)
+
+        wrapper.clear = cached.clear
+        return wrapper
+
+    return decorator
+
+
+def _calc_cash_value(snapshot: PortfolioSnapshot, month_id: Optional[int] = None) -> Tuple[int, float]:
+    """
+    CASH 자산의 투자원금 합계와 이자 반영 평가액을 계산 (스냅샷, DB 연결 없음)
+
+    Args:
+        snapshot: 포트폴리오 스냅샷
         month_id: 특정 월 ID (None이면 전체)
 
     Returns:
         (cash_invested, cash_current_value)
     """
-    conn = sqlite3.connect(db_path)
     if month_id is not None:
-        records = pd.read_sql_query("""
-            SELECT ph.input_amount, ph.purchase_date, ph.interest_rate, ph.interest_type
-            FROM purchase_history ph
-            JOIN accounts a ON ph.account_id = a.id
-            WHERE a.month_id = ? AND ph.asset_type = 'CASH'
-        """, conn, params=(month_id,))
+        records = snapshot.account_purchases()
+        records = records[records['month_id'].isin([month_id]) & (records['asset_type'] == 'CASH')]
     else:
-        records = pd.read_sql_query("""
-            SELECT input_amount, purchase_date, interest_rate, interest_type
-            FROM purchase_history
-            WHERE asset_type = 'CASH'
-        """, conn)
-    conn.close()
+        records = snapshot.purchases[snapshot.purchases['asset_type'] == 'CASH']
 
     if records.empty:
         return 0, 0.0
 
     total_invested = int(records['input_amount'].sum())
-    total_value = 0.0
-    for _, rec in records.iterrows():
-        rate = rec['interest_rate'] if pd.notna(rec['interest_rate']) else None
-        itype = rec['interest_type'] if pd.notna(rec['interest_type']) else 'simple'
-        total_value += calc_cash_current_value(
-            principal=int(rec['input_amount']),
-            annual_rate=rate,
-            purchase_date=rec['purchase_date'],
-            interest_type=itype,
-        )
+    total_value = calc_cash_records_value(records)
 
     return total_invested, total_value
 
 
+def _get_cash_value_map(snapshot: PortfolioSnapshot, cash_names) -> Dict[str, float]:
+    """
+    CASH 상품(holdings 이름)별 이자 반영 평가액 (전체 기간 납입건)
+
+    purchase_history.holding_id로 연결된 납입건을 스냅샷에서 골라 상품별로 합산한다.
+
+    Args:
+        snapshot: 포트폴리오 스냅샷
+        cash_names: CASH 상품 이름 목록
+
+    Returns:
+        {상품 이름: 평가액} (납입 이력이 없는 상품은 없음)
+    """
+    names = list(dict.fromkeys(cash_names))
+    if not names:
+        return {}
+
+    holding_names = snapshot.holdings.set_index('id')['name'].astype(object)
+    records = snapshot.purchases[snapshot.purchases['asset_type'] == 'CASH']
+    records = records.assign(name=records['holding_id'].map(holding_names))
+    records = records[records['name'].isin(names)]
+    if records.empty:
+        return {}
+
+    records = records.assign(value=calc_cash_values(
+        records['input_amount'], records['interest_rate'], records['purchase_date'], records['interest_type']
+    ))
+    return records.groupby('name')['value'].sum().to_dict()
+
+
+def _records(df: pd.DataFrame) -> List[Tuple]:
+    """DataFrame 행 → 튜플 목록 (SQL fetchall과 같은 형태: 파이썬 값, 결측은 None)"""
+    return list(df.astype(object).where(df.notna(), None).itertuples(index=False, name=None))
+
+
+def _sum_purchases(purchases: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+    """
+    납입건을 keys별로 수량 / 투자원금 합산 (SQL GROUP BY ... ORDER BY keys와 같은 순서)
+
+    Args:
+        purchases: purchases 또는 account_purchases 행
+        keys: 그룹 기준 컬럼
+
+    Returns:
+        DataFrame with columns: keys + ['total_quantity', 'invested'] (category 키는 문자열로)
+    """
+    df = (
+        purchases.groupby(keys, observed=True, dropna=False)
+        .agg(total_quantity=('quantity', 'sum'), invested=('input_amount', 'sum'))
+        .reset_index()
+    )
+    for key in keys:
+        if isinstance(df[key].dtype, pd.CategoricalDtype):
+            df[key] = df[key].astype(object)
+    return df
+
+
 # ===== 기본 데이터 조회 =====
 
-@st.cache_data(ttl=CACHE_TTL['static_data'])
+@cache_by_data_version(ttl=CACHE_TTL['static_data'])
 def get_available_months(db_path: str = DB_PATH) -> List[str]:
     """
     사용 가능한 월 목록 조회 (내림차순)
@@ -70,22 +164,10 @@ def get_available_months(db_path: str = DB_PATH) -> List[str]:
     Returns:
         ['2025-12', '2025-11', ...]
     """
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT year_month
-        FROM months
-        ORDER BY year_month DESC
-    """)
-
-    months = [row[0] for row in cursor.fetchall()]
-    conn.close()
-
-    return months
+    return sorted(get_snapshot(db_path).months['year_month'].tolist(), reverse=True)
 
 
-@st.cache_data(ttl=CACHE_TTL['static_data'])
+@cache_by_data_version(ttl=CACHE_TTL['static_data'])
 def get_latest_month(db_path: str = DB_PATH) -> Optional[str]:
     """최신 월 반환"""
     months = get_available_months(db_path)
@@ -93,46 +175,50 @@ def get_latest_month(db_path: str = DB_PATH) -> Optional[str]:
 
 
 def get_month_id(year_month: str, db_path: str = DB_PATH) -> Optional[int]:
-    """year_month로 month_id 조회"""
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT id FROM months WHERE year_month = ?
-    """, (year_month,))
-
-    result = cursor.fetchone()
-    conn.close()
-
-    return result[0] if result else None
+    """year_month로 month_id 조회 (스냅샷, DB 연결 없음)"""
+    return get_snapshot(db_path).month_id(year_month)
 
 
 # ===== 월별 요약 데이터 =====
 
-def _calculate_portfolio_value(purchase_data: List[Tuple], cash_invested: float, cash_value: float) -> Tuple[int, int]:
+def _fetch_prices_and_rate(tickers: List[str]) -> Tuple[Dict[str, Optional[float]], float]:
     """
-    포트폴리오 평가액 계산 (공통 로직)
-
-    Args:
-        purchase_data: [(ticker, quantity, invested), ...]
-        cash_invested: CASH 자산 투자원금
-        cash_value: CASH 자산 평가액 (이자 반영)
+    현재가 일괄 조회 + 환율 조회 (실패 시 기본 환율 1400)
 
     Returns:
-        (total_invested, total_value)
+        ({ticker: price}, exchange_rate)
     """
     from streamlit_app.utils.price_fetcher import get_multiple_prices, get_current_price
 
-    # 1. 현재가 조회
-    tickers = [row[0] for row in purchase_data]
     current_prices = get_multiple_prices(tickers) if tickers else {}
 
-    # 환율 조회
     exchange_rate = get_current_price('KRW=X')
     if not exchange_rate or exchange_rate <= 0:
         exchange_rate = 1400  # 기본 환율
 
-    # 2. 평가액 계산
+    return current_prices, exchange_rate
+
+
+def _value_portfolio(
+    purchase_data: List[Tuple],
+    cash_invested: float,
+    cash_value: float,
+    current_prices: Dict[str, Optional[float]],
+    exchange_rate: float
+) -> Tuple[int, int]:
+    """
+    조회해 둔 현재가 / 환율로 포트폴리오 평가액 계산 (네트워크 조회 없음)
+
+    Args:
+        purchase_data: [(ticker, quantity, invested), ...]
+        cash_invested: CASH 자산 투자원금
+        cash_value: CASH 자산 평가액 (이자 반영)
+        current_prices: {ticker: 현재가}
+        exchange_rate: USD/KRW 환율
+
+    Returns:
+        (total_invested, total_value)
+    """
     total_value = 0
     total_invested = 0
 
@@ -154,74 +240,134 @@ def _calculate_portfolio_value(purchase_data: List[Tuple], cash_invested: float,
             # 현재가 조회 실패 시 원금 사용 (fallback)
             total_value += invested
 
-    # 3. CASH 추가 (이자 반영)
+    # CASH 추가 (이자 반영)
     total_value += cash_value
     total_invested += cash_invested
 
     return int(total_invested), int(total_value)
 
 
-@st.cache_data(ttl=CACHE_TTL['monthly_data'])
-def get_monthly_summary(year_month: str, db_path: str = DB_PATH) -> Dict:
+def _calculate_portfolio_value(purchase_data: List[Tuple], cash_invested: float, cash_value: float) -> Tuple[int, int]:
     """
-    월별 요약 데이터 반환 (실시간 평가액)
+    포트폴리오 평가액 계산 (공통 로직)
+
+    Args:
+        purchase_data: [(ticker, quantity, invested), ...]
+        cash_invested: CASH 자산 투자원금
+        cash_value: CASH 자산 평가액 (이자 반영)
 
     Returns:
-        {
-            'total_value': int,      # 총 자산 (실시간 평가액)
-            'total_invested': int,   # 총 원금
-            'total_profit': int,     # 총 수익
-            'return_rate': float     # 수익률 (%)
-        }
+        (total_invested, total_value)
     """
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    current_prices, exchange_rate = _fetch_prices_and_rate([row[0] for row in purchase_data])
+    return _value_portfolio(purchase_data, cash_invested, cash_value, current_prices, exchange_rate)
 
-    # "전체 기간"인 경우
-    if year_month == "전체 기간":
-        # 모든 월의 데이터를 합산
-        all_months = get_available_months(db_path)
 
-        total_invested_sum = 0
-        total_value_sum = 0
+def _sum_cash_by(records: pd.DataFrame, key: str) -> Dict:
+    """
+    CASH 납입건을 key 컬럼별로 합산 (이자 반영 평가액은 전체 한 번에 계산)
 
-        for month in all_months:
-            month_id = get_month_id(month, db_path)
-            if not month_id:
-                continue
+    Args:
+        records: key, input_amount, purchase_date, interest_rate, interest_type 컬럼을 가진 DataFrame
+        key: 그룹 기준 컬럼 (month_id, account_id, 계좌명 등)
 
-            # STOCK/BOND: purchase_history에서 수량 조회
-            cursor.execute("""
-                SELECT
-                    ph.ticker,
-                    SUM(ph.quantity) as total_quantity,
-                    SUM(ph.input_amount) as invested
-                FROM purchase_history ph
-                JOIN accounts a ON ph.account_id = a.id
-                WHERE a.month_id = ? AND ph.asset_type IN ('STOCK', 'BOND')
-                GROUP BY ph.ticker
-            """, (month_id,))
-            purchase_data = cursor.fetchall()
+    Returns:
+        {key 값: (투자원금 합계, 평가액 합계)}
+    """
+    if records.empty:
+        return {}
+
+    values = calc_cash_values(
+        records['input_amount'], records['interest_rate'], records['purchase_date'], records['interest_type']
+    )
+    records = records.assign(value=values)
+    return {
+        group_key: (int(group['input_amount'].sum()), float(group['value'].to_numpy().sum()))
+        for group_key, group in records.groupby(key, sort=False)
+    }
+
+
+def _calc_month_values(db_path: str, year_months: Optional[List[str]] = None) -> Dict[str, Tuple[int, int]]:
+    """
+    여러 월의 원금 / 평가액 일괄 계산 (월별 get_monthly_summary와 같은 값)
 
-            # CASH: purchase_history에서 이자 반영 평가액 계산
-            cash_invested, cash_value = _calc_cash_value_from_db(db_path, month_id)
+    STOCK/BOND 수량과 CASH 납입건을 스냅샷에서 한 번에 합산하고,
+    현재가 / 환율도 1번만 조회한다 (월 수와 무관).
 
-            # 월별 평가액 계산
-            month_invested, month_value = _calculate_portfolio_value(purchase_data, cash_invested, cash_value)
+    Args:
+        db_path: DB 경로
+        year_months: 계산할 월 목록 (None이면 전체 월, DB에 없는 월은 결과에서 빠짐)
 
-            total_invested_sum += month_invested
-            total_value_sum += month_value
+    Returns:
+        {year_month: (total_invested, total_value)} (월마다 정수 절사)
+    """
+    snapshot = get_snapshot(db_path)
+    months = snapshot.months
+    if year_months is not None:
+        months = months[months['year_month'].isin(year_months)]
+    month_names = dict(zip(months['id'].tolist(), months['year_month']))
+
+    if not month_names:
+        return {}
+
+    purchases = snapshot.account_purchases()
+    purchases = purchases[purchases['month_id'].isin(list(month_names))]
+
+    # STOCK/BOND: 월 × 종목별 수량 (월별 조회와 같은 종목 순서)
+    stock_bond = _sum_purchases(purchases[purchases['asset_type'].isin(['STOCK', 'BOND'])], ['month_id', 'ticker'])
+    purchase_by_month: Dict[int, List[Tuple]] = {}
+    for month_id, ticker, quantity, invested in _records(stock_bond):
+        purchase_by_month.setdefault(month_id, []).append((ticker, quantity, invested))
+
+    # CASH: 월별 납입건 (이자 반영 평가액은 한 번에 계산)
+    cash_records = purchases[purchases['asset_type'] == 'CASH']
+    cash_by_month = _sum_cash_by(cash_records, 'month_id')
+
+    tickers = sorted({row[0] for rows in purchase_by_month.values() for row in rows})
+    current_prices, exchange_rate = _fetch_prices_and_rate(tickers)
+
+    values = {}
+    for month_id, year_month in month_names.items():
+        cash_invested, cash_value = cash_by_month.get(month_id, (0, 0.0))
+        values[year_month] = _value_portfolio(
+            purchase_by_month.get(month_id, []), cash_invested, cash_value, current_prices, exchange_rate
+        )
 
-        conn.close()
+    return values
 
-        total_invested = total_invested_sum
-        total_value = total_value_sum
+
+def _calc_all_time_summary(db_path: str) -> Tuple[int, int]:
+    """
+    "전체 기간" 원금 / 평가액: 월별 평가액(월마다 정수 절사)의 합계
+
+    Returns:
+        (total_invested, total_value)
+    """
+    values = _calc_month_values(db_path).values()
+    return sum(v[0] for v in values), sum(v[1] for v in values)
+
+
+@cache_by_data_version(ttl=CACHE_TTL['live_data'])
+def get_monthly_summary(year_month: str, db_path: str = DB_PATH) -> Dict:
+    """
+    월별 요약 데이터 반환 (실시간 평가액)
+
+    Returns:
+        {
+            'total_value': int,      # 총 자산 (실시간 평가액)
+            'total_invested': int,   # 총 원금
+            'total_profit': int,     # 총 수익
+            'return_rate': float     # 수익률 (%)
+        }
+    """
+    # "전체 기간"인 경우: 월별 평가액 합계 (쿼리 / 현재가 조회 횟수는 월 수와 무관)
+    if year_month == "전체 기간":
+        total_invested, total_value = _calc_all_time_summary(db_path)
 
     else:
         # 특정 월인 경우
         month_id = get_month_id(year_month, db_path)
         if not month_id:
-            conn.close()
             return {
                 'total_value': 0,
                 'total_invested': 0,
@@ -229,23 +375,15 @@ def get_monthly_summary(year_month: str, db_path: str = DB_PATH) -> Dict:
                 'return_rate': 0.0
             }
 
+        snapshot = get_snapshot(db_path)
+        purchases = snapshot.account_purchases()
+        purchases = purchases[purchases['month_id'].isin([month_id]) & purchases['asset_type'].isin(['STOCK', 'BOND'])]
+
         # STOCK/BOND: purchase_history에서 수량 조회
-        cursor.execute("""
-            SELECT
-                ph.ticker,
-                SUM(ph.quantity) as total_quantity,
-                SUM(ph.input_amount) as invested
-            FROM purchase_history ph
-            JOIN accounts a ON ph.account_id = a.id
-            WHERE a.month_id = ? AND ph.asset_type IN ('STOCK', 'BOND')
-            GROUP BY ph.ticker
-        """, (month_id,))
-        purchase_data = cursor.fetchall()
-
-        conn.close()
+        purchase_data = _records(_sum_purchases(purchases, ['ticker']))
 
         # CASH: purchase_history에서 이자 반영 평가액 계산
-        cash_invested, cash_value = _calc_cash_value_from_db(db_path, month_id)
+        cash_invested, cash_value = _calc_cash_value(snapshot, month_id)
 
         # 평가액 계산
         total_invested, total_value = _calculate_portfolio_value(purchase_data, cash_invested, cash_value)
@@ -262,7 +400,36 @@ def get_monthly_summary(year_month: str, db_path: str = DB_PATH) -> Dict:
     }
 
 
-@st.cache_data(ttl=CACHE_TTL['monthly_data'])
+@cache_by_data_version(ttl=CACHE_TTL['live_data'])
+def get_months_summary(year_months: List[str], db_path: str = DB_PATH) -> pd.DataFrame:
+    """
+    여러 월의 요약을 한 번에 반환 (월 × 지표, 쿼리 / 현재가 조회 횟수는 월 수와 무관)
+
+    Args:
+        year_months: 월 목록 (결과 행 순서, DB에 없는 월은 0)
+
+    Returns:
+        DataFrame with columns: ['월', '총 자산', '총 원금', '총 수익', '수익률']
+    """
+    values = _calc_month_values(db_path, year_months) if year_months else {}
+
+    data = []
+    for month in year_months:
+        total_invested, total_value = values.get(month, (0, 0))
+        total_profit = total_value - total_invested
+        return_rate = (total_profit / total_invested * 100) if total_invested > 0 else 0.0
+        data.append({
+            '월': month,
+            '총 자산': total_value,
+            '총 원금': total_invested,
+            '총 수익': total_profit,
+            '수익률': round(return_rate, 1)
+        })
+
+    return pd.DataFrame(data, columns=['월', '총 자산', '총 원금', '총 수익', '수익률'])
+
+
+@cache_by_data_version(ttl=CACHE_TTL['live_data'])
 def get_recent_months_data(current_month: str, num_months: int = 3, db_path: str = DB_PATH) -> pd.DataFrame:
     """
     최근 N개월 데이터를 테이블로 반환
@@ -279,23 +446,12 @@ def get_recent_months_data(current_month: str, num_months: int = 3, db_path: str
     except ValueError:
         selected_months = all_months[:num_months]
 
-    data = []
-    for month in selected_months:
-        summary = get_monthly_summary(month, db_path)
-        data.append({
-            '월': month,
-            '총 자산': summary['total_value'],
-            '총 원금': summary['total_invested'],
-            '총 수익': summary['total_profit'],
-            '수익률': summary['return_rate']
-        })
-
-    return pd.DataFrame(data)
+    return get_months_summary(selected_months, db_path)
 
 
 # ===== 자산 유형별 데이터 =====
 
-@st.cache_data(ttl=CACHE_TTL['monthly_data'])
+@cache_by_data_version(ttl=CACHE_TTL['monthly_data'])
 def get_asset_type_summary(year_month: str, db_path: str = DB_PATH) -> Dict[str, int]:
     """
     자산 유형별 요약
@@ -303,34 +459,21 @@ def get_asset_type_summary(year_month: str, db_path: str = DB_PATH) -> Dict[str,
     Returns:
         {'STOCK': int, 'BOND': int, 'CASH': int}
     """
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    snapshot = get_snapshot(db_path)
 
     # "전체 기간"인 경우 purchase_history에서 합산
     if year_month == "전체 기간":
-        cursor.execute("""
-            SELECT asset_type, SUM(input_amount) as total_amount
-            FROM purchase_history
-            GROUP BY asset_type
-        """)
+        rows, amount_column = snapshot.purchases, 'input_amount'
     else:
-        month_id = get_month_id(year_month, db_path)
+        month_id = snapshot.month_id(year_month)
         if not month_id:
-            conn.close()
             return {'STOCK': 0, 'BOND': 0, 'CASH': 0}
+        rows, amount_column = snapshot.month_rows('analyzed_holdings', month_id), 'my_amount'
 
-        cursor.execute("""
-            SELECT asset_type, SUM(my_amount) as total_amount
-            FROM analyzed_holdings
-            WHERE month_id = ? AND account_id IS NULL
-            GROUP BY asset_type
-        """, (month_id,))
-
-    results = cursor.fetchall()
-    conn.close()
+    totals = rows.groupby('asset_type', observed=True)[amount_column].sum()
 
     summary = {'STOCK': 0, 'BOND': 0, 'CASH': 0}
-    for asset_type, amount in results:
+    for asset_type, amount in totals.items():
         if asset_type in summary:
             summary[asset_type] = int(amount)
 
@@ -339,7 +482,7 @@ def get_asset_type_summary(year_month: str, db_path: str = DB_PATH) -> Dict[str,
 
 # ===== 계좌 데이터 =====
 
-@st.cache_data(ttl=CACHE_TTL['monthly_data'])
+@cache_by_data_version(ttl=CACHE_TTL['live_data'])
 def get_accounts(year_month: str, db_path: str = DB_PATH) -> List[Dict]:
     """
     해당 월의 모든 계좌 조회 (실시간 평가액)
@@ -357,148 +500,70 @@ def get_accounts(year_month: str, db_path: str = DB_PATH) -> List[Dict]:
             ...
         ]
     """
-    from streamlit_app.utils.price_fetcher import get_multiple_prices, get_current_price
+    snapshot = get_snapshot(db_path)
+    purchases = snapshot.account_purchases()
+    accounts_df = snapshot.accounts.astype({'name': object, 'type': object, 'broker': object})
 
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-
-    # "전체 기간"인 경우
+    # "전체 기간"인 경우: 계좌명 기준으로 모든 월 합산
     if year_month == "전체 기간":
-        cursor.execute("""
-            SELECT
-                MAX(a.id) as id,
-                a.name,
-                MAX(a.type) as type,
-                MAX(a.broker) as broker,
-                MAX(a.fee) as fee
-            FROM accounts a
-            GROUP BY a.name
-            ORDER BY a.name
-        """)
+        accounts_df = (
+            accounts_df.groupby('name', dropna=False)
+            .agg(id=('id', 'max'), type=('type', 'max'), broker=('broker', 'max'), fee=('fee', 'max'))
+            .reset_index()
+        )
+        purchase_rows = _sum_purchases(purchases, ['account_name', 'ticker', 'asset_type'])
+        cash_records = purchases[purchases['asset_type'] == 'CASH'].rename(columns={'account_name': 'account_key'})
+        key_index = 1
     else:
-        month_id = get_month_id(year_month, db_path)
+        month_id = snapshot.month_id(year_month)
         if not month_id:
-            conn.close()
             return []
 
-        cursor.execute("""
-            SELECT
-                a.id,
-                a.name,
-                a.type,
-                a.broker,
-                a.fee
-            FROM accounts a
-            WHERE a.month_id = ?
-            ORDER BY a.id
-        """, (month_id,))
+        accounts_df = accounts_df[accounts_df['month_id'].isin([month_id])]
 
-    accounts_basic = cursor.fetchall()
+        # 특정 월: account_id로 매칭 (계좌 전체 한 번에)
+        purchases = purchases[purchases['month_id'].isin([month_id])]
+        purchase_rows = _sum_purchases(
+            purchases[purchases['asset_type'].isin(['STOCK', 'BOND'])], ['account_id', 'ticker', 'asset_type']
+        )
+        cash_records = purchases[purchases['asset_type'] == 'CASH'].rename(columns={'account_id': 'account_key'})
+        key_index = 0
 
-    # 환율 조회
-    exchange_rate = get_current_price('KRW=X')
-    if not exchange_rate or exchange_rate <= 0:
-        exchange_rate = 1400
+    accounts_basic = _records(accounts_df[['id', 'name', 'type', 'broker', 'fee']])
+    purchase_rows = _records(purchase_rows.drop(columns='asset_type'))
 
-    accounts = []
-    for row in accounts_basic:
-        account_id = row[0]
-        account_name = row[1]
-
-        # 실시간 평가액 계산
-        if year_month == "전체 기간":
-            # 전체 기간: 계좌명으로 매칭
-            cursor.execute("""
-                SELECT
-                    ph.ticker,
-                    SUM(ph.quantity) as total_quantity,
-                    SUM(ph.input_amount) as invested,
-                    ph.asset_type
-                FROM purchase_history ph
-                JOIN accounts a ON ph.account_id = a.id
-                WHERE a.name = ?
-                GROUP BY ph.ticker, ph.asset_type
-            """, (account_name,))
-        else:
-            # 특정 월: account_id로 매칭
-            cursor.execute("""
-                SELECT
-                    ph.ticker,
-                    SUM(ph.quantity) as total_quantity,
-                    SUM(ph.input_amount) as invested,
-                    ph.asset_type
-                FROM purchase_history ph
-                WHERE ph.account_id = ? AND ph.asset_type IN ('STOCK', 'BOND')
-                GROUP BY ph.ticker, ph.asset_type
-            """, (account_id,))
-
-        purchase_data = cursor.fetchall()
+    purchase_by_account: Dict = {}
+    for account_key, ticker, quantity, invested in purchase_rows:
+        purchase_by_account.setdefault(account_key, []).append((ticker, quantity, invested))
 
-        # CASH: purchase_history에서 이자 반영 평가액 계산
-        if year_month == "전체 기간":
-            cash_records = pd.read_sql_query("""
-                SELECT ph.input_amount, ph.purchase_date, ph.interest_rate, ph.interest_type
-                FROM purchase_history ph
-                JOIN accounts a ON ph.account_id = a.id
-                WHERE a.name = ? AND ph.asset_type = 'CASH'
-            """, conn, params=(account_name,))
-        else:
-            cash_records = pd.read_sql_query("""
-                SELECT ph.input_amount, ph.purchase_date, ph.interest_rate, ph.interest_type
-                FROM purchase_history ph
-                WHERE ph.account_id = ? AND ph.asset_type = 'CASH'
-            """, conn, params=(account_id,))
-
-        cash_value = 0.0
-        for _, rec in cash_records.iterrows():
-            rate = rec['interest_rate'] if pd.notna(rec['interest_rate']) else None
-            itype = rec['interest_type'] if pd.notna(rec['interest_type']) else 'simple'
-            cash_value += calc_cash_current_value(
-                principal=int(rec['input_amount']),
-                annual_rate=rate,
-                purchase_date=rec['purchase_date'],
-                interest_type=itype,
-            )
-
-        # 현재가 조회
-        tickers = [row[0] for row in purchase_data]
-        current_prices = get_multiple_prices(tickers) if tickers else {}
+    # CASH: 이자 반영 평가액 (모든 계좌 한 번에)
+    cash_by_account = _sum_cash_by(cash_records, 'account_key')
 
-        # 평가액 계산
-        total_value = 0
-        for ticker, quantity, invested, asset_type in purchase_data:
-            current_price_usd = current_prices.get(ticker, 0)
-
-            if current_price_usd and current_price_usd > 0:
-                # 한국 주식은 이미 KRW
-                if ticker.endswith('.KS') or ticker.endswith('.KQ'):
-                    current_price_krw = current_price_usd
-                else:
-                    current_price_krw = current_price_usd * exchange_rate
-
-                value = quantity * current_price_krw
-                total_value += value
-            else:
-                # 현재가 조회 실패 시 원금 사용
-                total_value += invested
+    # 현재가 / 환율: 모든 계좌 종목을 합쳐 1번만 조회
+    tickers = sorted({row[1] for row in purchase_rows})
+    current_prices, exchange_rate = _fetch_prices_and_rate(tickers)
 
-        # CASH 추가 (이자 반영)
-        total_value += cash_value
+    accounts = []
+    for row in accounts_basic:
+        account_key = row[key_index]
+        cash_value = cash_by_account.get(account_key, (0, 0.0))[1]
+        _, total_value = _value_portfolio(
+            purchase_by_account.get(account_key, []), 0, cash_value, current_prices, exchange_rate
+        )
 
         accounts.append({
-            'id': account_id,
-            'name': account_name,
+            'id': row[0],
+            'name': row[1],
             'type': row[2],
             'broker': row[3],
             'fee': row[4],
-            'total_value': int(total_value)
+            'total_value': total_value
         })
 
-    conn.close()
     return accounts
 
 
-@st.cache_data(ttl=CACHE_TTL['monthly_data'])
+@cache_by_data_version(ttl=CACHE_TTL['live_data'])
 def get_account_holdings(year_month: str, account_id: int, db_path: str = DB_PATH) -> pd.DataFrame:
     """
     계좌별 보유 종목 조회 (실시간 평가액)
@@ -512,98 +577,69 @@ def get_account_holdings(year_month: str, account_id: int, db_path: str = DB_PAT
     """
     from streamlit_app.utils.price_fetcher import get_multiple_prices, get_current_price
 
-    conn = sqlite3.connect(db_path)
+    snapshot = get_snapshot(db_path)
+    holdings = snapshot.holdings.astype({'name': object, 'ticker_mapping': object, 'asset_type': object})
+    purchases = snapshot.purchases
+
+    def holding_rows(rows: pd.DataFrame, quantity, is_other) -> pd.DataFrame:
+        # holdings 행 → 화면 컬럼
+        return pd.DataFrame({
+            '종목명': rows['name'],
+            '티커': rows['ticker_mapping'],
+            '자산유형': rows['asset_type'],
+            '보유수량': quantity,
+            '투자원금': rows['amount'],
+            'is_other': is_other,
+        })
 
     # "전체 기간"인 경우
     if year_month == "전체 기간":
-        # purchase_history에서 조회
-        query_ph = """
-            SELECT
-                ph.ticker as 티커,
-                ph.ticker as 종목명,
-                ph.asset_type as 자산유형,
-                SUM(ph.quantity) as 보유수량,
-                SUM(ph.input_amount) as 투자원금,
-                CASE
-                    WHEN ph.ticker = 'OTHER' THEN 1
-                    ELSE 0
-                END as is_other
-            FROM purchase_history ph
-            JOIN accounts a ON ph.account_id = a.id
-            WHERE a.name = (SELECT name FROM accounts WHERE id = ?) AND ph.asset_type IN ('STOCK', 'BOND')
-            GROUP BY ph.ticker, ph.asset_type
-        """
-        df = pd.read_sql_query(query_ph, conn, params=(account_id,))
+        # purchase_history에서 조회 (같은 이름 계좌의 모든 월)
+        accounts = snapshot.accounts
+        account_name = accounts.loc[accounts['id'] == account_id, 'name']
+        same_name = accounts['name'].isin(account_name)
+        rows = purchases[purchases['account_id'].isin(accounts.loc[same_name, 'id'])
+                         & purchases['asset_type'].isin(['STOCK', 'BOND'])]
+        grouped = _sum_purchases(rows, ['ticker', 'asset_type'])
+        df = pd.DataFrame({
+            '티커': grouped['ticker'],
+            '종목명': grouped['ticker'],
+            '자산유형': grouped['asset_type'],
+            '보유수량': grouped['total_quantity'],
+            '투자원금': grouped['invested'],
+            'is_other': (grouped['ticker'] == 'OTHER').astype(int),
+        })
 
         # CASH 추가 (최신 월 holdings에서)
         latest_month = get_latest_month(db_path)
-        latest_month_id = get_month_id(latest_month, db_path) if latest_month else None
+        latest_month_id = snapshot.month_id(latest_month) if latest_month else None
         if latest_month_id:
-            query_cash = """
-                SELECT
-                    h.name as 종목명,
-                    h.ticker_mapping as 티커,
-                    h.asset_type as 자산유형,
-                    0.0 as 보유수량,
-                    h.amount as 투자원금,
-                    0 as is_other
-                FROM holdings h
-                JOIN accounts a ON h.account_id = a.id
-                WHERE a.name = (SELECT name FROM accounts WHERE id = ?)
-                  AND a.month_id = ?
-                  AND h.asset_type = 'CASH'
-            """
-            df_cash = pd.read_sql_query(query_cash, conn, params=(account_id, latest_month_id))
-            df = pd.concat([df, df_cash], ignore_index=True)
+            latest_accounts = accounts.loc[same_name & accounts['month_id'].isin([latest_month_id]), 'id']
+            cash = holdings[holdings['account_id'].isin(latest_accounts) & (holdings['asset_type'] == 'CASH')]
+            df = pd.concat([df, holding_rows(cash, 0.0, 0)], ignore_index=True)
     else:
         # 특정 월: holdings + purchase_history 병합
-        month_id = get_month_id(year_month, db_path)
+        month_id = snapshot.month_id(year_month)
         if not month_id:
-            conn.close()
             return pd.DataFrame()
 
-        # STOCK/BOND: purchase_history에서 수량 조회
-        query_ph = """
-            SELECT
-                h.name as 종목명,
-                h.ticker_mapping as 티커,
-                h.asset_type as 자산유형,
-                COALESCE(SUM(ph.quantity), 0) as 보유수량,
-                h.amount as 투자원금,
-                CASE
-                    WHEN h.ticker_mapping = 'OTHER' THEN 1
-                    ELSE 0
-                END as is_other
-            FROM holdings h
-            LEFT JOIN purchase_history ph ON h.account_id = ph.account_id
-                AND h.ticker_mapping = ph.ticker
-                AND h.asset_type = ph.asset_type
-            WHERE h.account_id = ? AND h.asset_type IN ('STOCK', 'BOND')
-            GROUP BY h.id, h.name, h.ticker_mapping, h.asset_type, h.amount
-        """
-        df_stock_bond = pd.read_sql_query(query_ph, conn, params=(account_id,))
+        account_holdings = holdings[holdings['account_id'].isin([account_id])]
+        is_other = (account_holdings['ticker_mapping'] == 'OTHER').astype(int)
+
+        # STOCK/BOND: purchase_history에서 수량 조회 (계좌 + 티커 + 자산유형 매칭)
+        stock_bond = account_holdings[account_holdings['asset_type'].isin(['STOCK', 'BOND'])]
+        quantities = _sum_purchases(purchases[purchases['account_id'].isin([account_id])], ['ticker', 'asset_type'])
+        quantity = stock_bond.merge(
+            quantities, how='left', left_on=['ticker_mapping', 'asset_type'], right_on=['ticker', 'asset_type']
+        )['total_quantity'].fillna(0).to_numpy()
+        df_stock_bond = holding_rows(stock_bond, quantity, is_other[stock_bond.index])
 
         # CASH: holdings에서만 조회
-        query_cash = """
-            SELECT
-                h.name as 종목명,
-                h.ticker_mapping as 티커,
-                h.asset_type as 자산유형,
-                0.0 as 보유수량,
-                h.amount as 투자원금,
-                CASE
-                    WHEN h.ticker_mapping = 'OTHER' THEN 1
-                    ELSE 0
-                END as is_other
-            FROM holdings h
-            WHERE h.account_id = ? AND h.asset_type = 'CASH'
-        """
-        df_cash = pd.read_sql_query(query_cash, conn, params=(account_id,))
+        cash = account_holdings[account_holdings['asset_type'] == 'CASH']
+        df_cash = holding_rows(cash, 0.0, is_other[cash.index])
 
         df = pd.concat([df_stock_bond, df_cash], ignore_index=True)
 
-    conn.close()
-
     # 타입 변환
     df['보유수량'] = pd.to_numeric(df['보유수량'], errors='coerce').fillna(0)
     df['투자원금'] = pd.to_numeric(df['투자원금'], errors='coerce').fillna(0)
@@ -624,43 +660,9 @@ def get_account_holdings(year_month: str, account_id: int, db_path: str = DB_PAT
         axis=1
     )
 
-    # CASH 이자 반영: purchase_history에서 interest_rate/interest_type으로 직접 계산
-    cash_value_map = {}  # 종목명 -> 평가액
-    cash_rows = df[df['자산유형'] == 'CASH']
-    if not cash_rows.empty:
-        conn2 = sqlite3.connect(db_path)
-        for _, crow in cash_rows.iterrows():
-            cash_name = crow['종목명']
-            # purchase_history에서 ticker 또는 name으로 매칭
-            cash_info = pd.read_sql_query("""
-                SELECT ph.input_amount, ph.purchase_date, ph.interest_rate, ph.interest_type
-                FROM purchase_history ph
-                WHERE ph.asset_type = 'CASH' AND ph.ticker = ?
-            """, conn2, params=(cash_name,))
-            if cash_info.empty:
-                # ticker_mapping이 다른 경우 holdings name으로 재시도
-                cash_info = pd.read_sql_query("""
-                    SELECT ph.input_amount, ph.purchase_date, ph.interest_rate, ph.interest_type
-                    FROM purchase_history ph
-                    JOIN accounts a ON ph.account_id = a.id
-                    JOIN holdings h ON h.account_id = a.id
-                        AND (h.ticker_mapping = ph.ticker OR h.name = ph.ticker)
-                        AND h.asset_type = 'CASH'
-                    WHERE h.name = ? AND ph.asset_type = 'CASH'
-                """, conn2, params=(cash_name,))
-            if not cash_info.empty:
-                total_val = 0.0
-                for _, rec in cash_info.iterrows():
-                    rate = rec['interest_rate'] if pd.notna(rec['interest_rate']) else None
-                    itype = rec['interest_type'] if pd.notna(rec['interest_type']) else 'simple'
-                    total_val += calc_cash_current_value(
-                        principal=int(rec['input_amount']),
-                        annual_rate=rate,
-                        purchase_date=rec['purchase_date'],
-                        interest_type=itype,
-                    )
-                cash_value_map[cash_name] = total_val
-        conn2.close()
+    # CASH 이자 반영: holding_id로 연결된 납입건 평가액 (상품 전체 한 번에 조회)
+    cash_names = df.loc[df['자산유형'] == 'CASH', '종목명']
+    cash_value_map = _get_cash_value_map(snapshot, cash_names)
 
     # 현재가 계산 (원화)
     def get_current_price_krw(row):
@@ -714,7 +716,7 @@ def get_account_holdings(year_month: str, account_id: int, db_path: str = DB_PAT
     return df
 
 
-@st.cache_data(ttl=CACHE_TTL['monthly_data'])
+@cache_by_data_version(ttl=CACHE_TTL['monthly_data'])
 def get_account_sectors(year_month: str, account_id: int, db_path: str = DB_PATH) -> pd.DataFrame:
     """
     계좌별 섹터 비중 조회
@@ -728,30 +730,25 @@ def get_account_sectors(year_month: str, account_id: int, db_path: str = DB_PATH
         if not year_month:
             return pd.DataFrame()
 
-    month_id = get_month_id(year_month, db_path)
+    snapshot = get_snapshot(db_path)
+    month_id = snapshot.month_id(year_month)
     if not month_id:
         return pd.DataFrame()
 
-    conn = sqlite3.connect(db_path)
-
-    query = """
-        SELECT
-            sector_name,
-            SUM(my_amount) as amount,
-            SUM(sector_percent) as percent
-        FROM analyzed_sectors
-        WHERE month_id = ? AND account_id = ?
-        GROUP BY sector_name
-        ORDER BY amount DESC
-    """
-
-    df = pd.read_sql_query(query, conn, params=(month_id, account_id))
-    conn.close()
+    rows = snapshot.month_rows('analyzed_sectors', month_id, account_id)
+    df = (
+        rows.groupby('sector_name', observed=True)
+        .agg(amount=('my_amount', 'sum'), percent=('sector_percent', 'sum'))
+        .reset_index()
+        .sort_values('amount', ascending=False, kind='stable')
+        .reset_index(drop=True)
+    )
+    df['sector_name'] = df['sector_name'].astype(str)
 
     return df
 
 
-@st.cache_data(ttl=CACHE_TTL['etf_data'])
+@cache_by_data_version(ttl=CACHE_TTL['etf_data'])
 def get_etf_lookthrough(year_month: str, account_id: int, top_n: int = 10, db_path: str = DB_PATH) -> pd.DataFrame:
     """
     ETF 투시 데이터 조회 (Top N만)
@@ -765,34 +762,28 @@ def get_etf_lookthrough(year_month: str, account_id: int, top_n: int = 10, db_pa
         if not year_month:
             return pd.DataFrame()
 
-    month_id = get_month_id(year_month, db_path)
+    snapshot = get_snapshot(db_path)
+    month_id = snapshot.month_id(year_month)
     if not month_id:
         return pd.DataFrame()
 
-    conn = sqlite3.connect(db_path)
-
-    query = """
-        SELECT
-            CASE
-                WHEN stock_symbol LIKE '%.KS' THEN stock_name || ' (' || stock_symbol || ')'
-                ELSE stock_symbol
-            END as 종목,
-            stock_symbol,
-            holding_percent,
-            my_amount,
-            source_ticker as '출처 ETF',
-            CASE
-                WHEN stock_symbol = 'OTHER' THEN 1
-                ELSE 0
-            END as is_other
-        FROM analyzed_holdings
-        WHERE month_id = ? AND account_id = ? AND asset_type = 'STOCK'
-        ORDER BY is_other ASC, my_amount DESC
-        LIMIT ?
-    """
-
-    df = pd.read_sql_query(query, conn, params=(month_id, account_id, top_n))
-    conn.close()
+    rows = snapshot.month_rows('analyzed_holdings', month_id, account_id)
+    rows = rows[rows['asset_type'] == 'STOCK']
+    symbol = rows['stock_symbol'].astype(str)
+    name = rows['stock_name'].astype(str)
+
+    df = pd.DataFrame({
+        '종목': symbol.where(~symbol.str.endswith('.KS'), name + ' (' + symbol + ')'),
+        'holding_percent': rows['holding_percent'],
+        'my_amount': rows['my_amount'],
+        '출처 ETF': rows['source_ticker'].astype(str),
+        'is_other': (symbol == 'OTHER').astype(int),
+    })
+    df = (
+        df.sort_values(['is_other', 'my_amount'], ascending=[True, False], kind='stable')
+        .head(top_n)
+        .reset_index(drop=True)
+    )
 
     # 계좌 내 비중 재계산
     total_amount = df['my_amount'].sum()
@@ -802,14 +793,14 @@ def get_etf_lookthrough(year_month: str, account_id: int, top_n: int = 10, db_pa
         df['ratio'] = df['holding_percent']
 
     # 불필요한 컬럼 제거
-    df = df.drop(['is_other', 'stock_symbol'], axis=1)
+    df = df.drop('is_other', axis=1)
 
     return df
 
 
 # ===== 전체 포트폴리오 데이터 =====
 
-@st.cache_data(ttl=CACHE_TTL['monthly_data'])
+@cache_by_data_version(ttl=CACHE_TTL['monthly_data'])
 def get_total_sectors(year_month: str, top_n: int = 10, db_path: str = DB_PATH) -> pd.DataFrame:
     """
     통합 섹터 비중 (Top N)
@@ -823,34 +814,27 @@ def get_total_sectors(year_month: str, top_n: int = 10, db_path: str = DB_PATH)
         if not year_month:
             return pd.DataFrame()
 
-    month_id = get_month_id(year_month, db_path)
+    snapshot = get_snapshot(db_path)
+    month_id = snapshot.month_id(year_month)
     if not month_id:
         return pd.DataFrame()
 
-    conn = sqlite3.connect(db_path)
-
-    query = """
-        SELECT
-            sector_name,
-            SUM(my_amount) as amount,
-            SUM(my_amount) * 100.0 / (
-                SELECT SUM(my_amount)
-                FROM analyzed_holdings
-                WHERE month_id = ? AND account_id IS NULL
-            ) as percent
-        FROM analyzed_sectors
-        WHERE month_id = ? AND account_id IS NULL
-        GROUP BY sector_name
-        ORDER BY amount DESC
-        LIMIT ?
-    """
-    df = pd.read_sql_query(query, conn, params=(month_id, month_id, top_n))
+    holdings_total = snapshot.month_rows('analyzed_holdings', month_id)['my_amount'].sum()
+    rows = snapshot.month_rows('analyzed_sectors', month_id)
+    df = (
+        rows.groupby('sector_name', observed=True)['my_amount'].sum()
+        .reset_index(name='amount')
+        .sort_values('amount', ascending=False, kind='stable')
+        .head(top_n)
+        .reset_index(drop=True)
+    )
+    df['sector_name'] = df['sector_name'].astype(str)
+    df['percent'] = df['amount'] * 100.0 / holdings_total if holdings_total else float('nan')
 
-    conn.close()
     return df
 
 
-@st.cache_data(ttl=CACHE_TTL['monthly_data'])
+@cache_by_data_version(ttl=CACHE_TTL['live_data'])
 def get_total_top_holdings(year_month: str, top_n: int = 20, db_path: str = DB_PATH) -> pd.DataFrame:
     """
     통합 보유 종목 Top N (현재 평가액 기준)
@@ -860,107 +844,32 @@ def get_total_top_holdings(year_month: str, top_n: int = 20, db_path: str = DB_P
     """
     from streamlit_app.utils.price_fetcher import get_multiple_prices, get_current_price
 
-    conn = sqlite3.connect(db_path)
+    snapshot = get_snapshot(db_path)
+    purchases = snapshot.account_purchases()
 
     # purchase_history에서 직접 매수한 종목의 수량 조회
     if year_month == "전체 기간":
-        query = """
-            SELECT
-                ticker,
-                asset_type,
-                SUM(quantity) as total_quantity,
-                SUM(input_amount) as invested
-            FROM purchase_history
-            GROUP BY ticker, asset_type
-        """
-        df = pd.read_sql_query(query, conn)
+        rows = snapshot.purchases
     else:
-        month_id = get_month_id(year_month, db_path)
+        month_id = snapshot.month_id(year_month)
         if not month_id:
-            conn.close()
             return pd.DataFrame()
 
-        query = """
-            SELECT
-                ph.ticker,
-                ph.asset_type,
-                SUM(ph.quantity) as total_quantity,
-                SUM(ph.input_amount) as invested
-            FROM purchase_history ph
-            JOIN accounts a ON ph.account_id = a.id
-            WHERE a.month_id = ?
-            GROUP BY ph.ticker, ph.asset_type
-        """
-        df = pd.read_sql_query(query, conn, params=(month_id,))
+        purchases = purchases[purchases['month_id'].isin([month_id])]
+        rows = purchases
+    df = _sum_purchases(rows, ['ticker', 'asset_type'])
 
-    # CASH 추가 (purchase_history에서 이자 정보 포함)
-    if year_month == "전체 기간":
-        query_cash = """
-            SELECT
-                h.name as ticker,
-                'CASH' as asset_type,
-                0.0 as total_quantity,
-                SUM(ph.input_amount) as invested
-            FROM purchase_history ph
-            JOIN accounts a ON ph.account_id = a.id
-            JOIN holdings h ON h.account_id = a.id AND h.ticker_mapping = ph.ticker AND h.asset_type = ph.asset_type
-            WHERE ph.asset_type = 'CASH'
-            GROUP BY h.name
-        """
-        df_cash = pd.read_sql_query(query_cash, conn)
-    else:
-        query_cash = """
-            SELECT
-                h.name as ticker,
-                'CASH' as asset_type,
-                0.0 as total_quantity,
-                SUM(ph.input_amount) as invested
-            FROM purchase_history ph
-            JOIN accounts a ON ph.account_id = a.id
-            JOIN holdings h ON h.account_id = a.id AND h.ticker_mapping = ph.ticker AND h.asset_type = ph.asset_type
-            WHERE a.month_id = ? AND ph.asset_type = 'CASH'
-            GROUP BY h.name
-        """
-        df_cash = pd.read_sql_query(query_cash, conn, params=(month_id,))
+    # CASH 추가 (holding_id로 연결된 상품 이름별 납입 원금)
+    holding_names = snapshot.holdings.set_index('id')['name'].astype(object)
+    cash = purchases[purchases['asset_type'] == 'CASH']
+    cash = cash.assign(ticker=cash['holding_id'].map(holding_names)).dropna(subset=['ticker'])
+    df_cash = _sum_purchases(cash, ['ticker']).assign(asset_type='CASH', total_quantity=0.0)
 
     if not df_cash.empty:
-        df = pd.concat([df, df_cash], ignore_index=True)
-
-    # CASH 이자 반영 평가액을 미리 계산
-    cash_value_map = {}
-    cash_names = df[df['asset_type'] == 'CASH']['ticker'].unique()
-    for cash_name in cash_names:
-        # purchase_history에서 ticker로 직접 매칭
-        cash_info = pd.read_sql_query("""
-            SELECT ph.input_amount, ph.purchase_date, ph.interest_rate, ph.interest_type
-            FROM purchase_history ph
-            WHERE ph.asset_type = 'CASH' AND ph.ticker = ?
-        """, conn, params=(cash_name,))
-        if cash_info.empty:
-            # holdings name으로 재시도
-            cash_info = pd.read_sql_query("""
-                SELECT ph.input_amount, ph.purchase_date, ph.interest_rate, ph.interest_type
-                FROM purchase_history ph
-                JOIN accounts a ON ph.account_id = a.id
-                JOIN holdings h ON h.account_id = a.id
-                    AND (h.ticker_mapping = ph.ticker OR h.name = ph.ticker)
-                    AND h.asset_type = 'CASH'
-                WHERE h.name = ? AND ph.asset_type = 'CASH'
-            """, conn, params=(cash_name,))
-        if not cash_info.empty:
-            total_val = 0.0
-            for _, rec in cash_info.iterrows():
-                rate = rec['interest_rate'] if pd.notna(rec['interest_rate']) else None
-                itype = rec['interest_type'] if pd.notna(rec['interest_type']) else 'simple'
-                total_val += calc_cash_current_value(
-                    principal=int(rec['input_amount']),
-                    annual_rate=rate,
-                    purchase_date=rec['purchase_date'],
-                    interest_type=itype,
-                )
-            cash_value_map[cash_name] = total_val
+        df = pd.concat([df, df_cash[df.columns]], ignore_index=True)
 
-    conn.close()
+    # CASH 이자 반영 평가액을 미리 계산 (상품 전체 한 번에 조회)
+    cash_value_map = _get_cash_value_map(snapshot, df.loc[df['asset_type'] == 'CASH', 'ticker'])
 
     if df.empty:
         return pd.DataFrame()
@@ -1017,7 +926,7 @@ def get_total_top_holdings(year_month: str, top_n: int = 20, db_path: str = DB_P
     return result
 
 
-@st.cache_data(ttl=CACHE_TTL['monthly_data'])
+@cache_by_data_version(ttl=CACHE_TTL['monthly_data'])
 def get_total_lookthrough_holdings(year_month: str, top_n: int = 50, db_path: str = DB_PATH) -> pd.DataFrame:
     """
     전체 포트폴리오 ETF 투시 보유 종목 Top N
@@ -1028,48 +937,36 @@ def get_total_lookthrough_holdings(year_month: str, top_n: int = 50, db_path: st
     Returns:
         DataFrame with columns: ['종목', '유형', '비중(%)', '평가금액', '출처 ETF']
     """
-    conn = sqlite3.connect(db_path)
+    snapshot = get_snapshot(db_path)
 
     if year_month == "전체 기간":
         # 전체 기간: 모든 월의 투시 데이터를 합산
-        query = """
-            SELECT
-                stock_symbol,
-                MAX(stock_name) as stock_name,
-                asset_type as 유형,
-                GROUP_CONCAT(DISTINCT source_ticker) as '출처 ETF',
-                SUM(my_amount) as amount
-            FROM analyzed_holdings
-            WHERE account_id IS NULL
-            GROUP BY stock_symbol, asset_type
-            ORDER BY
-                CASE WHEN stock_symbol = 'OTHER' THEN 1 ELSE 0 END,
-                amount DESC
-            LIMIT ?
-        """
-        df = pd.read_sql_query(query, conn, params=(top_n,))
+        rows = snapshot.analyzed_holdings
+        rows = rows[rows['account_id'].isna()]
     else:
-        month_id = get_month_id(year_month, db_path)
+        month_id = snapshot.month_id(year_month)
         if not month_id:
-            conn.close()
             return pd.DataFrame()
 
-        query = """
-            SELECT
-                stock_symbol,
-                MAX(stock_name) as stock_name,
-                asset_type as 유형,
-                GROUP_CONCAT(DISTINCT source_ticker) as '출처 ETF',
-                SUM(my_amount) as amount
-            FROM analyzed_holdings
-            WHERE month_id = ? AND account_id IS NULL
-            GROUP BY stock_symbol, asset_type
-            ORDER BY
-                CASE WHEN stock_symbol = 'OTHER' THEN 1 ELSE 0 END,
-                amount DESC
-            LIMIT ?
-        """
-        df = pd.read_sql_query(query, conn, params=(month_id, top_n))
+        rows = snapshot.month_rows('analyzed_holdings', month_id)
+
+    rows = rows.astype({'stock_symbol': object, 'stock_name': object, 'asset_type': object, 'source_ticker': object})
+    df = (
+        rows.groupby(['stock_symbol', 'asset_type'], dropna=False)
+        .agg(
+            stock_name=('stock_name', 'max'),
+            source_etfs=('source_ticker', lambda tickers: ','.join(tickers.dropna().unique())),
+            amount=('my_amount', 'sum'),
+        )
+        .reset_index()
+        .rename(columns={'asset_type': '유형', 'source_etfs': '출처 ETF'})
+    )
+    df = (
+        df.assign(is_other=(df['stock_symbol'] == 'OTHER').astype(int))
+        .sort_values(['is_other', 'amount'], ascending=[True, False], kind='stable')
+        .head(top_n)
+        .reset_index(drop=True)
+    )
 
     if not df.empty:
         # 종목명 표시: 한국 주식은 이름(티커), OTHER는 이름, 나머지는 티커
@@ -1083,8 +980,6 @@ def get_total_lookthrough_holdings(year_month: str, top_n: int = 50, db_path: st
             return sym
         df['종목'] = df.apply(format_name, axis=1)
 
-    conn.close()
-
     if df.empty:
         return pd.DataFrame()
 
@@ -1101,7 +996,7 @@ def get_total_lookthrough_holdings(year_month: str, top_n: int = 50, db_path: st
     return result
 
 
-@st.cache_data(ttl=CACHE_TTL['monthly_data'])
+@cache_by_data_version(ttl=CACHE_TTL['monthly_data'])
 def get_hierarchical_portfolio_data(year_month: str, db_path: str = DB_PATH) -> pd.DataFrame:
     """
     Sunburst 차트용 계층 데이터
@@ -1142,26 +1037,20 @@ def get_hierarchical_portfolio_data(year_month: str, db_path: str = DB_PATH) ->
     if not effective_month:
         return pd.DataFrame(columns=['labels', 'parents', 'values', 'colors'])
 
-    month_id = get_month_id(effective_month, db_path)
+    snapshot = get_snapshot(db_path)
+    month_id = snapshot.month_id(effective_month)
     if not month_id:
         return pd.DataFrame(columns=['labels', 'parents', 'values', 'colors'])
 
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    rows = snapshot.month_rows('analyzed_sectors', month_id)
+    sectors = (
+        rows.groupby(['sector_name', 'asset_type'], observed=True, dropna=False)['my_amount'].sum()
+        .reset_index(name='amount')
+        .sort_values('amount', ascending=False, kind='stable')
+        .head(15)
+    )
 
-    cursor.execute("""
-        SELECT
-            sector_name,
-            asset_type,
-            SUM(my_amount) as amount
-        FROM analyzed_sectors
-        WHERE month_id = ? AND account_id IS NULL
-        GROUP BY sector_name, asset_type
-        ORDER BY amount DESC
-        LIMIT 15
-    """, (month_id,))
-
-    for sector_name, asset_type, amount in cursor.fetchall():
+    for sector_name, asset_type, amount in sectors.itertuples(index=False):
         if asset_type in ['STOCK', 'BOND']:
             # 색상: 자산 유형별로 밝기 조정
             base_color = color_map.get(asset_type, '#95a5a6')
@@ -1172,16 +1061,17 @@ def get_hierarchical_portfolio_data(year_month: str, db_path: str = DB_PATH) ->
                 'colors': base_color
             })
 
-    conn.close()
-
     return pd.DataFrame(data)
 
 
-@st.cache_data(ttl=CACHE_TTL['monthly_data'])
+@cache_by_data_version(ttl=CACHE_TTL['monthly_data'])
 def search_total_holdings(year_month: str, ticker: str, db_path: str = DB_PATH) -> Optional[Dict]:
     """
     종목 검색 (직접 + ETF 통합)
 
+    ETF 경유 보유는 분석 시 생성한 stock_exposures 역색인에서 조회
+    (색인이 없는 이전 분석 월은 analyzed_holdings 전체 분석 행으로 대체, 수량 0)
+
     Returns:
         {
             'ticker': str,
@@ -1190,7 +1080,7 @@ def search_total_holdings(year_month: str, ticker: str, db_path: str = DB_PATH)
             'direct_value': int,
             'etf_shares': float,
             'etf_value': int,
-            'etf_details': List[Tuple],
+            'etf_details': List[Tuple],  # (출처 ETF, 환산 수량, 금액)
             'total_shares': float,
             'total_value': int
         }
@@ -1201,42 +1091,74 @@ def search_total_holdings(year_month: str, ticker: str, db_path: str = DB_PATH)
         if not year_month:
             return None
 
-    month_id = get_month_id(year_month, db_path)
+    snapshot = get_snapshot(db_path)
+    month_id = snapshot.month_id(year_month)
     if not month_id:
         return None
 
+    # 직접 보유 확인
+    month_accounts = snapshot.accounts.loc[snapshot.accounts['month_id'].isin([month_id]), 'id']
+    holdings = snapshot.holdings
+    direct_value = int(holdings.loc[
+        (holdings['ticker_mapping'] == ticker) & holdings['account_id'].isin(month_accounts), 'amount'
+    ].sum())
+
+    purchases = snapshot.purchases
+    direct_shares = float(purchases.loc[
+        (purchases['ticker'] == ticker) & (purchases['year_month'] == year_month), 'quantity'
+    ].sum())
+
+    # ETF 통해 보유 확인 (역색인: 스냅샷에 싣지 않고 종목 인덱스로 조회)
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
-
-    # 직접 보유 확인
-    cursor.execute("""
-        SELECT SUM(amount) as direct_value
-        FROM holdings
-        WHERE ticker_mapping = ? AND account_id IN (
-            SELECT id FROM accounts WHERE month_id = ?
-        )
-    """, (ticker, month_id))
-    result = cursor.fetchone()
-    direct_value = int(result[0]) if result and result[0] else 0
-
-    # ETF 통해 보유 확인
     cursor.execute("""
         SELECT
             source_ticker,
-            SUM(my_amount) as etf_value
-        FROM analyzed_holdings
-        WHERE stock_symbol = ? AND month_id = ? AND account_id IS NULL
+            SUM(implied_shares) as etf_shares,
+            SUM(my_amount) as etf_value,
+            MAX(stock_name) as stock_name
+        FROM stock_exposures
+        WHERE stock_symbol = ? AND month_id = ? AND is_direct = 0
         GROUP BY source_ticker
+        ORDER BY etf_value DESC
     """, (ticker, month_id))
+    exposure_rows = cursor.fetchall()
+
+    unindexed_month = False
+    if not exposure_rows:
+        cursor.execute("SELECT 1 FROM stock_exposures WHERE month_id = ? LIMIT 1", (month_id,))
+        unindexed_month = cursor.fetchone() is None
+    conn.close()
+
+    if unindexed_month:
+        # 색인 생성 이전에 분석된 월
+        rows = snapshot.month_rows('analyzed_holdings', month_id)
+        rows = rows[(rows['stock_symbol'] == ticker)
+                    & (rows['source_ticker'].astype(object) != rows['stock_symbol'].astype(object))]
+        rows = rows.astype({'source_ticker': object, 'stock_name': object})
+        fallback = (
+            rows.groupby('source_ticker')
+            .agg(etf_value=('my_amount', 'sum'), stock_name=('stock_name', 'max'))
+            .reset_index()
+            .sort_values('etf_value', ascending=False, kind='stable')
+        )
+        exposure_rows = [
+            (source_ticker, 0.0, etf_value, stock_name)
+            for source_ticker, etf_value, stock_name in _records(fallback)
+        ]
 
     etf_details = []
+    etf_shares_total = 0.0
     etf_value_total = 0
-    for source_ticker, etf_value in cursor.fetchall():
+    name = ticker
+    for source_ticker, etf_shares, etf_value, stock_name in exposure_rows:
+        etf_shares = float(etf_shares or 0.0)
         etf_value = int(etf_value)
-        etf_details.append((source_ticker, 0.0, etf_value))  # 수량은 계산 안 함
+        etf_details.append((source_ticker, etf_shares, etf_value))
+        etf_shares_total += etf_shares
         etf_value_total += etf_value
-
-    conn.close()
+        if stock_name:
+            name = stock_name
 
     # 결과가 없으면 None 반환
     if direct_value == 0 and etf_value_total == 0:
@@ -1244,18 +1166,51 @@ def search_total_holdings(year_month: str, ticker: str, db_path: str = DB_PATH)
 
     return {
         'ticker': ticker,
-        'name': ticker,  # 실제로는 종목명 조회 필요
-        'direct_shares': 0.0,  # 수량 계산 생략
+        'name': name,
+        'direct_shares': direct_shares,
         'direct_value': direct_value,
-        'etf_shares': 0.0,  # 수량 계산 생략
+        'etf_shares': etf_shares_total,
         'etf_value': etf_value_total,
         'etf_details': etf_details,
-        'total_shares': 0.0,
+        'total_shares': direct_shares + etf_shares_total,
         'total_value': direct_value + etf_value_total
     }
 
 
-@st.cache_data(ttl=CACHE_TTL['monthly_data'])
+@cache_by_data_version(ttl=CACHE_TTL['monthly_data'])
+def get_stock_exposure_history(ticker: str, db_path: str = DB_PATH) -> pd.DataFrame:
+    """
+    종목 하나의 전체 기간 노출 내역 (stock_exposures 역색인 조회)
+
+    Returns:
+        DataFrame with columns:
+        ['year_month', 'account_name', 'source_ticker', 'amount', 'implied_shares', 'is_direct']
+        (account_name이 None이면 계좌별 분석 없이 전체 분석만 있는 월)
+    """
+    conn = sqlite3.connect(db_path)
+
+    query = """
+        SELECT
+            m.year_month,
+            a.name as account_name,
+            e.source_ticker,
+            e.my_amount as amount,
+            e.implied_shares,
+            e.is_direct
+        FROM stock_exposures e
+        JOIN months m ON e.month_id = m.id
+        LEFT JOIN accounts a ON e.account_id = a.id
+        WHERE e.stock_symbol = ?
+        ORDER BY m.year_month, a.name, e.my_amount DESC
+    """
+
+    df = pd.read_sql_query(query, conn, params=(ticker,))
+    conn.close()
+
+    return df
+
+
+@cache_by_data_version(ttl=CACHE_TTL['live_data'])
 def get_monthly_holdings_comparison(year_month: str, db_path: str = DB_PATH) -> pd.DataFrame:
     """
     월별 계좌+종목별 투자 내역 비교 (실시간 수익률 포함)
@@ -1424,8 +1379,8 @@ def load_yaml_data(year_month: str) -> Optional[Dict]:
     if not yaml_path.exists():
         return None
 
-    with open(yaml_path, 'r', encoding='utf-8') as f:
-        return yaml.safe_load(f)
+    # 파일이 바뀌지 않았으면 파싱 없이 캐시 반환 (data/yaml_loader.py)
+    return load_yaml(str(yaml_path))
 
 
 def get_yaml_available_months() -> List[str]:
@@ -6,6 +6,7 @@ from streamlit_app.data_loader import (
     get_asset_type_summary,
     get_hierarchical_portfolio_data,
     search_total_holdings,
+    get_stock_exposure_history,
     get_total_sectors,
     get_total_top_holdings,
     get_total_lookthrough_holdings,
@@ -163,21 +164,26 @@ def render_stock_search(selected_month: str):
         st.metric(
             "💼 직접 보유",
             f"{result['direct_value']:,}원",
-            help="직접 매수한 금액"
+            delta=f"{result['direct_shares']:,.4f}주" if result['direct_shares'] else None,
+            delta_color="off",
+            help="직접 매수한 금액 (이번 달 매수 수량)"
         )
 
     with col2:
         st.metric(
             "📦 ETF 통해",
             f"{result['etf_value']:,}원",
-            help="ETF에 포함되어 간접 보유하는 금액"
+            delta=f"약 {result['etf_shares']:,.4f}주" if result['etf_shares'] else None,
+            delta_color="off",
+            help="ETF에 포함되어 간접 보유하는 금액 (현재가 기준 환산 수량)"
         )
 
     # ETF별 상세 내역
     if result['etf_details']:
         st.caption("ETF별 상세 내역:")
         for etf_name, shares, value in result['etf_details']:
-            st.caption(f"  • {etf_name}에서: {value:,}원")
+            shares_text = f" (약 {shares:,.4f}주)" if shares else ""
+            st.caption(f"  • {etf_name}에서: {value:,}원{shares_text}")
 
     st.divider()
 
@@ -188,6 +194,21 @@ def render_stock_search(selected_month: str):
         help="직접 보유 + ETF 통한 간접 보유"
     )
 
+    # 전체 기간 노출 추이 (역색인)
+    history = get_stock_exposure_history(result['ticker'])
+    if not history.empty:
+        with st.expander("📈 월별 노출 추이 (전체 계좌)"):
+            monthly = history.groupby('year_month')[['amount', 'implied_shares']].sum()
+            st.bar_chart(monthly['amount'])
+            st.dataframe(
+                history.rename(columns={
+                    'year_month': '월', 'account_name': '계좌', 'source_ticker': '출처',
+                    'amount': '금액', 'implied_shares': '환산 수량', 'is_direct': '직접 보유'
+                }),
+                hide_index=True,
+                width='stretch'
+            )
+
 
 def render_sector_chart(selected_month: str):
     """섹터 차트"""
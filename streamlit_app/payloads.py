@@ -0,0 +1,180 @@
+"""
+대시보드 사전 계산 데이터 (파이프라인 마지막 단계에서 생성)
+- 페이지가 조회하는 DB 전용 데이터셋(투시 종목, 섹터 Top N, Sunburst, 계좌별 섹터 등)을 월마다 미리 계산
+- DB 옆 파일(<db>.payloads)에 데이터 버전과 함께 저장 → 버전이 같을 때만 사용, 다르면 기존처럼 직접 계산
+- 현재가를 반영하는 데이터는 저장하지 않음 (TTL 캐시로 갱신)
+- 한 달만 바뀐 경우(감시 모드) 그 월 / "전체 기간" / 월 목록만 다시 계산하고 나머지는 기존 파일에서 재사용
+"""
+import inspect
+import os
+import pickle
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import streamlit as st
+
+from streamlit_app.config import DB_PATH
+from streamlit_app.snapshot import get_data_version, get_snapshot
+
+# get_payload에서 저장된 결과가 없을 때 반환 (None도 저장될 수 있으므로 별도 표식)
+MISSING = object()
+
+
+def get_payload_path(db_path: str) -> str:
+    """사전 계산 파일 경로 (DB 파일 옆)"""
+    return f"{db_path}.payloads"
+
+
+def payload_key(name: str, arguments: Dict) -> Tuple:
+    """
+    사전 계산 결과 키: (함수명, db_path를 뺀 인자)
+
+    Args:
+        name: data_loader 함수명
+        arguments: 기본값까지 채운 인자 (BoundArguments.arguments)
+
+    Returns:
+        ('get_total_sectors', (('year_month', '2025-12'), ('top_n', 10)))
+    """
+    return (name, tuple(
+        (arg, tuple(value) if isinstance(value, list) else value)
+        for arg, value in arguments.items() if arg != 'db_path'
+    ))
+
+
+def read_payloads(db_path: str, data_version: Tuple[int, ...]) -> Dict[Tuple, bytes]:
+    """
+    사전 계산 파일 읽기 (캐시 없음)
+
+    Args:
+        db_path: DB 경로
+        data_version: 현재 DB 데이터 버전
+
+    Returns:
+        {키: pickle bytes} (파일이 없거나 깨졌거나 데이터 버전이 다르면 빈 dict)
+    """
+    try:
+        with open(get_payload_path(db_path), 'rb') as f:
+            stored = pickle.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"⚠️ 대시보드 사전 계산 파일 읽기 실패 (직접 계산): {e}")
+        return {}
+
+    if stored.get('data_version') != tuple(data_version):
+        return {}
+    return stored['payloads']
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _cached_payloads(db_path: str, data_version: Tuple[int, ...]) -> Dict[Tuple, bytes]:
+    """(DB 경로, 데이터 버전)별 사전 계산 데이터 (모든 세션 공유)"""
+    return read_payloads(db_path, data_version)
+
+
+def get_payload(db_path: str, data_version: Tuple[int, ...], key: Tuple) -> Any:
+    """
+    사전 계산 결과 조회
+
+    Args:
+        db_path: DB 경로
+        data_version: 현재 DB 데이터 버전
+        key: payload_key 결과
+
+    Returns:
+        저장된 결과 (호출마다 새 객체), 없으면 MISSING
+    """
+    payload = _cached_payloads(db_path, data_version).get(key)
+    return MISSING if payload is None else pickle.loads(payload)
+
+
+def build_dashboard_payloads(
+    db_path: str = DB_PATH,
+    year_months: Optional[List[str]] = None,
+    base_version: Optional[Tuple[int, ...]] = None
+) -> int:
+    """
+    대시보드 페이지 데이터셋을 월마다 미리 계산해 저장
+
+    파이프라인 마지막 단계(DB 쓰기가 모두 끝난 뒤)에서 실행한다.
+    저장 후 DB가 바뀌면 데이터 버전이 달라져 대시보드는 직접 계산으로 돌아간다.
+
+    year_months를 주면 기존 파일이 base_version(해당 월을 바꾸기 직전 DB 버전) 기준일 때
+    그 월 / "전체 기간" / 월 목록만 다시 계산하고 다른 월의 데이터셋은 그대로 재사용한다.
+    (기존 파일이 없거나 버전이 다르면 전체 계산)
+
+    Args:
+        db_path: DB 경로
+        year_months: 바뀐 월 목록 (None이면 전체 계산)
+        base_version: 바뀌기 직전 DB 데이터 버전 (year_months와 함께 사용)
+
+    Returns:
+        저장한 데이터셋 수 (계산 중 DB가 바뀌었으면 0, 저장하지 않음)
+    """
+    from streamlit.logger import set_log_level
+    set_log_level('error')  # 스트림릿 런타임 밖 실행 경고(bare mode) 숨김
+    from streamlit_app import data_loader as loader
+
+    data_version = get_data_version(db_path)
+    payloads = {}
+
+    # 바뀐 월만 다시 계산: 기존 파일에서 그 외 월의 키 재사용
+    rebuild = None
+    if year_months is not None and base_version is not None:
+        previous = read_payloads(db_path, base_version)
+        if previous:
+            rebuild = set(year_months) | {"전체 기간"}
+            payloads = {
+                key: payload for key, payload in previous.items()
+                if dict(key[1]).get('year_month') not in rebuild
+            }
+
+    def store(func: Callable, *args, **kwargs):
+        # 키는 페이지 호출과 같은 방식(기본값 포함 인자)으로 계산
+        bound = inspect.signature(func).bind(*args, db_path=db_path, **kwargs)
+        bound.apply_defaults()
+        result = func.__wrapped__(*args, db_path=db_path, **kwargs)
+        payloads[payload_key(func.__name__, bound.arguments)] = pickle.dumps(
+            result, protocol=pickle.HIGHEST_PROTOCOL
+        )
+
+    store(loader.get_available_months)
+    store(loader.get_latest_month)
+
+    # 전체 포트폴리오 페이지 (top_n은 페이지 호출 인자와 같아야 함)
+    months = loader.get_available_months.__wrapped__(db_path)
+    for year_month in months + ["전체 기간"]:
+        if rebuild is not None and year_month not in rebuild:
+            continue
+        store(loader.get_asset_type_summary, year_month)
+        store(loader.get_hierarchical_portfolio_data, year_month)
+        store(loader.get_total_sectors, year_month, top_n=10)
+        store(loader.get_total_lookthrough_holdings, year_month, top_n=50)
+
+    # 계좌별 포트폴리오 페이지
+    snapshot = get_snapshot(db_path)
+    month_names = dict(zip(snapshot.months['id'], snapshot.months['year_month']))
+    for month_id, account_id in snapshot.accounts[['month_id', 'id']].itertuples(index=False):
+        year_month = month_names.get(month_id)
+        if year_month is None or (rebuild is not None and year_month not in rebuild):
+            continue
+        store(loader.get_account_sectors, year_month, int(account_id))
+        store(loader.get_etf_lookthrough, year_month, int(account_id), top_n=999)
+
+    if get_data_version(db_path) != data_version:
+        print("⚠️ 계산 중 DB가 변경되어 대시보드 데이터를 저장하지 않습니다.")
+        return 0
+
+    # 임시 파일에 쓴 뒤 교체 (대시보드가 쓰는 중인 파일을 읽지 않도록)
+    path = get_payload_path(db_path)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump({'data_version': data_version, 'payloads': payloads}, f,
+                    protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+    if rebuild is None:
+        print(f"✅ 대시보드 데이터 {len(payloads)}건 저장 ({len(months)}개월): {path}")
+    else:
+        print(f"✅ 대시보드 데이터 {len(payloads)}건 저장 ({len(months)}개월 중 {', '.join(sorted(year_months))}만 갱신): {path}")
+    return len(payloads)
@@ -0,0 +1,160 @@
+"""
+포트폴리오 스냅샷: DB 전체를 메모리 DataFrame으로 1번 읽어 모든 세션이 공유
+- st.cache_resource에 (DB 경로, 데이터 버전)별로 보관 → 파이프라인 실행 후 첫 조회에서만 다시 읽음
+- 반복되는 문자열 컬럼(티커, 종목명, 섹터 등)은 category로 저장
+"""
+import os
+import sqlite3
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import pandas as pd
+import streamlit as st
+
+from streamlit_app.config import DB_PATH
+
+
+# 테이블별로 읽을 컬럼 / category로 저장할 컬럼
+SNAPSHOT_TABLES = {
+    'months': ("SELECT id, year_month FROM months ORDER BY id", []),
+    'accounts': ("SELECT id, month_id, name, type, broker, fee FROM accounts ORDER BY id",
+                 ['name', 'type', 'broker']),
+    'holdings': ("""
+        SELECT id, account_id, name, ticker_mapping, amount, target_ratio, asset_type, interest_rate
+        FROM holdings ORDER BY id
+    """, ['name', 'ticker_mapping', 'asset_type']),
+    'purchases': ("""
+        SELECT id, account_id, holding_id, ticker, asset_type, year_month, purchase_date,
+               quantity, input_amount, interest_rate, interest_type
+        FROM purchase_history ORDER BY id
+    """, ['ticker', 'asset_type', 'year_month', 'interest_type']),
+    'analyzed_holdings': ("""
+        SELECT id, month_id, account_id, source_ticker, stock_symbol, stock_name,
+               holding_percent, my_amount, asset_type
+        FROM analyzed_holdings ORDER BY id
+    """, ['source_ticker', 'stock_symbol', 'stock_name', 'asset_type']),
+    'analyzed_sectors': ("""
+        SELECT id, month_id, account_id, source_ticker, sector_name, sector_percent, my_amount, asset_type
+        FROM analyzed_sectors ORDER BY id
+    """, ['source_ticker', 'sector_name', 'asset_type']),
+}
+
+
+@dataclass(frozen=True)
+class PortfolioSnapshot:
+    """
+    DB 한 버전의 메모리 사본 (읽기 전용, 세션 간 공유)
+
+    account_id가 NULL인 분석 행(전체 분석)은 account_id = <NA>로 저장된다.
+    """
+    data_version: Tuple[int, ...]
+    months: pd.DataFrame
+    accounts: pd.DataFrame
+    holdings: pd.DataFrame
+    purchases: pd.DataFrame
+    analyzed_holdings: pd.DataFrame
+    analyzed_sectors: pd.DataFrame
+
+    def month_id(self, year_month: str) -> Optional[int]:
+        """year_month → month_id (없으면 None)"""
+        match = self.months.loc[self.months['year_month'] == year_month, 'id']
+        return int(match.iloc[0]) if not match.empty else None
+
+    def month_rows(self, table: str, month_id: int, account_id: Optional[int] = None) -> pd.DataFrame:
+        """
+        분석 테이블에서 한 달 + 계좌의 행 (account_id=None이면 전체 분석 행)
+
+        Args:
+            table: 'analyzed_holdings' / 'analyzed_sectors'
+            month_id: 월 ID
+            account_id: 계좌 ID (None이면 account_id IS NULL)
+        """
+        df = getattr(self, table)
+        account_mask = df['account_id'].isna() if account_id is None else df['account_id'] == account_id
+        return df[(df['month_id'] == month_id) & account_mask.fillna(False)]
+
+    def account_purchases(self) -> pd.DataFrame:
+        """
+        purchase_history + 계좌의 month_id / 계좌명 (accounts JOIN: 계좌가 없는 납입건은 제외)
+
+        Returns:
+            purchases 컬럼 + month_id, account_name (id 순서 유지)
+        """
+        accounts = self.accounts.set_index('id')
+        df = self.purchases[self.purchases['account_id'].isin(accounts.index)]
+        return df.assign(
+            month_id=df['account_id'].map(accounts['month_id']).astype('Int64'),
+            account_name=df['account_id'].map(accounts['name']).astype(object),
+        )
+
+
+def get_data_version(db_path: str) -> Tuple[int, ...]:
+    """
+    DB 데이터 버전: DB 파일(WAL 모드면 -wal 파일 포함)의 (mtime_ns, 크기)
+
+    커밋이 있을 때마다 바뀌므로 캐시 키에 넣으면 데이터가 바뀔 때만 다시 계산한다.
+    (PRAGMA data_version은 같은 연결 안에서만 비교할 수 있어 호출마다 연결하는 대시보드에는 맞지 않음)
+
+    Args:
+        db_path: DB 경로
+
+    Returns:
+        버전 튜플 (파일이 없으면 빈 튜플)
+    """
+    version = ()
+    for path in (db_path, f"{db_path}-wal"):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        version += (stat.st_mtime_ns, stat.st_size)
+    return version
+
+
+def load_snapshot(db_path: str = DB_PATH) -> PortfolioSnapshot:
+    """
+    DB를 읽어 스냅샷 생성 (캐시 없음)
+
+    Args:
+        db_path: DB 경로
+
+    Returns:
+        PortfolioSnapshot
+    """
+    version = get_data_version(db_path)
+    frames = {}
+
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("BEGIN")  # 모든 테이블을 같은 시점 기준으로 읽기 (읽는 중 커밋 차단)
+        for name, (query, categorical) in SNAPSHOT_TABLES.items():
+            df = pd.read_sql_query(query, conn)
+            for column in categorical:
+                df[column] = df[column].astype('category')
+            for column in ('month_id', 'account_id', 'holding_id'):
+                if column in df.columns:
+                    df[column] = df[column].astype('Int64')  # NULL 보존
+            frames[name] = df
+    finally:
+        conn.close()
+
+    return PortfolioSnapshot(data_version=version, **frames)
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _cached_snapshot(db_path: str, data_version: Tuple[int, ...]) -> PortfolioSnapshot:
+    """(DB 경로, 데이터 버전)별 스냅샷 (모든 세션 공유)"""
+    return load_snapshot(db_path)
+
+
+def get_snapshot(db_path: str = DB_PATH) -> PortfolioSnapshot:
+    """
+    현재 데이터 버전의 스냅샷 (데이터가 바뀌었으면 새로 읽음)
+
+    Args:
+        db_path: DB 경로
+
+    Returns:
+        PortfolioSnapshot (읽기 전용으로 사용, 수정 금지)
+    """
+    return _cached_snapshot(db_path, get_data_version(db_path))
@@ -7,6 +7,16 @@ import pytest
 from unittest.mock import patch, MagicMock
 
 
+@pytest.fixture(autouse=True)
+def isolated_yaml_cache(tmp_path, monkeypatch):
+    """YAML 캐시를 테스트별 임시 디렉토리로 분리"""
+    from data.yaml_loader import clear_yaml_cache
+    monkeypatch.setenv('STOCK_ROUTINE_YAML_CACHE', str(tmp_path / 'yaml_cache'))
+    clear_yaml_cache()
+    yield
+    clear_yaml_cache()
+
+
 @pytest.fixture
 def db_path(tmp_path):
     """임시 DB 파일 경로"""
@@ -137,6 +147,48 @@ def populated_db(initialized_db):
     return db_path
 
 
+@pytest.fixture
+def analyzed_db(populated_db):
+    """populated_db의 2025-01에 계좌별 / 전체 분석 결과 추가"""
+    conn = sqlite3.connect(populated_db)
+    month_id = conn.execute("SELECT id FROM months WHERE year_month = '2025-01'").fetchone()[0]
+    isa_id = conn.execute("SELECT id FROM accounts WHERE month_id = ? AND name = 'ISA'", (month_id,)).fetchone()[0]
+
+    holdings = [
+        # (account_id, source, symbol, name, percent, amount, asset_type)
+        (isa_id, 'SPY', 'AAPL', 'Apple', 7.0, 14000, 'STOCK'),
+        (isa_id, 'SPY', 'OTHER', '기타', 50.0, 100000, 'STOCK'),
+        (isa_id, 'QQQ', 'MSFT', 'Microsoft', 9.0, 18000, 'STOCK'),
+        (isa_id, '069500.KS', '005930.KS', '삼성전자', 25.0, 50000, 'STOCK'),
+        (isa_id, 'CMA', 'CASH', '현금', 100.0, 30000, 'CASH'),
+        (None, 'SPY', 'AAPL', 'Apple', 7.0, 14000, 'STOCK'),
+        (None, 'TLT', 'UST', '미국 국채', 100.0, 40000, 'BOND'),
+    ]
+    conn.executemany("""
+        INSERT INTO analyzed_holdings
+        (month_id, account_id, source_ticker, stock_symbol, stock_name, holding_percent, my_amount, asset_type)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, [(month_id, *row) for row in holdings])
+
+    sectors = [
+        # (account_id, source, sector, percent, amount, asset_type)
+        (isa_id, 'SPY', 'Technology', 30.0, 60000, 'STOCK'),
+        (isa_id, 'QQQ', 'Technology', 50.0, 100000, 'STOCK'),
+        (isa_id, 'SPY', 'Healthcare', 10.0, 20000, 'STOCK'),
+        (None, 'SPY', 'Technology', 30.0, 60000, 'STOCK'),
+        (None, 'TLT', 'Government', 100.0, 40000, 'BOND'),
+        (None, 'SPY', 'Healthcare', 10.0, 20000, 'STOCK'),
+    ]
+    conn.executemany("""
+        INSERT INTO analyzed_sectors
+        (month_id, account_id, source_ticker, sector_name, sector_percent, my_amount, asset_type)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, [(month_id, *row) for row in sectors])
+    conn.commit()
+    conn.close()
+    return populated_db, month_id, isa_id
+
+
 @pytest.fixture
 def mock_yfinance():
     """yfinance를 mock하여 외부 API 호출 없이 테스트"""
@@ -199,4 +251,47 @@ def mock_yf_download():
                 return df
 
         mock_dl.side_effect = fake_download
-        yield mock_dl
\ No newline at end of file
+        yield mock_dl
+
+# 임포트 시 과거 종가 (티커 → (종가, 통화), 요청한 날짜를 그대로 체결일로 반환) / 환율
+HISTORICAL_PRICES = {'SPY': (600.0, 'USD'), '069500.KS': (35000.0, 'KRW')}
+HISTORICAL_RATE = 1450.0
+
+# 대시보드 평가 시 현재가 / 환율
+CURRENT_PRICES = {'SPY': 610.5, 'QQQ': 480.25, '069500.KS': 36250.0}
+CURRENT_RATE = 1437.3
+
+
+@pytest.fixture
+def offline_prices(request):
+    """
+    임포트의 과거 종가 / 환율 조회 고정 (호출 기록 확인용)
+
+    기본은 HISTORICAL_PRICES, indirect parametrize로 {티커: (종가, 통화)}를 바꿀 수 있음
+    """
+    prices = getattr(request, 'param', HISTORICAL_PRICES)
+
+    def fake_price(ticker, target_date):
+        return (target_date, *prices[ticker]) if ticker in prices else None
+
+    with patch('data.import_monthly_purchases.get_historical_price', side_effect=fake_price) as price, \
+            patch('data.import_monthly_purchases.get_exchange_rate', return_value=HISTORICAL_RATE):
+        yield price
+
+
+@pytest.fixture
+def fake_prices(request):
+    """
+    대시보드 현재가 / 환율 조회 고정 (호출 기록 확인용), 앞뒤로 st.cache_data 캐시 비움
+
+    기본은 CURRENT_PRICES, indirect parametrize로 {티커: 현재가}를 바꿀 수 있음
+    """
+    import streamlit as st
+
+    prices = getattr(request, 'param', CURRENT_PRICES)
+    with patch('streamlit_app.utils.price_fetcher.get_multiple_prices',
+               side_effect=lambda tickers: {t: prices.get(t) for t in tickers}) as price, \
+            patch('streamlit_app.utils.price_fetcher.get_current_price', return_value=CURRENT_RATE) as rate:
+        st.cache_data.clear()
+        yield price, rate
+        st.cache_data.clear()
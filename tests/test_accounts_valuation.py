@@ -0,0 +1,69 @@
+"""
+테스트 30: 계좌 목록 일괄 평가 (get_accounts)
+- 모든 계좌를 계좌별 GROUP BY 1번 + CASH 1번 + 현재가 조회 1번으로 평가
+- 특정 월: account_id 기준 / 전체 기간: 계좌명 기준 합산
+- 계좌 수가 늘어도 현재가 / 환율 조회는 1번
+"""
+import sqlite3
+import pytest
+
+from core.interest_calculator import calc_cash_current_value
+from streamlit_app.data_loader import get_accounts
+from tests.conftest import CURRENT_PRICES, CURRENT_RATE
+
+
+@pytest.fixture
+def accounts_db(populated_db):
+    """populated_db + ISA 계좌 CASH 납입건 (이자 있음)"""
+    conn = sqlite3.connect(populated_db)
+    account_ids = [row[0] for row in conn.execute("""
+        SELECT a.id FROM accounts a JOIN months m ON a.month_id = m.id WHERE a.name = 'ISA' ORDER BY m.year_month
+    """)]
+    for year_month, account_id in zip(['2025-01', '2025-02'], account_ids):
+        conn.execute("""
+            INSERT INTO purchase_history
+            (ticker, asset_type, year_month, purchase_date, quantity, input_amount, price_at_purchase,
+             currency, account_id, interest_rate, interest_type)
+            VALUES ('CMA', 'CASH', ?, ?, 100000, 100000, 1.0, 'KRW', ?, 0.035, 'simple')
+        """, (year_month, f"{year_month}-26", account_id))
+    conn.commit()
+    conn.close()
+    return populated_db
+
+
+def _stock_value(rows):
+    return sum(q * CURRENT_PRICES[t] * (1 if t.endswith('.KS') else CURRENT_RATE) for t, q in rows)
+
+
+class TestGetAccounts:
+    """계좌별 실시간 평가액"""
+
+    def test_month_values(self, accounts_db, fake_prices):
+        accounts = get_accounts('2025-01', accounts_db)
+
+        assert [a['name'] for a in accounts] == ['ISA', '연금저축']
+        isa, pension = accounts
+        cash = calc_cash_current_value(100000, 0.035, '2025-01-26', 'simple')
+        assert isa['total_value'] == int(_stock_value([('QQQ', 0.2857), ('SPY', 0.3632)]) + cash)
+        assert pension['total_value'] == int(_stock_value([('069500.KS', 14.2857)]))
+
+    def test_all_period_by_name(self, accounts_db, fake_prices):
+        accounts = get_accounts("전체 기간", accounts_db)
+
+        isa = next(a for a in accounts if a['name'] == 'ISA')
+        cash = sum(calc_cash_current_value(100000, 0.035, d, 'simple') for d in ['2025-01-26', '2025-02-26'])
+        # 전체 기간 쿼리는 CASH 행도 원금으로 포함 (현재가 없음) + 이자 반영 평가액
+        stocks = _stock_value([('QQQ', 0.2857 + 0.3472), ('SPY', 0.3632 + 0.4108)])
+        assert isa['total_value'] == pytest.approx(int(stocks + 200000 + cash), abs=1)
+
+    def test_single_price_batch(self, accounts_db, fake_prices):
+        prices, rate = fake_prices
+
+        get_accounts('2025-01', accounts_db)
+
+        assert prices.call_count == 1
+        assert sorted(prices.call_args[0][0]) == ['069500.KS', 'QQQ', 'SPY']
+        assert rate.call_count == 1
+
+    def test_missing_month(self, accounts_db, fake_prices):
+        assert get_accounts('2030-01', accounts_db) == []
@@ -0,0 +1,61 @@
+"""
+테스트 29: "전체 기간" 요약 일괄 계산 (get_monthly_summary)
+- 전체 기간 = 월별 요약(월마다 정수 절사)의 합계와 같은 값
+- 현재가 / 환율 조회는 월 수와 무관하게 1번
+- 현재가 조회 실패 종목은 원금, CASH는 이자 반영
+"""
+import sqlite3
+import pytest
+
+from streamlit_app.data_loader import get_monthly_summary
+
+
+@pytest.fixture
+def summary_db(populated_db):
+    """populated_db + 이자 있는 CASH 납입건 / 현재가 없는 종목"""
+    conn = sqlite3.connect(populated_db)
+    account_ids = [row[0] for row in conn.execute("""
+        SELECT a.id FROM accounts a JOIN months m ON a.month_id = m.id WHERE a.name = 'ISA' ORDER BY m.year_month
+    """)]
+    for year_month, account_id in zip(['2025-01', '2025-02'], account_ids):
+        conn.execute("""
+            INSERT INTO purchase_history
+            (ticker, asset_type, year_month, purchase_date, quantity, input_amount, price_at_purchase,
+             currency, account_id, interest_rate, interest_type)
+            VALUES ('CMA', 'CASH', ?, ?, 100000, 100000, 1.0, 'KRW', ?, 0.035, 'compound')
+        """, (year_month, f"{year_month}-26", account_id))
+    conn.execute("""
+        INSERT INTO purchase_history
+        (ticker, asset_type, year_month, purchase_date, quantity, input_amount, price_at_purchase, account_id)
+        VALUES ('DELISTED', 'STOCK', '2025-02', '2025-02-26', 3, 90000, 30000.0, ?)
+    """, (account_ids[1],))
+    conn.commit()
+    conn.close()
+    return populated_db
+
+
+class TestAllTimeSummary:
+    """전체 기간 요약"""
+
+    def test_equals_sum_of_monthly(self, summary_db, fake_prices):
+        months = [get_monthly_summary(m, summary_db) for m in ['2025-01', '2025-02']]
+
+        total = get_monthly_summary("전체 기간", summary_db)
+
+        assert total['total_invested'] == sum(m['total_invested'] for m in months)
+        assert total['total_value'] == sum(m['total_value'] for m in months)
+        assert total['total_profit'] == total['total_value'] - total['total_invested']
+
+    def test_single_price_batch(self, summary_db, fake_prices):
+        prices, rate = fake_prices
+
+        get_monthly_summary("전체 기간", summary_db)
+
+        assert prices.call_count == 1
+        assert sorted(prices.call_args[0][0]) == ['069500.KS', 'DELISTED', 'QQQ', 'SPY']
+        assert rate.call_count == 1
+
+    def test_empty_db(self, initialized_db, fake_prices):
+        assert get_monthly_summary("전체 기간", initialized_db) == {
+            'total_value': 0, 'total_invested': 0, 'total_profit': 0, 'return_rate': 0.0
+        }
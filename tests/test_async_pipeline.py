@@ -0,0 +1,163 @@
+"""
+테스트 14: 비동기 분석 파이프라인 (analyze_month_portfolio_async)
+- 동기 analyze_month_portfolio와 동일한 저장 결과
+- 티커별 조회 1번 (계좌/전체 작업 공유)
+- 조회 타임아웃 / 오류 시 그 티커의 모든 작업(계좌별 + 전체)에 FAILED 메타데이터 기록, 나머지 티커는 정상 저장
+- 계산 오류도 해당 작업만 FAILED, 다른 티커 작업은 계속
+"""
+import asyncio
+import shutil
+import sqlite3
+import time
+import pandas as pd
+import pytest
+from unittest.mock import patch
+
+import core.analyze_portfolio as analyze_portfolio
+from core.analyze_portfolio import analyze_month_portfolio
+from core.analyze_portfolio_async import analyze_month_portfolio_async
+
+
+TOP_HOLDINGS = {
+    'SPY': pd.DataFrame({'Name': ['Apple', 'Microsoft'], 'Holding Percent': [0.07, 0.06]},
+                        index=pd.Index(['AAPL', 'MSFT'], name='Symbol')),
+    'QQQ': pd.DataFrame({'Name': ['Apple', 'Amazon'], 'Holding Percent': [0.09, 0.05]},
+                        index=pd.Index(['AAPL', 'AMZN'], name='Symbol')),
+    '069500.KS': pd.DataFrame({'Name': ['삼성전자'], 'Holding Percent': [0.3]},
+                              index=pd.Index(['005930.KS'], name='Symbol')),
+}
+SECTORS = {'SPY': {'technology': 0.3}, 'QQQ': {'technology': 0.5}, '069500.KS': {'technology': 0.4}}
+QUOTE_TYPES = {'SPY': 'ETF', 'QQQ': 'ETF', '069500.KS': 'ETF'}
+
+
+@pytest.fixture
+def offline_yfinance():
+    """yfinance 조회 함수를 고정 데이터로 대체 (호출 횟수 기록)"""
+    calls = {'holdings': [], 'info': []}
+
+    def fake_holdings(ticker):
+        calls['holdings'].append(ticker)
+        return TOP_HOLDINGS.get(ticker)
+
+    def fake_info(ticker, cache=None):
+        calls['info'].append(ticker)
+        return {'quoteType': QUOTE_TYPES.get(ticker, 'EQUITY')}
+
+    with patch.object(analyze_portfolio, 'get_exchange_rate', return_value=1450.0), \
+            patch.object(analyze_portfolio, 'fetch_etf_holdings', side_effect=fake_holdings), \
+            patch.object(analyze_portfolio, 'fetch_etf_sectors', side_effect=lambda t: SECTORS.get(t)), \
+            patch.object(analyze_portfolio, 'get_ticker_info', side_effect=fake_info):
+        yield calls
+
+
+def _analysis_rows(db_path):
+    conn = sqlite3.connect(db_path)
+    holdings = sorted(conn.execute("""
+        SELECT month_id, account_id, source_ticker, stock_symbol, stock_name, holding_percent, my_amount, asset_type
+        FROM analyzed_holdings
+    """).fetchall(), key=repr)
+    sectors = sorted(conn.execute("""
+        SELECT month_id, account_id, source_ticker, sector_name, sector_percent, my_amount, asset_type
+        FROM analyzed_sectors
+    """).fetchall(), key=repr)
+    metadata = sorted(conn.execute(
+        "SELECT month_id, ticker, status, holdings_count, sectors_count FROM analysis_metadata"
+    ).fetchall(), key=repr)
+    conn.close()
+    return holdings, sectors, metadata
+
+
+class TestAsyncMatchesSync:
+    """동기 버전과 결과 동일"""
+
+    def test_same_rows_as_sync(self, populated_db, tmp_path, offline_yfinance):
+        async_db = str(tmp_path / 'async.db')
+        shutil.copy(populated_db, async_db)
+
+        analyze_month_portfolio('2025-01', populated_db)
+        stats = asyncio.run(analyze_month_portfolio_async('2025-01', async_db))
+
+        assert _analysis_rows(async_db) == _analysis_rows(populated_db)
+        assert stats['errors'] == 0
+
+    def test_each_ticker_fetched_once(self, populated_db, offline_yfinance):
+        """SPY는 계좌별 + 전체 작업이 있어도 1번만 조회"""
+        stats = asyncio.run(analyze_month_portfolio_async('2025-01', populated_db))
+
+        assert offline_yfinance['holdings'].count('SPY') == 1
+        assert stats['tickers'] == 4  # SPY, QQQ, 069500.KS, CMA
+        assert stats['jobs'] == 8  # 계좌별 4 + 전체 4
+
+
+class TestAsyncTimeout:
+    """조회 타임아웃"""
+
+    def test_timeout_records_failure(self, populated_db, offline_yfinance):
+        original = analyze_portfolio.resolve_asset
+
+        def slow_resolve(ticker, *args, **kwargs):
+            if ticker == 'QQQ':
+                time.sleep(0.5)  # 타임아웃 이후에도 스레드는 끝까지 실행되므로 조회 없이 반환
+                return {'ticker': 'QQQ', 'asset_type': 'STOCK', 'quote_type': 'ETF',
+                        'info': {}, 'holdings_df': None, 'sectors': None}
+            return original(ticker, *args, **kwargs)
+
+        with patch('core.analyze_portfolio_async.resolve_asset', side_effect=slow_resolve):
+            asyncio.run(analyze_month_portfolio_async('2025-01', populated_db, fetch_timeout=0.1))
+
+        conn = sqlite3.connect(populated_db)
+        failed = conn.execute(
+            "SELECT ticker, error_message FROM analysis_metadata WHERE status = 'FAILED'"
+        ).fetchall()
+        sources = {row[0] for row in conn.execute("SELECT DISTINCT source_ticker FROM analyzed_holdings")}
+        conn.close()
+
+        assert failed == [('QQQ', 'fetch timeout')] * 2  # 계좌별 + 전체
+        assert 'QQQ' not in sources
+        assert {'SPY', '069500.KS', 'CASH'} <= sources
+
+    def test_resolve_error_fails_every_job(self, populated_db, offline_yfinance):
+        original = analyze_portfolio.resolve_asset
+
+        def broken_resolve(ticker, *args, **kwargs):
+            if ticker == 'QQQ':
+                raise ConnectionError("연결 끊김")
+            return original(ticker, *args, **kwargs)
+
+        with patch('core.analyze_portfolio_async.resolve_asset', side_effect=broken_resolve):
+            stats = asyncio.run(analyze_month_portfolio_async('2025-01', populated_db))
+
+        conn = sqlite3.connect(populated_db)
+        failed = conn.execute(
+            "SELECT account_id IS NULL, ticker, error_message FROM analysis_metadata WHERE status = 'FAILED'"
+        ).fetchall()
+        conn.close()
+
+        assert sorted(failed) == [(0, 'QQQ', '연결 끊김'), (1, 'QQQ', '연결 끊김')]
+        assert stats['jobs'] == 8
+
+
+class TestAsyncBuildError:
+    """계산 오류"""
+
+    def test_build_error_fails_only_that_ticker(self, populated_db, offline_yfinance):
+        original = analyze_portfolio.build_asset_analysis
+
+        def broken_build(resolved, name, amount):
+            if resolved['ticker'] == 'QQQ':
+                raise ValueError("잘못된 구성 종목")
+            return original(resolved, name, amount)
+
+        with patch('core.analyze_portfolio_async.build_asset_analysis', side_effect=broken_build):
+            stats = asyncio.run(analyze_month_portfolio_async('2025-01', populated_db))
+
+        conn = sqlite3.connect(populated_db)
+        failed = conn.execute(
+            "SELECT ticker, error_message FROM analysis_metadata WHERE status = 'FAILED'"
+        ).fetchall()
+        sources = {row[0] for row in conn.execute("SELECT DISTINCT source_ticker FROM analyzed_holdings")}
+        conn.close()
+
+        assert failed == [('QQQ', '잘못된 구성 종목')] * 2  # 계좌별 + 전체
+        assert {'SPY', '069500.KS', 'CASH'} <= sources
+        assert stats['jobs'] == 8
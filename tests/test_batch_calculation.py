@@ -0,0 +1,150 @@
+"""
+테스트 11: 벡터화 일괄 계산 (calculate_holdings_batch / calculate_sectors_batch)
+- 기존 calculate_my_holdings / calculate_my_sectors 결과와 완전히 일치
+- OTHER / other 행 생성
+- ETF별 비중 합계는 순차 합산과 같은 부동소수 결과
+- 분석 루프: 같은 자산 작업(계좌별 + 전체)을 한 번에 계산 (build_asset_analyses)
+"""
+import pandas as pd
+import pytest
+
+from core.analyze_portfolio import (
+    _sequential_weight_totals,
+    build_asset_analyses,
+    build_asset_analysis,
+    build_composition_frame,
+    build_sector_frame,
+    calculate_holdings_batch,
+    calculate_my_holdings,
+    calculate_my_sectors,
+    calculate_sectors_batch,
+)
+
+
+HOLDINGS_BY_ETF = {
+    'SPY': pd.DataFrame(
+        {'Name': ['Apple Inc.', 'Microsoft Corp', 'NVIDIA Corp'],
+         'Holding Percent': [0.0713, 0.0651, 0.0597]},
+        index=pd.Index(['AAPL', 'MSFT', 'NVDA'], name='Symbol'),
+    ),
+    'QQQ': pd.DataFrame(
+        {'Name': ['Apple Inc.', 'Amazon.com'],
+         'Holding Percent': [0.0890, 0.0533]},
+        index=pd.Index(['AAPL', 'AMZN'], name='Symbol'),
+    ),
+}
+SECTORS_BY_ETF = {
+    'SPY': {'technology': 0.3137, 'healthcare': 0.1123},
+    'QQQ': {'technology': 0.5, 'communication_services': 0.5},
+}
+ALLOCATION = pd.DataFrame([
+    {'account_id': 1, 'source_ticker': 'SPY', 'amount': 300_000, 'asset_type': 'STOCK'},
+    {'account_id': 1, 'source_ticker': 'QQQ', 'amount': 200_003, 'asset_type': 'STOCK'},
+    {'account_id': 2, 'source_ticker': 'SPY', 'amount': 123_457, 'asset_type': 'STOCK'},
+])
+
+
+def _scalar_rows(calc, data_by_etf, key_col):
+    rows = {}
+    for _, alloc in ALLOCATION.iterrows():
+        for row in calc(alloc['source_ticker'], alloc['amount'], data_by_etf[alloc['source_ticker']]):
+            rows[(alloc['account_id'], row['source_ticker'], row[key_col])] = row['my_amount']
+    return rows
+
+
+class TestHoldingsBatch:
+    """calculate_holdings_batch == calculate_my_holdings (행 단위)"""
+
+    def test_matches_scalar(self):
+        composition = build_composition_frame(HOLDINGS_BY_ETF)
+        batch = calculate_holdings_batch(composition, ALLOCATION)
+
+        expected = _scalar_rows(calculate_my_holdings, HOLDINGS_BY_ETF, 'stock_symbol')
+        actual = {
+            (r.account_id, r.source_ticker, r.stock_symbol): r.my_amount
+            for r in batch.itertuples()
+        }
+
+        assert actual == expected
+
+    def test_other_row_name(self):
+        composition = build_composition_frame(HOLDINGS_BY_ETF)
+        batch = calculate_holdings_batch(composition, ALLOCATION)
+
+        other = batch[(batch['stock_symbol'] == 'OTHER') & (batch['source_ticker'] == 'QQQ')]
+        assert other['stock_name'].tolist() == ['QQQ 기타 종목']
+        assert other['holding_percent'].iloc[0] == pytest.approx(1.0 - 0.0890 - 0.0533)
+
+    def test_no_other_when_fully_covered(self):
+        composition = build_composition_frame({
+            'FULL': pd.DataFrame({'Symbol': ['A', 'B'], 'Name': ['A', 'B'], 'Holding Percent': [0.5, 0.5]})
+        })
+        allocation = pd.DataFrame([{'account_id': None, 'source_ticker': 'FULL', 'amount': 1000, 'asset_type': 'STOCK'}])
+
+        batch = calculate_holdings_batch(composition, allocation)
+
+        assert 'OTHER' not in batch['stock_symbol'].tolist()
+        assert batch['my_amount'].sum() == 1000
+
+    def test_empty_inputs(self):
+        batch = calculate_holdings_batch(build_composition_frame({}), ALLOCATION)
+        assert batch.empty
+
+
+class TestSectorsBatch:
+    """calculate_sectors_batch == calculate_my_sectors"""
+
+    def test_matches_scalar(self):
+        sectors = build_sector_frame(SECTORS_BY_ETF)
+        batch = calculate_sectors_batch(sectors, ALLOCATION)
+
+        expected = _scalar_rows(calculate_my_sectors, SECTORS_BY_ETF, 'sector_name')
+        actual = {
+            (r.account_id, r.source_ticker, r.sector_name): r.my_amount
+            for r in batch.itertuples()
+        }
+
+        assert actual == expected
+
+
+class TestWeightTotals:
+    """ETF별 비중 합계"""
+
+    def test_matches_sequential_sum(self):
+        weights = [0.1, 0.2, 0.3, 0.07, 1e-17, 0.0651, 0.0597]
+        df = pd.DataFrame({
+            'source_ticker': ['SPY', 'QQQ', 'SPY', 'QQQ', 'SPY', 'SPY', 'QQQ'],
+            'holding_percent': weights,
+        })
+
+        totals = _sequential_weight_totals(df, 'holding_percent')
+
+        expected = {}
+        for etf_ticker, weight in zip(df['source_ticker'], weights):
+            expected[etf_ticker] = expected.get(etf_ticker, 0.0) + weight
+        assert list(totals.index) == ['SPY', 'QQQ']
+        assert totals.to_dict() == expected  # 근사가 아닌 완전 일치
+
+
+class TestAssetAnalysesBatch:
+    """build_asset_analyses == 작업마다 build_asset_analysis"""
+
+    @pytest.mark.parametrize('asset_type', ['STOCK', 'BOND'])
+    def test_matches_per_job(self, asset_type):
+        resolved = {'ticker': 'SPY', 'asset_type': asset_type, 'quote_type': 'ETF', 'info': {},
+                    'holdings_df': HOLDINGS_BY_ETF['SPY'], 'sectors': SECTORS_BY_ETF['SPY']}
+        items = [('S&P500 ETF', 300_000), ('S&P500 ETF', 123_457), ('S&P500 ETF', 423_457)]
+
+        batch = build_asset_analyses(resolved, items)
+
+        assert batch == [build_asset_analysis(resolved, name, amount) for name, amount in items]
+        assert all(type(row['my_amount']) is int for analysis in batch for row in analysis['holdings'])
+
+    def test_fetch_failed(self):
+        resolved = {'ticker': 'SPY', 'asset_type': 'STOCK', 'quote_type': 'ETF', 'info': {},
+                    'holdings_df': None, 'sectors': None}
+
+        batch = build_asset_analyses(resolved, [('S&P500 ETF', 1000), ('S&P500 ETF', 2000)])
+
+        assert [a['holdings'] for a in batch] == [[], []]
+        assert [a['metadata'] for a in batch] == [None, None]
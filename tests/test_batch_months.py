@@ -0,0 +1,105 @@
+"""
+테스트 15: 여러 월 일괄 분석 (run_all_months_batch)
+- 환율 / ETF 구성 종목 / 섹터 / quoteType을 모든 월이 공유 (티커당 1번 조회)
+- 월별 분석 결과는 개별 실행과 동일
+- 분석 계획은 월마다 1번만 생성 (미리 만든 계획을 분석에 전달)
+"""
+import shutil
+import sqlite3
+import pandas as pd
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+
+import core.analyze_portfolio as analyze_portfolio
+from scripts.run_all_months import run_all_months_batch
+
+
+TOP_HOLDINGS = {
+    'SPY': pd.DataFrame({'Name': ['Apple'], 'Holding Percent': [0.07]}, index=pd.Index(['AAPL'], name='Symbol')),
+    'QQQ': pd.DataFrame({'Name': ['Apple'], 'Holding Percent': [0.09]}, index=pd.Index(['AAPL'], name='Symbol')),
+    '069500.KS': pd.DataFrame({'Name': ['삼성전자'], 'Holding Percent': [0.3]},
+                              index=pd.Index(['005930.KS'], name='Symbol')),
+}
+
+
+@pytest.fixture
+def counted_fetches():
+    """조회 함수 호출 횟수 기록"""
+    calls = {'holdings': [], 'sectors': [], 'info': [], 'exchange_rate': 0}
+
+    def fake_rate():
+        calls['exchange_rate'] += 1
+        return 1450.0
+
+    def fake_holdings(ticker):
+        calls['holdings'].append(ticker)
+        return TOP_HOLDINGS.get(ticker)
+
+    def fake_sectors(ticker):
+        calls['sectors'].append(ticker)
+        return {'technology': 0.5}
+
+    def fake_info(ticker, cache=None):
+        if cache is not None and ticker in cache['info']:
+            return cache['info'][ticker]
+        calls['info'].append(ticker)
+        info = {'quoteType': 'ETF' if ticker in TOP_HOLDINGS else 'EQUITY'}
+        if cache is not None:
+            cache['info'][ticker] = info
+        return info
+
+    with patch.object(analyze_portfolio, 'get_exchange_rate', side_effect=fake_rate), \
+            patch('scripts.run_all_months.get_exchange_rate', side_effect=fake_rate), \
+            patch.object(analyze_portfolio, 'fetch_etf_holdings', side_effect=fake_holdings), \
+            patch.object(analyze_portfolio, 'fetch_etf_sectors', side_effect=fake_sectors), \
+            patch.object(analyze_portfolio, 'get_ticker_info', side_effect=fake_info):
+        yield calls
+
+
+class TestRunAllMonthsBatch:
+    """공유 데이터로 여러 월 분석"""
+
+    def test_each_ticker_fetched_once_across_months(self, populated_db, counted_fetches):
+        result = run_all_months_batch(
+            [Path('monthly/2025-01.yaml'), Path('monthly/2025-02.yaml')],
+            db_path=populated_db, skip_import=True, skip_visualize=True
+        )
+
+        assert result['months'] == ['2025-01', '2025-02']
+        assert result['failed'] == []
+        assert counted_fetches['exchange_rate'] == 1
+        # SPY/QQQ는 두 달 × (계좌별 + 전체) 모두 보유해도 1번씩
+        assert sorted(counted_fetches['holdings']) == sorted(['SPY', 'QQQ', '069500.KS'])
+        assert sorted(counted_fetches['sectors']) == sorted(['SPY', 'QQQ', '069500.KS'])
+        assert counted_fetches['info'].count('AAPL') == 1
+
+    def test_results_match_single_month_runs(self, populated_db, tmp_path, counted_fetches):
+        single_db = str(tmp_path / 'single.db')
+        shutil.copy(populated_db, single_db)
+
+        run_all_months_batch([Path('2025-01.yaml'), Path('2025-02.yaml')],
+                             db_path=populated_db, skip_import=True, skip_visualize=True)
+        for year_month in ['2025-01', '2025-02']:
+            analyze_portfolio.analyze_month_portfolio(year_month, single_db, overwrite=True)
+
+        def rows(db_path):
+            conn = sqlite3.connect(db_path)
+            data = sorted(conn.execute(
+                "SELECT month_id, account_id, source_ticker, stock_symbol, my_amount FROM analyzed_holdings"
+            ).fetchall(), key=repr)
+            conn.close()
+            return data
+
+        assert rows(populated_db) == rows(single_db)
+
+    def test_plans_built_once_per_month(self, populated_db, counted_fetches):
+        with patch('scripts.run_all_months.plan_month_analysis',
+                   wraps=analyze_portfolio.plan_month_analysis) as batch_plan, \
+                patch.object(analyze_portfolio, 'plan_month_analysis',
+                             wraps=analyze_portfolio.plan_month_analysis) as month_plan:
+            run_all_months_batch([Path('2025-01.yaml'), Path('2025-02.yaml')],
+                                 db_path=populated_db, skip_import=True, skip_visualize=True)
+
+        assert batch_plan.call_count == 2
+        assert month_plan.call_count == 0
@@ -0,0 +1,288 @@
+"""
+테스트 22: 증권사 거래내역 스트리밍 임포트 (import_broker_trades)
+- 설명 행 / 한글 헤더 / 날짜·숫자 형식 정규화, 청크 단위 파싱
+- 단가·환율이 없는 행은 청크별로 모아 daily_prices 먼저, 부족한 티커만 yfinance 1번
+- 이미 조회한 구간 안의 주말·공휴일은 다시 조회하지 않음 (daily_price_fetches)
+- 매도 행 건너뜀, 체결월 계좌에 연결
+- 실패 시 롤백, 월 YAML 재임포트 후에도 거래내역 유지 (계좌 재연결)
+- 거래내역이 있는 (계좌, 월, 티커)는 YAML 가상 매수 대신 거래내역만 합산 (holdings 연결, 자산 유형)
+"""
+import sqlite3
+import pytest
+from unittest.mock import patch
+
+from data.import_broker_trades import import_broker_trades, iter_trade_chunks, resolve_daily_closes
+from data.import_month import import_month
+
+
+TRADES_CSV = """거래내역 조회 결과
+조회기간,2025.01.01 ~ 2025.02.28
+거래일자,매매구분,종목코드,수량,체결단가,통화,계좌명
+2025.01.24,매수,spy,2,"600.00",USD,ISA
+2025/01/24,매수,069500.KS,10,"35,000",KRW,연금저축
+20250224,매도,SPY,1,610,USD,ISA
+2025-02-24,매수,SPY,1,,USD,해외주식
+합계,,,,,,
+"""
+
+CLOSES = {
+    'SPY': {'2025-01-24': 600.0, '2025-02-21': 605.0, '2025-02-24': 610.0},
+    'KRW=X': {'2025-01-24': 1450.0, '2025-02-24': 1440.0},
+}
+
+
+@pytest.fixture
+def trades_csv(tmp_path):
+    path = tmp_path / 'trades_2025.csv'
+    path.write_text(TRADES_CSV, encoding='utf-8')
+    return str(path)
+
+
+@pytest.fixture
+def offline_closes():
+    def fake_closes(ticker, start, end):
+        return {d: c for d, c in CLOSES.get(ticker, {}).items() if start <= d <= end}
+
+    with patch('data.import_broker_trades.fetch_daily_closes', side_effect=fake_closes) as fetch:
+        yield fetch
+
+
+def _broker_rows(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("""
+        SELECT p.ticker, p.purchase_date, p.quantity, p.input_amount, p.price_at_purchase,
+               p.currency, p.exchange_rate, a.name
+        FROM purchase_history p LEFT JOIN accounts a ON p.account_id = a.id
+        WHERE p.note LIKE 'broker:%'
+        ORDER BY p.purchase_date, p.ticker
+    """).fetchall()
+    conn.close()
+    return rows
+
+
+class TestIterTradeChunks:
+    """스트리밍 파싱"""
+
+    def test_header_detection_and_normalization(self, trades_csv):
+        trades = [t for chunk in iter_trade_chunks(trades_csv) for t in chunk]
+
+        assert len(trades) == 4  # 합계 행 제외
+        assert trades[0]['trade_date'] == '2025-01-24'
+        assert trades[0]['ticker'] == 'SPY'
+        assert trades[1]['price'] == 35000.0
+        assert trades[2]['trade_date'] == '2025-02-24'
+        assert trades[2]['is_buy'] is False
+        assert trades[3]['price'] is None
+
+    def test_chunk_size(self, tmp_path):
+        path = tmp_path / 'big.csv'
+        lines = ['date,ticker,quantity,price'] + [f'2025-01-24,SPY,1,600' for _ in range(2500)]
+        path.write_text('\n'.join(lines), encoding='utf-8')
+
+        sizes = [len(chunk) for chunk in iter_trade_chunks(str(path), chunk_size=1000)]
+
+        assert sizes == [1000, 1000, 500]
+
+    def test_missing_columns_raises(self, tmp_path):
+        path = tmp_path / 'bad.csv'
+        path.write_text('date,memo\n2025-01-24,x\n', encoding='utf-8')
+
+        with pytest.raises(ValueError):
+            list(iter_trade_chunks(str(path)))
+
+
+class TestImportBrokerTrades:
+    """purchase_history 임포트"""
+
+    def test_buys_imported_with_krw_conversion(self, trades_csv, populated_db, offline_closes):
+        result = import_broker_trades(trades_csv, populated_db)
+
+        assert result == {'rows': 3, 'skipped': 1, 'unlinked': 1, 'chunks': 1, 'replaced': 2}
+        assert _broker_rows(populated_db) == [
+            ('069500.KS', '2025-01-24', 10.0, 350000, 35000.0, 'KRW', None, '연금저축'),
+            ('SPY', '2025-01-24', 2.0, 1740000, 870000.0, 'USD', 1450.0, 'ISA'),
+            ('SPY', '2025-02-24', 1.0, 878400, 878400.0, 'USD', 1440.0, None),  # 해외주식 계좌 없음 → 미연결
+        ]
+
+    def test_closes_batched_and_stored(self, trades_csv, populated_db, offline_closes):
+        import_broker_trades(trades_csv, populated_db)
+
+        fetched = sorted(call.args[0] for call in offline_closes.call_args_list)
+        assert fetched == ['KRW=X', 'SPY']  # 청크당 티커 1번
+
+        conn = sqlite3.connect(populated_db)
+        stored = conn.execute("SELECT COUNT(*) FROM daily_prices WHERE ticker = 'SPY'").fetchone()[0]
+        conn.close()
+        assert stored == 2  # 2025-02-17 ~ 2025-02-24 구간
+
+        offline_closes.reset_mock()
+        import_broker_trades(trades_csv, populated_db, overwrite=True)
+        offline_closes.assert_not_called()  # 로컬 저장소에서 해결
+
+    def test_existing_file_requires_overwrite(self, trades_csv, populated_db, offline_closes):
+        import_broker_trades(trades_csv, populated_db)
+
+        assert import_broker_trades(trades_csv, populated_db) is None
+        import_broker_trades(trades_csv, populated_db, overwrite=True)
+        assert len(_broker_rows(populated_db)) == 3
+
+    def test_missing_close_rolls_back(self, trades_csv, populated_db):
+        with patch('data.import_broker_trades.fetch_daily_closes', return_value={}), \
+                pytest.raises(ValueError, match='KRW=X'):
+            import_broker_trades(trades_csv, populated_db, chunk_size=1)
+
+        assert _broker_rows(populated_db) == []
+
+    def test_default_account(self, tmp_path, populated_db, offline_closes):
+        path = tmp_path / 'isa.csv'
+        path.write_text('date,ticker,quantity,amount\n2025-01-24,069500.KS,2,70000\n', encoding='utf-8')
+
+        import_broker_trades(str(path), populated_db, account_name='ISA')
+
+        assert _broker_rows(populated_db) == [('069500.KS', '2025-01-24', 2.0, 70000, 35000.0, 'KRW', None, 'ISA')]
+
+
+class TestResolveDailyCloses:
+    """종가 저장소 조회 구간"""
+
+    def test_weekend_date_not_refetched(self, initialized_db, offline_closes):
+        conn = sqlite3.connect(initialized_db)
+        cursor = conn.cursor()
+
+        # 2025-01-26 = 일요일 → 직전 영업일 종가
+        first = resolve_daily_closes(cursor, {'SPY': {'2025-01-26'}})
+        second = resolve_daily_closes(cursor, {'SPY': {'2025-01-25', '2025-01-26'}})
+        assert offline_closes.call_count == 1
+        assert first == {('SPY', '2025-01-26'): ('2025-01-24', 600.0)}
+        assert second[('SPY', '2025-01-25')] == ('2025-01-24', 600.0)
+
+        # 조회 구간 밖의 영업일은 다시 조회 (직전 종가로 대체하지 않음)
+        later = resolve_daily_closes(cursor, {'SPY': {'2025-01-26', '2025-02-24'}})
+        conn.close()
+        assert offline_closes.call_count == 2
+        assert offline_closes.call_args.args == ('SPY', '2025-02-17', '2025-02-24')
+        assert later[('SPY', '2025-02-24')] == ('2025-02-24', 610.0)
+
+    def test_failed_fetch_not_recorded(self, initialized_db):
+        conn = sqlite3.connect(initialized_db)
+        cursor = conn.cursor()
+
+        with patch('data.import_broker_trades.fetch_daily_closes', return_value={}) as fetch:
+            resolve_daily_closes(cursor, {'SPY': {'2025-01-26'}})
+            resolve_daily_closes(cursor, {'SPY': {'2025-01-26'}})
+        conn.close()
+
+        assert fetch.call_count == 2
+
+
+class TestMonthReimport:
+    """월 YAML 재임포트와 공존"""
+
+    def test_broker_rows_kept_and_relinked(self, tmp_path, trades_csv, initialized_db, offline_closes):
+        yaml_path = tmp_path / '2025-01.yaml'
+        yaml_path.write_text("""
+accounts:
+  - name: ISA
+    type: 중개형ISA
+    broker: 한투
+    holdings:
+      - name: CMA
+        ticker_mapping: CMA
+        amount: 100000
+        asset_type: CASH
+""", encoding='utf-8')
+        import_month(str(yaml_path), initialized_db, 26)
+        import_broker_trades(trades_csv, initialized_db)
+
+        import_month(str(yaml_path), initialized_db, 26, overwrite=True, force=True)
+
+        rows = _broker_rows(initialized_db)
+        assert len(rows) == 3
+        assert rows[1][0] == 'SPY' and rows[1][-1] == 'ISA'  # 새 계좌 ID로 재연결
+
+
+PRECEDENCE_YAML = """
+accounts:
+  - name: ISA
+    type: 중개형ISA
+    broker: 한투
+    holdings:
+      - name: SPY
+        ticker_mapping: SPY
+        amount: 300000
+      - name: CMA
+        ticker_mapping: CMA
+        amount: 100000
+        asset_type: CASH
+  - name: 연금저축
+    type: 연금저축
+    broker: 한투
+    holdings:
+      - name: 채권ETF
+        ticker_mapping: 069500.KS
+        amount: 500000
+        asset_type: BOND
+"""
+
+
+class TestYamlPrecedence:
+    """거래내역 우선 (YAML 가상 매수 대체)"""
+
+    @pytest.fixture
+    def yaml_path(self, tmp_path):
+        path = tmp_path / '2025-01.yaml'
+        path.write_text(PRECEDENCE_YAML, encoding='utf-8')
+        return str(path)
+
+    @pytest.fixture
+    def offline_prices(self):
+        prices = {'SPY': ('2025-01-24', 600.0, 'USD'), '069500.KS': ('2025-01-24', 35000.0, 'KRW')}
+        with patch('data.import_monthly_purchases.get_historical_price', side_effect=lambda t, d: prices.get(t)), \
+                patch('data.import_monthly_purchases.get_exchange_rate', return_value=1450.0):
+            yield
+
+    @staticmethod
+    def _totals(db_path):
+        """(계좌, 티커)별 투자 금액 합계 + 행 정보"""
+        conn = sqlite3.connect(db_path)
+        totals = conn.execute("""
+            SELECT a.name, p.ticker, SUM(p.input_amount), COUNT(*)
+            FROM purchase_history p JOIN accounts a ON p.account_id = a.id
+            WHERE p.year_month = '2025-01'
+            GROUP BY a.name, p.ticker
+            ORDER BY a.name, p.ticker
+        """).fetchall()
+        links = conn.execute("""
+            SELECT p.ticker, p.asset_type, h.name
+            FROM purchase_history p LEFT JOIN holdings h ON p.holding_id = h.id
+            WHERE p.note LIKE 'broker:%' AND p.account_id IS NOT NULL
+            ORDER BY p.ticker
+        """).fetchall()
+        conn.close()
+        return totals, links
+
+    def test_broker_trades_replace_yaml_purchases(self, yaml_path, trades_csv, initialized_db,
+                                                  offline_prices, offline_closes):
+        import_month(yaml_path, initialized_db, 26)
+
+        result = import_broker_trades(trades_csv, initialized_db)
+
+        assert result['replaced'] == 2
+        totals, links = self._totals(initialized_db)
+        assert totals == [
+            ('ISA', 'CMA', 100000, 1),       # 거래내역 없음 → YAML 유지
+            ('ISA', 'SPY', 1740000, 1),      # 거래내역만 (YAML 300,000원 제외)
+            ('연금저축', '069500.KS', 350000, 1),
+        ]
+        assert links == [('069500.KS', 'BOND', '채권ETF'), ('SPY', 'STOCK', 'SPY')]
+
+    def test_month_reimport_keeps_precedence(self, yaml_path, trades_csv, initialized_db,
+                                             offline_prices, offline_closes):
+        import_month(yaml_path, initialized_db, 26)
+        import_broker_trades(trades_csv, initialized_db)
+        before = self._totals(initialized_db)
+
+        import_month(yaml_path, initialized_db, 26, overwrite=True, force=True)
+
+        # 'broker:' 행은 유지되어 새 계좌·holdings에 다시 연결, YAML 매수는 다시 대체
+        assert self._totals(initialized_db) == before
@@ -0,0 +1,104 @@
+"""
+테스트 27: 평가일 시계열 적금 평가액 (calc_cash_value_series)
+- 평가일별 합계 = 평가일마다 납입건별 합산
+- 평가일 이후 납입건 제외 / include_future
+- 납입건 분할 계산 (SERIES_MAX_CELLS)
+- 월말 날짜 변환, 자산 추이 데이터의 적금 이자 반영
+"""
+import sqlite3
+import numpy as np
+import pytest
+from unittest.mock import patch
+
+import core.interest_calculator as interest_calculator
+from core.interest_calculator import calc_cash_current_value, calc_cash_value_series, month_end_dates
+
+
+PRINCIPALS = [100000, 250000, 100000, 50000]
+RATES = [0.035, 0.04, None, 0.1]
+DATES = ['2024-01-26', '2024-03-05', '2024-06-26', '2025-02-26']
+TYPES = ['simple', 'compound', 'simple', 'compound']
+EVAL_DATES = ['2023-12-31', '2024-03-05', '2024-12-31', '2025-02-28', '2030-06-30']
+
+
+def _scalar_series(eval_dates, include_future=False):
+    return [
+        sum(
+            calc_cash_current_value(p, r, d, t, e)
+            for p, r, d, t in zip(PRINCIPALS, RATES, DATES, TYPES)
+            if include_future or d <= e
+        )
+        for e in eval_dates
+    ]
+
+
+class TestCashValueSeries:
+    """평가일 × 납입건 일괄 계산"""
+
+    @pytest.mark.parametrize('include_future', [False, True])
+    def test_matches_scalar_sums(self, include_future):
+        series = calc_cash_value_series(PRINCIPALS, RATES, DATES, TYPES, EVAL_DATES, include_future)
+
+        assert series.tolist() == _scalar_series(EVAL_DATES, include_future)
+
+    def test_future_installments_excluded(self):
+        series = calc_cash_value_series(PRINCIPALS, RATES, DATES, TYPES, ['2023-12-31', '2024-03-05'])
+
+        assert series[0] == 0.0
+        assert series[1] == pytest.approx(100000 * (1 + 0.035 * 2 / 12) + 250000)  # 당일 납입건 포함
+
+    def test_principal_series(self):
+        series = calc_cash_value_series(PRINCIPALS, None, DATES, eval_dates=EVAL_DATES)
+
+        assert series.tolist() == [0.0, 350000.0, 450000.0, 500000.0, 500000.0]
+
+    def test_chunked_equals_single_pass(self):
+        expected = calc_cash_value_series(PRINCIPALS, RATES, DATES, TYPES, EVAL_DATES)
+
+        with patch.object(interest_calculator, 'SERIES_MAX_CELLS', 5):
+            chunked = calc_cash_value_series(PRINCIPALS, RATES, DATES, TYPES, EVAL_DATES)
+
+        assert chunked.tolist() == expected.tolist()
+
+    def test_empty(self):
+        assert calc_cash_value_series([], [], [], eval_dates=EVAL_DATES).tolist() == [0.0] * 5
+        assert calc_cash_value_series(PRINCIPALS, RATES, DATES, TYPES, []).size == 0
+
+
+class TestMonthEndDates:
+    """'YYYY-MM' → 월말"""
+
+    def test_month_ends(self):
+        ends = month_end_dates(['2024-01', '2024-02', '2023-02', '2024-12'])
+
+        assert ends.astype(str).tolist() == ['2024-01-31', '2024-02-29', '2023-02-28', '2024-12-31']
+
+
+class TestAssetTrendData:
+    """자산 추이 데이터: 월말 기준 적금 이자를 평가금액에 반영 (투자금액과 같은 누계 기준)"""
+
+    def test_cash_interest_added(self, initialized_db):
+        from visualization.visualize_portfolio import get_asset_trend_data
+
+        conn = sqlite3.connect(initialized_db)
+        for year_month, day in [('2024-01', '2024-01-26'), ('2024-02', '2024-02-26')]:
+            month_id = conn.execute("INSERT INTO months (year_month) VALUES (?)", (year_month,)).lastrowid
+            conn.execute("""
+                INSERT INTO purchase_history
+                (ticker, asset_type, year_month, purchase_date, quantity, input_amount, interest_rate, interest_type)
+                VALUES ('적금', 'CASH', ?, ?, 1, 120000, 0.05, 'simple')
+            """, (year_month, day))
+            conn.execute("""
+                INSERT INTO analyzed_holdings
+                (month_id, account_id, source_ticker, stock_symbol, stock_name, holding_percent, my_amount)
+                VALUES (?, NULL, 'SPY', 'AAPL', 'Apple', 0.07, 1000)
+            """, (month_id,))
+        conn.commit()
+        conn.close()
+
+        df = get_asset_trend_data(initialized_db)
+
+        assert df['cumulative_invested'].tolist() == [120000, 240000]
+        assert df['cash_interest'].tolist() == [0.0, pytest.approx(500.0)]  # 1월 납입분 1개월 이자
+        # 평가금액도 투자금액과 같은 누계 기준: 월별 평가액 누계 + 적금 이자 누계
+        assert df['current_value'].tolist() == [1000.0, pytest.approx(2500.0)]
@@ -0,0 +1,77 @@
+"""
+테스트 25: 적금 평가액 배열 API (calc_cash_values)
+- 단건 calc_cash_current_value와 값이 정확히 같음 (단리 / 복리 / 이율 없음 / 미래 매수일)
+- 이율 NaN·None, 이자 유형 None은 단건 호출부와 같은 처리
+- DataFrame 레코드 합계 (calc_cash_records_value)
+"""
+import itertools
+import pandas as pd
+import pytest
+
+from core.interest_calculator import calc_cash_current_value, calc_cash_records_value, calc_cash_values
+
+
+PRINCIPALS = [1, 100000, 333333, 7777777]
+RATES = [None, 0.0, -0.01, 0.035, 0.0425, 0.1, 3.5]
+PURCHASE_DATES = ['2020-01-26', '2023-02-28', '2025-01-31', '2025-06-01']
+INTEREST_TYPES = ['simple', 'compound']
+EVAL_DATES = ['2025-01-01', '2026-03-26', '2030-12-31']
+
+
+class TestCalcCashValues:
+    """단건 함수와 동일한 값"""
+
+    @pytest.mark.parametrize('eval_date', EVAL_DATES)
+    def test_matches_scalar_exactly(self, eval_date):
+        rows = list(itertools.product(PRINCIPALS, RATES, PURCHASE_DATES, INTEREST_TYPES))
+
+        values = calc_cash_values(
+            [r[0] for r in rows], [r[1] for r in rows], [r[2] for r in rows], [r[3] for r in rows], eval_date
+        )
+
+        expected = [calc_cash_current_value(p, rate, d, t, eval_date) for p, rate, d, t in rows]
+        assert values.tolist() == expected
+
+    def test_scalar_arguments_broadcast(self):
+        values = calc_cash_values([100000, 200000], 0.035, ['2024-01-26', '2024-07-26'], 'simple', '2025-01-26')
+
+        assert values.tolist() == [
+            calc_cash_current_value(100000, 0.035, '2024-01-26', 'simple', '2025-01-26'),
+            calc_cash_current_value(200000, 0.035, '2024-07-26', 'simple', '2025-01-26'),
+        ]
+
+    def test_missing_rate_and_type(self):
+        """DB의 NULL 이율 → 원금, NULL 이자 유형 → 단리"""
+        records = pd.DataFrame({
+            'input_amount': [100000, 100000],
+            'interest_rate': [None, 0.04],
+            'purchase_date': ['2024-01-26', '2024-01-26'],
+            'interest_type': [None, None],
+        })
+
+        values = calc_cash_values(records['input_amount'], records['interest_rate'],
+                                  records['purchase_date'], records['interest_type'], '2025-01-26')
+
+        assert values.tolist() == [100000.0, calc_cash_current_value(100000, 0.04, '2024-01-26', 'simple', '2025-01-26')]
+
+    def test_default_eval_date_is_today(self):
+        assert calc_cash_values([100000], [0.035], ['2020-01-26'], ['compound'])[0] == \
+            calc_cash_current_value(100000, 0.035, '2020-01-26', 'compound')
+
+
+class TestCalcCashRecordsValue:
+    """레코드 합계"""
+
+    def test_sum(self):
+        records = pd.DataFrame({
+            'input_amount': [100000, 50000],
+            'interest_rate': [0.035, None],
+            'purchase_date': ['2024-01-26', '2024-02-26'],
+            'interest_type': ['simple', 'simple'],
+        })
+
+        assert calc_cash_records_value(records, '2025-01-26') == pytest.approx(103500.0 + 50000.0)
+
+    def test_empty(self):
+        records = pd.DataFrame(columns=['input_amount', 'interest_rate', 'purchase_date', 'interest_type'])
+        assert calc_cash_records_value(records) == 0.0
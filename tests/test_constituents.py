@@ -0,0 +1,134 @@
+"""
+테스트 12: 운용사 보유종목 파일 기반 전체 구성 종목 (import_constituents)
+- 상단 설명 행 / 퍼센트 단위가 섞인 CSV 파싱
+- 심볼 사전 + (ETF, 심볼ID, 비중) 저장 및 재임포트 교체
+- 분석 시 yfinance top_holdings 대신 로컬 구성 종목 사용
+"""
+import sqlite3
+import pandas as pd
+import pytest
+from unittest.mock import patch
+
+from data.import_constituents import import_constituents, parse_holdings_file, save_constituents
+from core.analyze_portfolio import analyze_stock_asset, calculate_my_holdings, get_etf_constituents
+
+
+ISHARES_STYLE_CSV = """\ufeffiShares Core S&P 500 ETF
+Fund Holdings as of,"Jan 31, 2025"
+Inception Date,"May 15, 2000"
+
+Ticker,Name,Sector,Asset Class,Market Value,Weight (%),Notional Value
+AAPL,APPLE INC,Information Technology,Equity,"1,000",60.00,"1,000"
+MSFT,MICROSOFT CORP,Information Technology,Equity,"500",30.00,"500"
+USD,USD CASH,Cash and/or Derivatives,Cash,"100",6.00,"100"
+USD,USD CASH,Cash and/or Derivatives,Cash,"50",4.00,"50"
+-,FUTURES,Cash and/or Derivatives,Futures,0,0.00,0
+
+"The content contained herein is owned or licensed by BlackRock"
+"""
+
+
+def _write(tmp_path, filename, content):
+    path = tmp_path / filename
+    path.write_text(content, encoding='utf-8')
+    return str(path)
+
+
+def _large_constituents(count=3000):
+    weight = 1.0 / count
+    return pd.DataFrame({
+        'Symbol': [f'S{i:04d}' for i in range(count)],
+        'Name': [f'Stock {i}' for i in range(count)],
+        'Holding Percent': [weight] * count,
+    })
+
+
+class TestParseHoldingsFile:
+    """운용사 파일 파싱"""
+
+    def test_ishares_style_csv(self, tmp_path):
+        path = _write(tmp_path, 'IVV.csv', ISHARES_STYLE_CSV)
+
+        df = parse_holdings_file(path)
+
+        assert df['Symbol'].tolist() == ['AAPL', 'MSFT', 'USD']
+        assert df['Holding Percent'].tolist() == pytest.approx([0.6, 0.3, 0.1])
+        assert df.loc[df['Symbol'] == 'AAPL', 'Name'].iloc[0] == 'APPLE INC'
+
+    def test_fraction_weights_kept(self, tmp_path):
+        path = _write(tmp_path, 'ABC.csv', "종목코드,종목명,비중\n005930,삼성전자,0.25\n000660,SK하이닉스,0.10\n")
+
+        df = parse_holdings_file(path)
+
+        assert df['Symbol'].tolist() == ['005930', '000660']
+        assert df['Holding Percent'].tolist() == pytest.approx([0.25, 0.10])
+
+    def test_missing_columns_raises(self, tmp_path):
+        path = _write(tmp_path, 'BAD.csv', "foo,bar\n1,2\n")
+
+        with pytest.raises(ValueError):
+            parse_holdings_file(path)
+
+
+class TestSaveConstituents:
+    """컬럼형 저장 및 조회"""
+
+    def test_roundtrip_3000_constituents(self, initialized_db):
+        df = _large_constituents()
+
+        saved = save_constituents('VT', df, 'VT.csv', initialized_db)
+        loaded = get_etf_constituents('VT', initialized_db)
+
+        assert saved == 3000
+        assert len(loaded) == 3000
+        assert loaded['Holding Percent'].sum() == pytest.approx(1.0)
+
+    def test_reimport_replaces_and_shares_symbols(self, initialized_db):
+        save_constituents('VT', _large_constituents(3000), 'VT.csv', initialized_db)
+        save_constituents('VT', _large_constituents(100), 'VT.csv', initialized_db)
+        save_constituents('VTI', _large_constituents(100), 'VTI.csv', initialized_db)
+
+        conn = sqlite3.connect(initialized_db)
+        vt_count = conn.execute("SELECT COUNT(*) FROM etf_constituents WHERE etf_ticker = 'VT'").fetchone()[0]
+        symbol_count = conn.execute("SELECT COUNT(*) FROM constituent_symbols").fetchone()[0]
+        conn.close()
+
+        assert vt_count == 100
+        assert symbol_count == 3000  # 같은 심볼은 ETF 간 공유
+
+    def test_unknown_ticker_returns_none(self, initialized_db):
+        assert get_etf_constituents('SPY', initialized_db) is None
+
+    def test_import_folder(self, tmp_path, initialized_db):
+        folder = tmp_path / 'constituents'
+        folder.mkdir()
+        _write(folder, 'ivv.csv', ISHARES_STYLE_CSV)
+        _write(folder, 'notes.txt', 'ignored')
+
+        result = import_constituents(str(folder), initialized_db)
+
+        assert result == {'IVV': 3}
+
+
+class TestAnalyzeWithLocalConstituents:
+    """분석 시 로컬 구성 종목 사용"""
+
+    def test_local_constituents_replace_top_holdings(self, populated_db):
+        df = _large_constituents()
+        save_constituents('VT', df, 'VT.csv', populated_db)
+
+        with patch('core.analyze_portfolio.yf.Ticker') as mock_ticker, \
+                patch('core.analyze_portfolio.fetch_etf_sectors', return_value=None):
+            analyze_stock_asset('VT', 'VT', 1_000_000, 1, None, populated_db)
+
+        mock_ticker.assert_not_called()
+
+        conn = sqlite3.connect(populated_db)
+        rows = dict(conn.execute(
+            "SELECT stock_symbol, my_amount FROM analyzed_holdings WHERE month_id = 1 AND source_ticker = 'VT'"
+        ).fetchall())
+        conn.close()
+
+        expected = {row['stock_symbol']: row['my_amount'] for row in calculate_my_holdings('VT', 1_000_000, df)}
+        assert rows == expected
+        assert len([s for s in rows if s != 'OTHER']) == 3000
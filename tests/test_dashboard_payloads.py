@@ -0,0 +1,205 @@
+"""
+테스트 34: 대시보드 사전 계산 데이터 (streamlit_app/payloads.py)
+- 파이프라인 마지막 단계에서 월별 페이지 데이터셋을 DB 옆 파일에 저장
+- 같은 데이터 버전이면 페이지 조회가 계산 없이 저장된 결과 반환 (직접 계산과 같은 값)
+- DB가 바뀌었거나 파일이 깨졌으면 직접 계산으로 돌아감
+- 바뀐 월만 다시 계산 (직전 버전 파일이면 다른 월 데이터셋 재사용)
+"""
+import os
+import sqlite3
+import pytest
+from unittest.mock import patch
+
+import streamlit_app.data_loader as data_loader
+import streamlit_app.payloads as payloads_module
+import streamlit_app.snapshot as snapshot_module
+from streamlit_app.payloads import build_dashboard_payloads, get_payload_path, payload_key, read_payloads
+from streamlit_app.data_loader import (
+    get_account_sectors,
+    get_asset_type_summary,
+    get_available_months,
+    get_etf_lookthrough,
+    get_hierarchical_portfolio_data,
+    get_latest_month,
+    get_total_lookthrough_holdings,
+    get_total_sectors,
+)
+
+
+CACHED = (get_account_sectors, get_asset_type_summary, get_available_months, get_etf_lookthrough,
+          get_hierarchical_portfolio_data, get_latest_month, get_total_lookthrough_holdings, get_total_sectors)
+
+
+def _clear():
+    payloads_module._cached_payloads.clear()
+    snapshot_module._cached_snapshot.clear()
+    for func in CACHED:
+        func.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    _clear()
+    yield
+    _clear()
+
+
+def _page_calls(isa_id):
+    """페이지가 호출하는 방식 그대로"""
+    return [
+        lambda db: get_available_months(db),
+        lambda db: get_latest_month(db),
+        lambda db: get_asset_type_summary('2025-01', db),
+        lambda db: get_hierarchical_portfolio_data('2025-01', db),
+        lambda db: get_total_sectors('2025-01', top_n=10, db_path=db),
+        lambda db: get_total_lookthrough_holdings('2025-01', top_n=50, db_path=db),
+        lambda db: get_total_lookthrough_holdings("전체 기간", top_n=50, db_path=db),
+        lambda db: get_account_sectors('2025-01', isa_id, db),
+        lambda db: get_etf_lookthrough('2025-01', isa_id, top_n=999, db_path=db),
+    ]
+
+
+def _same(a, b):
+    if hasattr(a, 'equals'):
+        return a.equals(b)
+    return a == b
+
+
+class TestPayloadKey:
+    """사전 계산 키"""
+
+    def test_excludes_db_path(self):
+        key = payload_key('get_total_sectors', {'year_month': '2025-01', 'top_n': 10, 'db_path': 'x.db'})
+
+        assert key == ('get_total_sectors', (('year_month', '2025-01'), ('top_n', 10)))
+
+    def test_list_argument_hashable(self):
+        key = payload_key('get_months_summary', {'year_months': ['2025-01'], 'db_path': 'x.db'})
+
+        assert hash(key) is not None
+
+
+class TestBuildPayloads:
+    """파이프라인 마지막 단계"""
+
+    def test_writes_file(self, analyzed_db):
+        db_path, _, _ = analyzed_db
+
+        count = build_dashboard_payloads(db_path)
+
+        assert count > 0
+        assert os.path.exists(get_payload_path(db_path))
+
+    def test_pages_served_without_computation(self, analyzed_db):
+        db_path, _, isa_id = analyzed_db
+        expected = [call(db_path) for call in _page_calls(isa_id)]
+        _clear()
+
+        build_dashboard_payloads(db_path)
+        _clear()
+
+        # 스냅샷 / DB 조회 없이 저장된 결과만으로 응답
+        with patch.object(data_loader, 'get_snapshot', side_effect=AssertionError("스냅샷 조회")), \
+                patch.object(data_loader.sqlite3, 'connect', side_effect=AssertionError("DB 조회")):
+            served = [call(db_path) for call in _page_calls(isa_id)]
+
+        for got, want in zip(served, expected):
+            assert _same(got, want)
+
+
+class TestPayloadInvalidation:
+    """데이터가 바뀌면 직접 계산"""
+
+    def test_stale_after_commit(self, analyzed_db):
+        db_path, _, _ = analyzed_db
+        build_dashboard_payloads(db_path)
+
+        conn = sqlite3.connect(db_path)
+        conn.execute("INSERT INTO months (year_month) VALUES ('2025-03')")
+        conn.commit()
+        conn.close()
+
+        assert get_available_months(db_path) == ['2025-03', '2025-02', '2025-01']
+
+    def test_corrupt_file_ignored(self, analyzed_db):
+        db_path, _, _ = analyzed_db
+        with open(get_payload_path(db_path), 'wb') as f:
+            f.write(b'not a pickle')
+
+        assert get_available_months(db_path) == ['2025-02', '2025-01']
+
+    def test_not_saved_when_db_changes_during_build(self, analyzed_db):
+        db_path, _, _ = analyzed_db
+        versions = iter([(1, 1), (2, 2)])
+
+        with patch.object(payloads_module, 'get_data_version', side_effect=lambda _: next(versions)):
+            assert build_dashboard_payloads(db_path) == 0
+
+        assert not os.path.exists(get_payload_path(db_path))
+
+
+class TestIncrementalBuild:
+    """바뀐 월만 다시 계산"""
+
+    def _edit_month(self, db_path, month_id):
+        conn = sqlite3.connect(db_path)
+        conn.execute("""
+            INSERT INTO analyzed_sectors
+            (month_id, account_id, source_ticker, sector_name, sector_percent, my_amount, asset_type)
+            VALUES (?, NULL, 'QQQ', 'Energy', 5.0, 90000, 'STOCK')
+        """, (month_id,))
+        conn.commit()
+        conn.close()
+
+    def _built_months(self, db_path, **kwargs):
+        """다시 계산한 get_total_sectors의 월 목록"""
+        with patch.object(payloads_module, 'payload_key', wraps=payload_key) as key:
+            build_dashboard_payloads(db_path, **kwargs)
+        return [call.args[1]['year_month'] for call in key.call_args_list if call.args[0] == 'get_total_sectors']
+
+    def test_reuses_other_months(self, analyzed_db):
+        db_path, month_id, _ = analyzed_db
+        build_dashboard_payloads(db_path)
+        base_version = snapshot_module.get_data_version(db_path)
+        self._edit_month(db_path, month_id)
+
+        built = self._built_months(db_path, year_months=['2025-01'], base_version=base_version)
+        _clear()
+
+        assert built == ['2025-01', "전체 기간"]
+        payloads = read_payloads(db_path, snapshot_module.get_data_version(db_path))
+        for year_month in ['2025-01', '2025-02']:
+            key = payload_key('get_total_sectors', {'year_month': year_month, 'top_n': 10})
+            assert key in payloads  # 2025-02는 기존 파일에서 재사용
+
+        # 재사용한 월도 직접 계산과 같은 값, 바뀐 월은 새 데이터 반영
+        expected = data_loader.get_total_sectors.__wrapped__('2025-02', 10, db_path)
+        assert get_total_sectors('2025-02', top_n=10, db_path=db_path).equals(expected)
+        assert 'Energy' in get_total_sectors('2025-01', top_n=10, db_path=db_path)['sector_name'].tolist()
+
+    def test_full_build_when_base_differs(self, analyzed_db):
+        db_path, month_id, _ = analyzed_db
+        build_dashboard_payloads(db_path)
+        self._edit_month(db_path, month_id)
+
+        built = self._built_months(db_path, year_months=['2025-01'], base_version=(0, 0))
+
+        assert built == ['2025-02', '2025-01', "전체 기간"]
+
+
+class TestPipelineStage:
+    """run_monthly 마지막 단계"""
+
+    def test_stage_builds_payloads(self, analyzed_db):
+        from scripts.run_monthly import build_dashboard_stage
+        db_path, _, _ = analyzed_db
+
+        assert build_dashboard_stage(db_path) > 0
+        assert os.path.exists(get_payload_path(db_path))
+
+    def test_stage_failure_not_fatal(self, analyzed_db):
+        from scripts.run_monthly import build_dashboard_stage
+        db_path, _, _ = analyzed_db
+
+        with patch.object(payloads_module, 'build_dashboard_payloads', side_effect=RuntimeError("디스크 가득")):
+            assert build_dashboard_stage(db_path) == 0
@@ -0,0 +1,89 @@
+"""
+테스트 32: DB 데이터 버전 기반 대시보드 캐시 (cache_by_data_version)
+- DB 커밋이 있으면 데이터 버전이 바뀌고 캐시가 바로 무효화
+- 데이터가 그대로면 TTL 없이 캐시 유지 (DB 재조회 없음)
+- 감싼 함수마다 캐시 분리
+- 함수별 캐시 항목 수 상한 (max_entries, 데이터 버전마다 쌓이지 않음)
+"""
+import sqlite3
+import pytest
+from unittest.mock import patch
+
+import streamlit_app.data_loader as data_loader
+from streamlit_app.data_loader import get_available_months, get_data_version, get_latest_month
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    get_available_months.clear()
+    get_latest_month.clear()
+    yield
+    get_available_months.clear()
+    get_latest_month.clear()
+
+
+def _add_month(db_path, year_month):
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO months (year_month) VALUES (?)", (year_month,))
+    conn.commit()
+    conn.close()
+
+
+class TestDataVersion:
+    """DB 데이터 버전"""
+
+    def test_changes_on_commit(self, initialized_db):
+        before = get_data_version(initialized_db)
+        assert get_data_version(initialized_db) == before
+
+        _add_month(initialized_db, '2025-01')
+
+        assert get_data_version(initialized_db) != before
+
+    def test_missing_file(self, tmp_path):
+        assert get_data_version(str(tmp_path / 'missing.db')) == ()
+
+
+class TestVersionedCache:
+    """캐시 유지 / 무효화"""
+
+    def test_cached_until_data_changes(self, initialized_db):
+        _add_month(initialized_db, '2025-01')
+        assert get_available_months(initialized_db) == ['2025-01']
+
+        # 데이터가 그대로면 DB를 다시 읽지 않음
+        with patch.object(data_loader.sqlite3, 'connect', side_effect=AssertionError("DB 재조회")):
+            assert get_available_months(initialized_db) == ['2025-01']
+
+        # 파이프라인 실행(커밋) 직후 바로 새 데이터
+        _add_month(initialized_db, '2025-02')
+        assert get_available_months(initialized_db) == ['2025-02', '2025-01']
+        assert get_latest_month(initialized_db) == '2025-02'
+
+    def test_functions_cached_separately(self, initialized_db):
+        _add_month(initialized_db, '2025-01')
+
+        assert get_available_months(initialized_db) == ['2025-01']
+        assert get_latest_month(initialized_db) == '2025-01'
+
+    def test_keyword_db_path(self, initialized_db):
+        _add_month(initialized_db, '2025-01')
+
+        assert get_available_months(db_path=initialized_db) == ['2025-01']
+
+    def test_max_entries_bounds_cache(self, initialized_db):
+        calls = []
+
+        @data_loader.cache_by_data_version(max_entries=2)
+        def echo(db_path: str, label: str) -> str:
+            calls.append(label)
+            return label
+
+        for label in ['a', 'b', 'c']:
+            echo(initialized_db, label)
+        echo(initialized_db, 'c')
+        assert calls == ['a', 'b', 'c']
+
+        echo(initialized_db, 'a')  # 가장 오래된 항목은 제거됨
+        assert calls == ['a', 'b', 'c', 'a']
+        echo.clear()
@@ -0,0 +1,160 @@
+"""
+테스트 10: 계좌별 분석 결과로부터 전체 분석 파생 (derive_total_analysis)
+- 직접 전체 분석한 결과와 금액 일치 (절사 오차 보정)
+- CASH 상품별 유지
+- 분석 실패 계좌는 합계에서 제외
+"""
+import sqlite3
+import pandas as pd
+import pytest
+
+from core.analyze_portfolio import (
+    calculate_my_holdings,
+    calculate_my_sectors,
+    derive_total_analysis,
+    save_analyzed_holdings,
+    save_analyzed_sectors,
+)
+
+
+SPY_HOLDINGS = pd.DataFrame({
+    'Symbol': ['AAPL', 'MSFT', 'NVDA'],
+    'Name': ['Apple Inc.', 'Microsoft Corp', 'NVIDIA Corp'],
+    'Holding Percent': [0.0713, 0.0651, 0.0597],
+})
+SPY_SECTORS = {'technology': 0.3137, 'healthcare': 0.1123}
+
+
+def _month_accounts(db_path, year_month='2025-01'):
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT a.id, a.name FROM accounts a
+        JOIN months m ON a.month_id = m.id
+        WHERE m.year_month = ?
+    """, (year_month,))
+    rows = {name: acc_id for acc_id, name in cursor.fetchall()}
+    cursor.execute("SELECT id FROM months WHERE year_month = ?", (year_month,))
+    month_id = cursor.fetchone()[0]
+    conn.close()
+    return month_id, rows
+
+
+@pytest.fixture
+def two_account_spy_db(populated_db):
+    """ISA(SPY 300,000) + 연금저축(SPY 200,001)의 계좌별 분석 결과가 저장된 DB"""
+    month_id, accounts = _month_accounts(populated_db)
+
+    conn = sqlite3.connect(populated_db)
+    conn.execute(
+        "INSERT INTO holdings (account_id, name, ticker_mapping, amount, target_ratio, asset_type) "
+        "VALUES (?, 'SPY', 'SPY', 200001, 0.3, 'STOCK')", (accounts['연금저축'],))
+    conn.commit()
+    conn.close()
+
+    for account_name, amount in [('ISA', 300_000), ('연금저축', 200_001)]:
+        account_id = accounts[account_name]
+        save_analyzed_holdings(month_id, account_id,
+                               calculate_my_holdings('SPY', amount, SPY_HOLDINGS),
+                               populated_db, asset_type='STOCK')
+        save_analyzed_sectors(month_id, account_id,
+                              calculate_my_sectors('SPY', amount, SPY_SECTORS),
+                              populated_db, asset_type='STOCK')
+
+    cash_rows = [{
+        'source_ticker': 'CASH', 'stock_symbol': 'CASH', 'stock_name': 'CMA',
+        'holding_percent': 1.0, 'my_amount': 100_000
+    }]
+    save_analyzed_holdings(month_id, accounts['ISA'], cash_rows, populated_db, asset_type='CASH')
+
+    return populated_db, month_id
+
+
+def _total_rows(db_path, month_id, table, key):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(
+        f"SELECT {key}, my_amount FROM {table} WHERE month_id = ? AND account_id IS NULL",
+        (month_id,)
+    ).fetchall()
+    conn.close()
+    return dict(rows)
+
+
+class TestDeriveTotalAnalysis:
+    """INSERT ... SELECT ... GROUP BY 기반 전체 분석"""
+
+    def test_matches_direct_total_analysis(self, two_account_spy_db):
+        """파생 결과 = 전체 금액(500,001원)으로 직접 계산한 결과"""
+        db_path, month_id = two_account_spy_db
+
+        derive_total_analysis(month_id, db_path)
+
+        expected = {
+            row['stock_symbol']: row['my_amount']
+            for row in calculate_my_holdings('SPY', 500_001, SPY_HOLDINGS)
+        }
+        derived = _total_rows(db_path, month_id, 'analyzed_holdings', 'stock_symbol')
+
+        for symbol, amount in expected.items():
+            assert derived[symbol] == amount
+
+    def test_sectors_match_direct_total_analysis(self, two_account_spy_db):
+        """섹터도 전체 금액 기준으로 재계산"""
+        db_path, month_id = two_account_spy_db
+
+        derive_total_analysis(month_id, db_path)
+
+        expected = {
+            row['sector_name']: row['my_amount']
+            for row in calculate_my_sectors('SPY', 500_001, SPY_SECTORS)
+        }
+        derived = _total_rows(db_path, month_id, 'analyzed_sectors', 'sector_name')
+
+        assert derived == expected
+
+    def test_cash_summed_as_is(self, two_account_spy_db):
+        """CASH는 단순 합산"""
+        db_path, month_id = two_account_spy_db
+
+        derive_total_analysis(month_id, db_path)
+
+        derived = _total_rows(db_path, month_id, 'analyzed_holdings', 'stock_symbol')
+        assert derived['CASH'] == 100_000
+
+    def test_rerun_replaces_previous_total(self, two_account_spy_db):
+        """재실행 시 기존 전체 행을 교체 (중복 없음)"""
+        db_path, month_id = two_account_spy_db
+
+        first = derive_total_analysis(month_id, db_path)
+        second = derive_total_analysis(month_id, db_path)
+
+        conn = sqlite3.connect(db_path)
+        count = conn.execute(
+            "SELECT COUNT(*) FROM analyzed_holdings WHERE month_id = ? AND account_id IS NULL",
+            (month_id,)
+        ).fetchone()[0]
+        conn.close()
+
+        assert first == second
+        assert count == first[0]
+
+    def test_unanalyzed_account_excluded(self, populated_db):
+        """분석 결과가 없는 계좌의 투자금은 합계에 포함하지 않음"""
+        month_id, accounts = _month_accounts(populated_db)
+
+        conn = sqlite3.connect(populated_db)
+        conn.execute(
+            "INSERT INTO holdings (account_id, name, ticker_mapping, amount, target_ratio, asset_type) "
+            "VALUES (?, 'SPY', 'SPY', 200000, 0.3, 'STOCK')", (accounts['연금저축'],))
+        conn.commit()
+        conn.close()
+
+        # ISA만 분석 성공
+        save_analyzed_holdings(month_id, accounts['ISA'],
+                               calculate_my_holdings('SPY', 300_000, SPY_HOLDINGS),
+                               populated_db, asset_type='STOCK')
+
+        derive_total_analysis(month_id, populated_db)
+
+        derived = _total_rows(populated_db, month_id, 'analyzed_holdings', 'stock_symbol')
+        assert sum(derived.values()) <= 300_000
@@ -0,0 +1,233 @@
+"""
+테스트 17: 종목 노출 역색인 (build_exposure_index / search_total_holdings)
+- 분석 시 종목 → (월, 계좌, 출처 ETF, 금액, 환산 수량) 색인 생성
+- 직접 보유는 매수 수량, ETF 경유는 금액 ÷ 이번 달 원화 가격 (기준일 종가 × 이번 달 환율)
+- info를 새로 조회하지 않음 (분석 중 조회한 종목만 기준일 종가 조회)
+- 종목 검색 / 전체 기간 노출 추이를 색인에서 조회
+"""
+import sqlite3
+import pandas as pd
+import pytest
+from unittest.mock import patch
+
+import core.analyze_portfolio as analyze_portfolio
+from core.analyze_portfolio import analyze_month_portfolio, build_exposure_index, new_composition_cache
+from data.import_constituents import save_constituents
+
+
+TOP_HOLDINGS = {
+    'SPY': pd.DataFrame({'Name': ['Apple', 'Microsoft'], 'Holding Percent': [0.07, 0.06]},
+                        index=pd.Index(['AAPL', 'MSFT'], name='Symbol')),
+    'QQQ': pd.DataFrame({'Name': ['Apple'], 'Holding Percent': [0.10]},
+                        index=pd.Index(['AAPL'], name='Symbol')),
+    '069500.KS': pd.DataFrame({'Name': ['삼성전자'], 'Holding Percent': [0.3]},
+                              index=pd.Index(['005930.KS'], name='Symbol')),
+}
+INFO = {
+    'AAPL': {'quoteType': 'EQUITY', 'regularMarketPrice': 999.0, 'currency': 'USD'},
+    'MSFT': {'quoteType': 'EQUITY', 'regularMarketPrice': 999.0, 'currency': 'USD'},
+    '005930.KS': {'quoteType': 'EQUITY', 'regularMarketPrice': 99999.0, 'currency': 'KRW'},
+}
+# 기준일(마지막 매수일) 종가 - info 현재가(999)와 다름
+CLOSES = {'AAPL': 200.0, 'MSFT': 400.0, '005930.KS': 50000.0}
+
+
+def fake_closes(ticker, start_date, end_date):
+    """기준일 직전 영업일 종가 1개"""
+    return {end_date: CLOSES[ticker]} if ticker in CLOSES else {}
+
+
+def _call(fn, *args):
+    """st.cache_data 데코레이터 우회"""
+    return fn.__wrapped__(*args) if hasattr(fn, '__wrapped__') else fn(*args)
+
+
+@pytest.fixture
+def exposure_db(populated_db):
+    """2025-01, 2025-02 분석 완료 DB (현재 환율 1500, 매수 환율 1400 / 1420)"""
+    def fake_info(ticker, cache=None):
+        info = INFO.get(ticker, {'quoteType': 'ETF'})
+        if cache is not None:
+            cache['info'][ticker] = info
+        return info
+
+    with patch.object(analyze_portfolio, 'get_exchange_rate', return_value=1500.0), \
+            patch.object(analyze_portfolio, 'fetch_etf_holdings', side_effect=lambda t: TOP_HOLDINGS.get(t)), \
+            patch.object(analyze_portfolio, 'fetch_etf_sectors', return_value=None), \
+            patch.object(analyze_portfolio, 'get_ticker_info', side_effect=fake_info), \
+            patch('data.import_broker_trades.fetch_daily_closes', side_effect=fake_closes):
+        analyze_month_portfolio('2025-01', populated_db)
+        analyze_month_portfolio('2025-02', populated_db)
+    return populated_db
+
+
+def _exposures(db_path, symbol):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("""
+        SELECT month_id, account_id, source_ticker, my_amount, implied_shares, is_direct
+        FROM stock_exposures WHERE stock_symbol = ?
+        ORDER BY month_id, source_ticker
+    """, (symbol,)).fetchall()
+    conn.close()
+    return rows
+
+
+class TestBuildExposureIndex:
+    """색인 생성"""
+
+    def test_per_account_rows_with_implied_shares(self, exposure_db):
+        rows = _exposures(exposure_db, 'AAPL')
+
+        # 월 2개 × (SPY, QQQ), 계좌별 행만 (전체 행 중복 없음)
+        assert [(r[0], r[2]) for r in rows] == [(1, 'QQQ'), (1, 'SPY'), (2, 'QQQ'), (2, 'SPY')]
+        assert all(r[1] is not None for r in rows)
+
+        month1_spy = rows[1]
+        assert month1_spy[3] == 21_000  # 300,000 × 7%
+        assert month1_spy[4] == pytest.approx(21_000 / (200.0 * 1400.0))
+        assert month1_spy[5] == 0
+
+    def test_month_close_stored_for_offline_rebuild(self, exposure_db):
+        """조회한 기준일 종가는 daily_prices에 저장 → 재생성 시 yfinance 조회 없음"""
+        conn = sqlite3.connect(exposure_db)
+        stored = conn.execute(
+            "SELECT price_date, close FROM daily_prices WHERE ticker = 'AAPL' ORDER BY price_date"
+        ).fetchall()
+        conn.close()
+        assert stored == [('2025-01-26', 200.0), ('2025-02-26', 200.0)]
+
+        with patch('data.import_broker_trades.fetch_daily_closes') as mock_fetch:
+            build_exposure_index(2, exposure_db)
+
+        mock_fetch.assert_not_called()
+        assert _exposures(exposure_db, 'AAPL')[2][4] == pytest.approx(25_000 / (200.0 * 1420.0))
+
+    def test_uses_stored_month_close_not_info_price(self, populated_db):
+        """daily_prices의 기준일 종가 × 이번 달 매수 환율 사용 (info 현재가·현재 환율 미사용)"""
+        conn = sqlite3.connect(populated_db)
+        conn.execute(
+            "INSERT INTO daily_prices (ticker, price_date, close, currency) VALUES ('AAPL', '2025-01-24', 180.0, 'USD')"
+        )
+        conn.execute("""
+            INSERT INTO analyzed_holdings
+            (month_id, account_id, source_ticker, stock_symbol, stock_name, holding_percent, my_amount, asset_type)
+            VALUES (1, 1, 'SPY', 'AAPL', 'Apple', 1.0, 252000, 'STOCK')
+        """)
+        conn.commit()
+        conn.close()
+
+        cache = new_composition_cache()
+        cache['info']['AAPL'] = INFO['AAPL']
+        with patch.object(analyze_portfolio, 'get_ticker_info') as mock_info, \
+                patch('data.import_broker_trades.fetch_daily_closes') as mock_fetch:
+            build_exposure_index(1, populated_db, cache)
+
+        mock_info.assert_not_called()
+        mock_fetch.assert_not_called()
+        assert _exposures(populated_db, 'AAPL') == [(1, 1, 'SPY', 252000, pytest.approx(1.0), 0)]
+
+    def test_krw_price_not_converted(self, exposure_db):
+        rows = _exposures(exposure_db, '005930.KS')
+
+        assert len(rows) == 1
+        assert rows[0][4] == pytest.approx(150_000 / 50000.0)
+
+    def test_uncached_symbol_not_fetched(self, populated_db):
+        """분석 중 info를 조회하지 않은 종목은 info·종가 모두 새로 조회하지 않음 (수량 미산출)"""
+        conn = sqlite3.connect(populated_db)
+        conn.execute("""
+            INSERT INTO analyzed_holdings
+            (month_id, account_id, source_ticker, stock_symbol, stock_name, holding_percent, my_amount, asset_type)
+            VALUES (1, 1, 'SPY', 'AAPL', 'Apple', 1.0, 300000, 'STOCK')
+        """)
+        conn.commit()
+        conn.close()
+
+        with patch.object(analyze_portfolio, 'get_ticker_info') as mock_info, \
+                patch('data.import_broker_trades.fetch_daily_closes') as mock_fetch:
+            build_exposure_index(1, populated_db, new_composition_cache())
+
+        mock_info.assert_not_called()
+        mock_fetch.assert_not_called()
+        assert _exposures(populated_db, 'AAPL') == [(1, 1, 'SPY', 300000, None, 0)]
+
+    def test_other_and_cash_excluded(self, exposure_db):
+        assert _exposures(exposure_db, 'OTHER') == []
+        assert _exposures(exposure_db, 'CASH') == []
+
+    def test_direct_holding_uses_purchase_quantity(self, populated_db):
+        """개별 주식 직접 보유(출처 = 종목)는 매수 수량 사용"""
+        conn = sqlite3.connect(populated_db)
+        conn.execute("""
+            INSERT INTO analyzed_holdings
+            (month_id, account_id, source_ticker, stock_symbol, stock_name, holding_percent, my_amount, asset_type)
+            VALUES (1, 1, 'SPY', 'SPY', 'SPY', 1.0, 300000, 'STOCK')
+        """)
+        conn.commit()
+        conn.close()
+
+        build_exposure_index(1, populated_db)
+
+        assert _exposures(populated_db, 'SPY') == [(1, 1, 'SPY', 300000, pytest.approx(0.3632), 1)]
+
+    def test_local_constituents_not_fetched(self, populated_db):
+        """로컬 구성 종목 ETF의 종목은 가격 재조회 없음 (수량 미산출)"""
+        save_constituents('SPY', pd.DataFrame({
+            'Symbol': ['AAPL'], 'Name': ['Apple'], 'Holding Percent': [1.0]
+        }), 'SPY.csv', populated_db)
+        conn = sqlite3.connect(populated_db)
+        conn.execute("""
+            INSERT INTO analyzed_holdings
+            (month_id, account_id, source_ticker, stock_symbol, stock_name, holding_percent, my_amount, asset_type)
+            VALUES (1, 1, 'SPY', 'AAPL', 'Apple', 1.0, 300000, 'STOCK')
+        """)
+        conn.commit()
+        conn.close()
+
+        with patch.object(analyze_portfolio, 'get_ticker_info') as mock_info, \
+                patch('data.import_broker_trades.fetch_daily_closes') as mock_fetch:
+            build_exposure_index(1, populated_db, new_composition_cache())
+
+        mock_info.assert_not_called()
+        mock_fetch.assert_not_called()
+        assert _exposures(populated_db, 'AAPL') == [(1, 1, 'SPY', 300000, None, 0)]
+
+    def test_rebuild_replaces_month(self, exposure_db):
+        before = _exposures(exposure_db, 'AAPL')
+
+        with patch('data.import_broker_trades.fetch_daily_closes') as mock_fetch:
+            build_exposure_index(1, exposure_db)
+
+        mock_fetch.assert_not_called()
+        assert _exposures(exposure_db, 'AAPL') == before
+
+
+class TestExposureQueries:
+    """대시보드 조회"""
+
+    def test_search_total_holdings(self, exposure_db):
+        import streamlit_app.data_loader as dl
+
+        result = _call(dl.search_total_holdings, '2025-01', 'AAPL', exposure_db)
+
+        assert result['etf_value'] == 21_000 + 20_000
+        assert result['etf_shares'] == pytest.approx(41_000 / (200.0 * 1400.0))
+        assert [d[0] for d in result['etf_details']] == ['SPY', 'QQQ']
+        assert result['total_shares'] == pytest.approx(result['etf_shares'])
+
+    def test_search_direct_shares(self, exposure_db):
+        import streamlit_app.data_loader as dl
+
+        result = _call(dl.search_total_holdings, '2025-01', 'SPY', exposure_db)
+
+        assert result['direct_value'] == 300_000
+        assert result['direct_shares'] == pytest.approx(0.3632)
+
+    def test_exposure_history_across_months(self, exposure_db):
+        import streamlit_app.data_loader as dl
+
+        df = _call(dl.get_stock_exposure_history, 'AAPL', exposure_db)
+
+        monthly = df.groupby('year_month')['amount'].sum().to_dict()
+        assert monthly == {'2025-01': 41_000, '2025-02': 24_500 + 25_000}
+        assert set(df['account_name']) == {'ISA'}
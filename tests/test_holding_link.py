@@ -0,0 +1,168 @@
+"""
+테스트 28: 매수 이력 ↔ holdings 연결 (purchase_history.holding_id)
+- 임포트 시 매수 이력마다 holdings 행 ID 기록 (같은 티커 상품도 구분)
+- 기존 DB 백필 (ticker_mapping → name 순서로 매칭)
+- 스테이징 병합 시 본 DB holdings ID로 교체
+- CASH 상품별 평가액 일괄 조회
+"""
+import sqlite3
+import pytest
+
+from core.interest_calculator import calc_cash_current_value
+from data.init_db import init_database
+from data.import_month import import_month
+from data.import_monthly_data import import_monthly_data
+from data.import_monthly_purchases import import_monthly_purchases
+from data.staging_db import create_staging_db, merge_staging_month
+from streamlit_app.snapshot import load_snapshot
+
+
+MONTH_YAML = """
+accounts:
+  - name: ISA
+    type: 중개형ISA
+    broker: 한투
+    holdings:
+      - name: SPY
+        ticker_mapping: SPY
+        amount: 300000
+      - name: 청년적금
+        ticker_mapping: 적금
+        amount: 100000
+        asset_type: CASH
+        interest_rate: 0.05
+      - name: 일반적금
+        ticker_mapping: 적금
+        amount: 200000
+        asset_type: CASH
+        interest_rate: 0.03
+        interest_type: compound
+"""
+
+
+@pytest.fixture
+def yaml_paths(tmp_path):
+    folder = tmp_path / 'monthly'
+    folder.mkdir()
+    paths = []
+    for year_month in ['2025-01', '2025-02']:
+        path = folder / f'{year_month}.yaml'
+        path.write_text(MONTH_YAML, encoding='utf-8')
+        paths.append(str(path))
+    return paths
+
+
+def _links(db_path):
+    """(월, 매수 티커, 금액, 연결된 holdings 이름 / 티커 / 같은 계좌 여부)"""
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("""
+        SELECT p.year_month, p.ticker, p.input_amount, h.name, h.ticker_mapping, h.account_id = p.account_id
+        FROM purchase_history p LEFT JOIN holdings h ON h.id = p.holding_id
+        ORDER BY p.year_month, p.input_amount
+    """).fetchall()
+    conn.close()
+    return rows
+
+
+EXPECTED = [
+    ('2025-01', '적금', 100000, '청년적금', '적금', 1),
+    ('2025-01', '적금', 200000, '일반적금', '적금', 1),
+    ('2025-01', 'SPY', 300000, 'SPY', 'SPY', 1),
+]
+
+
+class TestImportLink:
+    """임포트 시 holding_id 기록"""
+
+    def test_import_month(self, yaml_paths, offline_prices, initialized_db):
+        import_month(yaml_paths[0], initialized_db, 26)
+
+        assert _links(initialized_db) == EXPECTED
+
+    def test_two_step_import(self, yaml_paths, offline_prices, initialized_db):
+        import_monthly_data(yaml_paths[0], initialized_db)
+        import_monthly_purchases(yaml_paths[0], initialized_db, 26)
+
+        assert _links(initialized_db) == EXPECTED
+
+    def test_overwrite_relinks(self, yaml_paths, offline_prices, initialized_db):
+        import_month(yaml_paths[0], initialized_db, 26)
+        import_month(yaml_paths[0], initialized_db, 26, overwrite=True, force=True)
+
+        assert _links(initialized_db) == EXPECTED
+
+
+class TestBackfill:
+    """기존 DB 마이그레이션"""
+
+    def test_backfill_by_ticker_then_name(self, initialized_db):
+        conn = sqlite3.connect(initialized_db)
+        month_id = conn.execute("INSERT INTO months (year_month) VALUES ('2025-01')").lastrowid
+        account_id = conn.execute(
+            "INSERT INTO accounts (month_id, name, type, broker) VALUES (?, 'ISA', '중개형ISA', '한투')", (month_id,)
+        ).lastrowid
+        conn.executemany(
+            "INSERT INTO holdings (account_id, name, ticker_mapping, amount, target_ratio, asset_type) "
+            "VALUES (?, ?, ?, ?, 0.5, ?)",
+            [(account_id, 'SPY', 'SPY', 300000, 'STOCK'), (account_id, 'CMA', 'CMA계좌', 100000, 'CASH')]
+        )
+        conn.executemany("""
+            INSERT INTO purchase_history
+            (ticker, asset_type, year_month, purchase_date, quantity, input_amount, account_id, note)
+            VALUES (?, ?, '2025-01', '2025-01-26', 1, ?, ?, ?)
+        """, [
+            ('SPY', 'STOCK', 300000, account_id, None),
+            ('CMA', 'CASH', 100000, account_id, None),  # 예전 임포트: ticker에 holdings 이름
+            ('SPY', 'STOCK', 50000, account_id, 'broker:trades.csv'),  # 증권사 거래내역은 연결 안 함
+        ])
+        conn.commit()
+        conn.close()
+
+        init_database(initialized_db)
+
+        assert _links(initialized_db) == [
+            ('2025-01', 'SPY', 50000, None, None, None),
+            ('2025-01', 'CMA', 100000, 'CMA', 'CMA계좌', 1),
+            ('2025-01', 'SPY', 300000, 'SPY', 'SPY', 1),
+        ]
+
+
+class TestStagingMergeLink:
+    """스테이징 병합"""
+
+    def test_holding_id_remapped(self, tmp_path, yaml_paths, offline_prices):
+        main_db = str(tmp_path / 'main.db')
+        staging_db = str(tmp_path / 'staging.db')
+        init_database(main_db)
+        import_month(yaml_paths[0], main_db, 26)  # 본 DB holdings ID를 스테이징과 다르게
+        create_staging_db(main_db, staging_db)
+        import_month(yaml_paths[1], staging_db, 26)
+
+        merge_staging_month(staging_db, main_db, '2025-02')
+
+        links = _links(main_db)
+        assert links[:3] == EXPECTED
+        assert links[3:] == [('2025-02',) + row[1:] for row in EXPECTED]
+
+
+class TestCashValueMap:
+    """CASH 상품별 평가액 일괄 조회"""
+
+    def test_grouped_by_product(self, yaml_paths, offline_prices, initialized_db):
+        from streamlit_app.data_loader import _get_cash_value_map
+
+        for path in yaml_paths:
+            import_month(path, initialized_db, 26)
+
+        values = _get_cash_value_map(load_snapshot(initialized_db), ['청년적금', '일반적금', '청년적금', '없는상품'])
+
+        dates = ['2025-01-26', '2025-02-26']
+        assert values == {
+            '청년적금': pytest.approx(sum(calc_cash_current_value(100000, 0.05, d, 'simple') for d in dates)),
+            '일반적금': pytest.approx(sum(calc_cash_current_value(200000, 0.03, d, 'compound') for d in dates)),
+        }
+
+    def test_empty(self, initialized_db):
+        from streamlit_app.data_loader import _get_cash_value_map
+
+        assert _get_cash_value_map(load_snapshot(initialized_db), []) == {}
@@ -0,0 +1,159 @@
+"""
+테스트 21: 임포트 입력 지문 (import_fingerprints)
+- 정규화한 YAML 내용 + 매수 기준일이 같으면 임포트 건너뜀 (주가 조회 없음, month_id 유지)
+- 주석 / 키 순서만 바뀐 경우는 변경 없음으로 판단
+- 금액 / 매수 기준일 변경, force 지정 시 다시 임포트
+- 병렬 재실행 시 변경된 월만 임포트, 변경 없는 월은 워커에서 재분석만
+"""
+import sqlite3
+import pandas as pd
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import core.analyze_portfolio as analyze_portfolio
+from data.import_month import compute_import_fingerprint, import_month, is_import_unchanged
+from data.import_monthly_data import import_monthly_data
+import scripts.run_all_months as run_all_months
+from scripts.run_all_months import run_all_months_parallel
+
+
+MONTH_YAML = """
+accounts:
+  - name: ISA
+    type: 중개형ISA
+    broker: 한투
+    holdings:
+      - name: SPY
+        ticker_mapping: SPY
+        amount: {spy}
+      - name: CMA
+        ticker_mapping: CMA
+        amount: 100000
+        asset_type: CASH
+"""
+
+
+@pytest.fixture
+def yaml_path(tmp_path):
+    path = tmp_path / '2025-03.yaml'
+    path.write_text(MONTH_YAML.format(spy=300000), encoding='utf-8')
+    return path
+
+
+class TestComputeFingerprint:
+    """지문 계산"""
+
+    def test_key_order_ignored(self):
+        a = {'accounts': [{'name': 'ISA', 'fee': 0.1}]}
+        b = {'accounts': [{'fee': 0.1, 'name': 'ISA'}]}
+        assert compute_import_fingerprint(a, 26) == compute_import_fingerprint(b, 26)
+
+    def test_purchase_day_included(self):
+        data = {'accounts': []}
+        assert compute_import_fingerprint(data, 26) != compute_import_fingerprint(data, 25)
+
+
+class TestImportSkip:
+    """변경 없는 월 임포트 건너뛰기"""
+
+    def test_unchanged_month_skipped(self, yaml_path, offline_prices, initialized_db):
+        first = import_month(str(yaml_path), initialized_db, 26, overwrite=True)
+        offline_prices.reset_mock()
+
+        second = import_month(str(yaml_path), initialized_db, 26, overwrite=True)
+
+        assert first['skipped'] is False
+        assert second == {'month_id': first['month_id'], 'accounts': 0, 'holdings': 0,
+                          'purchases': 0, 'skipped': True}
+        offline_prices.assert_not_called()
+        assert is_import_unchanged(str(yaml_path), initialized_db, 26)
+
+    def test_comment_only_edit_skipped(self, yaml_path, offline_prices, initialized_db):
+        import_month(str(yaml_path), initialized_db, 26, overwrite=True)
+        yaml_path.write_text("# 메모 추가\n" + MONTH_YAML.format(spy=300000), encoding='utf-8')
+
+        assert import_month(str(yaml_path), initialized_db, 26, overwrite=True)['skipped'] is True
+
+    def test_amount_change_reimported(self, yaml_path, offline_prices, initialized_db):
+        import_month(str(yaml_path), initialized_db, 26, overwrite=True)
+        yaml_path.write_text(MONTH_YAML.format(spy=350000), encoding='utf-8')
+
+        result = import_month(str(yaml_path), initialized_db, 26, overwrite=True)
+
+        conn = sqlite3.connect(initialized_db)
+        amount = conn.execute("SELECT input_amount FROM purchase_history WHERE ticker = 'SPY'").fetchone()[0]
+        conn.close()
+        assert result['skipped'] is False
+        assert amount == 350000
+
+    def test_purchase_day_change_reimported(self, yaml_path, offline_prices, initialized_db):
+        import_month(str(yaml_path), initialized_db, 26, overwrite=True)
+
+        assert not is_import_unchanged(str(yaml_path), initialized_db, 25)
+        assert import_month(str(yaml_path), initialized_db, 25, overwrite=True)['skipped'] is False
+
+    def test_force_reimports(self, yaml_path, offline_prices, initialized_db):
+        import_month(str(yaml_path), initialized_db, 26, overwrite=True)
+        offline_prices.reset_mock()
+
+        result = import_month(str(yaml_path), initialized_db, 26, overwrite=True, force=True)
+
+        assert result['skipped'] is False
+        offline_prices.assert_called()
+
+    def test_legacy_overwrite_invalidates_fingerprint(self, yaml_path, offline_prices, initialized_db):
+        """2단계 임포트로 월을 교체하면 지문도 무효화"""
+        import_month(str(yaml_path), initialized_db, 26, overwrite=True)
+        import_monthly_data(str(yaml_path), initialized_db, overwrite=True)
+
+        assert not is_import_unchanged(str(yaml_path), initialized_db, 26)
+
+
+class TestParallelRerun:
+    """병렬 재실행 시 변경된 월만 임포트"""
+
+    def test_only_edited_month_imported(self, tmp_path, offline_prices):
+        folder = tmp_path / 'monthly'
+        folder.mkdir()
+        paths = []
+        for year_month in ['2025-01', '2025-02']:
+            path = folder / f'{year_month}.yaml'
+            path.write_text(MONTH_YAML.format(spy=300000), encoding='utf-8')
+            paths.append(path)
+        db_path = str(tmp_path / 'main.db')
+
+        top = pd.DataFrame({'Name': ['Apple'], 'Holding Percent': [0.07]}, index=pd.Index(['AAPL'], name='Symbol'))
+        with patch.object(analyze_portfolio, 'get_exchange_rate', return_value=1450.0), \
+                patch('scripts.run_all_months.get_exchange_rate', return_value=1450.0), \
+                patch.object(analyze_portfolio, 'fetch_etf_holdings', return_value=top), \
+                patch.object(analyze_portfolio, 'fetch_etf_sectors', return_value={'technology': 0.5}), \
+                patch.object(analyze_portfolio, 'get_ticker_info',
+                             side_effect=lambda t, cache=None: {'quoteType': 'ETF' if t == 'SPY' else 'EQUITY'}):
+            first = run_all_months_parallel(paths, db_path=db_path, skip_visualize=True, workers=2)
+            paths[1].write_text(MONTH_YAML.format(spy=350000), encoding='utf-8')
+            # 워커 호출을 기록하기 위해 같은 프로세스의 스레드 풀로 실행
+            with patch.object(run_all_months, 'ProcessPoolExecutor', ThreadPoolExecutor), \
+                    patch.object(run_all_months, 'import_month', wraps=import_month) as reimport, \
+                    patch.object(run_all_months, 'analyze_month_portfolio',
+                                 wraps=analyze_portfolio.analyze_month_portfolio) as reanalyze:
+                second = run_all_months_parallel(paths, db_path=db_path, skip_visualize=True, workers=2)
+            third = run_all_months_parallel(paths, db_path=db_path, skip_visualize=True, workers=2)
+            forced = run_all_months_parallel(paths, db_path=db_path, skip_visualize=True, workers=2, force=True)
+
+        assert first == {'months': ['2025-01', '2025-02'], 'failed': [], 'unchanged': []}
+        # 임포트를 건너뛴 월도 워커의 스테이징 DB에서 재분석 (일괄·순차 모드와 동일)
+        assert second == {'months': ['2025-01', '2025-02'], 'failed': [], 'unchanged': ['2025-01']}
+        assert [call.args[0] for call in reimport.call_args_list] == [str(paths[1])]
+        assert sorted(call.kwargs['year_month'] for call in reanalyze.call_args_list) == ['2025-01', '2025-02']
+        # 병합 후에도 지문 유지 → 다음 실행도 두 월 모두 임포트 생략
+        assert third == {'months': ['2025-01', '2025-02'], 'failed': [], 'unchanged': ['2025-01', '2025-02']}
+        assert forced == {'months': ['2025-01', '2025-02'], 'failed': [], 'unchanged': []}
+
+        conn = sqlite3.connect(db_path)
+        analyzed = conn.execute("""
+            SELECT m.year_month, COUNT(*) FROM analyzed_holdings ah JOIN months m ON ah.month_id = m.id
+            GROUP BY m.year_month
+        """).fetchall()
+        conn.close()
+        assert [row[0] for row in analyzed] == ['2025-01', '2025-02']
@@ -0,0 +1,162 @@
+"""
+테스트 20: 단일 트랜잭션 월 임포트 (import_month)
+- 계좌 / 보유 종목 / 매수 이력을 한 번에 저장, 계좌 연결은 삽입한 행 기준
+- 같은 종목은 계좌가 달라도 주가 1번 조회
+- 주가 조회 실패 시 DB 변경 없음 (반쯤 임포트된 월 없음)
+- overwrite 시 기존 월의 계좌 / 분석 결과까지 교체
+"""
+import sqlite3
+import pytest
+from unittest.mock import patch
+
+from data.import_month import import_month
+from data.import_monthly_data import import_monthly_data
+from data.import_monthly_purchases import import_monthly_purchases
+
+
+MONTH_YAML = """
+accounts:
+  - name: ISA
+    type: 중개형ISA
+    broker: 한투
+    holdings:
+      - name: SPY
+        ticker_mapping: SPY
+        amount: 300000
+      - name: CMA
+        ticker_mapping: CMA
+        amount: 100000
+        asset_type: CASH
+        interest_rate: 3.5
+  - name: 연금저축
+    type: 연금저축
+    broker: 한투
+    holdings:
+      - name: SPY
+        ticker_mapping: SPY
+        amount: 200000
+      - name: KODEX200
+        ticker_mapping: 069500.KS
+        amount: 500000
+"""
+
+
+@pytest.fixture
+def yaml_path(tmp_path):
+    path = tmp_path / '2025-03.yaml'
+    path.write_text(MONTH_YAML, encoding='utf-8')
+    return str(path)
+
+
+def _month_rows(db_path, year_month='2025-03'):
+    conn = sqlite3.connect(db_path)
+    holdings = sorted(conn.execute("""
+        SELECT a.name, h.name, h.ticker_mapping, h.amount, h.target_ratio, h.asset_type, h.interest_rate
+        FROM holdings h JOIN accounts a ON h.account_id = a.id JOIN months m ON a.month_id = m.id
+        WHERE m.year_month = ?
+    """, (year_month,)).fetchall())
+    purchases = sorted(conn.execute("""
+        SELECT a.name, p.ticker, p.asset_type, p.purchase_date, p.quantity, p.input_amount,
+               p.price_at_purchase, p.currency, p.exchange_rate, p.interest_rate, p.interest_type
+        FROM purchase_history p LEFT JOIN accounts a ON p.account_id = a.id
+        WHERE p.year_month = ?
+    """, (year_month,)).fetchall(), key=repr)
+    conn.close()
+    return holdings, purchases
+
+
+class TestImportMonth:
+    """단일 트랜잭션 임포트"""
+
+    def test_matches_two_step_import(self, tmp_path, yaml_path, offline_prices, initialized_db):
+        two_step_db = str(tmp_path / 'two_step.db')
+        from data.init_db import init_database
+        init_database(two_step_db)
+        import_monthly_data(yaml_path, two_step_db, overwrite=True)
+        import_monthly_purchases(yaml_path, two_step_db, 26, overwrite=True)
+
+        result = import_month(yaml_path, initialized_db, 26)
+
+        assert result['accounts'] == 2
+        assert result['holdings'] == 4
+        assert result['purchases'] == 4
+        assert _month_rows(initialized_db) == _month_rows(two_step_db)
+
+    def test_price_fetched_once_per_ticker(self, yaml_path, offline_prices, initialized_db):
+        import_month(yaml_path, initialized_db, 26)
+
+        fetched = [call.args[0] for call in offline_prices.call_args_list]
+        assert sorted(fetched) == ['069500.KS', 'SPY']
+
+    def test_purchases_linked_to_inserted_accounts(self, yaml_path, offline_prices, initialized_db):
+        import_month(yaml_path, initialized_db, 26)
+
+        conn = sqlite3.connect(initialized_db)
+        linked = conn.execute("""
+            SELECT a.name, p.input_amount FROM purchase_history p JOIN accounts a ON p.account_id = a.id
+            WHERE p.ticker = 'SPY' ORDER BY p.input_amount
+        """).fetchall()
+        conn.close()
+
+        assert linked == [('연금저축', 200000), ('ISA', 300000)]
+
+    def test_price_failure_leaves_db_untouched(self, yaml_path, populated_db):
+        """기존 월이 있어도 주가 실패 시 삭제되지 않음"""
+        import_month_path = yaml_path.replace('2025-03', '2025-01')
+        with open(import_month_path, 'w', encoding='utf-8') as f:
+            f.write(MONTH_YAML)
+        conn = sqlite3.connect(populated_db)
+        before = conn.execute("SELECT COUNT(*) FROM holdings").fetchone()[0]
+        conn.close()
+
+        with patch('data.import_monthly_purchases.get_historical_price', return_value=None), \
+                patch('data.import_monthly_purchases.get_price_from_db', return_value=None), \
+                pytest.raises(ValueError, match='SPY'):
+            import_month(import_month_path, populated_db, 26, overwrite=True)
+
+        conn = sqlite3.connect(populated_db)
+        after = conn.execute("SELECT COUNT(*) FROM holdings").fetchone()[0]
+        months = [row[0] for row in conn.execute("SELECT year_month FROM months ORDER BY year_month")]
+        conn.close()
+        assert after == before
+        assert months == ['2025-01', '2025-02']
+
+    def test_write_error_rolls_back(self, yaml_path, offline_prices, initialized_db):
+        conn = sqlite3.connect(initialized_db)
+        conn.execute("DROP TABLE purchase_history")
+        conn.commit()
+        conn.close()
+
+        with pytest.raises(sqlite3.OperationalError):
+            import_month(yaml_path, initialized_db, 26)
+
+        conn = sqlite3.connect(initialized_db)
+        counts = [conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0] for t in ('months', 'accounts', 'holdings')]
+        conn.close()
+        assert counts == [0, 0, 0]
+
+    def test_overwrite_replaces_month_and_analysis(self, yaml_path, offline_prices, initialized_db):
+        first = import_month(yaml_path, initialized_db, 26)
+        conn = sqlite3.connect(initialized_db)
+        conn.execute("""
+            INSERT INTO analyzed_holdings
+            (month_id, account_id, source_ticker, stock_symbol, stock_name, holding_percent, my_amount)
+            VALUES (?, NULL, 'SPY', 'AAPL', 'Apple', 0.07, 21000)
+        """, (first['month_id'],))
+        conn.commit()
+        conn.close()
+
+        import_month(yaml_path, initialized_db, 26, overwrite=True, force=True)
+
+        conn = sqlite3.connect(initialized_db)
+        counts = {t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]
+                  for t in ('months', 'accounts', 'holdings', 'purchase_history', 'analyzed_holdings')}
+        conn.close()
+        assert counts == {'months': 1, 'accounts': 2, 'holdings': 4, 'purchase_history': 4, 'analyzed_holdings': 0}
+
+    def test_existing_month_without_overwrite_skipped(self, yaml_path, offline_prices, initialized_db):
+        import_month(yaml_path, initialized_db, 26)
+        offline_prices.reset_mock()
+
+        assert import_month(yaml_path, initialized_db, 26) is None
+        offline_prices.assert_not_called()
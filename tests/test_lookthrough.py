@@ -0,0 +1,119 @@
+"""
+테스트 13: 하위 펀드 재귀 전개 (expand_etf_holdings)
+- fund-of-funds 비중 곱셈 전개
+- 순환 참조 / 최대 깊이 보호
+- 같은 하위 펀드는 실행당 1번만 조회 (구성 종목 캐시)
+"""
+import pandas as pd
+import pytest
+from unittest.mock import patch
+
+import core.analyze_portfolio as analyze_portfolio
+from core.analyze_portfolio import expand_etf_holdings, new_composition_cache
+from data.import_constituents import save_constituents
+
+
+def _composition(rows):
+    return pd.DataFrame(rows, columns=['Symbol', 'Name', 'Holding Percent'])
+
+
+def _weights(df):
+    return dict(zip(df['Symbol'], df['Holding Percent']))
+
+
+@pytest.fixture
+def fund_of_funds_db(initialized_db):
+    """FOF = VT 50% + BND 30% + AAPL 20%, VT = AAPL 60% + MSFT 40%, BND = 국채 100%"""
+    save_constituents('FOF', _composition([
+        ('VT', 'Vanguard Total World', 0.5),
+        ('BND', 'Vanguard Total Bond', 0.3),
+        ('AAPL', 'Apple', 0.2),
+    ]), 'FOF.csv', initialized_db)
+    save_constituents('VT', _composition([
+        ('AAPL', 'Apple', 0.6),
+        ('MSFT', 'Microsoft', 0.4),
+    ]), 'VT.csv', initialized_db)
+    save_constituents('BND', _composition([
+        ('UST', 'US Treasury', 1.0),
+    ]), 'BND.csv', initialized_db)
+    return initialized_db
+
+
+class TestExpandEtfHoldings:
+    """재귀 전개"""
+
+    def test_nested_weights_multiplied(self, fund_of_funds_db):
+        df = expand_etf_holdings('FOF', fund_of_funds_db)
+
+        assert _weights(df) == pytest.approx({
+            'AAPL': 0.2 + 0.5 * 0.6,
+            'MSFT': 0.5 * 0.4,
+            'UST': 0.3,
+        })
+
+    def test_no_sub_funds_returns_original(self, fund_of_funds_db):
+        df = expand_etf_holdings('VT', fund_of_funds_db)
+
+        assert _weights(df) == pytest.approx({'AAPL': 0.6, 'MSFT': 0.4})
+
+    def test_depth_limit(self, fund_of_funds_db):
+        df = expand_etf_holdings('FOF', fund_of_funds_db, max_depth=1)
+
+        assert set(df['Symbol']) == {'VT', 'BND', 'AAPL'}
+
+    def test_cycle_terminates(self, initialized_db):
+        save_constituents('A', _composition([('B', 'Fund B', 0.5), ('X', 'Stock X', 0.5)]), 'A.csv', initialized_db)
+        save_constituents('B', _composition([('A', 'Fund A', 0.5), ('Y', 'Stock Y', 0.5)]), 'B.csv', initialized_db)
+
+        df = expand_etf_holdings('A', initialized_db)
+
+        # A → B → A 는 종목으로 유지
+        assert _weights(df) == pytest.approx({'X': 0.5, 'Y': 0.25, 'A': 0.25})
+
+
+class TestCompositionCache:
+    """실행 단위 캐시"""
+
+    def test_shared_sub_fund_resolved_once(self, fund_of_funds_db):
+        save_constituents('FOF2', _composition([('VT', 'Vanguard Total World', 1.0)]), 'FOF2.csv', fund_of_funds_db)
+        cache = new_composition_cache()
+
+        with patch('core.analyze_portfolio.get_etf_constituents',
+                   wraps=analyze_portfolio.get_etf_constituents) as spy:
+            expand_etf_holdings('FOF', fund_of_funds_db, cache)
+            expand_etf_holdings('FOF2', fund_of_funds_db, cache)
+            expand_etf_holdings('FOF', fund_of_funds_db, cache)
+
+        loaded = [call.args[0] for call in spy.call_args_list]
+        assert loaded.count('VT') == 1
+        assert sorted(set(loaded)) == ['BND', 'FOF', 'FOF2', 'VT']
+
+    def test_remote_sub_fund_detected_by_quote_type(self, initialized_db):
+        """yfinance 구성 종목은 quoteType으로 하위 펀드 판별, info도 1번만 조회"""
+        top_holdings = {
+            'PARENT': _composition([('CHILD', 'Child ETF', 0.5), ('AAPL', 'Apple', 0.5)]).set_index('Symbol'),
+            'CHILD': _composition([('MSFT', 'Microsoft', 1.0)]).set_index('Symbol'),
+        }
+        quote_types = {'CHILD': 'ETF', 'AAPL': 'EQUITY'}
+        cache = new_composition_cache()
+
+        with patch('core.analyze_portfolio.fetch_etf_holdings', side_effect=lambda t: top_holdings.get(t)) as fetch, \
+                patch('core.analyze_portfolio.yf.Ticker') as mock_ticker:
+            mock_ticker.side_effect = lambda t: type('T', (), {'info': {'quoteType': quote_types.get(t)}})()
+            df = expand_etf_holdings('PARENT', initialized_db, cache)
+            expand_etf_holdings('PARENT', initialized_db, cache)
+
+        assert _weights(df) == pytest.approx({'MSFT': 0.5, 'AAPL': 0.5})
+        assert fetch.call_count == 2  # PARENT, CHILD 각 1번
+        assert mock_ticker.call_count == 3  # CHILD, AAPL, MSFT 각 1번
+
+    def test_expansion_memoized_per_fund(self, fund_of_funds_db):
+        """같은 펀드 재전개 시 구성 종목 순회 / 하위 펀드 판별 없이 캐시 결과 반환"""
+        cache = new_composition_cache()
+        first = expand_etf_holdings('FOF', fund_of_funds_db, cache)
+
+        with patch.object(analyze_portfolio, '_is_fund', side_effect=AssertionError("재판별")):
+            second = expand_etf_holdings('FOF', fund_of_funds_db, cache)
+
+        assert second is first
+        assert set(expand_etf_holdings('FOF', fund_of_funds_db, cache, max_depth=1)['Symbol']) == {'VT', 'BND', 'AAPL'}
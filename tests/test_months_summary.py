@@ -0,0 +1,74 @@
+"""
+테스트 31: 여러 월 요약 일괄 조회 (get_months_summary / get_recent_months_data)
+- 월 × 지표 결과 = 월별 get_monthly_summary와 같은 값
+- 현재가 / 환율 조회는 월 수와 무관하게 1번
+- DB에 없는 월은 0, 요청한 월 순서 유지
+"""
+import sqlite3
+import pytest
+
+from streamlit_app.data_loader import get_monthly_summary, get_months_summary, get_recent_months_data
+
+
+COLUMNS = ['월', '총 자산', '총 원금', '총 수익', '수익률']
+
+
+@pytest.fixture
+def months_db(populated_db):
+    """populated_db에 2025-03 (CASH만) 추가"""
+    conn = sqlite3.connect(populated_db)
+    month_id = conn.execute("INSERT INTO months (year_month) VALUES ('2025-03')").lastrowid
+    account_id = conn.execute(
+        "INSERT INTO accounts (month_id, name, type, broker, fee) VALUES (?, 'ISA', '중개형ISA', '한투', 0.0)",
+        (month_id,)
+    ).lastrowid
+    conn.execute("""
+        INSERT INTO purchase_history
+        (ticker, asset_type, year_month, purchase_date, quantity, input_amount, price_at_purchase,
+         currency, account_id, interest_rate, interest_type)
+        VALUES ('CMA', 'CASH', '2025-03', '2025-03-26', 100000, 100000, 1.0, 'KRW', ?, 0.035, 'simple')
+    """, (account_id,))
+    conn.commit()
+    conn.close()
+    return populated_db
+
+
+class TestMonthsSummary:
+    """월 × 지표 일괄 계산"""
+
+    def test_matches_monthly_summary(self, months_db, fake_prices):
+        months = ['2025-03', '2025-01', '2025-02']
+
+        df = get_months_summary(months, months_db)
+
+        assert list(df.columns) == COLUMNS
+        assert df['월'].tolist() == months
+        for _, row in df.iterrows():
+            summary = get_monthly_summary(row['월'], months_db)
+            assert (row['총 자산'], row['총 원금'], row['총 수익'], row['수익률']) == (
+                summary['total_value'], summary['total_invested'], summary['total_profit'], summary['return_rate']
+            )
+
+    def test_single_price_batch(self, months_db, fake_prices):
+        prices, rate = fake_prices
+
+        get_months_summary(['2025-01', '2025-02', '2025-03'], months_db)
+
+        assert prices.call_count == 1
+        assert rate.call_count == 1
+
+    def test_missing_and_empty(self, months_db, fake_prices):
+        df = get_months_summary(['2030-01'], months_db)
+        assert df.values.tolist() == [['2030-01', 0, 0, 0, 0.0]]
+
+        assert get_months_summary([], months_db).empty
+
+
+class TestRecentMonthsData:
+    """최근 N개월 테이블"""
+
+    def test_recent_from_current(self, months_db, fake_prices):
+        df = get_recent_months_data('2025-02', 3, months_db)
+
+        assert df['월'].tolist() == ['2025-02', '2025-01']
+        assert list(df.columns) == COLUMNS
@@ -0,0 +1,261 @@
+"""
+테스트 18: 여러 월 병렬 임포트·분석 (run_all_months_parallel)
+- 월별 스테이징 DB에서 워커 프로세스가 임포트 + 분석
+- 본 DB 병합 결과는 순차 실행과 동일 (ID 재발급, 기존 월 교체)
+- 실패한 월은 병합하지 않고 나머지 월은 정상 병합
+- 스테이징 DB는 본 DB의 매수 이력 / 종가 / 증권사 거래내역을 보고 임포트 (재임포트 = 순차 실행)
+- 입력 변경 없는 월도 워커에서 재분석 후 같은 방식으로 병합 (일괄·순차 모드와 동일)
+- ETF 구성 종목은 메인 프로세스에서 1번 조회한 캐시를 워커에 전달
+"""
+import sqlite3
+import pandas as pd
+import pytest
+from unittest.mock import patch
+
+import core.analyze_portfolio as analyze_portfolio
+from data.init_db import init_database
+from data.import_month import import_month
+from data.import_monthly_data import import_monthly_data
+from data.import_monthly_purchases import import_monthly_purchases
+from data.staging_db import create_staging_db, merge_staging_month
+from scripts.run_all_months import _process_month_in_staging, _warm_composition_cache, run_all_months_parallel
+
+
+MONTH_YAML = """
+accounts:
+  - name: ISA
+    type: 중개형ISA
+    broker: 한투
+    holdings:
+      - name: SPY
+        ticker_mapping: SPY
+        amount: {spy}
+      - name: CMA
+        ticker_mapping: CMA
+        amount: 100000
+        asset_type: CASH
+  - name: 연금저축
+    type: 연금저축
+    broker: 한투
+    holdings:
+      - name: KODEX200
+        ticker_mapping: 069500.KS
+        amount: 500000
+"""
+
+TOP_HOLDINGS = {
+    'SPY': pd.DataFrame({'Name': ['Apple'], 'Holding Percent': [0.07]}, index=pd.Index(['AAPL'], name='Symbol')),
+    '069500.KS': pd.DataFrame({'Name': ['삼성전자'], 'Holding Percent': [0.3]},
+                              index=pd.Index(['005930.KS'], name='Symbol')),
+}
+PRICES = {'SPY': ('2025-01-24', 600.0, 'USD'), '069500.KS': ('2025-01-24', 35000.0, 'KRW')}
+
+
+@pytest.fixture
+def yaml_months(tmp_path):
+    folder = tmp_path / 'monthly'
+    folder.mkdir()
+    paths = []
+    for year_month, spy in [('2025-01', 300000), ('2025-02', 350000), ('2025-03', 400000)]:
+        path = folder / f'{year_month}.yaml'
+        path.write_text(MONTH_YAML.format(spy=spy), encoding='utf-8')
+        paths.append(path)
+    return paths
+
+
+@pytest.fixture
+def offline():
+    """주가 / 환율 / ETF 조회 고정 (fork된 워커 프로세스에도 그대로 적용)"""
+    with patch('data.import_monthly_purchases.get_historical_price', side_effect=lambda t, d: PRICES.get(t)), \
+            patch('data.import_monthly_purchases.get_exchange_rate', return_value=1450.0), \
+            patch.object(analyze_portfolio, 'get_exchange_rate', return_value=1450.0), \
+            patch('scripts.run_all_months.get_exchange_rate', return_value=1450.0), \
+            patch.object(analyze_portfolio, 'fetch_etf_holdings', side_effect=lambda t: TOP_HOLDINGS.get(t)), \
+            patch.object(analyze_portfolio, 'fetch_etf_sectors', return_value={'technology': 0.5}), \
+            patch.object(analyze_portfolio, 'get_ticker_info',
+                         side_effect=lambda t, cache=None: {'quoteType': 'ETF' if t in TOP_HOLDINGS else 'EQUITY'}):
+        yield
+
+
+def _snapshot(db_path):
+    """ID와 무관한 비교용 데이터 (월 / 계좌명 기준)"""
+    conn = sqlite3.connect(db_path)
+    queries = {
+        'months': "SELECT year_month, exchange_rate FROM months",
+        'holdings': """
+            SELECT m.year_month, a.name, h.ticker_mapping, h.amount, h.asset_type
+            FROM holdings h JOIN accounts a ON h.account_id = a.id JOIN months m ON a.month_id = m.id
+        """,
+        'purchases': """
+            SELECT p.year_month, a.name, p.ticker, p.quantity, p.input_amount
+            FROM purchase_history p LEFT JOIN accounts a ON p.account_id = a.id
+        """,
+        'analyzed': """
+            SELECT m.year_month, a.name, ah.source_ticker, ah.stock_symbol, ah.my_amount
+            FROM analyzed_holdings ah JOIN months m ON ah.month_id = m.id
+            LEFT JOIN accounts a ON ah.account_id = a.id
+        """,
+        'sectors': """
+            SELECT m.year_month, a.name, s.source_ticker, s.sector_name, s.my_amount
+            FROM analyzed_sectors s JOIN months m ON s.month_id = m.id
+            LEFT JOIN accounts a ON s.account_id = a.id
+        """,
+        'exposures': """
+            SELECT m.year_month, a.name, e.stock_symbol, e.source_ticker, e.my_amount
+            FROM stock_exposures e JOIN months m ON e.month_id = m.id
+            LEFT JOIN accounts a ON e.account_id = a.id
+        """,
+    }
+    snapshot = {key: sorted(conn.execute(sql).fetchall(), key=repr) for key, sql in queries.items()}
+    conn.close()
+    return snapshot
+
+
+def _run_sequential(yaml_files, db_path):
+    init_database(db_path)
+    for path in yaml_files:
+        import_monthly_data(str(path), db_path, overwrite=True)
+        import_monthly_purchases(str(path), db_path, 26, overwrite=True)
+        analyze_portfolio.analyze_month_portfolio(path.stem, db_path, overwrite=True)
+
+
+class TestStagingMerge:
+    """스테이징 DB 병합"""
+
+    def test_merge_matches_direct_import(self, tmp_path, yaml_months, offline):
+        sequential_db = str(tmp_path / 'sequential.db')
+        _run_sequential(yaml_months[:1], sequential_db)
+
+        main_db = str(tmp_path / 'main.db')
+        staging_db = str(tmp_path / 'staging.db')
+        init_database(main_db)
+        create_staging_db(main_db, staging_db)
+        _process_month_in_staging('2025-01', str(yaml_months[0]), staging_db, 26, False, 1450.0)
+        counts = merge_staging_month(staging_db, main_db, '2025-01')
+
+        assert counts['accounts'] == 2
+        assert _snapshot(main_db) == _snapshot(sequential_db)
+
+    def test_merge_replaces_existing_month(self, tmp_path, yaml_months, offline):
+        main_db = str(tmp_path / 'main.db')
+        staging_db = str(tmp_path / 'staging.db')
+        init_database(main_db)
+        create_staging_db(main_db, staging_db)
+        _process_month_in_staging('2025-01', str(yaml_months[0]), staging_db, 26, False, 1450.0)
+
+        merge_staging_month(staging_db, main_db, '2025-01')
+        first = _snapshot(main_db)
+        merge_staging_month(staging_db, main_db, '2025-01')
+
+        assert _snapshot(main_db) == first
+
+        conn = sqlite3.connect(main_db)
+        orphans = conn.execute(
+            "SELECT COUNT(*) FROM analyzed_holdings WHERE month_id NOT IN (SELECT id FROM months)"
+        ).fetchone()[0]
+        conn.close()
+        assert orphans == 0
+
+    def test_missing_month_raises(self, tmp_path):
+        main_db = str(tmp_path / 'main.db')
+        staging_db = str(tmp_path / 'staging.db')
+        init_database(main_db)
+        create_staging_db(main_db, staging_db)
+
+        with pytest.raises(ValueError):
+            merge_staging_month(staging_db, main_db, '2025-01')
+
+
+    def test_reimport_keeps_main_prices_and_broker_trades(self, tmp_path, yaml_months, offline):
+        def add_broker_trade(db_path):
+            conn = sqlite3.connect(db_path)
+            account_id = conn.execute("SELECT id FROM accounts WHERE name = 'ISA'").fetchone()[0]
+            conn.execute("""
+                INSERT INTO purchase_history
+                (ticker, asset_type, year_month, purchase_date, quantity, input_amount, account_id, note)
+                VALUES ('SPY', 'STOCK', '2025-01', '2025-01-10', 1, 870000, ?, 'broker:trades.csv')
+            """, (account_id,))
+            conn.execute(
+                "INSERT INTO daily_prices (ticker, price_date, close, currency) VALUES ('SPY', '2025-01-10', 600.0, 'USD')"
+            )
+            conn.commit()
+            conn.close()
+
+        # 순차 모드(run_monthly)와 같은 import_month 재임포트
+        sequential_db = str(tmp_path / 'sequential.db')
+        _run_sequential(yaml_months[:1], sequential_db)
+        add_broker_trade(sequential_db)
+        import_month(str(yaml_months[0]), sequential_db, 26, overwrite=True, force=True)
+        analyze_portfolio.analyze_month_portfolio('2025-01', sequential_db, overwrite=True)
+
+        main_db = str(tmp_path / 'main.db')
+        staging_db = str(tmp_path / 'staging.db')
+        _run_sequential(yaml_months[:1], main_db)
+        add_broker_trade(main_db)
+        create_staging_db(main_db, staging_db, '2025-01')
+
+        conn = sqlite3.connect(staging_db)
+        assert conn.execute("SELECT COUNT(*) FROM daily_prices").fetchone()[0] == 1
+        assert conn.execute("SELECT COUNT(*) FROM purchase_history WHERE note LIKE 'broker:%'").fetchone()[0] == 1
+        conn.close()
+
+        _process_month_in_staging('2025-01', str(yaml_months[0]), staging_db, 26, False, 1450.0)
+        merge_staging_month(staging_db, main_db, '2025-01')
+
+        snapshot = _snapshot(main_db)
+        assert snapshot == _snapshot(sequential_db)
+        # 새 계좌에 1번만 연결, 같은 (계좌, 월, 티커)의 YAML 매수는 거래내역으로 대체
+        assert [row for row in snapshot['purchases'] if row[2] == 'SPY'] == [('2025-01', 'ISA', 'SPY', 1.0, 870000)]
+
+
+class TestRunAllMonthsParallel:
+    """프로세스 풀 실행"""
+
+    def test_matches_sequential_run(self, tmp_path, yaml_months, offline):
+        sequential_db = str(tmp_path / 'sequential.db')
+        _run_sequential(yaml_months, sequential_db)
+
+        parallel_db = str(tmp_path / 'parallel.db')
+        result = run_all_months_parallel(yaml_months, db_path=parallel_db, skip_visualize=True, workers=2)
+
+        assert result == {'months': ['2025-01', '2025-02', '2025-03'], 'failed': [], 'unchanged': []}
+        assert _snapshot(parallel_db) == _snapshot(sequential_db)
+        assert not list(tmp_path.glob('staging_*'))  # 스테이징 DB 정리
+
+    def test_unchanged_rerun_matches_sequential(self, tmp_path, yaml_months, offline):
+        sequential_db = str(tmp_path / 'sequential.db')
+        _run_sequential(yaml_months, sequential_db)
+
+        parallel_db = str(tmp_path / 'parallel.db')
+        run_all_months_parallel(yaml_months, db_path=parallel_db, skip_visualize=True, workers=2)
+        result = run_all_months_parallel(yaml_months, db_path=parallel_db, skip_visualize=True, workers=2)
+
+        assert result == {'months': ['2025-01', '2025-02', '2025-03'], 'failed': [],
+                          'unchanged': ['2025-01', '2025-02', '2025-03']}
+        assert _snapshot(parallel_db) == _snapshot(sequential_db)
+
+    def test_worker_uses_warm_cache(self, tmp_path, yaml_months, offline):
+        """메인 프로세스에서 조회한 캐시를 받은 워커는 ETF를 다시 조회하지 않음"""
+        main_db = str(tmp_path / 'main.db')
+        staging_db = str(tmp_path / 'staging.db')
+        init_database(main_db)
+        cache = _warm_composition_cache([str(path) for path in yaml_months], main_db)
+        create_staging_db(main_db, staging_db)
+
+        with patch.object(analyze_portfolio, 'fetch_etf_holdings', side_effect=AssertionError), \
+                patch.object(analyze_portfolio, 'fetch_etf_sectors', side_effect=AssertionError):
+            _process_month_in_staging('2025-01', str(yaml_months[0]), staging_db, 26, False, 1450.0, cache)
+        merge_staging_month(staging_db, main_db, '2025-01')
+
+        sequential_db = str(tmp_path / 'sequential.db')
+        _run_sequential(yaml_months[:1], sequential_db)
+        assert _snapshot(main_db) == _snapshot(sequential_db)
+
+    def test_failed_month_skipped(self, tmp_path, yaml_months, offline):
+        yaml_months[1].write_text("accounts: [broken", encoding='utf-8')
+        db_path = str(tmp_path / 'parallel.db')
+
+        result = run_all_months_parallel(yaml_months, db_path=db_path, skip_visualize=True, workers=2)
+
+        assert result == {'months': ['2025-01', '2025-03'], 'failed': ['2025-02'], 'unchanged': []}
+        assert [row[0] for row in _snapshot(db_path)['months']] == ['2025-01', '2025-03']
@@ -0,0 +1,163 @@
+"""
+테스트 33: 세션 공유 포트폴리오 스냅샷 (streamlit_app/snapshot.py)
+- DB를 데이터 버전당 1번만 읽고, 커밋 후 첫 조회에서 새로 읽음
+- 반복 문자열은 category, 전체 분석 행의 account_id는 <NA>
+- 월 / 분석 조회 함수는 스냅샷 필터로 SQL과 같은 결과
+- 계좌 / 보유 종목 / 월별 평가액 조회는 스냅샷 로드 후 DB 연결 없음
+"""
+import sqlite3
+import pytest
+from unittest.mock import patch
+
+import streamlit_app.snapshot as snapshot_module
+from streamlit_app.snapshot import get_snapshot, load_snapshot
+from streamlit_app.data_loader import (
+    get_account_holdings,
+    get_account_sectors,
+    get_accounts,
+    get_asset_type_summary,
+    get_available_months,
+    get_etf_lookthrough,
+    get_hierarchical_portfolio_data,
+    get_latest_month,
+    get_months_summary,
+    get_total_lookthrough_holdings,
+    get_total_sectors,
+    get_total_top_holdings,
+)
+
+
+CACHED = (get_account_holdings, get_account_sectors, get_accounts, get_asset_type_summary,
+          get_available_months, get_etf_lookthrough, get_hierarchical_portfolio_data, get_latest_month,
+          get_months_summary, get_total_lookthrough_holdings, get_total_sectors, get_total_top_holdings)
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    snapshot_module._cached_snapshot.clear()
+    for func in CACHED:
+        func.clear()
+    yield
+    snapshot_module._cached_snapshot.clear()
+    for func in CACHED:
+        func.clear()
+
+
+class TestSnapshotCache:
+    """데이터 버전별 스냅샷 공유"""
+
+    def test_shared_until_commit(self, populated_db):
+        first = get_snapshot(populated_db)
+        assert get_snapshot(populated_db) is first
+
+        conn = sqlite3.connect(populated_db)
+        conn.execute("INSERT INTO months (year_month) VALUES ('2025-03')")
+        conn.commit()
+        conn.close()
+
+        second = get_snapshot(populated_db)
+        assert second is not first
+        assert second.month_id('2025-03') is not None
+        assert first.month_id('2025-03') is None
+
+    def test_single_read_per_version(self, populated_db):
+        with patch.object(snapshot_module, 'load_snapshot', wraps=load_snapshot) as loader:
+            get_available_months(populated_db)
+            get_asset_type_summary("전체 기간", populated_db)
+
+        assert loader.call_count == 1
+
+
+class TestSnapshotFrames:
+    """스냅샷 DataFrame 형식"""
+
+    def test_dtypes(self, analyzed_db):
+        db_path, month_id, _ = analyzed_db
+        snapshot = load_snapshot(db_path)
+
+        assert snapshot.purchases['ticker'].dtype == 'category'
+        assert snapshot.analyzed_sectors['sector_name'].dtype == 'category'
+        assert snapshot.analyzed_holdings['account_id'].isna().sum() == 2
+        assert len(snapshot.month_rows('analyzed_holdings', month_id)) == 2
+
+    def test_account_purchases(self, populated_db):
+        snapshot = load_snapshot(populated_db)
+        purchases = snapshot.account_purchases()
+
+        assert purchases['id'].tolist() == snapshot.purchases['id'].tolist()
+        assert purchases['account_name'].tolist() == ['ISA', 'ISA', '연금저축', 'ISA', 'ISA']
+        assert purchases.groupby('month_id').size().tolist() == [3, 2]
+
+    def test_month_lookup(self, populated_db):
+        snapshot = load_snapshot(populated_db)
+
+        assert snapshot.month_id('2030-01') is None
+        assert get_available_months(populated_db) == ['2025-02', '2025-01']
+
+
+class TestSnapshotQueries:
+    """스냅샷 기반 조회 결과"""
+
+    def test_asset_type_summary(self, analyzed_db):
+        db_path, _, _ = analyzed_db
+
+        assert get_asset_type_summary('2025-01', db_path) == {'STOCK': 14000, 'BOND': 40000, 'CASH': 0}
+        assert get_asset_type_summary('2030-01', db_path) == {'STOCK': 0, 'BOND': 0, 'CASH': 0}
+        assert get_asset_type_summary("전체 기간", db_path)['STOCK'] > 0
+
+    def test_account_sectors(self, analyzed_db):
+        db_path, _, isa_id = analyzed_db
+
+        df = get_account_sectors('2025-01', isa_id, db_path)
+
+        assert df.values.tolist() == [['Technology', 160000, 80.0], ['Healthcare', 20000, 10.0]]
+
+    def test_total_sectors(self, analyzed_db):
+        db_path, _, _ = analyzed_db
+
+        df = get_total_sectors('2025-01', top_n=2, db_path=db_path)
+
+        assert df['sector_name'].tolist() == ['Technology', 'Government']
+        assert df['percent'].tolist() == pytest.approx([60000 * 100.0 / 54000, 40000 * 100.0 / 54000])
+
+    def test_etf_lookthrough(self, analyzed_db):
+        db_path, _, isa_id = analyzed_db
+
+        df = get_etf_lookthrough('2025-01', isa_id, db_path=db_path)
+
+        # 한국 종목은 "이름 (티커)", OTHER는 맨 뒤, CASH 제외
+        assert df['종목'].tolist() == ['삼성전자 (005930.KS)', 'MSFT', 'AAPL', 'OTHER']
+        assert '출처 ETF' in df.columns
+
+    def test_hierarchical_sectors(self, analyzed_db):
+        db_path, _, _ = analyzed_db
+
+        df = get_hierarchical_portfolio_data('2025-01', db_path)
+        sectors = df[df['parents'].isin(['STOCK', 'BOND'])]
+
+        assert sectors[['labels', 'parents', 'values']].values.tolist() == [
+            ['Technology', 'STOCK', 60000],
+            ['Government', 'BOND', 40000],
+            ['Healthcare', 'STOCK', 20000],
+        ]
+
+
+class TestNoDbConnection:
+    """스냅샷을 읽은 뒤에는 DB 연결 없이 조회"""
+
+    def test_heavy_queries(self, analyzed_db):
+        db_path, _, isa_id = analyzed_db
+        get_snapshot(db_path)
+
+        with patch('streamlit_app.utils.price_fetcher.get_multiple_prices',
+                   side_effect=lambda tickers: {ticker: 500.0 for ticker in tickers}), \
+                patch('streamlit_app.utils.price_fetcher.get_current_price', return_value=1400.0), \
+                patch('sqlite3.connect', side_effect=AssertionError('DB 연결')):
+            for year_month in ['2025-01', "전체 기간"]:
+                assert [account['name'] for account in get_accounts(year_month, db_path)] == ['ISA', '연금저축']
+                assert not get_account_holdings(year_month, isa_id, db_path).empty
+                assert not get_total_top_holdings(year_month, db_path=db_path).empty
+                assert not get_total_lookthrough_holdings(year_month, db_path=db_path).empty
+            summary = get_months_summary(['2025-02', '2025-01'], db_path)
+
+        assert summary['총 원금'].tolist() == [600000, 1000000]
@@ -0,0 +1,91 @@
+"""
+테스트 23: (티커, 날짜) 인덱스 기반 최근접 가격 조회 (price_lookup)
+- 직전 / 직후 범위 탐색 2번으로 가장 가까운 날짜 선택 (같은 거리면 직전)
+- 허용 거리 밖 / 가격 NULL 행 제외
+- 여러 티커 일괄 조회, 인덱스 사용 (임시 정렬 없음)
+"""
+import sqlite3
+import pytest
+
+from data.import_monthly_purchases import get_price_from_db
+from data.price_lookup import nearest_price, nearest_prices
+
+
+@pytest.fixture
+def price_db(initialized_db):
+    conn = sqlite3.connect(initialized_db)
+    conn.executemany("""
+        INSERT INTO purchase_history (ticker, asset_type, year_month, purchase_date, quantity, input_amount, price_at_purchase)
+        VALUES (?, 'STOCK', substr(?, 1, 7), ?, 1, 0, ?)
+    """, [
+        ('SPY', '2025-01-20', '2025-01-20', 800000.0),
+        ('SPY', '2025-01-27', '2025-01-27', 820000.0),
+        ('SPY', '2025-01-25', '2025-01-25', None),
+        ('QQQ', '2025-01-10', '2025-01-10', 700000.0),
+        ('QQQ', '2025-01-14', '2025-01-14', 710000.0),
+    ])
+    conn.executemany(
+        "INSERT INTO daily_prices (ticker, price_date, close, currency) VALUES (?, ?, ?, 'USD')",
+        [('SPY', '2025-01-23', 600.0), ('SPY', '2025-01-24', 601.0)]
+    )
+    conn.commit()
+    conn.close()
+    return initialized_db
+
+
+class TestNearestPrice:
+    """단건 조회"""
+
+    @pytest.mark.parametrize('target, expected', [
+        ('2025-01-20', ('2025-01-20', 800000.0)),  # 같은 날짜
+        ('2025-01-22', ('2025-01-20', 800000.0)),  # 직전이 더 가까움
+        ('2025-01-25', ('2025-01-27', 820000.0)),  # 직후가 더 가까움 (가격 NULL 행 제외)
+        ('2025-01-15', ('2025-01-20', 800000.0)),  # 직전 없음
+        ('2025-02-05', None),  # 7일 초과
+    ])
+    def test_nearest(self, price_db, target, expected):
+        conn = sqlite3.connect(price_db)
+        assert nearest_price(conn.cursor(), 'SPY', target) == expected
+        conn.close()
+
+    def test_tie_prefers_prior(self, price_db):
+        """QQQ 01-10 / 01-14 모두 2일 거리 → 직전"""
+        conn = sqlite3.connect(price_db)
+        assert nearest_price(conn.cursor(), 'QQQ', '2025-01-12') == ('2025-01-10', 700000.0)
+        conn.close()
+
+    def test_daily_prices_source(self, price_db):
+        conn = sqlite3.connect(price_db)
+        assert nearest_price(conn.cursor(), 'SPY', '2025-01-26', source='daily_prices') == ('2025-01-24', 601.0)
+        conn.close()
+
+    def test_uses_index_without_sort(self, price_db):
+        conn = sqlite3.connect(price_db)
+        plan = ' '.join(row[3] for row in conn.execute("""
+            EXPLAIN QUERY PLAN
+            SELECT purchase_date, price_at_purchase FROM purchase_history
+            WHERE ticker = 'SPY' AND purchase_date <= '2025-01-22' AND purchase_date >= date('2025-01-22', '-7 days')
+              AND price_at_purchase IS NOT NULL
+            ORDER BY purchase_date DESC LIMIT 1
+        """))
+        conn.close()
+        assert 'idx_purchase_history_ticker_date' in plan
+        assert 'TEMP B-TREE' not in plan
+
+    def test_get_price_from_db(self, price_db):
+        assert get_price_from_db('SPY', '2025-01-26', price_db) == 820000.0
+        assert get_price_from_db('AAPL', '2025-01-26', price_db) is None
+
+
+class TestNearestPrices:
+    """일괄 조회"""
+
+    def test_batch(self, price_db):
+        result = nearest_prices(price_db, [
+            ('SPY', '2025-01-22'), ('QQQ', '2025-01-12'), ('SPY', '2025-01-22'), ('AAPL', '2025-01-22'),
+        ])
+
+        assert result == {
+            ('SPY', '2025-01-22'): ('2025-01-20', 800000.0),
+            ('QQQ', '2025-01-12'): ('2025-01-10', 700000.0),
+        }
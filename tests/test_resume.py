@@ -0,0 +1,188 @@
+"""
+테스트 16: 중단된 분석 이어서 실행 (analyze_month_portfolio resume)
+- (계좌, 보유 종목) 단위 완료 기록(run_id)을 analysis_metadata에 저장
+- 중단 후 resume 시 남은 단위만 분석, 중복 행 없음
+- FAILED 단위는 재시도, 완료 기록 없는 기존 데이터는 overwrite 필요
+- 구성 종목 조회 결과가 없는 단위는 FAILED로 기록 → resume 시 재시도 (섹터 행 중복 없음)
+"""
+import asyncio
+import shutil
+import sqlite3
+import time
+import pandas as pd
+import pytest
+from unittest.mock import patch
+
+import core.analyze_portfolio as analyze_portfolio
+from core.analyze_portfolio import analyze_month_portfolio, analyze_stock_asset, get_completed_units
+from core.analyze_portfolio_async import analyze_month_portfolio_async
+
+
+TOP_HOLDINGS = {
+    'SPY': pd.DataFrame({'Name': ['Apple', 'Microsoft'], 'Holding Percent': [0.07, 0.06]},
+                        index=pd.Index(['AAPL', 'MSFT'], name='Symbol')),
+    'QQQ': pd.DataFrame({'Name': ['Apple', 'Amazon'], 'Holding Percent': [0.09, 0.05]},
+                        index=pd.Index(['AAPL', 'AMZN'], name='Symbol')),
+    '069500.KS': pd.DataFrame({'Name': ['삼성전자'], 'Holding Percent': [0.3]},
+                              index=pd.Index(['005930.KS'], name='Symbol')),
+}
+
+
+@pytest.fixture
+def offline_yfinance():
+    """yfinance 조회 함수를 고정 데이터로 대체"""
+    with patch.object(analyze_portfolio, 'get_exchange_rate', return_value=1450.0), \
+            patch.object(analyze_portfolio, 'fetch_etf_holdings', side_effect=lambda t: TOP_HOLDINGS.get(t)), \
+            patch.object(analyze_portfolio, 'fetch_etf_sectors', return_value={'technology': 0.5}), \
+            patch.object(analyze_portfolio, 'get_ticker_info',
+                         side_effect=lambda t, cache=None: {'quoteType': 'ETF' if t in TOP_HOLDINGS else 'EQUITY'}):
+        yield
+
+
+@pytest.fixture
+def resolve_spy():
+    """resolve_asset 호출 티커 기록"""
+    calls = []
+    original = analyze_portfolio.resolve_asset
+
+    def spy(ticker, *args, **kwargs):
+        calls.append(ticker)
+        return original(ticker, *args, **kwargs)
+
+    with patch.object(analyze_portfolio, 'resolve_asset', side_effect=spy):
+        yield calls
+
+
+def _rows(db_path):
+    conn = sqlite3.connect(db_path)
+    holdings = sorted(conn.execute(
+        "SELECT month_id, account_id, source_ticker, stock_symbol, my_amount FROM analyzed_holdings"
+    ).fetchall(), key=repr)
+    sectors = sorted(conn.execute(
+        "SELECT month_id, account_id, source_ticker, sector_name, my_amount FROM analyzed_sectors"
+    ).fetchall(), key=repr)
+    units = sorted(conn.execute(
+        "SELECT account_id, holding_ticker, holding_name, status FROM analysis_metadata"
+    ).fetchall(), key=repr)
+    conn.close()
+    return holdings, sectors, units
+
+
+def _interrupt_after(count):
+    """count번째 이후 resolve_asset 호출에서 실행 중단 (Ctrl+C)"""
+    original = analyze_portfolio.resolve_asset
+    calls = []
+
+    def interrupted(ticker, *args, **kwargs):
+        if len(calls) >= count:
+            raise KeyboardInterrupt
+        calls.append(ticker)
+        return original(ticker, *args, **kwargs)
+
+    return patch.object(analyze_portfolio, 'resolve_asset', side_effect=interrupted)
+
+
+class TestCheckpoints:
+    """완료 기록"""
+
+    def test_every_unit_recorded(self, populated_db, offline_yfinance):
+        analyze_month_portfolio('2025-01', populated_db)
+
+        completed = get_completed_units(1, populated_db)
+
+        assert len(completed) == 8  # 계좌별 4 + 전체 4
+        assert (None, 'SPY', 'SPY') in completed
+
+        conn = sqlite3.connect(populated_db)
+        run_ids = {row[0] for row in conn.execute("SELECT run_id FROM analysis_metadata")}
+        conn.close()
+        assert len(run_ids) == 1 and None not in run_ids
+
+
+class TestResume:
+    """중단 후 이어서 분석"""
+
+    def test_resume_after_interrupt_matches_full_run(self, populated_db, tmp_path, offline_yfinance):
+        full_db = str(tmp_path / 'full.db')
+        shutil.copy(populated_db, full_db)
+        analyze_month_portfolio('2025-01', full_db)
+
+        with _interrupt_after(3), pytest.raises(KeyboardInterrupt):
+            analyze_month_portfolio('2025-01', populated_db)
+        assert len(get_completed_units(1, populated_db)) == 3
+
+        with patch.object(analyze_portfolio, 'resolve_asset', wraps=analyze_portfolio.resolve_asset) as spy:
+            analyze_month_portfolio('2025-01', populated_db, resume=True)
+
+        # 남은 단위 5개 (069500.KS 계좌별 + 전체는 한 번에 조회·계산)
+        assert spy.call_count == 4
+        assert len(get_completed_units(1, populated_db)) == 8
+        assert _rows(populated_db) == _rows(full_db)
+
+    def test_resume_completed_month_does_nothing(self, populated_db, offline_yfinance, resolve_spy):
+        analyze_month_portfolio('2025-01', populated_db)
+        before = _rows(populated_db)
+        resolve_spy.clear()
+
+        analyze_month_portfolio('2025-01', populated_db, resume=True)
+
+        assert resolve_spy == []
+        assert _rows(populated_db) == before
+
+    def test_failed_unit_retried(self, populated_db, offline_yfinance):
+        original = analyze_portfolio.resolve_asset
+
+        def slow_resolve(ticker, *args, **kwargs):
+            if ticker == 'QQQ':
+                time.sleep(0.5)
+                return {'ticker': 'QQQ', 'asset_type': 'STOCK', 'quote_type': 'ETF',
+                        'info': {}, 'holdings_df': None, 'sectors': None}
+            return original(ticker, *args, **kwargs)
+
+        with patch('core.analyze_portfolio_async.resolve_asset', side_effect=slow_resolve):
+            asyncio.run(analyze_month_portfolio_async('2025-01', populated_db, fetch_timeout=0.1))
+
+        with patch.object(analyze_portfolio, 'resolve_asset', wraps=original) as spy:
+            analyze_month_portfolio('2025-01', populated_db, resume=True)
+
+        assert [call.args[0] for call in spy.call_args_list] == ['QQQ']  # 계좌별 + 전체를 한 번에
+
+        conn = sqlite3.connect(populated_db)
+        statuses = [row[0] for row in conn.execute("SELECT status FROM analysis_metadata")]
+        qqq_count = conn.execute(
+            "SELECT COUNT(*) FROM analyzed_holdings WHERE source_ticker = 'QQQ' AND account_id IS NULL"
+        ).fetchone()[0]
+        conn.close()
+
+        assert 'FAILED' not in statuses
+        assert len(statuses) == 8
+        assert qqq_count == 3  # AAPL, AMZN, OTHER
+
+    def test_missing_holdings_retried(self, populated_db, tmp_path, offline_yfinance):
+        """동기 분석에서 구성 종목 조회가 None이면 완료로 기록하지 않음"""
+        full_db = str(tmp_path / 'full.db')
+        shutil.copy(populated_db, full_db)
+        analyze_month_portfolio('2025-01', full_db)
+
+        with patch.object(analyze_portfolio, 'fetch_etf_holdings',
+                          side_effect=lambda t: None if t == 'QQQ' else TOP_HOLDINGS.get(t)):
+            analyze_month_portfolio('2025-01', populated_db)
+
+        completed = get_completed_units(1, populated_db)
+        assert len(completed) == 6
+        assert not any(ticker == 'QQQ' for _, ticker, _ in completed)
+
+        with patch.object(analyze_portfolio, 'resolve_asset', wraps=analyze_portfolio.resolve_asset) as spy:
+            analyze_month_portfolio('2025-01', populated_db, resume=True)
+
+        assert [call.args[0] for call in spy.call_args_list] == ['QQQ']
+        assert _rows(populated_db) == _rows(full_db)
+
+    def test_legacy_data_requires_overwrite(self, populated_db, offline_yfinance):
+        """완료 기록 없이 저장된 분석 데이터는 이어서 분석 불가"""
+        analyze_stock_asset('SPY', 'S&P500 ETF', 1_000_000, 1, None, populated_db)
+        before = _rows(populated_db)
+
+        analyze_month_portfolio('2025-01', populated_db, resume=True)
+
+        assert _rows(populated_db) == before
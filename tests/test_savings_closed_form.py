@@ -0,0 +1,77 @@
+"""
+테스트 26: 적금 상품 단위 평가 (등차 / 등비 합 공식)
+- 매월 같은 금액 연속 납입 → 공식 결과 = 납입건별 합산
+- 평가일 이후 / 같은 달 납입(경과 0개월) 포함
+- 금액 변경 / 빠진 달 / 같은 달 중복 → 납입건별 합산으로 대체
+"""
+import itertools
+import numpy as np
+import pytest
+from unittest.mock import patch
+
+import core.interest_calculator as interest_calculator
+from core.interest_calculator import (
+    calc_cash_current_value,
+    calc_regular_savings_value,
+    calc_savings_product_value,
+    regular_schedule,
+)
+
+
+def _monthly_dates(first_month: str, count: int, day: int = 26):
+    return [f"{np.datetime64(first_month) + i}-{day:02d}" for i in range(count)]
+
+
+def _row_sum(principals, rate, dates, itype, eval_date):
+    return sum(calc_cash_current_value(p, rate, d, itype, eval_date) for p, d in zip(principals, dates))
+
+
+class TestRegularSavings:
+    """공식 계산"""
+
+    @pytest.mark.parametrize('rate, itype, eval_date, first_month, count', list(itertools.product(
+        [0.035, 0.1], ['simple', 'compound'], ['2019-01-01', '2025-03-15', '2030-06-30'],
+        ['2020-01', '2024-11'], [1, 12, 60],
+    )))
+    def test_matches_row_sum(self, rate, itype, eval_date, first_month, count):
+        dates = _monthly_dates(first_month, count)
+
+        value = calc_regular_savings_value(100000, rate, dates[0], count, itype, eval_date)
+
+        assert value == pytest.approx(_row_sum([100000] * count, rate, dates, itype, eval_date), rel=1e-12)
+
+    def test_no_rate(self):
+        assert calc_regular_savings_value(100000, None, '2020-01-26', 24) == 2400000.0
+        assert calc_regular_savings_value(100000, 0.0, '2020-01-26', 24) == 2400000.0
+
+    def test_constant_time(self):
+        """납입 100년치도 배열 연산 없이 계산"""
+        with patch.object(interest_calculator, 'calc_cash_values') as per_row:
+            value = calc_savings_product_value(
+                [50000] * 1200, 0.03, _monthly_dates('1950-01', 1200), 'compound', '2050-01-01'
+            )
+        per_row.assert_not_called()
+        assert value > 50000 * 1200
+
+
+class TestSavingsProductFallback:
+    """불규칙 납입은 납입건별 합산"""
+
+    @pytest.mark.parametrize('principals, dates', [
+        ([100000, 150000, 100000], _monthly_dates('2024-01', 3)),  # 금액 변경
+        ([100000] * 3, ['2024-01-26', '2024-02-26', '2024-04-26']),  # 빠진 달
+        ([100000] * 3, ['2024-01-05', '2024-01-26', '2024-02-26']),  # 같은 달 중복
+    ])
+    def test_irregular_schedule(self, principals, dates):
+        assert regular_schedule(principals, dates) is None
+
+        value = calc_savings_product_value(principals, 0.04, dates, 'compound', '2025-06-30')
+
+        assert value == pytest.approx(_row_sum(principals, 0.04, dates, 'compound', '2025-06-30'), rel=1e-12)
+
+    def test_unordered_regular_schedule(self):
+        dates = list(reversed(_monthly_dates('2024-01', 6)))
+        assert regular_schedule([100000] * 6, dates) == (100000.0, '2024-01-26', 6)
+
+    def test_nan_rate(self):
+        assert calc_savings_product_value([100000] * 3, float('nan'), _monthly_dates('2024-01', 3)) == 300000.0
@@ -0,0 +1,188 @@
+"""
+테스트 24: 월별 YAML 감시 모드 (watch_monthly)
+- 시작 시 DB 입력 지문과 다른 월만 처리
+- mtime 변경 후 한 폴링 동안 그대로면 해당 월만 처리
+- 조회 캐시(구성 종목 등)는 월 간 공유, 잘못된 YAML은 루프를 멈추지 않음
+- 이전 월 수정 시 이후 월 누적 차트도 다시 그림
+- 대시보드 데이터는 수정한 월만 다시 계산 (다른 월은 기존 파일 재사용)
+- 임포트 후 분석이 실패하면 지문을 지우고 다음 폴링에서 재시도
+"""
+import os
+import pandas as pd
+import pytest
+from unittest.mock import patch
+
+import core.analyze_portfolio as analyze_portfolio
+import scripts.watch_monthly as watch_module
+from scripts.watch_monthly import scan_monthly_files, watch_monthly
+from streamlit_app.payloads import read_payloads
+from streamlit_app.snapshot import get_data_version
+
+
+MONTH_YAML = """
+accounts:
+  - name: ISA
+    type: 중개형ISA
+    broker: 한투
+    holdings:
+      - name: SPY
+        ticker_mapping: SPY
+        amount: {spy}
+"""
+
+PRICES = {'SPY': ('2025-01-24', 600.0, 'USD')}
+
+
+@pytest.fixture
+def monthly_dir(tmp_path):
+    folder = tmp_path / 'monthly'
+    folder.mkdir()
+    for year_month in ['2025-01', '2025-02']:
+        (folder / f'{year_month}.yaml').write_text(MONTH_YAML.format(spy=300000), encoding='utf-8')
+    return folder
+
+
+@pytest.fixture
+def offline():
+    """주가 / 환율 / ETF 조회 고정, 시각화 생략"""
+    top = pd.DataFrame({'Name': ['Apple'], 'Holding Percent': [0.07]}, index=pd.Index(['AAPL'], name='Symbol'))
+    with patch('data.import_monthly_purchases.get_historical_price', side_effect=lambda t, d: PRICES.get(t)), \
+            patch('data.import_monthly_purchases.get_exchange_rate', return_value=1450.0), \
+            patch.object(watch_module, 'get_exchange_rate', return_value=1450.0) as rate, \
+            patch.object(analyze_portfolio, 'fetch_etf_holdings', return_value=top) as holdings, \
+            patch.object(analyze_portfolio, 'fetch_etf_sectors', return_value={'technology': 0.5}), \
+            patch.object(analyze_portfolio, 'get_ticker_info',
+                         side_effect=lambda t, cache=None: {'quoteType': 'ETF' if t == 'SPY' else 'EQUITY'}), \
+            patch.object(watch_module, 'visualize_portfolio') as visualize:
+        yield {'rate': rate, 'holdings': holdings, 'visualize': visualize}
+
+
+def _edit(path, spy, bump_ns=10 ** 9):
+    """내용 수정 + mtime을 확실히 다르게"""
+    stat = path.stat()
+    path.write_text(MONTH_YAML.format(spy=spy), encoding='utf-8')
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + bump_ns))
+
+
+class TestScanMonthlyFiles:
+    """파일 스캔"""
+
+    def test_only_month_files(self, monthly_dir):
+        (monthly_dir / 'template.yaml').write_text('accounts: []', encoding='utf-8')
+        (monthly_dir / '2025-03.yml').write_text('accounts: []', encoding='utf-8')
+
+        assert sorted(os.path.basename(p) for p in scan_monthly_files(str(monthly_dir))) == \
+            ['2025-01.yaml', '2025-02.yaml']
+
+
+class TestWatchMonthly:
+    """감시 루프"""
+
+    def test_startup_processes_only_changed_months(self, monthly_dir, db_path, offline):
+        first = watch_monthly(str(monthly_dir), db_path, max_cycles=0, interval=0)
+        second = watch_monthly(str(monthly_dir), db_path, max_cycles=0, interval=0)
+
+        assert first == ['2025-01', '2025-02']
+        assert second == []
+        # 두 달이 SPY 구성 종목 캐시 공유
+        assert offline['holdings'].call_count == 1
+        assert offline['rate'].call_count == 1
+
+    def test_edit_processed_after_stable_poll(self, monthly_dir, db_path, offline):
+        watch_monthly(str(monthly_dir), db_path, max_cycles=0, interval=0)
+        target = monthly_dir / '2025-02.yaml'
+        sleeps = []
+
+        def fake_sleep(seconds):
+            sleeps.append(seconds)
+            if len(sleeps) == 1:
+                _edit(target, 350000)
+
+        with patch.object(watch_module.time, 'sleep', side_effect=fake_sleep):
+            processed = watch_monthly(str(monthly_dir), db_path, max_cycles=3, interval=1)
+
+        assert processed == ['2025-02']
+        offline['visualize'].assert_called_with('2025-02', db_path, 'charts', price_cache={})
+
+    def test_edit_rerenders_later_months(self, monthly_dir, db_path, offline):
+        watch_monthly(str(monthly_dir), db_path, max_cycles=0, interval=0)
+        target = monthly_dir / '2025-01.yaml'
+        offline['visualize'].reset_mock()
+        sleeps = []
+
+        def fake_sleep(seconds):
+            sleeps.append(seconds)
+            if len(sleeps) == 1:
+                _edit(target, 350000)
+
+        with patch.object(watch_module.time, 'sleep', side_effect=fake_sleep):
+            processed = watch_monthly(str(monthly_dir), db_path, max_cycles=3, interval=1)
+
+        assert processed == ['2025-01']
+        assert [(c.args, c.kwargs.get('render_trend', True)) for c in offline['visualize'].call_args_list] == [
+            (('2025-01', db_path, 'charts'), True),
+            (('2025-02', db_path, 'charts'), False),  # 누적 자산 배분에 2025-01 매수 포함
+        ]
+
+    def test_edit_rebuilds_only_edited_month_payloads(self, monthly_dir, db_path, offline):
+        watch_monthly(str(monthly_dir), db_path, max_cycles=0, interval=0)
+        target = monthly_dir / '2025-01.yaml'
+        before_edit = get_data_version(db_path)
+        sleeps = []
+
+        def fake_sleep(seconds):
+            sleeps.append(seconds)
+            if len(sleeps) == 1:
+                _edit(target, 350000)
+
+        with patch.object(watch_module.time, 'sleep', side_effect=fake_sleep), \
+                patch.object(watch_module, 'build_dashboard_stage',
+                             wraps=watch_module.build_dashboard_stage) as stage:
+            watch_monthly(str(monthly_dir), db_path, max_cycles=3, interval=1)
+
+        stage.assert_called_once_with(db_path, ['2025-01'], before_edit)
+        assert read_payloads(db_path, get_data_version(db_path))  # 수정 후 DB 버전 기준으로 저장
+
+    def test_failed_analysis_retried_next_poll(self, monthly_dir, db_path, offline):
+        analyze = watch_module.analyze_month_portfolio
+        calls = []
+
+        def flaky_analyze(**kwargs):
+            calls.append(kwargs['year_month'])
+            if len(calls) == 1:
+                raise ConnectionError("네트워크 끊김")
+            return analyze(**kwargs)
+
+        with patch.object(watch_module, 'analyze_month_portfolio', side_effect=flaky_analyze), \
+                patch.object(watch_module.time, 'sleep'):
+            processed = watch_monthly(str(monthly_dir), db_path, max_cycles=1, interval=1)
+
+        # 시작 시 2025-01 분석 실패 → 파일 변경 없이 다음 폴링에서 재처리
+        assert calls == ['2025-01', '2025-02', '2025-01']
+        assert processed == ['2025-02', '2025-01']
+        assert watch_monthly(str(monthly_dir), db_path, max_cycles=0, interval=0) == []
+
+    def test_failed_analysis_reprocessed_after_restart(self, monthly_dir, db_path, offline):
+        with patch.object(watch_module, 'analyze_month_portfolio', side_effect=ConnectionError("네트워크 끊김")):
+            assert watch_monthly(str(monthly_dir), db_path, max_cycles=0, interval=0) == []
+
+        assert watch_monthly(str(monthly_dir), db_path, max_cycles=0, interval=0) == ['2025-01', '2025-02']
+
+    def test_broken_yaml_does_not_stop_loop(self, monthly_dir, db_path, offline):
+        watch_monthly(str(monthly_dir), db_path, max_cycles=0, interval=0)
+        broken = monthly_dir / '2025-01.yaml'
+        fixed = monthly_dir / '2025-02.yaml'
+        sleeps = []
+
+        def fake_sleep(seconds):
+            sleeps.append(seconds)
+            if len(sleeps) == 1:
+                stat = broken.stat()
+                broken.write_text('accounts: [broken', encoding='utf-8')
+                os.utime(broken, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+                _edit(fixed, 400000)
+
+        with patch.object(watch_module.time, 'sleep', side_effect=fake_sleep):
+            processed = watch_monthly(str(monthly_dir), db_path, max_cycles=3, interval=1)
+
+        assert processed == ['2025-02']
@@ -0,0 +1,109 @@
+"""
+테스트 19: YAML 로딩 레이어 (data/yaml_loader.py)
+- 같은 파일은 1번만 파싱 (경로 + mtime + 내용 해시 캐시)
+- 내용이 바뀌면 다시 파싱, touch만 한 경우는 파싱 생략
+- 디스크 캐시로 프로세스 간 재사용, 반환값은 캐시와 분리된 복사본
+"""
+import os
+import pytest
+from unittest.mock import patch
+
+import data.yaml_loader as yaml_loader
+from data.yaml_loader import clear_yaml_cache, load_yaml
+
+
+MONTH_YAML = """
+accounts:
+  - name: ISA
+    type: 중개형ISA
+    broker: 한투
+    holdings:
+      - name: SPY
+        ticker_mapping: SPY
+        amount: 300000
+"""
+
+
+@pytest.fixture
+def yaml_file(tmp_path):
+    path = tmp_path / '2025-01.yaml'
+    path.write_text(MONTH_YAML, encoding='utf-8')
+    return path
+
+
+@pytest.fixture
+def parse_spy():
+    with patch.object(yaml_loader, 'parse_yaml', wraps=yaml_loader.parse_yaml) as spy:
+        yield spy
+
+
+def _bump_mtime(path):
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+class TestLoadYaml:
+    """캐시 동작"""
+
+    def test_parsed_once(self, yaml_file, parse_spy):
+        first = load_yaml(str(yaml_file))
+        second = load_yaml(str(yaml_file))
+
+        assert first == second
+        assert first['accounts'][0]['holdings'][0]['amount'] == 300000
+        assert parse_spy.call_count == 1
+
+    def test_touch_without_change_not_reparsed(self, yaml_file, parse_spy):
+        load_yaml(str(yaml_file))
+        _bump_mtime(yaml_file)
+
+        load_yaml(str(yaml_file))
+
+        assert parse_spy.call_count == 1
+
+    def test_content_change_reparsed(self, yaml_file, parse_spy):
+        load_yaml(str(yaml_file))
+        yaml_file.write_text(MONTH_YAML.replace('300000', '450000'), encoding='utf-8')
+        _bump_mtime(yaml_file)
+
+        data = load_yaml(str(yaml_file))
+
+        assert data['accounts'][0]['holdings'][0]['amount'] == 450000
+        assert parse_spy.call_count == 2
+
+    def test_disk_cache_survives_memory_clear(self, yaml_file, parse_spy):
+        load_yaml(str(yaml_file))
+        clear_yaml_cache()
+
+        data = load_yaml(str(yaml_file))
+
+        assert data['accounts'][0]['name'] == 'ISA'
+        assert parse_spy.call_count == 1
+
+    def test_returned_copy_is_independent(self, yaml_file):
+        data = load_yaml(str(yaml_file))
+        data['accounts'].clear()
+
+        assert len(load_yaml(str(yaml_file))['accounts']) == 1
+
+    def test_no_cache_option(self, yaml_file, parse_spy):
+        load_yaml(str(yaml_file), use_cache=False)
+        load_yaml(str(yaml_file), use_cache=False)
+
+        assert parse_spy.call_count == 2
+
+    def test_corrupt_disk_cache_ignored(self, yaml_file, parse_spy):
+        load_yaml(str(yaml_file))
+        for path in yaml_loader.get_cache_dir().glob('*.pickle'):
+            path.write_bytes(b'broken')
+        clear_yaml_cache()
+
+        data = load_yaml(str(yaml_file))
+
+        assert data['accounts'][0]['name'] == 'ISA'
+        assert parse_spy.call_count == 2
+
+    def test_same_result_as_safe_load(self, yaml_file):
+        import yaml
+
+        assert load_yaml(str(yaml_file), use_cache=False) == yaml.safe_load(MONTH_YAML)
@@ -6,10 +6,11 @@ import sqlite3
 import argparse
 from pathlib import Path
 from datetime import datetime
+from typing import Optional
 import matplotlib.pyplot as plt
 import matplotlib.font_manager as fm
 import pandas as pd
-from core.interest_calculator import calc_cash_current_value
+from core.interest_calculator import calc_cash_records_value, calc_cash_value_series, month_end_dates
 
 # 한글 폰트 설정
 plt.rcParams['font.family'] = 'AppleGothic'  # macOS
@@ -97,7 +98,32 @@ def get_top_holdings(month_id: int, db_path: str, limit: int = 10) -> pd.DataFra
     return df
 
 
-def get_cumulative_net_worth(up_to_month: str, db_path: str) -> dict:
+def _get_last_price(ticker: str, price_cache: Optional[dict]) -> float:
+    """
+    yfinance 현재가 조회 (price_cache가 있으면 티커당 1번만 조회)
+    실패 시 예외를 그대로 전달 (실패도 캐시하여 재조회하지 않음)
+    """
+    import yfinance as yf
+
+    if price_cache is not None and ticker in price_cache:
+        cached = price_cache[ticker]
+        if isinstance(cached, Exception):
+            raise cached
+        return cached
+
+    try:
+        price = yf.Ticker(ticker).fast_info['last_price']
+    except Exception as e:
+        if price_cache is not None:
+            price_cache[ticker] = e
+        raise
+
+    if price_cache is not None:
+        price_cache[ticker] = price
+    return price
+
+
+def get_cumulative_net_worth(up_to_month: str, db_path: str, price_cache: Optional[dict] = None) -> dict:
     """
     해당 월까지의 누적 자산 계산
 
@@ -107,6 +133,7 @@ def get_cumulative_net_worth(up_to_month: str, db_path: str) -> dict:
     Args:
         up_to_month: 기준 월 (YYYY-MM)
         db_path: 데이터베이스 경로
+        price_cache: 여러 월 시각화 시 공유하는 현재가/환율 캐시 (None이면 매번 조회)
 
     Returns:
         {
@@ -124,8 +151,6 @@ def get_cumulative_net_worth(up_to_month: str, db_path: str) -> dict:
             }
         }
     """
-    import yfinance as yf
-
     conn = sqlite3.connect(db_path)
 
     # 1. purchase_history에서 투자금액 및 수량 누적 (CASH 제외)
@@ -156,15 +181,7 @@ def get_cumulative_net_worth(up_to_month: str, db_path: str) -> dict:
     cash_value = 0.0
     if not cash_records.empty:
         cash_invested = int(cash_records['input_amount'].sum())
-        for _, rec in cash_records.iterrows():
-            rate = rec['interest_rate'] if pd.notna(rec['interest_rate']) else None
-            itype = rec['interest_type'] if pd.notna(rec['interest_type']) else 'simple'
-            cash_value += calc_cash_current_value(
-                principal=int(rec['input_amount']),
-                annual_rate=rate,
-                purchase_date=rec['purchase_date'],
-                interest_type=itype,
-            )
+        cash_value = calc_cash_records_value(cash_records)
 
     if cash_invested > 0:
         cash_row = pd.DataFrame([{
@@ -187,7 +204,7 @@ def get_cumulative_net_worth(up_to_month: str, db_path: str) -> dict:
 
     # 4. 환율 조회
     try:
-        exchange_rate = yf.Ticker("KRW=X").fast_info['last_price']
+        exchange_rate = _get_last_price("KRW=X", price_cache)
     except:
         exchange_rate = 1450.0
 
@@ -206,8 +223,7 @@ def get_cumulative_net_worth(up_to_month: str, db_path: str) -> dict:
         else:
             try:
                 # yfinance로 현재가 조회
-                stock = yf.Ticker(ticker)
-                current_price_usd = stock.fast_info['last_price']
+                current_price_usd = _get_last_price(ticker, price_cache)
 
                 # 한국 주식 여부 확인
                 is_korean = ticker.endswith(('.KS', '.KQ'))
@@ -491,11 +507,24 @@ def create_top_holdings_chart(holdings_df: pd.DataFrame, output_path: str, top_n
     print(f"✅ 상위 보유 종목 차트 저장: {output_path} (총 {len(display_df)}개 항목)")
 
 
-def create_asset_trend_chart(db_path: str, output_path: str, months: int = 6):
-    """자산 추이 라인 차트 생성 (투자금액 vs 평가금액)"""
+def get_asset_trend_data(db_path: str) -> pd.DataFrame:
+    """
+    월별 자산 추이 데이터 (투자금액 누계 vs 평가금액 누계)
+
+    투자금액과 평가금액 모두 해당 월까지의 누계로 계산한다.
+    평가금액 = 월별 분석 평가액(analyzed_holdings)의 누계 + 각 월말까지 쌓인 적금 이자 누계
+    (calc_cash_value_series로 전체 월 한 번에 계산).
+
+    Args:
+        db_path: 데이터베이스 경로
+
+    Returns:
+        DataFrame with ['year_month', 'monthly_invested', 'cumulative_invested', 'current_value', 'cash_interest']
+        (current_value / cash_interest도 누계)
+    """
     conn = sqlite3.connect(db_path)
 
-    # 1. 투자금액 누적 (purchase_history)
+    # 1. 투자금액 누적 (purchase_history, CASH 포함)
     invested_query = """
         SELECT
             year_month,
@@ -507,24 +536,18 @@ def create_asset_trend_chart(db_path: str, output_path: str, months: int = 6):
 
     invested_df = pd.read_sql_query(invested_query, conn)
 
-    # 2. CASH 추가 (purchase_history, 이자 반영)
-    cash_query = """
-        SELECT
-            year_month,
-            SUM(input_amount) as cash_amount
+    # 2. CASH 납입건 (월말 기준 이자 계산용)
+    cash_records = pd.read_sql_query("""
+        SELECT input_amount, interest_rate, purchase_date, interest_type
         FROM purchase_history
         WHERE asset_type = 'CASH'
-        GROUP BY year_month
-        ORDER BY year_month
-    """
-
-    cash_df = pd.read_sql_query(cash_query, conn)
+    """, conn)
 
-    # 3. 평가금액 (analyzed_holdings)
+    # 3. 월별 평가금액 (analyzed_holdings, 해당 월 매수분)
     value_query = """
         SELECT
             m.year_month,
-            SUM(ah.my_amount) as current_value
+            SUM(ah.my_amount) as monthly_value
         FROM months m
         JOIN analyzed_holdings ah ON m.id = ah.month_id
         WHERE ah.account_id IS NULL
@@ -536,12 +559,30 @@ def create_asset_trend_chart(db_path: str, output_path: str, months: int = 6):
     conn.close()
 
     # 4. 데이터 병합
-    df = pd.merge(invested_df, cash_df, on='year_month', how='outer')
-    df = pd.merge(df, value_df, on='year_month', how='outer')
-    df = df.fillna(0)
+    df = pd.merge(invested_df, value_df, on='year_month', how='outer').sort_values('year_month')
+    df = df.fillna(0).reset_index(drop=True)
+
+    # 누적 투자금액 / 평가금액 (같은 누계 기준)
+    df['cumulative_invested'] = df['monthly_invested'].cumsum()
+    df['current_value'] = df['monthly_value'].cumsum()
+
+    # 월말 기준 적금 이자 = 평가액 - 납입 원금 (월 × 납입건 한 번에)
+    df['cash_interest'] = 0.0
+    if not cash_records.empty and not df.empty:
+        month_ends = month_end_dates(df['year_month'])
+        args = (cash_records['input_amount'], cash_records['interest_rate'],
+                cash_records['purchase_date'], cash_records['interest_type'])
+        cash_value = calc_cash_value_series(*args, eval_dates=month_ends)
+        cash_principal = calc_cash_value_series(args[0], None, args[2], eval_dates=month_ends)
+        df['cash_interest'] = cash_value - cash_principal
+    df['current_value'] = df['current_value'] + df['cash_interest']
 
-    # 누적 투자금액 계산
-    df['cumulative_invested'] = (df['monthly_invested'] + df['cash_amount']).cumsum()
+    return df[['year_month', 'monthly_invested', 'cumulative_invested', 'current_value', 'cash_interest']]
+
+
+def create_asset_trend_chart(db_path: str, output_path: str, months: int = 6):
+    """자산 추이 라인 차트 생성 (투자금액 vs 평가금액, 적금 이자 반영)"""
+    df = get_asset_trend_data(db_path)
 
     # 최근 N개월만 표시
     df = df.tail(months)
@@ -598,7 +639,13 @@ def create_asset_trend_chart(db_path: str, output_path: str, months: int = 6):
     print(f"✅ 자산 추이 차트 저장: {output_path}")
 
 
-def visualize_portfolio(year_month: str, db_path: str = "portfolio.db", output_dir: str = "charts"):
+def visualize_portfolio(
+    year_month: str,
+    db_path: str = "portfolio.db",
+    output_dir: str = "charts",
+    price_cache: Optional[dict] = None,
+    render_trend: bool = True
+):
     """
     포트폴리오 시각화 메인 함수 (누적 모드)
 
@@ -606,6 +653,8 @@ def visualize_portfolio(year_month: str, db_path: str = "portfolio.db", output_d
         year_month: 분석할 월 (YYYY-MM)
         db_path: 데이터베이스 경로
         output_dir: 차트 저장 디렉토리
+        price_cache: 여러 월이 공유하는 현재가/환율 캐시
+        render_trend: False면 자산 추이 차트(모든 월 공통 파일) 생략 (일괄 실행 시 마지막에 1번)
     """
     print(f"📊 {year_month}월 포트폴리오 시각화 시작")
     print(f"   (누적 모드: {year_month}까지의 모든 투자 포함)")
@@ -623,7 +672,7 @@ def visualize_portfolio(year_month: str, db_path: str = "portfolio.db", output_d
         return
 
     # 1. 자산 배분 차트 (누적)
-    net_worth = get_cumulative_net_worth(year_month, db_path)
+    net_worth = get_cumulative_net_worth(year_month, db_path, price_cache)
     create_asset_allocation_chart(
         net_worth,
         output_path / f"{year_month}_asset_allocation.png"
@@ -645,11 +694,12 @@ def visualize_portfolio(year_month: str, db_path: str = "portfolio.db", output_d
     )
 
     # 4. 자산 추이 차트 (누적, 고정 파일명)
-    create_asset_trend_chart(
-        db_path,
-        output_path / "cumulative_asset_trend.png",
-        months=12
-    )
+    if render_trend:
+        create_asset_trend_chart(
+            db_path,
+            output_path / "cumulative_asset_trend.png",
+            months=12
+        )
 
     print("=" * 80)
     print(f"✅ 시각화 완료! 차트는 '{output_dir}/' 디렉토리에 저장되었습니다.")